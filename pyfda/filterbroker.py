@@ -232,7 +232,8 @@ fil_tree = freeze_hierarchical({
 # ------------------------------------------------------------------------------
 
 conf_settings = {
-    'THEME': 'light'}
+    'THEME': 'light',
+    'FX_BACKEND': 'auto'}
 
 # -----------------------------------------------------------------------------
 # Dictionary containing current filter type, specifications, design and some
@@ -24,7 +24,7 @@ from operator import add
 # from amaranth import *
 from amaranth.back import verilog
 from amaranth import Signal, signed, Elaboratable, Module
-from amaranth.sim import Simulator, Tick  # , Delay, Settle
+from amaranth.sim import Simulator
 
 import pyfda.fixpoint_widgets.fir_df.fir_df_amaranth_mod as mod
 
@@ -55,10 +55,22 @@ class FIR_DF_amaranth(object):
 
         - 'q_mul', value: dict with quantizer settings for the partial products
            optional, 'quant' and 'sat' are both set to 'none' if there is none
+
+    The module is elaborated and simulated in a persistent session: The simulator
+    and its register state are kept alive across the frames passed to `fxfilter()`
+    and are only rebuilt by `init()` when coefficients or quantizer settings have
+    changed. Stimuli and responses are exchanged via preallocated integer buffers.
     """
+    # clock period of the simulation in s (only relevant for the simulation time)
+    T_CLK = 1e-6
+
     def __init__(self, p):
 
         self.p = p  # parameter dictionary with coefficients etc.
+        self.sim = None
+        self.sim_key = None  # coefficients and quantizer settings of `self.sim`
+        self.x_buf = np.zeros(1024, dtype=np.int64)  # stimulus buffer
+        self.y_buf = np.zeros(1024, dtype=np.int64)  # response buffer
         self.Q_b = fx.Fixed(self.p['QCB'])  # transversal coeffs
         # self.Q_mul = fx.Fixed(self.p['QACC'].copy())  # partial products
         # self.Q_acc = fx.Fixed(self.p['QACC'])  # accumulator
@@ -93,15 +105,25 @@ class FIR_DF_amaranth(object):
         if not fb.fil[0]['fx_sim']:
             return
 
+        self.p = p
         b_q = quant_coeffs(fb.fil[0]['ba'][0], self.Q_b, out_frmt="qint")
         self.L = len(b_q)
 
         self.reset()
 
-        # Unpack p and coeff. dict in new dict without modifying p
-        d = {**p, **{'ba': b_q}}  # unpack p and coeff. dict in new dict without
-        # d = p | {'ba': b_q}  # python 3.9+ only
-        self.mod = mod.FIR_DF_amaranth_mod(d)
+        # Elaborate module and build simulator only when coefficients or quantizer
+        # settings have changed, otherwise clear the registers of the running session
+        sim_key = (tuple(b_q), tuple((q, p[q]['WI'], p[q]['WF'], p[q]['quant'],
+                                      p[q]['ovfl']) for q in ('QI', 'QCB', 'QACC', 'QO')))
+        if sim_key == self.sim_key:
+            self.flush()
+        else:
+            # Unpack p and coeff. dict in new dict without modifying p
+            d = {**p, **{'ba': b_q}}  # unpack p and coeff. dict in new dict without
+            # d = p | {'ba': b_q}  # python 3.9+ only
+            self.mod = mod.FIR_DF_amaranth_mod(d)
+            self.sim = None  # simulator is built with the first frame
+            self.sim_key = sim_key
 
         # Initialize filter memory with passed values zi and fill up with zeros
         # or truncate to filter length
@@ -114,34 +136,76 @@ class FIR_DF_amaranth(object):
             else:
                 self.zi = zi[:self.L - 1]
 
+    # ---------------------------------------------------------
+    def init_sim(self) -> None:
+        """
+        Build the simulator for `self.mod` and start a new session with a
+        background testbench that runs for the lifetime of the simulator.
+        """
         self.sim = Simulator(self.mod)
-        # with Simulator(m) as sim:
-        self.sim.add_clock(1/48000)
-
-        # TODO:
-        # see https://github.com/RobertBaruch/amaranth-tutorial/blob/main/7_simulating.md
-        # - provide run control outside fxfilter using
-        #   Processes may be passive or active. When an active process runs out of things
-        #   to tell the simulator to do, it asks the simulator to finish. In effect, it
-        #   controls the endpoint of the simulator. The simulation ends when all active
-        #   processes are done. A passive process, on the other hand, doesn't ask the
-        #   simulator to finish.
-        #   By default, processes added with add_process and add_sync_process are active.
-        #   A process can change its mode using `yield Active()`` or `yield Passive()`.
+        self.sim.add_clock(self.T_CLK)
+        self.sim.add_testbench(self.testbench, background=True)
+        self.N_sim = 0  # number of samples simulated in this session
+        self.N_frame = 0  # number of samples in current frame
+        self.k_frame = 0  # index of next sample in current frame
+
+    # ---------------------------------------------------------
+    async def testbench(self, ctx):
+        """
+        Amaranth testbench, apply stimuli via input `mod.i` from buffer `self.x_buf`
+        and collect filter outputs from `mod.o` in buffer `self.y_buf`, one sample
+        per clock cycle.
+
+        When all samples of the current frame have been processed, wait in steps of
+        a quarter clock period for the next frame. `run_frame()` stops the simulation
+        before the next clock edge, so the registers keep their state in between.
+
+        The output can only be read once per clock cycle, the simulator has no API
+        to collect the values of several cycles at once. Reading it with `ctx.get()`
+        takes less than 10 % of the simulation time of a cycle.
+
+        Requires the async testbench API of Amaranth >= 0.5.
+        """
+        while True:
+            if self.k_frame < self.N_frame:
+                ctx.set(self.mod.i, int(self.x_buf[self.k_frame]))
+                await ctx.tick()
+                self.y_buf[self.k_frame] = ctx.get(self.mod.o)
+                self.k_frame += 1
+            else:
+                await ctx.delay(self.T_CLK / 4)
 
     # ---------------------------------------------------------
-    def process(self):
+    def run_frame(self, x_i: np.ndarray) -> np.ndarray:
         """
-        Amaranth process, apply stimuli via input `mod.i` from list `self.input`
-        and collect filter outputs from `mod.o` in list `self.output`
+        Simulate the integer stimulus `x_i` in the running session and return
+        the integer response (a view into the response buffer).
         """
-        self.output = []
-        # self.ovfl_acc = []
-        for i in self.input:
-            yield self.mod.i.eq(int(i))
-            yield Tick()
-            self.output.append((yield self.mod.o))
-            # self.ovfl_acc.append((yield self.mod.ovfl_acc_o))
+        N = len(x_i)
+        if N == 0:
+            return self.y_buf[:0]
+        if self.sim is None:
+            self.init_sim()
+        if N > len(self.x_buf):  # grow buffers
+            self.x_buf = np.zeros(2 ** int(np.ceil(np.log2(N))), dtype=np.int64)
+            self.y_buf = np.zeros_like(self.x_buf)
+        self.x_buf[:N] = x_i
+        self.N_frame = N
+        self.k_frame = 0
+        self.N_sim += N
+        # Clock edge for sample k is at (k + 1/2) * T_CLK, stop the simulation
+        # 1/8 clock period after the edge of the last sample of the frame
+        self.sim.run_until((self.N_sim - 3 / 8) * self.T_CLK)
+        return self.y_buf[:N]
+
+    # ---------------------------------------------------------
+    def flush(self) -> None:
+        """
+        Clear the registers of the running session by simulating `L + 1` zeros
+        (one register per tap plus the output register of the adder tree).
+        """
+        if self.sim is not None:
+            self.run_frame(np.zeros(self.L + 1, dtype=np.int64))
 
     # ---------------------------------------------------------
     def reset(self):
@@ -153,6 +217,15 @@ class FIR_DF_amaranth(object):
         self.N_over_filt = 0
         self.zi = np.zeros(self.L - 1)
 
+    # ---------------------------------------------------------
+    def n_overflows(self) -> dict:
+        """
+        Return the number of overflows of the data path quantizers since the last
+        `reset()` as a dict with the quantizer names as keys. Overflows inside the
+        amaranth module are not counted, only the output quantizer is available.
+        """
+        return {'Q_O': self.Q_O.q_dict['N_over']}
+
     # ---------------------------------------------------------
     def fxfilter(self, x: iterable = None, zi: iterable = None) -> np.ndarray:
         """
@@ -190,7 +263,8 @@ class FIR_DF_amaranth(object):
                 logger.warning("len(zi) > len(b) - 1, zi was truncated")
 
         # store last L-1 inputs (i.e. the L-1 registers)
-        self.zi = np.concatenate((self.zi, x))[-(self.L-1):]
+        self.zi = np.concatenate((self.zi, x))
+        self.zi = self.zi[len(self.zi) - (self.L - 1):]
 
         # Calculate response by:
         # - append new stimuli `x` to register state `self.zi`
@@ -200,14 +274,12 @@ class FIR_DF_amaranth(object):
         # - quantize the partial products x*b, yielding xb_q
         # - accumulate the quantized partial products and quantize result, yielding y_q[k]
 
-        # convert stimulus to integer
+        # convert stimulus to integer and simulate it in the running session
         if fb.fil[0]['qfrmt'] == 'qfrac':
-            self.input = x * (1 << self.p['QI']['WF'])
+            x_i = np.asarray(x) * (1 << self.p['QI']['WF'])
         else:
-            self.input = x
-        # logger.warning(f"stim = {self.input}")
-        self.sim.add_process(self.process)
-        self.sim.run()
+            x_i = np.asarray(x)
+        y_i = self.run_frame(x_i)
 
         # Currently doesn't work, output signal is quantized afterwards, resetting 'N_over'
         # fb.fil[0]['fxq']['QO']['N_over'] = 13  # doesn't work, output signal is quantized
@@ -215,7 +287,8 @@ class FIR_DF_amaranth(object):
         # logger.warning(f"y = {self.Q_O.fixp(self.output, in_frmt='qint', out_frmt=fb.fil[0]['qfrmt'])}")
         # N_ovfl_acc = sum(self.ovfl_acc)
         # logger.error(f"N_ovfl_acc = {self.ovfl_acc}")
-        return self.Q_O.fixp(self.output, in_frmt='qint', out_frmt=fb.fil[0]['qfrmt']), self.zi
+        return self.Q_O.fixp(y_i.astype(np.float64), in_frmt='qint',
+                             out_frmt=fb.fil[0]['qfrmt']), self.zi
 
 
 # ------------------------------------------------------------------------------
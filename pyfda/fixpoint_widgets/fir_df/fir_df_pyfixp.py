@@ -15,6 +15,7 @@ import pyfda.filterbroker as fb
 # from pyfda.libs.pyfda_lib import pprint_log
 import pyfda.libs.pyfda_fix_lib as fx
 from pyfda.libs.pyfda_fix_lib import quant_coeffs
+from pyfda.libs import pyfda_fix_lib_numba as fxn
 
 import logging
 logger = logging.getLogger(__name__)
@@ -41,9 +42,21 @@ class FIR_DF_pyfixp(object):
 
         - 'q_mul', value: dict with quantizer settings for the partial products
            optional, 'quant' and 'sat' are both set to 'none' if there is none
+
+    block_mode : bool
+        When `True` (default), calculate the response for a whole frame at once
+        (see `fxfilter_block()`), otherwise loop over the samples one by one
+        (see `fxfilter_loop()`). Both methods yield bit-exact identical results.
+        In block mode, the compiled kernel (see `fxfilter_kernel()`) is used
+        instead when the numba backend is active.
     """
-    def __init__(self, p):
+    # max. number of elements (rows x taps) of the partial product matrix
+    # calculated in one go in block mode, this limits the memory footprint
+    N_BLOCK_MAX = 1 << 20
+
+    def __init__(self, p, block_mode: bool = True):
         self.p = p
+        self.block_mode = block_mode
 
         # create various quantizers and initialize / reset them
         self.Q_b = fx.Fixed(self.p['QCB'])  # transversal coeffs
@@ -112,7 +125,7 @@ class FIR_DF_pyfixp(object):
     # ---------------------------------------------------------
     def reset(self):
         """
-        Reset register and overflow counters of quantizers
+        Reset register, overflow counters and delta-sigma modulators of quantizers
         (but don't reset coefficient quantizers)
         """
         self.Q_mul.resetN()
@@ -121,6 +134,17 @@ class FIR_DF_pyfixp(object):
         self.N_over_filt = 0
         self.zi = np.zeros(self.L - 1)
 
+    # ---------------------------------------------------------
+    def n_overflows(self) -> dict:
+        """
+        Return the number of overflows of the data path quantizers since the last
+        `reset()` as a dict with the quantizer names as keys. Overflows of the
+        partial products are included in the accumulator overflows, overflows of
+        the coefficients are not counted.
+        """
+        return {'Q_acc': self.Q_acc.q_dict['N_over'] + self.Q_mul.q_dict['N_over'],
+                'Q_O': self.Q_O.q_dict['N_over']}
+
     # ---------------------------------------------------------
     def fxfilter(self, x: iterable = None, zi: iterable = None) -> np.ndarray:
         """
@@ -155,39 +179,185 @@ class FIR_DF_pyfixp(object):
                 self.zi = zi[:self.L - 1]
                 logger.warning("len(zi) > len(b) - 1, zi was truncated")
 
+        if self.block_mode:
+            y_q = None
+            if fxn.fx_backend() == 'numba':
+                y_q = self.fxfilter_kernel(x)  # returns None when not applicable
+            if y_q is None:
+                y_q = self.fxfilter_block(x)
+        else:
+            y_q = self.fxfilter_loop(x)
+
+        # store last L-1 inputs (i.e. the L-1 registers), also for L = 1
+        self.zi = self.zi[len(self.zi) - (self.L - 1):]
+
+        # Overflows in Q_mul are added to overflows in Q_Acc, then Q_mul is reset
+        if self.Q_acc.q_dict['N_over'] > 0 or self.Q_mul.q_dict['N_over'] > 0:
+            logger.warning(f"Overflows: N_Acc = {self.Q_acc.q_dict['N_over']}, "
+                           f"N_Mul = {self.Q_mul.q_dict['N_over']}")
+
+        self.Q_acc.q_dict['N_over'] = self.Q_acc.q_dict['N_over'] + self.Q_mul.q_dict['N_over']
+        self.Q_mul.resetN(dsm=False)  # keep modulator state between frames
+
+        return self.Q_O.requant(y_q[:len(x)], self.Q_acc), self.zi
+
+    # ---------------------------------------------------------
+    def fxfilter_loop(self, x: iterable) -> np.ndarray:
+        """
+        Calculate the accumulator values for the input frame `x` sample by sample.
+
+        Calculate response by:
+        - append new stimuli `x` to register state `self.zi`
+        - slide a window with length `len(b)` over `self.zi`, starting at position `k`
+          and multiply it with the coefficients `b`, yielding the partial products x*b
+        - quantize the partial products x*b, yielding xb_q
+        - accumulate the quantized partial products and quantize result, yielding y_q[k]
+
+        `self.zi` contains the old register state followed by `x` afterwards.
+
+        Parameters
+        ----------
+        x : array of float
+            input values, quantized according to the setting of `p['QI']`
+
+        Returns
+        -------
+        y_q : ndarray
+            accumulator values for each input sample, quantized with `Q_acc`
+        """
+        qfrmt = fb.fil[0]['qfrmt']
         # initialize quantized partial products and output arrays
         y_q = xb_q = np.zeros(len(x))
 
-        # Calculate response by:
-        # - append new stimuli `x` to register state `self.zi`
-        # - slide a window with length `len(b)` over `self.zi`, starting at position `k`
-        #   and multiply it with the coefficients `b`, yielding the partial products x*b
-        #   TODO: Doing this for the last len(x) terms should be enough
-        # - quantize the partial products x*b, yielding xb_q
-        # - accumulate the quantized partial products and quantize result, yielding y_q[k]
-
         self.zi = np.concatenate((self.zi, x))
 
         for k in range(len(x)):
             # partial products xb_q at time k, quantized with Q_mul:
             xb_q = self.Q_mul.fixp(self.zi[k:k + self.L] * self.b_q,
-                                   in_frmt=fb.fil[0]['qfrmt'],
-                                   out_frmt=fb.fil[0]['qfrmt'])
+                                   in_frmt=qfrmt, out_frmt=qfrmt)
             # accumulate x_bq to get accu[k]
-            y_q[k] = self.Q_acc.fixp(np.sum(xb_q), in_frmt=fb.fil[0]['qfrmt'],
-                                     out_frmt=fb.fil[0]['qfrmt'])
+            y_q[k] = self.Q_acc.fixp(np.sum(xb_q), in_frmt=qfrmt, out_frmt=qfrmt)
 
-        self.zi = self.zi[-(self.L-1):]  # store last L-1 inputs (i.e. the L-1 registers)
+        return y_q
 
-        # Overflows in Q_mul are added to overflows in Q_Acc, then Q_mul is reset
-        if self.Q_acc.q_dict['N_over'] > 0 or self.Q_mul.q_dict['N_over'] > 0:
-            logger.warning(f"Overflows: N_Acc = {self.Q_acc.q_dict['N_over']}, "
-                           f"N_Mul = {self.Q_mul.q_dict['N_over']}")
+    # ---------------------------------------------------------
+    def fxfilter_block(self, x: iterable) -> np.ndarray:
+        """
+        Calculate the accumulator values for the input frame `x` in block mode,
+        yielding the same results and overflow counts as `fxfilter_loop()`:
 
-        self.Q_acc.q_dict['N_over'] = self.Q_acc.q_dict['N_over'] + self.Q_mul.q_dict['N_over']
-        self.Q_mul.resetN()
+        - append new stimuli `x` to register state `self.zi`
+        - create a strided (read-only) view of `self.zi` with one window of
+          length `len(b)` per row, i.e. row `k` contains `self.zi[k:k + L]`.
+          No data is copied here.
+        - multiply all windows with the coefficients `b` and quantize the
+          resulting matrix of partial products with a single call of `Q_mul.fixp()`
+        - sum up the rows and quantize the accumulator values with a single call
+          of `Q_acc.fixp()`
 
-        return self.Q_O.requant(y_q[:len(x)], self.Q_acc), self.zi
+        Large frames are processed in chunks of rows, limiting the size of
+        the partial product matrix to `N_BLOCK_MAX` elements.
+
+        Parameters
+        ----------
+        x : array of float
+            input values, quantized according to the setting of `p['QI']`
+
+        Returns
+        -------
+        y_q : ndarray
+            accumulator values for each input sample, quantized with `Q_acc`
+        """
+        qfrmt = fb.fil[0]['qfrmt']
+        y_q = np.zeros(len(x))
+
+        self.zi = np.concatenate((self.zi, x))
+        # strided view with shape (len(x), L), row k = self.zi[k:k + L]
+        zi_win = np.lib.stride_tricks.sliding_window_view(self.zi, self.L)
+
+        N_rows = max(self.N_BLOCK_MAX // self.L, 1)  # number of rows per chunk
+        for k in range(0, len(x), N_rows):
+            # partial products for all rows of the chunk, quantized with Q_mul:
+            xb_q = self.Q_mul.fixp(zi_win[k:k + N_rows] * self.b_q,
+                                   in_frmt=qfrmt, out_frmt=qfrmt)
+            # accumulate rows of x_bq to get accu[k:k + N_rows]
+            y_q[k:k + N_rows] = self.Q_acc.fixp(np.sum(xb_q, axis=1),
+                                                in_frmt=qfrmt, out_frmt=qfrmt)
+        return y_q
+
+    # ---------------------------------------------------------
+    def fxfilter_kernel(self, x: iterable) -> np.ndarray:
+        """
+        Calculate the accumulator values for the input frame `x` with the compiled
+        integer kernel `fir_df_kernel()` from `pyfda_fix_lib_numba`, yielding the
+        same results and overflow counts as `fxfilter_loop()`.
+
+        The kernel is only used when the results are guaranteed to be identical,
+        i.e. when inputs and coefficients are on the grid of their quantizers,
+        the quantizers use an integer quantization method with `W <= 62` bits
+        and all intermediate results stay below 2**52.
+
+        Parameters
+        ----------
+        x : array of float
+            input values, quantized according to the setting of `p['QI']`
+
+        Returns
+        -------
+        y_q : ndarray or None
+            accumulator values for each input sample, quantized with `Q_acc`.
+            `None` when the kernel cannot be used, registers and overflow counters
+            are unchanged in this case.
+        """
+        qfrmt = fb.fil[0]['qfrmt']
+        Q_mul, Q_acc = self.Q_mul, self.Q_acc
+        x = np.asarray(x)
+        if not fb.fil[0]['fx_sim'] or x.ndim != 1 or len(x) == 0\
+                or x.dtype.kind not in {'i', 'u', 'f'}:
+            return None
+        for Q in (Q_mul, Q_acc):
+            if Q.q_dict['WI'] + Q.q_dict['WF'] + 1 > 62\
+                    or Q.q_dict['quant'] not in fxn.QUANT_CODES:
+                return None
+
+        # convert inputs and coefficients to integers, in 'qint' format the
+        # products are interpreted directly in units of the LSB of `Q_mul`
+        WF_mul, WF_acc = Q_mul.q_dict['WF'], Q_acc.q_dict['WF']
+        if qfrmt == 'qfrac':
+            WF_x, WF_b = self.p['QI']['WF'], self.p['QCB']['WF']
+            X = np.concatenate((self.zi, x)) * (2. ** WF_x)
+            B = self.b_q * (2. ** WF_b)
+            dWF_mul, dWF_acc = WF_x + WF_b - WF_mul, WF_mul - WF_acc
+        else:
+            X = np.concatenate((self.zi, x)).astype(np.float64)
+            B = np.asarray(self.b_q, dtype=np.float64)
+            dWF_mul = dWF_acc = 0
+        if not (np.array_equal(X, np.rint(X)) and np.array_equal(B, np.rint(B))):
+            return None  # off-grid or non-finite values
+        # bound of the sum of partial products
+        sum_max = np.max(np.abs(X)) * np.sum(np.abs(B)) * 2. ** max(-dWF_mul, 0)
+        if sum_max * 2. ** max(-dWF_acc, 0) >= 2. ** 52:
+            return None
+
+        acc, N_mul, ovr_acc = fxn.fir_df_kernel(
+            X.astype(np.int64), B.astype(np.int64),
+            dWF_mul, fxn.QUANT_CODES[Q_mul.q_dict['quant']],
+            WF_mul + Q_mul.q_dict['WI'] + 1, fxn.OVFL_CODES[Q_mul.q_dict['ovfl']],
+            dWF_acc, fxn.QUANT_CODES[Q_acc.q_dict['quant']],
+            WF_acc + Q_acc.q_dict['WI'] + 1, fxn.OVFL_CODES[Q_acc.q_dict['ovfl']])
+
+        # update registers and overflow counters, `Q_mul` is reset after each frame
+        # in `fxfilter()`, only its number of overflows is needed
+        self.zi = np.concatenate((self.zi, x))
+        Q_mul.N_over = 0 if Q_mul.q_dict['ovfl'] == 'none' else Q_mul.N_over + N_mul
+        Q_mul.q_dict['N_over'] = Q_mul.N_over
+        Q_acc._ovfl_flags(ovr_acc)
+        Q_mul.N += len(x) * self.L
+        Q_acc.N += len(x)
+
+        if qfrmt == 'qfrac':
+            return acc * (2. ** -WF_acc)
+        return acc.astype(np.float64)
 
 
 # ------------------------------------------------------------------------------
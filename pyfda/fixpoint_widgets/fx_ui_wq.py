@@ -459,7 +459,8 @@ class FX_UI_WQ(QWidget):
             q_dict = self.q_dict  # update UI from instance / global qdict
         else:
             for k in q_dict:
-                if k not in {'quant', 'ovfl', 'WI', 'WF', 'w_a_m', 'N_over'}:
+                if k not in {'quant', 'ovfl', 'WI', 'WF', 'w_a_m', 'N_over',
+                             'dsm_order', 'dsm_osr', 'dsm_opt'}:
                     logger.warning(f"Unknown quantization dict key '{k}'")
 
         # Update all non-numeric instance quantization dict entries from passed `q_dict`
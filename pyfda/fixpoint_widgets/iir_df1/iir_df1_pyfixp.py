@@ -9,11 +9,13 @@
 """
 Fixpoint class for calculating direct-form DF1 IIR filter using pyfixp routines
 """
+from operator import mul
 import numpy as np
 from numpy.lib.function_base import iterable
 import pyfda.filterbroker as fb
 import pyfda.libs.pyfda_fix_lib as fx
 from pyfda.libs.pyfda_fix_lib import quant_coeffs
+from pyfda.libs import pyfda_fix_lib_numba as fxn
 
 import logging
 logger = logging.getLogger(__name__)
@@ -41,9 +43,20 @@ class IIR_DF1_pyfixp(object):
 
         - 'q_mul', value: dict with partial product quantizer settings
             currently unused, created from a copy of the QACC dict
+
+    block_mode : bool
+        When `True` (default), calculate the response for a whole frame with
+        the integer engine `fxfilter_block()` whenever the results are guaranteed
+        to be bit-exact, otherwise loop over the samples one by one
+        (see `fxfilter_loop()`).
     """
-    def __init__(self, p):
+    # all intermediate values of the block engine must stay below this limit,
+    # the float64 arithmetics of the sample loop are exact in this range
+    INT_LIMIT = 1 << 52
+
+    def __init__(self, p, block_mode: bool = True):
         self.p = p
+        self.block_mode = block_mode
 
         # create various quantizers and initialize / reset them
         self.Q_a = fx.Fixed(self.p['QCA'])  # recursive coeffs
@@ -152,7 +165,7 @@ class IIR_DF1_pyfixp(object):
     # ---------------------------------------------------------
     def reset(self):
         """
-        Reset registers and overflow counters of quantizers
+        Reset registers, overflow counters and delta-sigma modulators of quantizers
         (except for coefficient quant.)
         """
         self.Q_mul_a.resetN()
@@ -163,6 +176,17 @@ class IIR_DF1_pyfixp(object):
         self.zi_a = np.zeros(self.L - 1)
         self.zi_b = np.zeros(self.L - 1)
 
+    # ---------------------------------------------------------
+    def n_overflows(self) -> dict:
+        """
+        Return the number of overflows of the data path quantizers since the last
+        `reset()` as a dict with the quantizer names as keys. Overflows of the
+        partial products are included in the accumulator overflows, overflows of
+        the coefficients are not counted.
+        """
+        return {'Q_acc': self.Q_acc.N_over + self.Q_mul_a.N_over + self.Q_mul_b.N_over,
+                'Q_O': self.Q_O.N_over}
+
     # ---------------------------------------------------------
     def fxfilter(self, x: iterable = None,
                  zi_b: iterable = None, zi_a: iterable = None) -> np.ndarray:
@@ -184,6 +208,10 @@ class IIR_DF1_pyfixp(object):
         - accumulate the quantized partial products and quantize result as `y_q[k]`
         - insert last output `y_q[k]` into the recursive register `self.zi_a`
 
+        In block mode, the response is calculated with `fxfilter_block()` yielding
+        identical results, see `fxfilter_loop()` for the sample-by-sample
+        implementation.
+
           TODO: complex inputs?
 
         Parameters
@@ -218,8 +246,6 @@ class IIR_DF1_pyfixp(object):
             The content of the L-1 recursive state registers with the
             last L-1 output values
         """
-        qfrmt = fb.fil[0]['qfrmt']
-
         # if initial conditions `zi_a` or `zi_b` have been given, use them:
         if zi_b is not None:
             if len(zi_b) == self.L - 1:   # use zi_b as it is
@@ -239,6 +265,47 @@ class IIR_DF1_pyfixp(object):
                 self.zi_a = zi_a[:self.L - 1]
                 logger.warning("len(zi_a) > len(coeff) - 1, zi_a was truncated")
 
+        y_q = None
+        if self.block_mode:
+            y_q = self.fxfilter_block(x)  # returns None when not applicable
+        if y_q is None:
+            y_q = self.fxfilter_loop(x)
+
+        # store last L-1 inputs (i.e. the L-1 registers), also for L = 1
+        self.zi_b = self.zi_b[len(self.zi_b) - (self.L - 1):]
+
+        # Overflows in Q_mul are added to overflows in Q_Acc, then Q_mul is reset
+        if self.Q_acc.N_over > 0 or self.Q_mul_a.N_over > 0 or self.Q_mul_b.N_over > 0:
+            logger.warning(f"Overflows: N_Acc = {self.Q_acc.N_over}, "
+                           f"N_Mul_a = {self.Q_mul_a.N_over}, "
+                           f"N_Mul_b = {self.Q_mul_b.N_over}.")
+        self.Q_acc.N_over += self.Q_mul_a.N_over + self.Q_mul_b.N_over
+        self.Q_mul_a.resetN(dsm=False)  # keep modulator state between frames
+        self.Q_mul_b.resetN(dsm=False)
+
+        return y_q[:len(x)], self.zi_b, self.zi_a
+
+    # ---------------------------------------------------------
+    def fxfilter_loop(self, x: iterable) -> np.ndarray:
+        """
+        Calculate the quantized output values for the input frame `x` sample by
+        sample.
+
+        `self.zi_b` contains the old register state followed by `x` afterwards,
+        `self.zi_a` contains the last L-1 output values.
+
+        Parameters
+        ----------
+        x : array of float
+            input values, quantized according to the setting of `p['QI']`
+
+        Returns
+        -------
+        y_q : ndarray
+            output values for each input sample, quantized with `Q_O`
+        """
+        qfrmt = fb.fil[0]['qfrmt']
+
         # initialize quantized partial products and output arrays
         y_q = xb_q = np.zeros(len(x))
         ya_q = np.zeros(self.L - 1)
@@ -271,19 +338,256 @@ class IIR_DF1_pyfixp(object):
                                 self.Q_acc)
             self.zi_a[0] = y_q[k]
 
-        self.zi_b = self.zi_b[-(self.L-1):]  # store last L-1 inputs (i.e. the L-1 registers)
+        return y_q
 
-        # Overflows in Q_mul are added to overflows in Q_Acc, then Q_mul is reset
-        if self.Q_acc.N_over > 0 or self.Q_mul_a.N_over > 0 or self.Q_mul_b.N_over > 0:
-            logger.warning(f"Overflows: N_Acc = {self.Q_acc.N_over}, "
-                           f"N_Mul_a = {self.Q_mul_a.N_over}, "
-                           f"N_Mul_b = {self.Q_mul_b.N_over}.")
-        self.Q_acc.N_over += self.Q_mul_a.N_over + self.Q_mul_b.N_over
-        self.Q_mul_a.resetN()
-        self.Q_mul_b.resetN()
+    # ---------------------------------------------------------
+    def fxfilter_block(self, x: iterable) -> np.ndarray:
+        """
+        Calculate the quantized output values for the input frame `x` with an
+        integer engine, yielding the same results and overflow counts as
+        `fxfilter_loop()`. All values are processed as integers in units of the
+        LSB of the corresponding quantizer:
+
+        - append new stimuli `x` to the transversal register state `self.zi_b`
+        - the transversal part does not depend on the feedback, it is calculated
+          for the whole frame up front: Multiply a strided view of the windows
+          of `self.zi_b` with the coefficients `b`, treat overflows of the partial
+          products with `Q_mul_b`, sum up the rows and requantize the sums to
+          the accumulator format with a few int64 array operations.
+        - the recursive part is calculated sample by sample in a tight loop,
+          operating on a preallocated ring buffer with the last L-1 output values.
+          The loop is compiled when the numba backend is active (see
+          `pyfda_fix_lib_numba`).
+
+        Requantization is done by shifting, overflows are treated with bit masks
+        or by clipping.
+
+        The engine is only used when the results are guaranteed to be identical
+        to those of the sample loop, i.e. when all inputs, registers and
+        coefficients are on the grid of their quantizers, all quantizers use
+        an integer quantization method with `W <= 62` bits, the output
+        quantizer limits the range of the recursive registers (`'sat'` or `'wrap'`)
+        and all intermediate results stay below `INT_LIMIT`.
 
-        return y_q[:len(x)], self.zi_b, self.zi_a
+        Parameters
+        ----------
+        x : array of float
+            input values, quantized according to the setting of `p['QI']`
+
+        Returns
+        -------
+        y_q : ndarray or None
+            output values for each input sample, quantized with `Q_O`. `None`
+            when the engine cannot be used, registers and overflow counters are
+            unchanged in this case.
+        """
+        qfrmt = fb.fil[0]['qfrmt']
+        M = self.L - 1
+        Q_mb, Q_ma, Q_acc, Q_O = self.Q_mul_b, self.Q_mul_a, self.Q_acc, self.Q_O
+
+        x = np.asarray(x)
+        if not fb.fil[0]['fx_sim'] or M < 1 or len(self.a_q) != self.L\
+                or x.ndim != 1 or len(x) == 0 or x.dtype.kind not in {'i', 'u', 'f'}:
+            return None
+        if Q_acc.q_dict['quant'] not in fx.INT_QUANT_METHODS\
+                or Q_O.q_dict['quant'] not in fx.INT_QUANT_METHODS\
+                or Q_mb.q_dict['quant'] == 'dsm' or Q_ma.q_dict['quant'] == 'dsm'\
+                or Q_O.q_dict['ovfl'] == 'none':
+            return None
+        for Q in (Q_mb, Q_ma, Q_acc, Q_O):
+            if Q.q_dict['WI'] + Q.q_dict['WF'] + 1 > 62:
+                return None
+
+        # convert inputs, registers and coefficients to integers
+        def to_int(v, WF: int):
+            v_i = np.asarray(v, dtype=np.float64)
+            if qfrmt == 'qfrac':
+                v_i = v_i * (2. ** WF)
+            if not np.array_equal(v_i, np.rint(v_i))\
+                    or np.max(np.abs(v_i), initial=0) >= self.INT_LIMIT:
+                return None  # off-grid, out of range or non-finite
+            return v_i.astype(np.int64)
+
+        X = to_int(np.concatenate((self.zi_b, x)), self.p['QI']['WF'])
+        B = to_int(self.b_q, self.p['QCB']['WF'])
+        A = to_int(self.a_q[1:], self.p['QCA']['WF'])
+        Y = to_int(self.zi_a, self.p['QO']['WF'])
+        if X is None or B is None or A is None or Y is None:
+            return None
+
+        # make sure that all intermediate results stay within INT_LIMIT
+        WF_mb, WF_ma = Q_mb.q_dict['WF'], Q_ma.q_dict['WF']
+        WF_acc, WF_O = Q_acc.q_dict['WF'], Q_O.q_dict['WF']
+        W_acc = Q_acc.q_dict['WI'] + WF_acc + 1
+        W_O = Q_O.q_dict['WI'] + WF_O + 1
+
+        def acc_bound(sum_max: int, WF_in: int) -> tuple:
+            """ bound of accumulator value before and after overflow treatment """
+            pre = (sum_max << max(WF_acc - WF_in, 0)) + 1
+            if Q_acc.q_dict['ovfl'] == 'none':
+                return pre, pre
+            return pre, 1 << (W_acc - 1)
+
+        Y_max = max(1 << (W_O - 1), int(np.max(np.abs(Y))))
+        sum_a_max = Y_max * int(np.sum(np.abs(A)))
+        sum_b_max = int(np.max(np.abs(X))) * int(np.sum(np.abs(B)))
+        acc_a_pre, acc_a_max = acc_bound(sum_a_max, WF_ma)
+        acc_b_pre, acc_b_max = acc_bound(sum_b_max, WF_mb)
+        o_pre = (acc_a_max + acc_b_max) << max(WF_O - WF_acc, 0)
+        if max(sum_a_max, sum_b_max, acc_a_pre, acc_b_pre, o_pre) >= self.INT_LIMIT:
+            return None
+
+        # ---- transversal part for the whole frame -----------------------------
+        N = len(x)
+        # strided view with shape (N, len(b)), row k = X[k:k + len(b)]
+        X_win = np.lib.stride_tricks.sliding_window_view(X, len(B))[:N]
+        xb_q = X_win * B
+        Q_mb.N += xb_q.size
+        Q_mb._ovfl_int(xb_q)
+        # overflows of the accumulator are treated in the recursive part, keeping
+        # the order of the overflow statistics of the sample loop
+        acc_b = Q_acc._quant_int(np.sum(xb_q, axis=1), WF_mb)
+
+        # ---- recursive part, sample by sample ---------------------------------
+        ovfl_ma, ovfl_acc, ovfl_O =\
+            Q_ma.q_dict['ovfl'], Q_acc.q_dict['ovfl'], Q_O.q_dict['ovfl']
+        W_ma = Q_ma.q_dict['WI'] + WF_ma + 1
+        if fxn.fx_backend() == 'numba':
+            y_q, zi_a, N_ma, ovr_acc, ovr_O = fxn.iir_df1_kernel(
+                acc_b, A, Y, W_ma, fxn.OVFL_CODES[ovfl_ma],
+                WF_ma - WF_acc, fxn.QUANT_CODES[Q_acc.q_dict['quant']],
+                W_acc, fxn.OVFL_CODES[ovfl_acc],
+                WF_acc - WF_O, fxn.QUANT_CODES[Q_O.q_dict['quant']],
+                W_O, fxn.OVFL_CODES[ovfl_O])
+        else:
+            # partial products y * a only need to be checked when they can overflow
+            chk_ma = ovfl_ma != 'none' and Y_max * int(np.max(np.abs(A))) >= 1 << (W_ma - 1)
+            y_q, zi_a, N_ma, ovr_acc, ovr_O = _iir_df1_recursion(
+                acc_b.tolist(), A.tolist(), Y.tolist(), W_ma, ovfl_ma, chk_ma,
+                _shift_quant(WF_ma - WF_acc, Q_acc.q_dict['quant']), W_acc, ovfl_acc,
+                _shift_quant(WF_acc - WF_O, Q_O.q_dict['quant']), W_O, ovfl_O)
+
+        # ---- update registers and overflow counters ----------------------------
+        scale = 2. ** -WF_O if qfrmt == 'qfrac' else 1.
+        self.zi_b = np.concatenate((self.zi_b, x))
+        self.zi_a = np.array(zi_a, dtype=np.float64) * scale
 
+        # `Q_mul_a` is reset after each frame in `fxfilter()`, only its number
+        # of overflows is needed
+        if ovfl_ma != 'none':
+            Q_ma.N_over += N_ma
+            Q_ma.q_dict['N_over'] = Q_ma.N_over
+        Q_ma.N += N * M
+        Q_acc._ovfl_flags(ovr_acc)
+        Q_acc.N += 2 * N
+        Q_O._ovfl_flags(ovr_O)
+        Q_O.N += N
+
+        return np.array(y_q, dtype=np.float64) * scale
+
+
+# ------------------------------------------------------------------------------
+def _iir_df1_recursion(acc_b: list, A: list, Y: list, W_ma: int, ovfl_ma: str,
+                       chk_ma: bool, q_acc, W_acc: int, ovfl_acc: str,
+                       q_O, W_O: int, ovfl_O: str) -> tuple:
+    """
+    Recursive part of `IIR_DF1_pyfixp.fxfilter_block()` operating on lists of
+    Python integers, see `iir_df1_kernel()` in `pyfda_fix_lib_numba` for the
+    compiled version. `q_acc` and `q_O` are requantization functions created by
+    `_shift_quant()`, partial products are only checked for overflows when
+    `chk_ma == True`.
+
+    Return the output values, the final output registers, the number of
+    overflows of the partial products and the overflow flags of the accumulator
+    (shape `(N, 2)`) and the output.
+    """
+    N = len(acc_b)
+    M = len(A)
+    MAX_ma = (1 << (W_ma - 1)) - 1
+    MIN_ma = -MAX_ma - 1
+    MAX_acc = (1 << (W_acc - 1)) - 1
+    MIN_acc = -MAX_acc - 1
+    MAX_O = (1 << (W_O - 1)) - 1
+    MIN_O = -MAX_O - 1
+    N_ma = 0
+    ovr_acc = np.zeros((N, 2), dtype=np.int8)
+    ovr_O = np.zeros(N, dtype=np.int8)
+
+    # ring buffer with two copies of the output registers: the window
+    # `buf[p:p + M]` always contains the last M outputs, newest first
+    buf = Y * 2
+    p = 0
+    y_q = [0] * N
+    for k in range(N):
+        acc_b_k = acc_b[k]
+        if ovfl_acc != 'none' and (acc_b_k > MAX_acc or acc_b_k < MIN_acc):
+            ovr_acc[k, 0] = 1 if acc_b_k > MAX_acc else -1
+            if ovfl_acc == 'sat':
+                acc_b_k = MAX_acc if acc_b_k > MAX_acc else MIN_acc
+            else:
+                acc_b_k = ((acc_b_k - MIN_acc) & (2 * MAX_acc + 1)) + MIN_acc
+
+        if chk_ma:
+            ya_q = list(map(mul, A, buf[p:p + M]))
+            if max(ya_q) > MAX_ma or min(ya_q) < MIN_ma:
+                for i, v in enumerate(ya_q):
+                    if v > MAX_ma or v < MIN_ma:
+                        N_ma += 1
+                        if ovfl_ma == 'sat':
+                            ya_q[i] = MAX_ma if v > MAX_ma else MIN_ma
+                        else:
+                            ya_q[i] = ((v - MIN_ma) & (2 * MAX_ma + 1)) + MIN_ma
+            acc_a = q_acc(sum(ya_q))
+        else:
+            acc_a = q_acc(sum(map(mul, A, buf[p:p + M])))
+
+        if ovfl_acc != 'none' and (acc_a > MAX_acc or acc_a < MIN_acc):
+            ovr_acc[k, 1] = 1 if acc_a > MAX_acc else -1
+            if ovfl_acc == 'sat':
+                acc_a = MAX_acc if acc_a > MAX_acc else MIN_acc
+            else:
+                acc_a = ((acc_a - MIN_acc) & (2 * MAX_acc + 1)) + MIN_acc
+
+        y = q_O(acc_b_k - acc_a)
+        if ovfl_O != 'none' and (y > MAX_O or y < MIN_O):
+            ovr_O[k] = 1 if y > MAX_O else -1
+            if ovfl_O == 'sat':
+                y = MAX_O if y > MAX_O else MIN_O
+            else:
+                y = ((y - MIN_O) & (2 * MAX_O + 1)) + MIN_O
+
+        y_q[k] = y
+        # insert output into recursive (output) state register
+        p = p - 1 if p > 0 else M - 1
+        buf[p] = buf[p + M] = y
+
+    return y_q, buf[p:p + M], N_ma, ovr_acc, ovr_O
+
+
+# ------------------------------------------------------------------------------
+def _shift_quant(dWF: int, quant: str):
+    """
+    Return a function for requantizing an integer by removing `dWF` fractional
+    bits with quantization method `quant`, yielding the same results as `Fixed()`.
+    For `dWF <= 0`, the integer is left-shifted by `-dWF` bits.
+    """
+    if dWF <= 0:
+        return lambda v: v << -dWF
+    elif quant == 'floor':
+        return lambda v: v >> dWF
+    elif quant == 'ceil':
+        return lambda v: -(-v >> dWF)
+    elif quant == 'fix':
+        return lambda v: v >> dWF if v >= 0 else -(-v >> dWF)
+    else:  # 'round', 'rint': round half to even
+        half = 1 << (dWF - 1)
+        mask = (1 << dWF) - 1
+
+        def round_half_even(v):
+            q = v >> dWF
+            r = v & mask
+            return q + 1 if r > half or (r == half and q & 1) else q
+        return round_half_even
 
 # ------------------------------------------------------------------------------
 if __name__ == '__main__':
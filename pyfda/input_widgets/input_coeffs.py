@@ -295,6 +295,9 @@ class Input_Coeffs(QWidget):
         # handles to quantization objects (`fx.Fixed()` instances) of coefficient widgets
         self.Q = [self.ui.wdg_wq_coeffs_b.Q,
                      self.ui.wdg_wq_coeffs_a.Q]
+        # overflow flags are needed for coloring the table items
+        for q in self.Q:
+            q.track_flags = True
 
         self._construct_UI()
 
@@ -419,6 +422,9 @@ class Input_Coeffs(QWidget):
           `self.Q[0]` and `self.Q[1]` for `b` and `a` coefficients respectively
           and store them in the array `self.ba_q`. Depending on the number base
           (float, dec, hex, ...) the result can be of type float or string.
+          Formatted columns are cached by the quantizer objects until their
+          settings change, refreshing the table with unchanged coefficients
+          doesn't need to format them again.
 
         *  Store pos. / neg. overflows in the 3rd and 4th column of `self.ba_q` as
            0 or +/- 1.
@@ -755,14 +761,15 @@ class Input_Coeffs(QWidget):
 
         self.ba = [[], []]
         if orientation_horiz:
-            for c in range(num_cols):
-                if formatted_import:
-                    self.ba[0].append(
-                        self.Q[0].frmt2float(data_str[c][0]))
-                    if num_rows > 1:
-                        self.ba[1].append(
-                            self.Q[1].frmt2float(data_str[c][1]))
-                else:
+            if formatted_import:
+                # convert whole columns at once with the vectorized parser
+                self.ba[0] = self.Q[0].frmt2float(
+                    np.asarray([data_str[c][0] for c in range(num_cols)]))
+                if num_rows > 1:
+                    self.ba[1] = self.Q[1].frmt2float(
+                        np.asarray([data_str[c][1] for c in range(num_cols)]))
+            else:
+                for c in range(num_cols):
                     self.ba[0].append(data_str[c][0])
                     if num_rows > 1:
                         self.ba[1].append(data_str[c][1])
@@ -773,15 +780,13 @@ class Input_Coeffs(QWidget):
                 self._filter_type(ftype='FIR')
         else:
             if formatted_import:
-                self.ba[0] =\
-                    [self.Q[0].frmt2float(s) for s in data_str[0]]
+                self.ba[0] = self.Q[0].frmt2float(np.asarray(data_str[0]))
             else:
                 self.ba[0] = data_str[0]
             # IIR
             if num_cols > 1:
                 if formatted_import:
-                    self.ba[1] =\
-                        [self.Q[1].frmt2float(s) for s in data_str[1]]
+                    self.ba[1] = self.Q[1].frmt2float(np.asarray(data_str[1]))
                 else:
                     self.ba[1] = data_str[1]
                 self._filter_type(ftype='IIR')
@@ -15,14 +15,16 @@ import re
 import importlib
 
 from pyfda.libs.compat import (
-    Qt, QWidget, QPushButton, QComboBox, QFileDialog, QLabel, QPixmap,
-    QVBoxLayout, QHBoxLayout, pyqtSignal, QFrame, QSizePolicy)
+    Qt, QWidget, QPushButton, QComboBox, QFileDialog, QLabel, QPixmap, QSpinBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+    QVBoxLayout, QHBoxLayout, QThread, pyqtSignal, QFrame, QSizePolicy)
 
 import numpy as np
 
 import pyfda.filterbroker as fb  # importing filterbroker initializes all its globals
 import pyfda.libs.pyfda_dirs as dirs
 from pyfda.libs.pyfda_lib import pprint_log, first_item
+from pyfda.libs import pyfda_fix_sweep as fx_sweep
 from pyfda.libs.pyfda_qt_lib import (
     qget_cmb_box, qstyle_widget, qcmb_box_populate, qset_cmb_box)
 from pyfda.fixpoint_widgets.fx_ui_wq import FX_UI_WQ
@@ -43,6 +45,36 @@ logger = logging.getLogger(__name__)
 classes = {'Input_Fixpoint_Specs': 'Fixpoint'}  #: Dict with class name : display name
 
 
+class Sweep_Worker(QThread):
+    """
+    Worker thread for the wordlength sweep: Simulate the fixpoint filter class
+    `fx_class` for all quantizer configurations `fxq_list` against the stimulus
+    `x` with `pyfda_fix_sweep.fx_sweep()` in a pool of `n_workers` processes,
+    keeping the GUI responsive. Stimulus and filter settings `fil` are snapshots
+    taken on the GUI thread. `sig_finish` is emitted with the worker instance and
+    the list of results when the sweep has finished.
+    """
+    sig_finish = pyqtSignal(object, list)
+
+    def __init__(self, fx_class: type, fxq_list: list, x: np.ndarray, fil: dict,
+                 n_workers: int) -> None:
+        super().__init__()
+        self.fx_class = fx_class
+        self.fxq_list = fxq_list
+        self.x = x
+        self.fil = fil
+        self.n_workers = n_workers
+
+    def run(self) -> None:
+        try:
+            results = fx_sweep.fx_sweep(self.fx_class, self.fxq_list, self.x,
+                                        n_workers=self.n_workers, fil=self.fil)
+        except Exception as e:
+            logger.error(f"Error in wordlength sweep: {e}")
+            results = []
+        self.sig_finish.emit(self, results)
+
+
 class Input_Fixpoint_Specs(QWidget):
     """
     Create the widget that holds the dynamically loaded fixpoint filter UI
@@ -64,6 +96,8 @@ class Input_Fixpoint_Specs(QWidget):
         self.parent = parent
         self.fx_specs_changed = False
         self.fx_filt_changed = False
+        # worker thread for the wordlength sweep, `None` when no sweep is active
+        self.sweep_worker = None
 
         self.fx_path = os.path.realpath(
             os.path.join(dirs.INSTALL_DIR, 'fixpoint_widgets'))
@@ -243,10 +277,12 @@ class Input_Fixpoint_Specs(QWidget):
                         self.wdg_wq_input.Q.resetN()
                         self.wdg_wq_output.Q.resetN()
                         # Trigger fixpoint response calculation, passing a handle to the
-                        # fixpoint filter function in the emitted dict via signal-slot
+                        # fixpoint filter function and the fixpoint filter object (if
+                        # any) in the emitted dict via signal-slot
                         if hasattr(self.fx_filt_ui, 'fxfilter'):
                             self.emit({'fx_sim': 'start_fx_response_calculation',
-                                    'fxfilter_func': self.fx_filt_ui.fxfilter})
+                                    'fxfilter_func': self.fx_filt_ui.fxfilter,
+                                    'fx_filt': getattr(self.fx_filt_ui, 'fx_filt', None)})
                         else:
                             logger.error(
                                 "Couldn't find fixpoint filter definition\n"
@@ -410,15 +446,44 @@ class Input_Fixpoint_Specs(QWidget):
             "Create Verilog or VHDL netlist for fixpoint filter.")
         self.butExportHDL.setText("-> Verilog")
 
+        self.but_sweep = QPushButton(self)
+        self.but_sweep.setToolTip(
+            "<span>Simulate the fixpoint filter with white noise for different "
+            "fractional word lengths of the coefficient and accumulator quantizers "
+            "and list SNR, overflows and max. error.</span>")
+        self.but_sweep.setText("Sweep")
+
+        self.spn_sweep = QSpinBox(self)
+        self.spn_sweep.setRange(1, 8)
+        self.spn_sweep.setValue(3)
+        self.spn_sweep.setPrefix("\u00b1 ")  # plus-minus sign
+        self.spn_sweep.setSuffix(" bits")
+        self.spn_sweep.setToolTip(
+            "<span>Range of the word length sweep <i>WF</i> &plusmn; <i>dWF</i>.</span>")
+
         # Wrap qfrmt combobox and HDL buttons sim and convert in one layout
         layH_fx_btns = QHBoxLayout()
         layH_fx_btns.addWidget(self.cmb_qfrmt)
         layH_fx_btns.addWidget(self.butExportHDL)
+        layH_fx_btns.addWidget(self.but_sweep)
+        layH_fx_btns.addWidget(self.spn_sweep)
 
         frmHdlBtns = QFrame(self)
         frmHdlBtns.setLayout(layH_fx_btns)
         frmHdlBtns.setContentsMargins(*params['wdg_margins'])
 
+# ------------------------------------------------------------------------------
+#       Table with results of wordlength sweep, hidden until a sweep has been run
+# ------------------------------------------------------------------------------
+        self.tbl_sweep = QTableWidget(0, 4, self)
+        self.tbl_sweep.setHorizontalHeaderLabels(
+            ["dWF", "SNR / dB", "Overflows", "Max. Error"])
+        self.tbl_sweep.setAlternatingRowColors(True)
+        self.tbl_sweep.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tbl_sweep.verticalHeader().setVisible(False)
+        self.tbl_sweep.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tbl_sweep.setVisible(False)
+
 # -------------------------------------------------------------------
 #       Top level layout
 # -------------------------------------------------------------------
@@ -428,6 +493,7 @@ class Input_Fixpoint_Specs(QWidget):
         layVMain.addWidget(self.wdg_wq_input)
         layVMain.addWidget(wdg_fx_dyn)
         layVMain.addWidget(self.wdg_wq_output)
+        layVMain.addWidget(self.tbl_sweep)
         layVMain.addWidget(self.frmImg)
         layVMain.addStretch()
         layVMain.setContentsMargins(*params['wdg_margins'])
@@ -451,6 +517,7 @@ class Input_Fixpoint_Specs(QWidget):
         # ----------------------------------------------------------------------
         self.cmb_fx_wdg.currentIndexChanged.connect(self._update_fixp_widget)
         self.butExportHDL.clicked.connect(self.exportHDL)
+        self.but_sweep.clicked.connect(self.fx_sweep_wf)
         self.cmb_qfrmt.currentIndexChanged.connect(self.qfrmt2ui)
 
         # ----------------------------------------------------------------------
@@ -754,6 +821,10 @@ class Input_Fixpoint_Specs(QWidget):
         self.wdg_wq_input.setVisible(is_fixp)
         self.wdg_wq_output.setVisible(is_fixp)
         self.frmImg.setVisible(is_fixp)
+        self.but_sweep.setVisible(is_fixp)
+        self.spn_sweep.setVisible(is_fixp)
+        if not is_fixp:
+            self.tbl_sweep.setVisible(False)
         if self.fx_wdg_found:
            self.fx_filt_ui.setVisible(is_fixp)
 
@@ -877,6 +948,87 @@ class Input_Fixpoint_Specs(QWidget):
 
         return
 
+# ------------------------------------------------------------------------------
+    def fx_sim_sweep(self, fxq_list: list, x: np.ndarray = None,
+                     n_workers: int = 1) -> list:
+        """
+        Simulate the current fixpoint filter for all quantizer configurations in
+        `fxq_list` against the same stimulus `x` (fractional format). When `x` is
+        None, white noise is used. See `pyfda_fix_sweep.fx_sweep()` for details.
+
+        Returns
+        -------
+        results: list of dict
+            SNR, number of overflows and max. error for each configuration, an
+            empty list in case of an error
+        """
+        if not (self.fx_wdg_found and hasattr(self.fx_filt_ui, 'fx_filt')):
+            logger.error("No fixpoint filter found for wordlength sweep!")
+            return []
+        if x is None:
+            x = fx_sweep.sweep_stimulus(fb.fil[0]['fxq']['QI'])
+        try:
+            return fx_sweep.fx_sweep(
+                type(self.fx_filt_ui.fx_filt), fxq_list, x, n_workers=n_workers)
+        except (ValueError, AssertionError) as e:
+            logger.error(f"Wordlength sweep failed with msg. \"{e}\"")
+            return []
+
+# ------------------------------------------------------------------------------
+    def fx_sweep_wf(self) -> None:
+        """
+        Triggered by `self.but_sweep`: Sweep the fractional word lengths of the
+        coefficient and accumulator quantizers by `WF +/- dWF` with the range set
+        in `self.spn_sweep`. The configurations are simulated in a worker thread
+        with one process per CPU core, the results are displayed by
+        `self._fx_sweep_finished()`.
+        """
+        if self.sweep_worker is not None:  # sweep is still running
+            return
+        if not (self.fx_wdg_found and hasattr(self.fx_filt_ui, 'fx_filt')):
+            logger.error("No fixpoint filter found for wordlength sweep!")
+            return
+        self.dWF_sweep = range(-self.spn_sweep.value(), self.spn_sweep.value() + 1)
+        # snapshots of configurations, stimulus and filter settings, the filter
+        # dict may be changed by the GUI while the sweep is running
+        fxq_list = fx_sweep.sweep_configs(fb.fil[0]['fxq'], self.dWF_sweep)
+        x = fx_sweep.sweep_stimulus(fb.fil[0]['fxq']['QI'])
+        fil = fx_sweep.fil_snapshot()
+        # simulate in processes (at least two) that only use the snapshots
+        n_workers = max(min(os.cpu_count() or 1, len(fxq_list)), 2)
+
+        self.but_sweep.setEnabled(False)
+        self.sweep_worker = Sweep_Worker(
+            type(self.fx_filt_ui.fx_filt), fxq_list, x, fil, n_workers)
+        self.sweep_worker.sig_finish.connect(self._fx_sweep_finished)
+        self.sweep_worker.start()
+
+# ------------------------------------------------------------------------------
+    def _fx_sweep_finished(self, worker: Sweep_Worker, results: list) -> None:
+        """
+        Display the results of the wordlength sweep in `self.tbl_sweep` when the
+        worker thread has finished.
+        """
+        worker.wait()  # run() is about to return, don't destroy a running thread
+        self.sweep_worker = None
+        self.but_sweep.setEnabled(True)
+        if not results:
+            return
+
+        self.tbl_sweep.setRowCount(len(results))
+        for row, (d, r) in enumerate(zip(self.dWF_sweep, results)):
+            items = [f"{d:+d}", f"{r['SNR']:.2f}", str(r['N_over']),
+                     f"{r['err_max']:.3g}"]
+            for col, txt in enumerate(items):
+                item = QTableWidgetItem(txt)
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                if d == 0:  # highlight current setting
+                    font = item.font()
+                    font.setBold(True)
+                    item.setFont(font)
+                self.tbl_sweep.setItem(row, col, item)
+        self.tbl_sweep.setVisible(True)
+
 
 ###############################################################################
 if __name__ == '__main__':
@@ -15,8 +15,8 @@ import textwrap
 
 from pyfda.libs.compat import (
     QtGui, QWidget, QFont, QFrame, QPushButton, QLabel, QTableWidget, QTableWidgetItem,
-    QTextBrowser, QTextCursor, QLineEdit, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QSplitter, Qt, pyqtSignal)
+    QTextBrowser, QTextCursor, QLineEdit, QCheckBox, QVBoxLayout, QHBoxLayout,
+    QGridLayout, QSplitter, Qt, pyqtSignal)
 
 import numpy as np
 from numpy import pi, log10
@@ -25,6 +25,7 @@ import scipy.signal as sig
 import pyfda.filterbroker as fb  # importing filterbroker initializes all its globals
 import pyfda.filter_factory as ff  # importing filterbroker initializes all its globals
 from pyfda.libs.pyfda_lib import lin2unit, mod_version, to_html, safe_eval
+from pyfda.libs.pyfda_sig_lib import freqz_cache
 from pyfda.input_widgets.input_info_about import AboutWindow
 from pyfda.pyfda_rc import params
 
@@ -150,9 +151,17 @@ class Input_Info(QWidget):
         self.led_settings_NFFT.setToolTip("<span>Number of FFT points for frequency "
                                           "domain widgets.</span>")
 
+        self.chk_settings_adaptive = QCheckBox("Adaptive grid", self)
+        self.chk_settings_adaptive.setChecked(params['FREQ_GRID'] == 'adaptive')
+        self.chk_settings_adaptive.setToolTip(
+            "<span>Calculate the frequency response for |H(f)|, phase, group delay and "
+            "filter performance on an adaptive grid, refined at band edges, ripple "
+            "and notches instead of N_FFT uniformly spaced points.</span>")
+
         layGSettings = QGridLayout()
         layGSettings.addWidget(lbl_settings_NFFT, 1, 0)
         layGSettings.addWidget(self.led_settings_NFFT, 1, 1)
+        layGSettings.addWidget(self.chk_settings_adaptive, 1, 2)
 
         self.frmSettings = QFrame(self)
         self.frmSettings.setLayout(layGSettings)
@@ -210,6 +219,7 @@ class Input_Info(QWidget):
         self.butAbout.clicked.connect(self._about_window)
         self.butSettings.clicked.connect(self._show_settings)
         self.led_settings_NFFT.editingFinished.connect(self._update_settings_nfft)
+        self.chk_settings_adaptive.clicked.connect(self._update_settings_grid)
         self.butDebug.clicked.connect(self._show_debug)
 
         self.butFiltDict.clicked.connect(self._show_filt_dict)
@@ -243,6 +253,12 @@ class Input_Info(QWidget):
         self.led_settings_NFFT.setText(str(params['N_FFT']))
         self.emit({'data_changed': 'n_fft'})
 
+    def _update_settings_grid(self):
+        """ Select uniform or adaptive frequency grid """
+        params['FREQ_GRID'] = 'adaptive' if self.chk_settings_adaptive.isChecked()\
+            else 'uniform'
+        self.emit({'data_changed': 'n_fft'})
+
 # ------------------------------------------------------------------------------
     def load_dict(self):
         """
@@ -316,8 +332,15 @@ class Input_Info(QWidget):
             for the filter defined in the filter dict in a given frequency band
             [f_start, f_stop].
             """
-            w = np.linspace(f_start, f_stop, params['N_FFT'])*2*np.pi
-            [w, H] = sig.freqz(bb, aa, worN=w)
+            if params['FREQ_GRID'] == 'adaptive':
+                [w, H] = freqz_cache.fil_adaptive(
+                    fb.fil[0], w_lim=(2 * pi * f_start, 2 * pi * f_stop))
+            elif (f_start, f_stop) == (0, 1):
+                # whole unit circle, same response as in the plot widgets
+                [w, H] = freqz_cache.fil_freqz(fb.fil[0], worN=params['N_FFT'], whole=True)
+            else:
+                w = np.linspace(f_start, f_stop, params['N_FFT'])*2*np.pi
+                [w, H] = freqz_cache.fil_freqz(fb.fil[0], worN=w)
 
             # add antiCausals if we have them
             if (antiC):
@@ -346,9 +369,6 @@ class Input_Info(QWidget):
         self.tblFiltPerf.setVisible(self.butFiltPerf.isChecked())
         if self.butFiltPerf.isChecked():
 
-            bb = fb.fil[0]['ba'][0]
-            aa = fb.fil[0]['ba'][1]
-
             f_S = fb.fil[0]['f_S']
 
             f_lbls = []
@@ -418,7 +438,7 @@ class Input_Info(QWidget):
                 logger.debug("F_test_labels = %s" % f_lbls)
 
                 # Calculate frequency response at test frequencies
-                [w_test, a_test] = sig.freqz(bb, aa, 2.0 * pi * f_vals.astype(float))
+                [w_test, a_test] = freqz_cache.fil_freqz(fb.fil[0], 2.0 * pi * f_vals.astype(float))
                 # add antiCausals if we have them
                 if (antiC):
                    wa, ha = sig.freqz(bbA, aaA, 2.0 * pi * f_vals.astype(float))
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Monte-Carlo ensemble of transient simulations: Simulate `K` realizations of a
+stimulus consisting of a deterministic part and random noise with independent,
+seeded random number streams and accumulate the statistics of the realizations
+without storing them:
+
+- mean and variance of the response for each sample
+- mean power spectra of stimulus, quantized stimulus and response
+- number of overflows of the fixpoint quantizers
+
+Realizations are only simulated up to the end of the range of the spectra.
+"""
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import scipy.signal as sig
+
+import pyfda.filterbroker as fb
+import pyfda.libs.pyfda_fix_lib as fx
+from pyfda.libs.pyfda_fix_sweep import simulate
+
+import logging
+logger = logging.getLogger(__name__)
+
+#: noise types with random realizations that can be averaged over an ensemble
+NOISE_RANDOM = {'gauss', 'uniform', 'randint', 'brownian'}
+#: max. number of chunks the realizations are distributed over
+N_CHUNKS = 16
+
+
+# ------------------------------------------------------------------------------
+def noise_frame(noise: str, noi, N: int, rng: np.random.Generator, noi_last=0
+                ) -> np.ndarray:
+    """
+    Return `N` samples of random noise of type `noise` (see `NOISE_RANDOM`) with
+    the amplitude `noi`, generated by the random number generator `rng`.
+
+    For complex `noi`, the real and the imaginary part of the noise are generated
+    independently with the amplitudes `noi.real` and `noi.imag`. Brownian noise
+    (cumulated Gaussian noise) starts at `noi_last`, the last value of the previous
+    frame.
+    """
+    if np.iscomplexobj(noi):
+        return noise_frame(noise, noi.real, N, rng, np.real(noi_last))\
+            + 1j * noise_frame(noise, noi.imag, N, rng, np.imag(noi_last))
+    if noise == 'gauss':
+        return noi * rng.standard_normal(N)
+    elif noise == 'uniform':
+        return noi * (rng.random(N) - 0.5)
+    elif noise == 'randint':
+        return rng.integers(int(np.abs(noi)) + 1, size=N)
+    elif noise == 'brownian':
+        return np.cumsum(noi * rng.standard_normal(N)) + noi_last
+    else:
+        raise ValueError(f'Unknown kind of random noise "{noise}"')
+
+
+# ------------------------------------------------------------------------------
+def spectra(x: np.ndarray, y: np.ndarray, win: np.ndarray, q_i: dict = None
+            ) -> tuple:
+    """
+    Return the spectra of stimulus `x`, response `y` and - when the quantizer dict
+    `q_i` of the input quantizer is given - of the quantized stimulus for
+    `len(win)` samples, windowed with `win` and scaled by `1 / len(win)` like in
+    `Plot_Impz.calc_fft()`, otherwise the spectrum of the quantized stimulus is
+    `None`.
+    """
+    N_fft = len(win)
+    X_q = None
+    if q_i is not None:
+        X_q = np.fft.fft(fx.Fixed(copy.deepcopy(q_i)).fixp(x) * win) / N_fft
+    return np.fft.fft(x * win) / N_fft, np.fft.fft(y * win) / N_fft, X_q
+
+
+# ------------------------------------------------------------------------------
+class EnsembleStats(object):
+    """
+    Streaming statistics of an ensemble of transient simulations with `N` samples
+    and spectra with `N_fft` points. Realizations are added one by one with
+    `add()`, partial statistics (e.g. from different worker processes) are
+    combined with `merge()`.
+
+    Attributes
+    ----------
+    K : int
+        number of realizations
+
+    y_mean : ndarray
+        mean of the response for each sample
+
+    S_X, S_Xq, S_Y : ndarray
+        sum of the squared magnitude spectra of stimulus, quantized stimulus (only
+        for fixpoint simulations, otherwise zero) and response
+
+    N_over : dict
+        total number of overflows for each quantizer
+    """
+    def __init__(self, N: int, N_fft: int) -> None:
+        self.K = 0
+        self.y_mean = np.zeros(N)
+        self.y_M2 = np.zeros(N)  # sum of squared deviations from the mean
+        self.S_X = np.zeros(N_fft)
+        self.S_Xq = np.zeros(N_fft)
+        self.S_Y = np.zeros(N_fft)
+        self.N_over = {}
+
+    @property
+    def y_var(self) -> np.ndarray:
+        """ Variance of the response for each sample (zero for K < 2) """
+        return self.y_M2 / max(self.K - 1, 1)
+
+    @property
+    def P_X(self) -> np.ndarray:
+        """ Mean power spectrum of the stimulus """
+        return self.S_X / max(self.K, 1)
+
+    @property
+    def P_Xq(self) -> np.ndarray:
+        """ Mean power spectrum of the quantized stimulus """
+        return self.S_Xq / max(self.K, 1)
+
+    @property
+    def P_Y(self) -> np.ndarray:
+        """ Mean power spectrum of the response """
+        return self.S_Y / max(self.K, 1)
+
+    def add(self, y: np.ndarray, X: np.ndarray, Y: np.ndarray, X_q: np.ndarray = None,
+            N_over: dict = None) -> None:
+        """
+        Add response `y`, spectra `X`, `Y` and `X_q` (optional) and overflows
+        `N_over` (optional) of a realization
+        """
+        self.K += 1
+        delta = y - self.y_mean
+        self.y_mean = self.y_mean + delta / self.K  # upcast to complex if needed
+        self.y_M2 += (np.conj(delta) * (y - self.y_mean)).real
+        self.S_X += np.abs(X) ** 2
+        self.S_Y += np.abs(Y) ** 2
+        if X_q is not None:
+            self.S_Xq += np.abs(X_q) ** 2
+        for k, v in (N_over or {}).items():
+            self.N_over[k] = self.N_over.get(k, 0) + v
+
+    def merge(self, other: 'EnsembleStats') -> None:
+        """
+        Merge the statistics of `other` into this instance
+        """
+        K = self.K + other.K
+        if K == 0:
+            return
+        delta = other.y_mean - self.y_mean
+        self.y_mean = self.y_mean + delta * (other.K / K)
+        self.y_M2 = self.y_M2 + other.y_M2 + np.abs(delta) ** 2 * (self.K * other.K / K)
+        self.K = K
+        self.S_X = self.S_X + other.S_X
+        self.S_Xq = self.S_Xq + other.S_Xq
+        self.S_Y = self.S_Y + other.S_Y
+        for k, v in other.N_over.items():
+            self.N_over[k] = self.N_over.get(k, 0) + v
+
+
+# ------------------------------------------------------------------------------
+def _ensemble_task(x_det: np.ndarray, noise: str, noi, seeds: list, win: np.ndarray,
+                   N_start: int, fx_class: type) -> EnsembleStats:
+    """
+    Simulate the realizations with the random number streams `seeds` and return
+    their statistics. The filter is taken from `fb.fil[0]`, see `ensemble()`.
+    """
+    seg = slice(N_start, N_start + len(win))
+    stats = EnsembleStats(len(x_det), len(win))
+    sos = np.asarray(fb.fil[0]['sos'])
+    b, a = fb.fil[0]['ba']
+    for seed in seeds:
+        x = x_det + noise_frame(noise, noi, len(x_det), np.random.default_rng(seed))
+        if fx_class is None:
+            if len(sos) > 0:
+                y = sig.sosfilt(sos, x)
+            else:
+                y = sig.lfilter(b, a, x)
+            q_i = N_over = None
+        else:
+            # quantize stimulus like `Plot_Impz.impz_frame()`
+            q_i = fb.fil[0]['fxq']['QI']
+            Q_I = fx.Fixed(copy.deepcopy(q_i))
+            x_q = Q_I.fixp(x.real, out_frmt=fb.fil[0]['qfrmt'])
+            y, N_over = simulate(fx_class, copy.deepcopy(fb.fil[0]['fxq']), x_q)
+            N_over = {'Q_I': Q_I.N_over, **N_over}
+        stats.add(y, *spectra(x[seg], y[seg], win, q_i), N_over)
+    return stats
+
+
+# ------------------------------------------------------------------------------
+def _ensemble_worker(args: tuple, fil: dict) -> EnsembleStats:
+    """
+    Process pool wrapper for `_ensemble_task()`, copy the filter settings `fil` to
+    the filter dict of the worker process.
+    """
+    fb.fil[0].update(fil)
+    return _ensemble_task(*args)
+
+
+# ------------------------------------------------------------------------------
+def ensemble(x_det: np.ndarray, noise: str, noi, K: int, win: np.ndarray,
+             N_start: int = 0, seed=None, fx_class: type = None, n_workers: int = 1,
+             stop=None) -> EnsembleStats:
+    """
+    Simulate `K` realizations of the stimulus `x_det + noise` with independent
+    random number streams spawned from `seed` and return their statistics.
+
+    The floating point filter is given by `fb.fil[0]['sos']` or, when there are
+    no second-order sections, by `fb.fil[0]['ba']`. When `fx_class` is given, the
+    fixpoint filter class is instantiated with `fb.fil[0]['fxq']` for each
+    realization and the stimulus is quantized with the input quantizer in the
+    format `fb.fil[0]['qfrmt']`, see `pyfda_fix_sweep.fx_sweep()`.
+
+    Parameters
+    ----------
+    x_det : ndarray of float or complex
+        Deterministic part of the stimulus, only the samples up to the end of the
+        range of the spectra `N_start + len(win)` are needed and simulated
+
+    noise : str
+        Type of the noise, see `NOISE_RANDOM`
+
+    noi : float or complex
+        Amplitude of the noise, see `noise_frame()`
+
+    K : int
+        Number of realizations
+
+    win : ndarray of float
+        Window for the spectra, scaled by its coherent gain. Spectra are calculated
+        for `len(win)` samples from `N_start` on and scaled by `1 / len(win)` like
+        in `Plot_Impz.calc_fft()`
+
+    N_start : int
+        Index of the first sample for the spectra
+
+    seed : None, int or np.random.SeedSequence
+        Seed for the random number streams. Simulations with the same seed yield
+        identical results, independent of `n_workers`.
+
+    fx_class : type or None
+        Fixpoint filter class (e.g. `FIR_DF_pyfixp`) or None for floating point
+        simulation
+
+    n_workers : int
+        Number of worker processes. With the default `n_workers = 1`, the
+        realizations are simulated sequentially in the current process. Worker
+        processes are started with the 'spawn' method as this function is also
+        called from threads of the GUI.
+
+    stop : callable or None
+        Function that returns `True` when the simulation shall be stopped,
+        it is polled after each chunk of realizations. The statistics of the
+        realizations simulated so far are returned.
+
+    Returns
+    -------
+    stats : EnsembleStats
+        statistics of the ensemble, the mean and the variance of the response for
+        the `N_start + len(win)` simulated samples
+    """
+    if noise not in NOISE_RANDOM:
+        raise ValueError(f'Noise "{noise}" has no random realizations.')
+    seeds = np.random.SeedSequence(seed).spawn(K)
+    x_det = x_det[:N_start + len(win)]  # later samples don't contribute to the spectra
+    # distribute realizations over chunks independent of the number of workers
+    # for reproducible rounding and to allow stopping
+    n_chunks = min(K, N_CHUNKS)
+    chunks = [seeds[i::n_chunks] for i in range(n_chunks)]
+    stats = EnsembleStats(len(x_det), len(win))
+
+    if n_workers > 1 and n_chunks > 1:
+        fil = {k: copy.deepcopy(fb.fil[0][k])
+               for k in ('ba', 'sos', 'fxq', 'qfrmt', 'fx_sim', 'fx_base')}
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=multiprocessing.get_context('spawn')
+                                 ) as executor:
+            futures = {executor.submit(
+                _ensemble_worker, (x_det, noise, noi, chunk, win, N_start, fx_class), fil): i
+                for i, chunk in enumerate(chunks)}
+            # merge results in the order of the chunks for reproducible rounding
+            results = [None] * n_chunks
+            for f in as_completed(futures):
+                results[futures[f]] = f.result()
+                if stop is not None and stop():
+                    executor.shutdown(cancel_futures=True)
+                    break
+        for r in results:
+            if r is not None:
+                stats.merge(r)
+    else:
+        for chunk in chunks:
+            stats.merge(_ensemble_task(x_det, noise, noi, chunk, win, N_start, fx_class))
+            if stop is not None and stop():
+                break
+    return stats
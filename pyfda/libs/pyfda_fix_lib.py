@@ -12,8 +12,10 @@ numpy values and formatting reals in various formats
 """
 # ===========================================================================
 import re
-import inspect
+import math
 import copy
+import hashlib
+from collections import OrderedDict
 
 import pyfda.filterbroker as fb
 import numpy as np
@@ -35,6 +37,55 @@ logger = logging.getLogger(__name__)
 
 __version__ = 0.6
 
+# quantization methods supported by the int64 backend of `Fixed()`, mapped to
+# numpy ufuncs for in-place quantization of float arrays (`np.fix()` cannot
+# operate in place, `np.trunc()` yields the same results; `np.round()` is a
+# wrapper around `np.rint()` for zero decimals)
+INT_QUANT_METHODS = {
+    'floor': np.floor, 'round': np.rint, 'fix': np.trunc, 'ceil': np.ceil,
+    'rint': np.rint}
+# same for quantization of Python float scalars (`round()` rounds half to even
+# like `np.round()`)
+SCALAR_QUANT_METHODS = {
+    'floor': math.floor, 'round': round, 'fix': math.trunc, 'ceil': math.ceil,
+    'rint': round}
+# float values are clipped to this range before casting to int64
+INT_LIMIT = float(1 << 62)
+# optional quantizer dict keys with default values for delta-sigma modulation
+# (`quant == 'dsm'`): order, oversampling ratio and zero optimization of the NTF
+DSM_DEFAULTS = {'dsm_order': 3, 'dsm_osr': 64, 'dsm_opt': 1}
+# cache for noise transfer functions, key: (order, osr, opt)
+_NTF_CACHE = {}
+# max. number of arrays with formatted strings cached per `Fixed()` instance
+FRMT_CACHE_SIZE = 16
+# LRU cache for `quant_coeffs()` with max. number of entries and hit / miss counters
+QUANT_COEFFS_CACHE_SIZE = 32
+_QUANT_COEFFS_CACHE = OrderedDict()
+_quant_coeffs_stats = {'hits': 0, 'misses': 0}
+
+# Lookup tables for the vectorized string parser `Fixed._frmt2float_arr()`,
+# mapping the first 128 unicode code points to digit values (0 ... base - 1) or
+# to one of the following character classes, all other code points are illegal
+C_DOT, C_MINUS, C_SPACE, C_PAD, C_EXP, C_ILLEGAL = 16, 17, 18, 19, 20, 21
+FRMT_BASES = {'bin': 2, 'oct': 8, 'dec': 10, 'hex': 16}
+
+
+def _frmt_lut(frmt: str) -> np.ndarray:
+    lut = np.full(129, C_ILLEGAL, dtype=np.int8)
+    for d in range(FRMT_BASES[frmt]):
+        lut[ord('0123456789abcdef'[d])] = d
+        lut[ord('0123456789ABCDEF'[d])] = d
+    lut[ord('.')] = lut[ord(',')] = C_DOT
+    lut[ord('-')] = C_MINUS
+    lut[ord(' ')] = C_SPACE
+    lut[0] = C_PAD  # numpy pads unicode strings with zeros
+    if frmt == 'dec':
+        lut[ord('e')] = lut[ord('E')] = C_EXP
+    return lut
+
+
+FRMT_LUTS = {frmt: _frmt_lut(frmt) for frmt in FRMT_BASES}
+
 
 def qstr(text):
     """ carefully replace qstr() function - only needed for Py2 compatibility """
@@ -167,6 +218,106 @@ def bin2oct(bin_str: str, WI=0) -> str:
 bin2oct_vec = np.vectorize(bin2oct)  # safer than frompyfunction()
 
 
+# ---------------------------------------------------------------------
+# Converters for the legacy formatting path of `Fixed.float2frmt()`, created once
+# when the module is imported:
+# Insert binary point in string `bin_str` after position `pos`
+insert_binary_point = np.vectorize(
+    lambda bin_str, pos: (bin_str[:pos+1] + "." + bin_str[pos+1:]))
+binary_repr_vec = np.frompyfunc(np.binary_repr, 2, 1)
+
+
+def binary_repr(y_int, W):
+    """
+    Convert a scalar, array, list or tuple of integer values
+    to the binary representation using `np.binary_repr()` or
+    the vectorized form.
+    """
+    if type(y_int) in {np.ndarray, list, tuple}:
+        return binary_repr_vec(y_int, W).astype('U')
+    elif isinstance(y_int, (int, np.integer)):
+        return np.binary_repr(y_int, W)
+    else:
+        logger.error(f"Unsupported data type '{type(y_int)}'!")
+        return "0"
+
+
+# Lookup tables for the vectorized formatter `int2frmt()`: number of bits per digit
+# and number of digits looked up at once for each base, the tables map each group
+# value (one byte for 'bin' and 'hex', six bits for 'oct') to its ASCII digits
+FRMT_DIGIT_BITS = {'bin': 1, 'oct': 3, 'hex': 4}
+FRMT_LUT_DIGITS = {'bin': 8, 'oct': 2, 'hex': 2}
+
+
+def _digit_lut(frmt: str) -> np.ndarray:
+    k = FRMT_DIGIT_BITS[frmt]
+    g = FRMT_LUT_DIGITS[frmt]
+    v = np.arange(1 << (g * k))
+    digits = (v[:, None] >> (k * np.arange(g - 1, -1, -1))) & ((1 << k) - 1)
+    return np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)[digits]
+
+
+DIGIT_LUTS = {frmt: _digit_lut(frmt) for frmt in FRMT_DIGIT_BITS}
+
+
+# ---------------------------------------------------------------------
+def int2frmt(y_int: np.ndarray, W: int, WI: int, frmt: str):
+    """
+    Format an (array of) integer(s) `y_int` as two's complement numbers with a
+    word length of `W` bits in the number base `frmt` ('bin', 'oct' or 'hex').
+    `WI` is the number of integer bits without the sign bit, pass `WI = W` for
+    integer format.
+
+    The results are identical to `bin2hex_vec(binary_repr(y_int, W), WI)` resp.
+    `bin2oct_vec(...)` and `insert_binary_point(...)` but they are calculated for the
+    whole array at once: The digits are extracted from the integers with shifts
+    and bit masks in groups of several digits which are mapped to characters with
+    the lookup tables `DIGIT_LUTS`.
+
+    Returns
+    -------
+    ndarray of str or None
+        unicode string array with the same shape as `y_int`. `None` is returned
+        when the number cannot be formatted this way (`WI < 0`, word lengths
+        exceeding 62 bits or values outside the range of `W` bits), the legacy
+        converters need to be used then.
+    """
+    y_int = np.asarray(y_int, dtype=np.int64)
+    if WI < 0 or W < 1 or W > 62 or frmt not in DIGIT_LUTS:
+        return None
+    if y_int.size and (y_int.min() < -(1 << (W - 1)) or y_int.max() >= 1 << (W - 1)):
+        return None
+    k = FRMT_DIGIT_BITS[frmt]
+    g = FRMT_LUT_DIGITS[frmt]
+    lut = DIGIT_LUTS[frmt]
+    W_i = min(WI + 1, W)  # number of integer bits incl. sign bit
+    W_f = W - W_i  # number of fractional bits
+    N_i = -(-W_i // k)  # number of integer digits
+    N_f = -(-W_f // k)  # number of fractional digits
+    N = N_i + N_f
+    N_groups = -(-N // g)
+    # two's complement, left aligned to the digits of the fractional part
+    v = (y_int.ravel().astype(np.uint64) & np.uint64((1 << W) - 1))\
+        << np.uint64(N_f * k - W_f)
+
+    chars = np.empty((v.size, N_groups, g), dtype=np.uint8)
+    mask = np.uint64((1 << (g * k)) - 1)
+    for j in range(N_groups):
+        chars[:, N_groups - 1 - j] = lut[(v >> np.uint64(j * g * k)) & mask]
+    chars = chars.reshape(v.size, N_groups * g)[:, N_groups * g - N:]
+
+    if (frmt == 'bin' and WI < W) or (frmt != 'bin' and W_f > 0):
+        # insert radix point
+        y_chars = np.empty((v.size, N + 1), dtype=np.uint8)
+        y_chars[:, :N_i] = chars[:, :N_i]
+        y_chars[:, N_i] = ord('.')
+        y_chars[:, N_i + 1:] = chars[:, N_i:]
+    else:
+        y_chars = np.ascontiguousarray(chars)
+    return y_chars.view(f'S{y_chars.shape[1]}').reshape(y_int.shape).astype('U')
+
+
+
 # ------------------------------------------------------------------------------
 def dec2hex(val, nbits, WF=0):
     """
@@ -347,7 +498,313 @@ def csd2dec(csd_str):
 csd2dec_vec = np.vectorize(csd2dec)  # safer than np.frompyfunc()
 
 
-# ------------------------------------------------------------------------
+# ------------------------------------------------------------------------------
+# Vectorized CSD engine: The canonical signed digit (CSD) representation of an
+# integer is its nonadjacent form (NAF), which is calculated for whole arrays
+# with the bit trick x ^ 3x. Digits are mapped to characters with `CSD_CHARS`,
+# csd strings are parsed with the lookup table `CSD_LUT` (digit values -1, 0, +1
+# and the character classes of `FRMT_LUTS`).
+CSD_CHARS = np.frombuffer(b'-0+', dtype=np.uint8)
+CSD_LUT = np.full(129, C_ILLEGAL, dtype=np.int8)
+CSD_LUT[[ord('-'), ord('0'), ord('+')]] = [-1, 0, 1]
+CSD_LUT[[ord('.'), ord(',')]] = C_DOT
+CSD_LUT[ord(' ')] = C_SPACE
+CSD_LUT[0] = C_PAD
+# number of set bits for all byte values
+POPCOUNT_LUT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def naf(y_int) -> tuple:
+    """
+    Calculate the nonadjacent form (NAF) of the integer (array) `y_int` with
+    `abs(y_int) < 2 ** 62`.
+
+    Returns
+    -------
+    tuple of ndarray of uint64
+        bit masks `(pos, neg)` with the same shape as `y_int`, bit `i` of `pos`
+        (`neg`) is set when the CSD digit with the weight `2 ** i` is +1 (-1),
+        i.e. `y_int = pos - neg`.
+    """
+    y_int = np.asarray(y_int, dtype=np.int64)
+    x = np.abs(y_int).astype(np.uint64)
+    x3 = x * np.uint64(3)
+    c = x3 ^ x  # bits where x and 3x differ are nonzero digits, shifted by one
+    pos = (x3 & c) >> np.uint64(1)
+    neg = (x & c) >> np.uint64(1)
+    is_neg = y_int < 0
+    return np.where(is_neg, neg, pos), np.where(is_neg, pos, neg)
+
+
+def csd_digits(y_int, N: int = None) -> np.ndarray:
+    """
+    Return the CSD digits (-1, 0, +1) of the integer (array) `y_int` as an int8
+    array with an additional last axis of length `N`, starting with the MSB.
+    By default, `N` is the number of digits of the largest CSD number.
+    """
+    pos, neg = naf(y_int)
+    if N is None:
+        N = int(np.max(pos | neg, initial=0)).bit_length()
+    w = np.uint64(1) << np.arange(N - 1, -1, -1, dtype=np.uint64)
+    return ((pos[..., None] & w) > 0).astype(np.int8)\
+        - ((neg[..., None] & w) > 0).astype(np.int8)
+
+
+def csd_nonzero(y_int) -> tuple:
+    """
+    Count the nonzero CSD digits of the integer (array) `y_int`, e.g. to estimate
+    the number of adders needed for multiplying with fixpoint coefficients
+    `y_int` (in integer format).
+
+    Returns
+    -------
+    tuple
+        array with the number of nonzero digits for each element of `y_int` and
+        total number of nonzero digits
+    """
+    pos, neg = naf(y_int)
+    nz = np.ascontiguousarray(pos | neg)
+    n = POPCOUNT_LUT[nz.view(np.uint8)].reshape(nz.shape + (8,)).sum(axis=-1)
+    return n, int(np.sum(n))
+
+
+def dec2csd_arr(dec_val, WF: int = 0):
+    """
+    Convert the (array of) value(s) `dec_val` with `WF` fractional places to CSD
+    strings of their non-adjacent form (`naf()`), values that are not multiples
+    of `2 ** -WF` are rounded. The strings have the same layout as the results of
+    `dec2csd()` / `dec2csd_vec()`. The digits differ for fractional values in the
+    range 1/3 < |x| < 2/3 that are encoded wrongly by `dec2csd()` (e.g.
+    0.5 -> '+.0' instead of '0.+').
+
+    Returns
+    -------
+    str or ndarray of str
+        CSD string(s) with the same shape as `dec_val`, or `None` when `dec_val`
+        exceeds the range of 62 bits.
+    """
+    v = np.asarray(dec_val, dtype=np.float64)
+    y_int = np.round(np.ldexp(v, WF))
+    if np.any(np.abs(y_int) >= 2. ** 62):
+        return None
+    shape = v.shape
+    v = v.ravel()
+    y_int = y_int.ravel().astype(np.int64)
+    # number of integer digits like in `dec2csd()`
+    with np.errstate(divide='ignore'):
+        k = np.ceil(np.log2(np.abs(v) * 1.5))
+    N_i = np.where(np.abs(v) < 1., int(WF > 0), k).astype(np.int64)
+    N_i_max = max(int(np.max(N_i, initial=0)), 1)
+    N = N_i_max + WF  # number of digits in the longest string
+
+    chars = CSD_CHARS[csd_digits(y_int, N) + 1]
+    if WF > 0:  # insert radix point
+        chars = np.insert(chars, N_i_max, ord('.'), axis=1)
+    # left-align strings by removing leading digits, pad with zeros
+    idx = np.arange(chars.shape[1]) + (N_i_max - N_i)[:, None]
+    chars = np.take_along_axis(chars, np.minimum(idx, chars.shape[1] - 1), axis=1)
+    chars[idx >= chars.shape[1]] = 0
+    chars[v == 0] = 0
+    chars[v == 0, 0] = ord('0')
+    y_str = np.ascontiguousarray(chars).view(f'S{chars.shape[1]}')\
+        .reshape(shape).astype('U')
+    return y_str.item() if y_str.ndim == 0 else y_str
+
+
+def csd2dec_arr(csd_str) -> np.ndarray:
+    """
+    Convert an array-like of CSD strings to float. Unlike `csd2dec()`, the strings
+    may contain a radix point ('.' or ','), the result is scaled by
+    `2 ** -<number of fractional digits>` then. Characters other than
+    '+', '-', '0' and the radix point are ignored.
+    """
+    y = np.asarray(csd_str)
+    if y.dtype.kind != 'U':
+        y = y.astype(str)
+    shape = y.shape
+    y = np.ascontiguousarray(y).ravel()
+    L = y.dtype.itemsize // 4  # number of characters per string
+    if y.size == 0 or L == 0:
+        return np.zeros(shape)
+    codes = CSD_LUT[np.minimum(y.view(np.uint32).reshape(-1, L), 128)]
+    is_digit = codes <= 1
+    # position of digits counted from the right (0 = rightmost digit)
+    pos = np.cumsum(is_digit[:, ::-1], axis=1)[:, ::-1] - 1
+    # number of fractional places = digits right of the radix point
+    frc = np.count_nonzero(is_digit & (np.cumsum(codes == C_DOT, axis=1) > 0), axis=1)
+    D = np.where(is_digit, codes, 0).astype(np.float64)
+    return np.ldexp(np.sum(np.ldexp(D, pos), axis=1), -frc).reshape(shape)
+
+
+# ------------------------------------------------------------------------------
+def dsm_ntf(order: int = 3, osr: int = 64, opt: int = 1):
+    """
+    Return the noise transfer function of a delta-sigma modulator with `order`,
+    oversampling ratio `osr` and zero optimization `opt`, synthesized with
+    `deltasigma.synthesizeNTF()`. The results are cached by their parameters.
+    """
+    key = (order, osr, opt)
+    if key not in _NTF_CACHE:
+        _NTF_CACHE[key] = synthesizeNTF(order=order, osr=osr, opt=opt)
+    return _NTF_CACHE[key]
+
+
+# ------------------------------------------------------------------------------
+class DSM(object):
+    """
+    Single-bit delta-sigma modulator with a noise transfer function of given
+    `order`, oversampling ratio `osr` and zero optimization `opt`
+    (see `deltasigma.synthesizeNTF()`).
+
+    The state of the modulator is kept between calls of `modulate()`, so a long
+    signal can be processed frame by frame without discontinuities. Use `reset()`
+    to clear the state.
+    """
+    def __init__(self, order: int = 3, osr: int = 64, opt: int = 1):
+        if not DS:
+            raise Exception('"deltasigma" Toolbox not found.\n'
+                            'Try installing it with "pip install deltasigma".')
+        self.params = (order, osr, opt)
+        self.ntf = dsm_ntf(order, osr, opt)
+        self.reset()
+
+    def reset(self) -> None:
+        """ Reset the modulator state """
+        self.x0 = 0.
+
+    def modulate(self, u: np.ndarray) -> np.ndarray:
+        """
+        Return the modulator output (-1 or +1) for input `u` (range -1 ... +1),
+        starting from the state of the previous call.
+        """
+        # simulateDSM() returns four ndarrays:
+        # v: quantizer output (-1 or 1)
+        # xn: modulator states
+        # xmax: maximum value that each state reached during simulation
+        # y: the quantizer input (ie the modulator output)
+        v, xn, _, _ = simulateDSM(u, self.ntf, x0=self.x0)
+        xn = np.asarray(xn)
+        # store final state, `xn` contains either the final state or all states
+        self.x0 = xn[:, -1].copy() if xn.ndim > 1 else xn.copy()
+        return v
+
+
+# ------------------------------------------------------------------------------
+class OvflStats(object):
+    """
+    Streaming overflow statistics of a quantizer: The samples of all calls of
+    `Fixed.fixp()` since the last `reset()` are regarded as one stream with the
+    sample index `N`. The statistics are updated with the overflow masks of each
+    call without allocating memory of the size of the masks:
+
+    - `N_pos`, `N_neg`: number of positive and negative overflows
+    - `idx_first`, `idx_last`: index of first and last overflow (-1 without overflows)
+    - `bins`: number of overflows in `N_bins` bins of `bin_size` samples each. The
+      bin size starts with one sample and is doubled (merging neighbouring bins)
+      whenever the stream doesn't fit into the bins anymore, see `density()`.
+    """
+    def __init__(self, N_bins: int = 256):
+        self.N_bins = N_bins + N_bins % 2  # even number of bins for merging
+        self.reset()
+
+    def reset(self) -> None:
+        """ Reset all statistics and the sample index """
+        self.N = 0
+        self.N_pos = self.N_neg = 0
+        self.idx_first = self.idx_last = -1
+        self.bin_size = 1
+        self.bins = np.zeros(self.N_bins, dtype=np.int64)
+
+    @property
+    def N_over(self) -> int:
+        """ Total number of overflows """
+        return self.N_pos + self.N_neg
+
+    def advance(self, L: int) -> None:
+        """ Advance the sample index by `L` samples without overflows """
+        self.N += L
+        while self.N > self.N_bins * self.bin_size:
+            # merge neighbouring bins, doubling the bin size
+            self.bins[:self.N_bins // 2] = self.bins.reshape(-1, 2).sum(axis=1)
+            self.bins[self.N_bins // 2:] = 0
+            self.bin_size *= 2
+
+    def update(self, over_pos: np.ndarray, over_neg: np.ndarray) -> int:
+        """
+        Update the statistics with the boolean masks `over_pos` and `over_neg`
+        of positive and negative overflows of the next `over_pos.size` samples
+        (in C order) and return the number of overflows.
+        """
+        n0 = self.N
+        self.advance(over_pos.size)
+        N_pos = np.count_nonzero(over_pos)
+        N_neg = np.count_nonzero(over_neg)
+        if N_pos + N_neg == 0:
+            return 0
+        self.N_pos += N_pos
+        self.N_neg += N_neg
+
+        first = []
+        last = []
+        for mask, N_mask in ((over_pos, N_pos), (over_neg, N_neg)):
+            if N_mask > 0:
+                mask = mask.reshape(-1)  # view for contiguous masks
+                first.append(np.argmax(mask))
+                last.append(mask.size - 1 - np.argmax(mask[::-1]))
+                self._add_bins(mask, n0)
+        if self.idx_first < 0:
+            self.idx_first = n0 + int(min(first))
+        self.idx_last = n0 + int(max(last))
+        return N_pos + N_neg
+
+    def update_scalar(self, flag: int) -> None:
+        """
+        Update the statistics with the overflow `flag` (+1, -1 or 0) of one sample
+        """
+        self.advance(1)
+        if flag != 0:
+            if flag > 0:
+                self.N_pos += 1
+            else:
+                self.N_neg += 1
+            if self.idx_first < 0:
+                self.idx_first = self.N - 1
+            self.idx_last = self.N - 1
+            self.bins[(self.N - 1) // self.bin_size] += 1
+
+    def _add_bins(self, mask: np.ndarray, n0: int) -> None:
+        """
+        Add the number of overflows in the 1D mask `mask`, starting at sample
+        index `n0`, to the bins: partial first and last bins are counted
+        directly, full bins are counted with a buffered reduction.
+        """
+        bs = self.bin_size
+        L = mask.size
+        b = n0 // bs
+        head = min(-n0 % bs, L)  # samples in partially filled first bin
+        if head > 0:
+            self.bins[b] += np.count_nonzero(mask[:head])
+            b += 1
+        N_full = (L - head) // bs
+        if N_full > 0:
+            self.bins[b:b + N_full] += mask[head:head + N_full * bs]\
+                .reshape(N_full, bs).sum(axis=1, dtype=np.int64)
+        tail = L - head - N_full * bs
+        if tail > 0:
+            self.bins[b + N_full] += np.count_nonzero(mask[L - tail:])
+
+    def density(self) -> tuple:
+        """
+        Return the first sample index of all used bins and the overflow density
+        (number of overflows per sample) in each bin.
+        """
+        N_used = -(-self.N // self.bin_size)
+        n = np.arange(N_used) * self.bin_size
+        L = np.minimum(self.bin_size, self.N - n)  # last bin may be partial
+        return n, self.bins[:N_used] / L
+
+
+# ------------------------------------------------------------------------------
 class Fixed(object):
     """
     Implement binary quantization of signed scalar or array-like objects
@@ -382,8 +839,15 @@ class Fixed(object):
       - 'fix': round to nearest integer towards zero ('Betragsschneiden')
       - 'ceil': smallest integer `I`, such that :math:`I \\ge x`
       - 'rint': round towards nearest int
+      - 'dsm': delta-sigma modulation (requires the `deltasigma` module)
       - 'none': no quantization
 
+    * **'dsm_order'**, **'dsm_osr'**, **'dsm_opt'** : Order, oversampling ratio
+      and zero optimization of the delta-sigma modulator NTF, optional;
+      default = 3, 64, 1. The NTF is cached by these parameters, the modulator
+      state is kept across calls of `fixp()` (see attribute `dsm`) until
+      `resetN()` is called or the parameters are changed.
+
     * **'ovfl'** : Overflow method, optional; default = 'wrap'
 
       - 'wrap': do a two's complement wrap-around
@@ -394,6 +858,25 @@ class Fixed(object):
         total number of overflows (should be considered as read-only
         except for when an external quantizer is used)
 
+    int_backend : bool or None
+        Select the backend for quantization of arrays in `fixp()` and `requant()`:
+
+      - `None`: (default) automatic selection, the int64 backend is used when
+        `fb.fil[0]['qfrmt'] == 'qint'`, otherwise the float64 backend
+      - `True`: always use the int64 backend (if possible)
+      - `False`: always use the float64 backend
+
+      The int64 backend keeps samples as integers and treats overflows with shifts
+      and bit masks, it is exact for word lengths `W <= 62` when integer arrays are
+      passed. It is not used for scalars, for `quant == 'none'` or `'dsm'` and for
+      word lengths `W > 62`, the float64 backend is used instead.
+
+    track_flags : bool
+        When `True`, an array of overflow flags `ovr_flag` with the shape of the
+        input is created for each quantized array (needed e.g. for marking
+        overflows in the coefficient table). Default is `False`, only the
+        overflow statistics `ovfl_stats` are updated for arrays.
+
     Additionally, the following keys from global dict `fb.fil[0]` define the
     number base and quantization/overflow behaviour for fixpoint numbers:
 
@@ -434,11 +917,25 @@ class Fixed(object):
     N : integer
         total number of simulation data points
 
-    N_over_neg : integer
-        number of negative overflows (commented out)
+    N_fast : integer
+        number of `fixp()` calls that took the fast path for real-valued float
+        arrays and scalars, skipping all type checks. Not reset by `resetN()`.
 
-    N_over_pos : integer
-        number of positive overflows (commented out)
+    N_slow : integer
+        number of `fixp()` calls that took the slow path. Not reset by `resetN()`.
+
+    frmt_cache : dict
+        cache for the formatted results of `float2frmt()` for numeric arrays,
+        cleared when the quantizer settings are changed
+
+    N_cache_hits : integer
+        number of `float2frmt()` calls served from `frmt_cache`. Not reset by
+        `resetN()`.
+
+    ovfl_stats : OvflStats
+        streaming overflow statistics (numbers of positive and negative overflows,
+        index of first and last overflow and overflow density over the sample
+        index) of all quantized samples since the last `resetN()`
 
     ovr_flag: integer or integer array (same shape as input argument)
         overflow flag, meaning:
@@ -449,7 +946,12 @@ class Fixed(object):
 
             -1: negative overflow
 
-        has occured during last fixpoint conversion.
+        has occured during last fixpoint conversion. For arrays, the flags are
+        only calculated when `track_flags == True`, otherwise `ovr_flag = 0`.
+
+    dsm : DSM or None
+        delta-sigma modulator instance for `quant == 'dsm'`, created with the
+        first quantization. It is replaced when the modulator parameters change.
 
     places : integer
         number of places required for printing in the selected 'fx_base' format.
@@ -474,10 +976,22 @@ class Fixed(object):
     >>> yq = my_q.fixp(y)
     """
 
-    def __init__(self, q_dict):
+    def __init__(self, q_dict, int_backend: bool = None, track_flags: bool = False):
         """
         Construct `Fixed` object with dict `q_dict`
         """
+        self._int_backend = int_backend
+        self.track_flags = track_flags
+        self.ovfl_stats = OvflStats()
+        self.dsm = None  # delta-sigma modulator, created on demand
+        # preallocated boolean buffers for overflow masks
+        self._ovr_buf_pos = self._ovr_buf_neg = np.zeros(0, dtype=bool)
+        self._ovr_shape = None  # shape of the views `self._ovr_views` on the buffers
+        # number of `fixp()` calls that took the fast resp. the slow path
+        self.N_fast = self.N_slow = 0
+        # cache for results of `float2frmt()`, cleared when the settings change
+        self.frmt_cache = {}
+        self.N_cache_hits = 0
         # define valid keys and default values for quantization dict
         self.q_dict_default = {
             'WI': 0, 'WF': 15, 'w_a_m': 'm', 'quant': 'round', 'ovfl': 'sat',
@@ -526,7 +1040,7 @@ class Fixed(object):
         Unknown keys throw an error message.
         """
         for k in q_dict.keys():
-            if k not in self.q_dict_default:
+            if k not in self.q_dict_default and k not in DSM_DEFAULTS:
                 logger.error(u'Unknown Key "{0:s}"!'.format(k))
 
 # ------------------------------------------------------------------------------
@@ -543,6 +1057,10 @@ class Fixed(object):
         """
         self.verify_q_dict_keys(d)  # check whether all keys are valid
         self.q_dict.update(d)  # merge d into self.q_dict
+        # changed modulator parameters start a new modulator (without state)
+        if self.dsm is not None and self.dsm.params != tuple(
+                self.q_dict.get(k, v) for k, v in DSM_DEFAULTS.items()):
+            self.dsm = None
 
         # sanitize WI and WF
         self.q_dict['WI'] = int(self.q_dict['WI'])
@@ -581,6 +1099,157 @@ class Fixed(object):
             raise Exception(
                 u'Unknown number format "{0:s}"!'.format(fb.fil[0]['fx_base']))
 
+        self._compile_plan()
+
+# ------------------------------------------------------------------------------
+    def _compile_plan(self) -> None:
+        """
+        Compile the quantization plan `self._plan(y, in_frmt, out_frmt)` for the
+        current quantizer settings. The quantization function, the overflow handler
+        and all constants are bound when the plan is compiled, so `fixp()` doesn't
+        need to evaluate the settings for each call.
+
+        This is called by `set_qdict()` and needs to be called again when
+        `self.q_dict` or `fb.fil[0]['qfrmt']` have been modified directly.
+
+        The plan operates on real-valued numpy arrays (also 0-d arrays)
+        and returns a new array:
+
+        **(2) : QUANTIZATION**
+            For `in_frmt=='qfrac'`, multiply by 2**WF = 1/LSB to obtain an
+            intermediate format with quantization step size of 1.
+            Next, apply selected quantization method to convert
+            floating point inputs to "fixpoint integers".
+
+        **(3) : OVERFLOW / SATURATION**
+            Handle Overflow / saturation w.r.t. to the MSB = 2 ** (W - 2),
+            returning a result in the range MIN = -2*MSB ... + 2*MSB-LSB = MAX
+
+        **(4) : OUTPUT SCALING**
+            Divide result by `2 ** WF` factor for `out_frmt=='qfrac'` to obtain
+            quantized fractional number
+        """
+        self.frmt_cache.clear()  # formatted strings depend on the settings
+        quant = self.q_dict['quant']
+        ovfl = self.q_dict['ovfl']
+        WF = self.q_dict['WF']
+        scale = 2. ** WF
+        scale_inv = 2. ** -WF
+        # constants for quantized values in integer scale, LSB = 1
+        MSB = 2. ** (self.q_dict['WI'] + WF - 1)  # 2 ** (W - 2)
+        MAX = 2. * MSB - 1.  # 2 ** (W - 1) - 1
+        MIN = -2. * MSB
+
+        int_plan = self.int_backend_active()
+
+        # ----- quantization function --------------------------------------------
+        if quant in INT_QUANT_METHODS:
+            # floor: largest integer i, such that i <= x (= binary truncation)
+            # round: rounding, also = binary rounding
+            # fix: round to nearest integer towards zero ("Betragsschneiden")
+            # ceil: smallest integer i, such that i >= x
+            # rint: round towards nearest int
+            quant_func = INT_QUANT_METHODS[quant]
+        elif quant in {'none', 'dsm'}:
+            quant_func = None
+        else:
+            def plan(y, in_frmt, out_frmt):
+                raise Exception(f'Unknown Requantization type "{quant:s}"!')
+            self._plan = self._plan_scalar = plan
+            return
+
+        if ovfl not in {'none', 'sat', 'wrap'}:
+            def plan(y, in_frmt, out_frmt):
+                raise Exception(f'Unknown overflow type "{ovfl:s}"!')
+            self._plan = self._plan_scalar = plan
+            return
+
+        # ----- the plan ---------------------------------------------------------
+        def plan(y: np.ndarray, in_frmt: str, out_frmt: str) -> np.ndarray:
+            # use int64 backend for real-valued arrays when selected
+            if int_plan and y.ndim > 0:
+                return self._fixp_int(y, in_frmt=in_frmt, out_frmt=out_frmt)
+
+            # (2) quantization, creating a new array `yq`
+            if in_frmt == 'qfrac':
+                yq = np.multiply(y, scale, out=np.empty(y.shape))
+            else:
+                yq = np.array(y, dtype=np.float64)
+            if quant_func is not None:
+                quant_func(yq, out=yq)
+            elif quant == 'dsm':
+                yq = np.asarray(self._quant_dsm(yq), dtype=np.float64)
+
+            # (3) overflow handling
+            if ovfl == 'none':
+                self.N_over = 0  # set all overflow flags to zero
+                self.ovfl_stats.advance(yq.size)
+            else:
+                # Bool. vectors with '1' for every neg./pos overflow:
+                over_pos, over_neg = self._get_ovr_bufs(yq.shape)
+                np.greater(yq, MAX, out=over_pos)
+                np.less(yq, MIN, out=over_neg)
+                # create array of flags for pos. / neg. overflows when requested
+                self.ovr_flag = over_pos.view(np.int8) - over_neg.view(np.int8)\
+                    if self.track_flags else 0
+                # No. of pos. / neg. / all overflows occured since last reset:
+                N_over = self.ovfl_stats.update(over_pos, over_neg)
+                self.N_over += N_over
+
+                if N_over > 0:
+                    if ovfl == 'sat':
+                        # Replace overflows with Min/Max-Values (saturation):
+                        np.clip(yq, MIN, MAX, out=yq)
+                    else:
+                        # Replace overflows by two's complement wraparound (wrap),
+                        # the correction term is zero for values without overflow
+                        yq -= 4. * MSB * np.floor((yq + 2. * MSB) * (0.25 / MSB))
+
+            self.q_dict['N_over'] = self.N_over
+
+            # (4) output scaling
+            if out_frmt == 'qfrac':
+                yq *= scale_inv
+            return yq
+
+        # ----- the plan for Python float scalars ---------------------------------
+        def plan_scalar(y: float, in_frmt: str, out_frmt: str) -> float:
+            if not math.isfinite(y):  # math functions cannot handle inf and nan
+                return plan(np.asarray(y), in_frmt, out_frmt).item()
+            if in_frmt == 'qfrac':
+                y = y * scale
+            if quant_func_s is not None:
+                y = float(quant_func_s(y))
+
+            if ovfl == 'none':
+                self.N_over = 0
+                self.ovfl_stats.advance(1)
+            elif y > MAX or y < MIN:
+                self.ovr_flag = 1 if y > MAX else -1
+                self.ovfl_stats.update_scalar(self.ovr_flag)
+                self.N_over += 1
+                if ovfl == 'sat':
+                    y = MAX if y > MAX else MIN
+                else:
+                    y -= 4. * MSB * math.floor((y + 2. * MSB) * (0.25 / MSB))
+            else:
+                self.ovr_flag = 0
+                self.ovfl_stats.advance(1)
+
+            self.q_dict['N_over'] = self.N_over
+
+            if out_frmt == 'qfrac':
+                y = y * scale_inv
+            return y
+
+        self._plan = plan
+        if quant == 'dsm':
+            self._plan_scalar = lambda y, in_frmt, out_frmt:\
+                plan(np.asarray(y), in_frmt, out_frmt).item()
+        else:
+            quant_func_s = SCALAR_QUANT_METHODS.get(quant)  # None for 'none'
+            self._plan_scalar = plan_scalar
+
 # ------------------------------------------------------------------------------
     def fixp(self, y, in_frmt: str = 'qfrac', out_frmt: str = 'qfrac'):
         """
@@ -659,11 +1328,28 @@ class Fixed(object):
         >>> bq = bq.astype(btype) # restore original variable type
         """
 
+        # ======================================================================
+        # (0) : FAST PATH
+        #       Real-valued float arrays and scalars are passed directly to the
+        #       precompiled quantization plan, skipping all type checks. In float
+        #       mode, the slow path returns the input unchanged.
+        # ======================================================================
+        if fb.fil[0]['fx_sim']:
+            if type(y) is np.ndarray and y.dtype.kind == 'f':
+                self.N_fast += 1
+                self.N += y.size
+                return self._plan(y, in_frmt, out_frmt)
+            elif type(y) is float or type(y) is np.float64:
+                self.N_fast += 1
+                self.N += 1
+                return self._plan_scalar(float(y), in_frmt, out_frmt)
+
         # ======================================================================
         # (1) : INITIALIZATION
         #       Convert input argument into proper floating point scalars /
         #       arrays and initialize flags
         # ======================================================================
+        self.N_slow += 1
         if not fb.fil[0]['fx_sim']:
             logger.warning(
                 "fixp() should only be called for fixpoint number format - returning floats!")
@@ -684,7 +1370,7 @@ class Fixed(object):
             y = np.asarray(y)  # convert lists / tuples / ... to numpy arrays
             yq = np.zeros(y.shape)
             over_pos = over_neg = np.zeros(y.shape, dtype=bool)
-            self.ovr_flag = np.zeros(y.shape, dtype=int)
+            self.ovr_flag = np.zeros(y.shape, dtype=int) if self.track_flags else 0
 
             if np.issubdtype(y.dtype, np.number):
                 # numpy number type (usual case), proceed with test for complex value
@@ -742,114 +1428,212 @@ class Fixed(object):
             return yq
 
         # ======================================================================
-        # logger.error(f"fixp: in_frmt = '{in_frmt}', out_frmt = '{out_frmt}'")
-
-        # ======================================================================
-        # (2) : QUANTIZATION
-        #       For `in_frmt=='qfrac'`, multiply by 2**WF = 1/LSB to obtain an
-        #       intermediate format with quantization step size of 1.
-        #       Next, apply selected quantization method to convert
-        #       floating point inputs to "fixpoint integers".
+        # (2) - (4) : QUANTIZATION, OVERFLOW HANDLING AND OUTPUT SCALING
+        #       using the plan compiled by `set_qdict()`
         # ======================================================================
-        if in_frmt == 'qfrac':
-            y = y * (2. ** self.q_dict['WF'])
-
-        # logger.error(f"fixp (in:scaled): {pprint_log(y, N=4)}")
-
-        if self.q_dict['quant'] == 'floor':
-            yq = np.floor(y)  # largest integer i, such that i <= x (= binary truncation)
-        elif self.q_dict['quant'] == 'round':
-            yq = np.round(y)  # rounding, also = binary rounding
-        elif self.q_dict['quant'] == 'fix':
-            yq = np.fix(y)  # round to nearest integer towards zero ("Betragsschneiden")
-        elif self.q_dict['quant'] == 'ceil':
-            yq = np.ceil(y)  # smallest integer i, such that i >= x
-        elif self.q_dict['quant'] == 'rint':
-            yq = np.rint(y)  # round towards nearest int
-        elif self.q_dict['quant'] == 'dsm':
-            if DS:
-                # Synthesize DSM loop filter,
-                # TODO: parameters should be adjustable via quantizer dict
-                H = synthesizeNTF(order=3, osr=64, opt=1)
-                # Calculate DSM stream and shift/scale it from -1 ... +1 to
-                # 0 ... 1 sequence
-                yq = (simulateDSM(y*self.LSB, H)[0]+1)/(2*self.LSB)
-                # returns four ndarrays:
-                # v: quantizer output (-1 or 1)
-                # xn: modulator states.
-                # xmax: maximum value that each state reached during simulation
-                # y: The quantizer input (ie the modulator output).
+        if SCALAR:
+            return self._plan_scalar(float(y), in_frmt, out_frmt)
+        else:
+            return self._plan(y, in_frmt, out_frmt)
+
+    # --------------------------------------------------------------------------
+    def _quant_dsm(self, y: np.ndarray) -> np.ndarray:
+        """
+        Quantize `y` (integer scale) with the delta-sigma modulator `self.dsm`,
+        continuing from the modulator state of the previous call. The modulator
+        is (re-)created when its parameters in `self.q_dict` have changed.
+        """
+        params = tuple(self.q_dict.get(k, v) for k, v in DSM_DEFAULTS.items())
+        if self.dsm is None or self.dsm.params != params:
+            self.dsm = DSM(*params)
+        # Calculate DSM stream and shift/scale it from -1 ... +1 to
+        # 0 ... 1 sequence
+        return (self.dsm.modulate(y * self.LSB) + 1) / (2 * self.LSB)
+
+    # --------------------------------------------------------------------------
+    @property
+    def int_backend(self) -> bool:
+        """
+        Backend selection for `fixp()` and `requant()`: `None` for automatic selection,
+        `True` / `False` for int64 resp. float64 backend. Setting this attribute
+        recompiles the quantization plan.
+        """
+        return self._int_backend
+
+    @int_backend.setter
+    def int_backend(self, int_backend: bool) -> None:
+        self._int_backend = int_backend
+        self._compile_plan()
+
+    # --------------------------------------------------------------------------
+    def int_backend_active(self) -> bool:
+        """
+        Return `True` when the int64 backend is selected (see `int_backend`) and
+        can be used with the current quantizer settings.
+        """
+        if self._int_backend is None:
+            if fb.fil[0]['qfrmt'] != 'qint':
+                return False
+        elif not self._int_backend:
+            return False
+        return self.q_dict['quant'] in INT_QUANT_METHODS\
+            and self.q_dict['WI'] + self.q_dict['WF'] + 1 <= 62
+
+    # --------------------------------------------------------------------------
+    def _get_ovr_bufs(self, shape: tuple) -> tuple:
+        """
+        Return two preallocated boolean buffers with shape `shape` for positive
+        and negative overflow masks. The buffers are only reallocated when their
+        size is too small, views with the last requested shape are cached.
+        """
+        if shape != self._ovr_shape:
+            size = int(np.prod(shape))
+            if self._ovr_buf_pos.size < size:
+                self._ovr_buf_pos = np.empty(size, dtype=bool)
+                self._ovr_buf_neg = np.empty(size, dtype=bool)
+            self._ovr_shape = shape
+            self._ovr_views = (self._ovr_buf_pos[:size].reshape(shape),
+                               self._ovr_buf_neg[:size].reshape(shape))
+        return self._ovr_views
+
+    # --------------------------------------------------------------------------
+    def _fixp_int(self, y: np.ndarray, in_frmt: str = 'qfrac',
+                  out_frmt: str = 'qfrac') -> np.ndarray:
+        """
+        int64 backend of `fixp()` for real-valued arrays `y`:
+
+        - Integer arrays with `in_frmt == 'qint'` are used directly
+        - Float arrays are scaled by `2 ** WF` for `in_frmt == 'qfrac'`, quantized in
+          place and converted to int64
+        - Overflows are treated in place with bit masks (wrap) or by clipping (sat)
+
+        The result is an int64 array for integer input arrays and `out_frmt == 'qint'`,
+        otherwise a float64 array.
+        """
+        if y.dtype.kind in {'i', 'u'} and in_frmt == 'qint':
+            yq = y.astype(np.int64)  # always copy the input data
+            int_out = True
+        else:
+            if in_frmt == 'qfrac':
+                y_f = y * (2. ** self.q_dict['WF'])
             else:
-                raise Exception('"deltasigma" Toolbox not found.\n'
-                                'Try installing it with "pip install deltasigma".')
-        elif self.q_dict['quant'] == 'none':
-            yq = y  # return unquantized value
+                y_f = y.astype(np.float64)  # always copy the input data
+            INT_QUANT_METHODS[self.q_dict['quant']](y_f, out=y_f)
+            # limit range before casting to int64 to avoid undefined results
+            np.clip(y_f, -INT_LIMIT, INT_LIMIT, out=y_f)
+            yq = y_f.astype(np.int64)
+            int_out = False
+
+        self._ovfl_int(yq)
+
+        if out_frmt == 'qfrac':
+            return yq * (2. ** -self.q_dict['WF'])
+        elif int_out:
+            return yq
         else:
-            raise Exception(
-                f'''Unknown Requantization type "{self.q_dict['quant']:s}"!''')
-
-        # ========================================================================
-        # (3) : OVERFLOW / SATURATION
-        #       Handle Overflow / saturation w.r.t. to the MSB = 2 ** (W - 2),
-        #       returning a result in the range MIN = -2*MSB ... + 2*MSB-LSB = MAX
-        # ========================================================================
-        LSB = 1
-        MSB = 1 << (self.q_dict['WI'] + self.q_dict['WF'] - 1)  # 2 ** (W - 2)
-        MAX = 2 * MSB - LSB  # 2 ** (W - 1) - 1
-        MIN = - 2 * MSB
+            return yq.astype(np.float64)
 
+    # --------------------------------------------------------------------------
+    def _ovfl_int(self, yq: np.ndarray) -> None:
+        """
+        Treat overflows of int64 array `yq` in place and update overflow counters
+        """
         if self.q_dict['ovfl'] == 'none':
-            # set all overflow flags to zero
-            self.N_over = 0  # self.N_over_neg = self.N_over_pos =
+            self.N_over = 0
+            self.ovfl_stats.advance(yq.size)
         else:
-            # Bool. vectors with '1' for every neg./pos overflow:
-            over_neg = (yq < MIN)
-            over_pos = (yq > MAX)
-            # create flag / array of flags for pos. / neg. overflows
-            self.ovr_flag = over_pos.astype(int) - over_neg.astype(int)
-            # No. of pos. / neg. / all overflows occured since last reset:
-            # self.N_over_neg += np.sum(over_neg)
-            # self.N_over_pos += np.sum(over_pos)
-            self.N_over += np.sum(over_neg) + np.sum(over_pos)
-
-            # Replace overflows with Min/Max-Values (saturation):
+            W = self.q_dict['WI'] + self.q_dict['WF'] + 1
+            MIN = -(1 << (W - 1))
+            MAX = (1 << (W - 1)) - 1
+            over_pos, over_neg = self._get_ovr_bufs(yq.shape)
+            np.greater(yq, MAX, out=over_pos)
+            np.less(yq, MIN, out=over_neg)
+            # reinterpret bool masks as int8 for a cheap calculation of the flags
+            self.ovr_flag = over_pos.view(np.int8) - over_neg.view(np.int8)\
+                if self.track_flags else 0
+            self.N_over += self.ovfl_stats.update(over_pos, over_neg)
+
             if self.q_dict['ovfl'] == 'sat':
-                yq = np.where(over_pos, MAX, yq)  # (cond, true, false)
-                yq = np.where(over_neg, MIN, yq)
-            # Replace overflows by two's complement wraparound (wrap)
+                np.clip(yq, MIN, MAX, out=yq)
             elif self.q_dict['ovfl'] == 'wrap':
-                yq = np.where(
-                    over_pos | over_neg, yq - 4. * MSB * np.fix(
-                        (np.sign(yq) * 2 * MSB + yq) / (4 * MSB)), yq)
+                # two's complement wrap-around: shift range to 0 ... 2**W - 1,
+                # mask the lower W bits and shift back
+                yq -= MIN
+                yq &= (1 << W) - 1
+                yq += MIN
             else:
                 raise Exception(
                     f"""Unknown overflow type "{self.q_dict['ovfl']:s}"!""")
 
         self.q_dict.update({'N_over': self.N_over})
 
-        # ======================================================================
-        # (4) : OUTPUT SCALING
-        #       Divide result by `2 ** WF` factor for `out_frmt=='qint'` to obtain
-        #       quantized fractional number
-        # ======================================================================
-        if out_frmt == 'qfrac':
-            yq = yq / (2. ** self.q_dict['WF'])
-
-        # logger.error(f"fixp: (out:scaled) = {pprint_log(yq, N=4)}")
+    # --------------------------------------------------------------------------
+    def _ovfl_flags(self, ovr: np.ndarray) -> None:
+        """
+        Update overflow counters with the array `ovr` of overflow flags (+1, -1 or 0
+        for positive, negative or no overflow) of `ovr.size` samples (in C order)
+        that have been treated outside of this class, e.g. by the integer kernels
+        in `pyfda_fix_lib_numba`.
+        """
+        if self.q_dict['ovfl'] == 'none':
+            self.N_over = 0
+            self.ovfl_stats.advance(ovr.size)
+        else:
+            self.ovr_flag = ovr if self.track_flags else 0
+            self.N_over += self.ovfl_stats.update(ovr > 0, ovr < 0)
+        self.q_dict.update({'N_over': self.N_over})
 
-        if SCALAR and isinstance(yq, np.ndarray):
-            yq = yq.item()  # convert singleton array to scalar
+    # --------------------------------------------------------------------------
+    def _requant_int(self, x_i: np.ndarray, WI_F: int) -> np.ndarray:
+        """
+        int64 backend of `requant()` for integer arrays `x_i` in 'qint' format with
+        `WI_F` fractional bits: Align binary points by shifting and quantize by
+        right-shifting with the selected quantization method, then treat overflows.
+        """
+        yq = self._quant_int(x_i, WI_F)
+        self._ovfl_int(yq)
+        return yq
 
+    # --------------------------------------------------------------------------
+    def _quant_int(self, x_i: np.ndarray, WI_F: int) -> np.ndarray:
+        """
+        Quantization part of `_requant_int()` without overflow treatment
+        """
+        yq = x_i.astype(np.int64)  # always copy the input data
+        dWF = WI_F - self.q_dict['WF']  # number of fractional bits to be removed
+        if dWF <= 0:  # extend fractional bits, no quantization needed
+            yq <<= -dWF
+        else:
+            quant = self.q_dict['quant']
+            if quant == 'floor':
+                yq >>= dWF
+            elif quant == 'ceil':
+                np.negative(yq, out=yq)
+                yq >>= dWF
+                np.negative(yq, out=yq)
+            elif quant == 'fix':
+                neg = yq < 0
+                np.abs(yq, out=yq)
+                yq >>= dWF
+                np.negative(yq, out=yq, where=neg)
+            else:  # 'round', 'rint': round half to even like `np.round()`
+                rem = yq & ((1 << dWF) - 1)  # bits to be discarded
+                yq >>= dWF
+                half = 1 << (dWF - 1)
+                yq += (rem > half) | ((rem == half) & (yq & 1).astype(bool))
         return yq
 
     # --------------------------------------------------------------------------
-    def resetN(self):
-        """ Reset counters and overflow-flag of Fixed object """
-        frm = inspect.stack()[1]
-        logger.debug("'reset_N' called from {0}.{1}():{2}.".
-                     format(inspect.getmodule(frm[0]).__name__.split('.')[-1],
-                            frm[3], frm[2]))
+    def resetN(self, dsm: bool = True):
+        """
+        Reset counters, overflow statistics and overflow-flag of Fixed object and
+        the state of the delta-sigma modulator. Use `dsm=False` to keep the
+        modulator state between frames of one run.
+        """
         self.q_dict.update({'N_over': 0})
+        self.ovfl_stats.reset()
+        if dsm and self.dsm is not None:
+            self.dsm.reset()
 
         self.ovr_flag = 0
         # self.N_over_pos = 0
@@ -935,6 +1719,13 @@ class Fixed(object):
 
         WI_F = QI.q_dict['WF']  # number of fractional bits of input signal
 
+        # integer arrays are requantized by shifting with the int64 backend
+        if fb.fil[0]['qfrmt'] == 'qint' and fb.fil[0]['fx_sim']\
+                and isinstance(x_i, np.ndarray) and x_i.dtype.kind in {'i', 'u'}\
+                and self.int_backend_active():
+            self.N += x_i.size
+            return self._requant_int(x_i, WI_F)
+
         # Convert input signal to fractional format if needed for aligning at fractional point
         if fb.fil[0]['qfrmt'] == 'qint':
             x_i_frac = x_i / (1 << WI_F)
@@ -1005,7 +1796,130 @@ class Fixed(object):
         elif np.isscalar(y):
             return self.frmt2float_scalar(y)
         else:
-            return self.frmt2float_vec(y)
+            return self._frmt2float_arr(y)
+
+    # --------------------------------------------------------------------------
+    def _frmt2float_arr(self, y) -> np.ndarray:
+        """
+        Convert an array-like `y` of strings (or numbers) in 'dec', 'bin', 'oct',
+        'hex' or 'csd' format to float, yielding the same results as
+        `frmt2float_scalar()` for each element.
+
+        The strings are converted to a matrix of unicode code points, which are
+        mapped to digit values and character classes by the lookup tables
+        `FRMT_LUTS`. Well-formed strings (optional leading '-', digits, at most one
+        radix point, spaces) are validated and converted at once:
+
+        - 'dec': remove spaces and convert with `astype(np.float64)`
+        - 'bin', 'oct', 'hex': accumulate the digit values into an integer,
+          discard the bits outside the word length, calculate two's complement and
+          scale by the number of fractional places
+        - 'csd': convert with `csd2dec_arr()`
+
+        Finally, all values are quantized in one call of `fixp()`. Complex and
+        malformed strings and strings with more than 53 significant bits
+        are converted element-wise with `frmt2float_scalar()`.
+        """
+        frmt = fb.fil[0]['fx_base']
+        y = np.asarray(y)
+        if y.dtype.kind != 'U':
+            y = y.astype(str)
+        shape = y.shape
+        y = np.ascontiguousarray(y).ravel()
+        L = y.dtype.itemsize // 4  # number of characters per string
+        if y.size == 0 or L == 0:
+            return np.zeros(shape)
+
+        cp = y.view(np.uint32).reshape(-1, L)  # code points
+        if frmt == 'csd':
+            # strings consisting of CSD digits, spaces and at most one radix point
+            codes = CSD_LUT[np.minimum(cp, 128)]
+            ok = (np.count_nonzero(codes == C_ILLEGAL, axis=1) == 0)\
+                & (np.count_nonzero(codes == C_DOT, axis=1) <= 1)
+            yq = np.zeros(len(y))
+            yq[ok] = self.fixp(csd2dec_arr(y[ok]), out_frmt='qfrac')
+        else:
+            yq, ok = self._frmt2float_cp(y, cp, frmt)
+
+        # ---- element-wise conversion of the remaining strings -----------------
+        if not np.all(ok):
+            y_s = [self.frmt2float_scalar(v) for v in y[~ok]]
+            if any(isinstance(v, complex) for v in y_s):
+                yq = yq.astype(complex)
+            yq[~ok] = y_s
+        return yq.reshape(shape)
+
+    # --------------------------------------------------------------------------
+    def _frmt2float_cp(self, y: np.ndarray, cp: np.ndarray, frmt: str) -> tuple:
+        """
+        Convert the 1D array `y` of strings with the code point matrix `cp` in
+        'dec', 'bin', 'oct' or 'hex' format `frmt` to float, see `_frmt2float_arr()`.
+
+        Returns the quantized values and a boolean mask of the strings that
+        have been converted.
+        """
+        # ---- map code points to digits / character classes -------------------
+        codes = FRMT_LUTS[frmt][np.minimum(cp, 128)]
+        is_digit = codes < 16
+        is_dot = codes == C_DOT
+        is_minus = codes == C_MINUS
+        # index of first character that is not a space, is it a minus sign?
+        first = np.argmax(codes != C_SPACE, axis=1)
+        neg = is_minus[np.arange(len(y)), first]
+        # minus signs are only allowed as first character or after an exponent
+        is_minus[:, 1:] &= codes[:, :-1] != C_EXP
+        ok = (np.count_nonzero(codes == C_ILLEGAL, axis=1) == 0)\
+            & (np.count_nonzero(is_dot, axis=1) <= 1)\
+            & (np.count_nonzero(is_minus, axis=1) == neg)\
+            & np.any(is_digit, axis=1)
+
+        yq = np.zeros(len(y))
+        if frmt == 'dec':
+            ok &= np.count_nonzero(codes == C_EXP, axis=1) <= 1
+            y_ok = y[ok]
+            # remove spaces and replace ',' by '.' only when needed
+            if np.any(codes[ok] == C_SPACE):
+                y_ok = np.char.replace(y_ok, ' ', '')
+            if np.any(cp[ok] == ord(',')):
+                y_ok = np.char.replace(y_ok, ',', '.')
+            try:
+                y_dec = y_ok.astype(np.float64)
+            except ValueError:  # malformed strings, convert element-wise
+                ok[:] = False
+                y_dec = np.zeros(0)
+            yq[ok] = self.fixp(y_dec, in_frmt=fb.fil[0]['qfrmt'])
+        else:
+            base = FRMT_BASES[frmt]
+            b = base.bit_length() - 1  # bits per digit
+            if fb.fil[0]['qfrmt'] == 'qint':
+                W = self.q_dict['WI'] + self.q_dict['WF'] + 1
+            else:
+                W = self.q_dict['WI'] + 1
+
+            D = np.where(is_digit, codes, 0)
+            # position of digits counted from the right (0 = rightmost digit)
+            pos = np.cumsum(is_digit[:, ::-1], axis=1, dtype=np.int16)[:, ::-1] - 1
+            # number of significant digits, starting with the first nonzero digit
+            n_sig = np.max((pos + 1) * (D > 0), axis=1)
+            ok &= n_sig * b <= 53  # integers are exact in float64
+            D, pos = D[ok], pos[ok]
+            # number of fractional places = digits right of the radix point
+            frc = np.count_nonzero(
+                is_digit[ok] & (np.cumsum(is_dot[ok], axis=1) > 0), axis=1)
+            I = np.sum(D.astype(np.int64) << np.clip(pos * b, 0, 62), axis=1)
+            s = frc * b  # scaling: y_dec = I / base ** frc = I * 2 ** -s
+            int_bits = np.maximum(np.frexp(I)[1] - s, 0)
+            # When number is outside fixpoint range, discard MSBs
+            trunc = int_bits > W
+            if np.any(trunc):
+                I[trunc] &= (np.int64(1) << (W + s[trunc])) - 1
+                int_bits = np.maximum(np.frexp(I)[1] - s, 0)
+            y_dec = np.ldexp(I.astype(np.float64), -s)
+            # MSB set -> negative number in two's complement
+            y_dec[int_bits == W] -= 2. ** W
+            y_dec[neg[ok]] *= -1
+            yq[ok] = self.fixp(y_dec, out_frmt='qfrac')
+        return yq, ok
 
     # --------------------------------------------------------------------------
     def frmt2float_scalar(self, y: str) -> float:
@@ -1246,6 +2160,13 @@ class Fixed(object):
         The float is always quantized / saturated using `self.fixp()` before it is
         converted to different fixpoint number bases.
 
+        Results for numeric arrays are cached together with the overflow flags and
+        counters in `self.frmt_cache`, so repeated calls with the same data (e.g.
+        when the coefficient table is refreshed) don't need to quantize and format
+        the data again. The cache is cleared whenever the quantizer settings are
+        changed via `set_qdict()`, it is not used for delta-sigma modulation.
+        Cached results are not added to the overflow statistics `ovfl_stats`.
+
         Parameters
         ----------
         y: scalar or array-like
@@ -1258,41 +2179,36 @@ class Fixed(object):
             For all formats except `float` a fixpoint representation with
             a total number of W = WI + WF + 1 binary digits is returned.
         """
+        if not fb.fil[0]['fx_sim'] or type(y) is not np.ndarray\
+                or y.dtype.kind not in 'biufc' or self.q_dict['quant'] == 'dsm':
+            return self._float2frmt(y)
+
+        key = (fb.fil[0]['fx_base'], fb.fil[0]['qfrmt'], y.dtype.str, y.shape,
+               y.tobytes())
+        if key in self.frmt_cache:
+            y_str, dN, dN_over, ovr_flag = self.frmt_cache[key]
+            self.N_cache_hits += 1
+            self.N += dN
+            self.N_over += dN_over
+            self.q_dict.update({'N_over': self.N_over})
+            self.ovr_flag = np.copy(ovr_flag)
+        else:
+            N, N_over = self.N, self.N_over
+            y_str = self._float2frmt(y)
+            if len(self.frmt_cache) >= FRMT_CACHE_SIZE:
+                del self.frmt_cache[next(iter(self.frmt_cache))]  # drop oldest entry
+            self.frmt_cache[key] = (y_str, self.N - N, self.N_over - N_over,
+                                    np.copy(self.ovr_flag))
+        # return a copy as the result may be modified by the caller
+        return np.copy(y_str) if isinstance(y_str, np.ndarray) else y_str
 
-        insert_binary_point = np.vectorize(
-            lambda bin_str, pos: (bin_str[:pos+1] + "." + bin_str[pos+1:]))
+    # --------------------------------------------------------------------------
+    def _float2frmt(self, y):
         """
-            Define vectorized functions using numpys automatic type casting:
-            Vectorized functions for inserting binary point in string `bin_str`
-            after position `pos`.
-
-            Usage:  insert_binary_point(bin_str, pos)
-
-            Parameters
-            ----------
-            bin_str : str
-                String in binary format (only '0' and '1')
-            pos     : int
-                Position of binary point to be inserted
+        Quantize `y` and convert it to the number format `fb.fil[0]['fx_base']`
+        without caching, see `float2frmt()`.
         """
 
-        binary_repr_vec = np.frompyfunc(np.binary_repr, 2, 1)
-
-        def binary_repr(y_int, W):
-            """
-            Convert a scalar, array, list or tuple of integer values
-            to the binary representation using `np.binary_repr()` or
-            the vectorized form.
-            """
-
-            if type(y_int) in {np.ndarray, list, tuple}:
-                return binary_repr_vec(y_int, W).astype('U')
-            elif isinstance(y_int, (int, np.integer)):
-                return np.binary_repr(y_int, W)
-            else:
-                logger.error(f"Unsupported data type '{type(y_int)}'!")
-                return "0"
-
         # ======================================================================
         # logger.warning(f"float2frmt: y = {y}")
         if not fb.fil[0]['fx_sim']:  # return float input value unchanged (no string)
@@ -1342,33 +2258,44 @@ class Fixed(object):
         elif fb.fil[0]['fx_base'] == 'csd':
             if fb.fil[0]['qfrmt'] == 'qint':
                 # integer case, convert with 0 fractional bits
-                y_str = dec2csd_vec(y_fix, 0)
+                WF = 0
             else:
                 # fractional case, convert with WF fractional bits
-                y_str = dec2csd_vec(y_fix, self.q_dict['WF'])
+                WF = self.q_dict['WF']
+            # convert whole array from the NAF of the integer values, use the
+            # element-wise converter for unquantized values or > 62 bits
+            y_str = None
+            if self.q_dict['quant'] != 'none':
+                y_str = dec2csd_arr(y_fix, WF)
+            if y_str is None:
+                y_str = dec2csd_vec(y_fix, WF)
 
         elif fb.fil[0]['fx_base'] in {'bin', 'oct', 'hex'}:
             # represent fixpoint number as integer in the range -2**(W-1) ... 2**(W-1)
             y_fix_int = np.int64(np.round(y_fix / self.LSB))
             W = self.q_dict['WI'] + self.q_dict['WF'] + 1
-            # convert to (array of) string with 2's complement binary
-            y_bin_str = binary_repr(y_fix_int, W)
 
             if fb.fil[0]['qfrmt'] == 'qint':
                 WI = self.q_dict['WI'] + self.q_dict['WF'] + 1
                 # TODO: Is the "+ 1" correct?
             else:
                 WI = self.q_dict['WI']
-            if fb.fil[0]['fx_base'] == 'hex':
-                y_str = bin2hex_vec(y_bin_str, WI)
-            elif fb.fil[0]['fx_base'] == 'oct':
-                y_str = bin2oct_vec(y_bin_str, WI)
-            else:  # 'bin'
-                # insert radix point if required
-                if fb.fil[0]['qfrmt'] == 'qint':
-                    y_str = y_bin_str
-                else:
-                    y_str = insert_binary_point(y_bin_str, WI)
+            # format whole array from integer bits, use the legacy string
+            # converters below only when this is not possible
+            y_str = int2frmt(y_fix_int, W, WI, fb.fil[0]['fx_base'])
+            if y_str is None:
+                # convert to (array of) string with 2's complement binary
+                y_bin_str = binary_repr(y_fix_int, W)
+                if fb.fil[0]['fx_base'] == 'hex':
+                    y_str = bin2hex_vec(y_bin_str, WI)
+                elif fb.fil[0]['fx_base'] == 'oct':
+                    y_str = bin2oct_vec(y_bin_str, WI)
+                else:  # 'bin'
+                    # insert radix point if required
+                    if fb.fil[0]['qfrmt'] == 'qint':
+                        y_str = y_bin_str
+                    else:
+                        y_str = insert_binary_point(y_bin_str, WI)
         else:
             raise Exception(f"""Unknown number format "{fb.fil[0]['fx_base']}"!""")
 
@@ -1380,6 +2307,22 @@ class Fixed(object):
 
 ########################################
 
+# --------------------------------------------------------------------------
+def quant_coeffs_cache_info() -> dict:
+    """
+    Return a dict with the number of hits and misses and the current and max.
+    size of the LRU cache of `quant_coeffs()`
+    """
+    return {**_quant_coeffs_stats, 'size': len(_QUANT_COEFFS_CACHE),
+            'max_size': QUANT_COEFFS_CACHE_SIZE}
+
+
+def quant_coeffs_cache_clear() -> None:
+    """ Clear the LRU cache of `quant_coeffs()` and reset its statistics """
+    _QUANT_COEFFS_CACHE.clear()
+    _quant_coeffs_stats.update({'hits': 0, 'misses': 0})
+
+
 # --------------------------------------------------------------------------
 def quant_coeffs(coeffs: iterable, Q, recursive: bool = False, out_frmt: str = ""
                  ) -> np.ndarray:
@@ -1389,6 +2332,13 @@ def quant_coeffs(coeffs: iterable, Q, recursive: bool = False, out_frmt: str = "
     `fb.fil[0]['qfrmt']` (`'qfrac'` or `'qint'`) and `fb.fil[0]['fx_sim']` (`True`
     or `False`)
 
+    Results for numeric coefficients are stored in an LRU cache, keyed by a hash of
+    the coefficients, the quantizer settings `WI`, `WF`, `quant` and `ovfl`,
+    `fb.fil[0]['qfrmt']` and the arguments `recursive` and `out_frmt`. For a cache
+    hit, the overflow counters and statistics of `Q` are restored as if the
+    coefficients had been quantized, see `quant_coeffs_cache_info()` for
+    statistics.
+
     Parameters
     ----------
     coeffs: iterable
@@ -1407,13 +2357,10 @@ def quant_coeffs(coeffs: iterable, Q, recursive: bool = False, out_frmt: str = "
 
     Returns
     -------
-    A numpy array of integer coeffcients, quantized and scaled with the
+    A read-only numpy array of integer coeffcients, quantized and scaled with the
     settings of the quantization object dict or None in case of an error
 
     """
-    disp_frmt_tmp = fb.fil[0]['fx_base']  # temporarily store fx display format and
-    # always use decimal display format for coefficient quantization
-    fb.fil[0]['fx_base'] = 'dec'
     if out_frmt == "":
         out_frmt=fb.fil[0]['qfrmt']
     elif out_frmt not in {"qint", "qfrac"}:
@@ -1426,6 +2373,32 @@ def quant_coeffs(coeffs: iterable, Q, recursive: bool = False, out_frmt: str = "
         logger.error("Coeffs empty!")
         return None
 
+    # the state of the delta-sigma modulator after the call can't be restored from
+    # the cache, don't cache its results
+    key = None
+    c = np.asarray(coeffs)
+    if c.dtype.kind in 'biufc' and Q.q_dict['quant'] != 'dsm'\
+            and fb.fil[0]['fx_sim']:
+        key = (hashlib.blake2b(np.ascontiguousarray(c).tobytes(),
+                               digest_size=16).digest(), c.dtype.str, c.shape,
+               tuple(Q.q_dict[k] for k in ('WI', 'WF', 'quant', 'ovfl')),
+               fb.fil[0]['qfrmt'], recursive, out_frmt)
+        if key in _QUANT_COEFFS_CACHE:
+            _QUANT_COEFFS_CACHE.move_to_end(key)
+            _quant_coeffs_stats['hits'] += 1
+            coeff_q, N, N_over, ovfl_stats, ovr_flag = _QUANT_COEFFS_CACHE[key]
+            Q.N = N
+            Q.N_over = N_over
+            Q.q_dict['N_over'] = N_over
+            Q.ovfl_stats = copy.deepcopy(ovfl_stats)
+            Q.ovr_flag = np.copy(ovr_flag)
+            return coeff_q
+        _quant_coeffs_stats['misses'] += 1
+
+    disp_frmt_tmp = fb.fil[0]['fx_base']  # temporarily store fx display format and
+    # always use decimal display format for coefficient quantization
+    fb.fil[0]['fx_base'] = 'dec'
+
     # quantize floating point coefficients with the selected scale (WI.WF),
     # next, convert array float  -> array of fixp
     #                            -> list of int (scaled by 2^WF) when `'qfrmt':'qint'`
@@ -1439,6 +2412,14 @@ def quant_coeffs(coeffs: iterable, Q, recursive: bool = False, out_frmt: str = "
     # self.update_ovfl_cnt()  # update display of overflow counter and MSB / LSB
 
     fb.fil[0]['fx_base'] = disp_frmt_tmp  # restore previous display setting
+
+    coeff_q = np.asarray(coeff_q)
+    coeff_q.setflags(write=False)  # cached result is shared between callers
+    if key is not None:
+        _QUANT_COEFFS_CACHE[key] = (coeff_q, Q.N, Q.N_over, copy.deepcopy(Q.ovfl_stats),
+                                    np.copy(Q.ovr_flag))
+        while len(_QUANT_COEFFS_CACHE) > QUANT_COEFFS_CACHE_SIZE:
+            _QUANT_COEFFS_CACHE.popitem(last=False)  # remove least recently used entry
     return coeff_q
 
 
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Integer kernels for the recurrences of the pyfixp filters, compiled with numba
+when it is installed.
+
+All values are integers in units of the LSB of the corresponding quantizer,
+quantization and overflow methods are passed as integer codes (see `QUANT_CODES`
+and `OVFL_CODES`). The kernels yield the same results and overflow counts as the
+`Fixed()` class as long as all intermediate values stay within the range of
+float64 integers (< 2**52). Overflows of the accumulator and the output are
+returned as arrays of flags (+1, -1 or 0 for positive, negative or no overflow)
+that can be passed to the overflow statistics `OvflStats` of the quantizers.
+
+The backend is selected with the `FX_BACKEND` entry in the `[Config Settings]`
+section of `pyfda.conf`, see `fx_backend()`.
+"""
+import numpy as np
+import pyfda.filterbroker as fb
+
+import logging
+logger = logging.getLogger(__name__)
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+FX_BACKENDS = {'auto', 'numba', 'numpy'}
+
+# integer codes for quantization methods ('round' and 'rint' both round half
+# to even) and overflow methods
+QUANT_CODES = {'floor': 0, 'round': 1, 'rint': 1, 'fix': 2, 'ceil': 3}
+OVFL_CODES = {'none': 0, 'wrap': 1, 'sat': 2}
+
+_warned = False  # issue warning for missing numba only once
+
+
+# ------------------------------------------------------------------------------
+def fx_backend() -> str:
+    """
+    Return the active backend for the fixpoint kernels, `'numba'` or `'numpy'`,
+    depending on the setting `fb.conf_settings['FX_BACKEND']`:
+
+    - `'auto'`: use numba when it is installed
+    - `'numba'`: use numba, fall back to numpy with a warning when it is missing
+    - `'numpy'`: always use the numpy implementation
+    """
+    global _warned
+    backend = fb.conf_settings.get('FX_BACKEND', 'auto')
+    if backend not in FX_BACKENDS:
+        if not _warned:
+            logger.warning(f"Unknown fixpoint backend '{backend}', using 'auto'.")
+            _warned = True
+        backend = 'auto'
+    if backend == 'numpy':
+        return 'numpy'
+    if not HAS_NUMBA:
+        if backend == 'numba' and not _warned:
+            logger.warning("Fixpoint backend 'numba' selected but numba is not "
+                           "installed, using 'numpy'.")
+            _warned = True
+        return 'numpy'
+    return 'numba'
+
+
+# ------------------------------------------------------------------------------
+def requant(v: int, dWF: int, q_code: int) -> int:
+    """
+    Requantize integer `v` by removing `dWF` fractional bits with quantization
+    method code `q_code`. For `dWF <= 0`, `v` is left-shifted by `-dWF` bits.
+    """
+    if dWF <= 0:
+        return v << -dWF
+    if q_code == 0:  # floor
+        return v >> dWF
+    elif q_code == 3:  # ceil
+        return -((-v) >> dWF)
+    elif q_code == 2:  # fix
+        if v >= 0:
+            return v >> dWF
+        return -((-v) >> dWF)
+    else:  # round half to even
+        q = v >> dWF
+        r = v & ((1 << dWF) - 1)
+        half = 1 << (dWF - 1)
+        if r > half or (r == half and (q & 1) == 1):
+            q += 1
+        return q
+
+
+# ------------------------------------------------------------------------------
+def ovfl(v: int, W: int, o_code: int):
+    """
+    Treat overflows of integer `v` w.r.t. to a word length of `W` bits with overflow
+    method code `o_code`. Return the result and the overflow flag, i.e. `1` for a
+    positive, `-1` for a negative overflow and `0` otherwise.
+    """
+    if o_code == 0:  # none
+        return v, 0
+    MAX = (1 << (W - 1)) - 1
+    MIN = -MAX - 1
+    if v > MAX or v < MIN:
+        o = 1 if v > MAX else -1
+        if o_code == 2:  # sat
+            if v > MAX:
+                return MAX, o
+            return MIN, o
+        return ((v - MIN) & ((1 << W) - 1)) + MIN, o  # wrap
+    return v, 0
+
+
+# ------------------------------------------------------------------------------
+def fir_df_kernel(X, B, dWF_mul, q_mul, W_mul, o_mul, dWF_acc, q_acc, W_acc, o_acc):
+    """
+    Direct form FIR filter: For each `k`, multiply the window `X[k:k + len(B)]`
+    with the coefficients `B`, requantize and treat overflows of the partial
+    products, accumulate them and requantize and treat overflows of the sum.
+
+    Return the accumulator values, the number of overflows of the partial
+    products and the overflow flags of the accumulator.
+    """
+    L = len(B)
+    N = len(X) - L + 1
+    acc = np.zeros(N, dtype=np.int64)
+    ovr_acc = np.zeros(N, dtype=np.int8)
+    N_mul = 0
+    for k in range(N):
+        s = 0
+        for i in range(L):
+            v, o = ovfl(requant(X[k + i] * B[i], dWF_mul, q_mul), W_mul, o_mul)
+            N_mul += abs(o)
+            s += v
+        s, o = ovfl(requant(s, dWF_acc, q_acc), W_acc, o_acc)
+        ovr_acc[k] = o
+        acc[k] = s
+    return acc, N_mul, ovr_acc
+
+
+# ------------------------------------------------------------------------------
+def iir_df1_kernel(acc_b, A, Y, W_ma, o_ma, dWF_acc, q_acc, W_acc, o_acc,
+                   dWF_O, q_O, W_O, o_O):
+    """
+    Recursive part of the direct form 1 IIR filter: For each `k`, treat overflows
+    of the transversal part `acc_b[k]` (already requantized to the accumulator
+    format), multiply the last `M = len(A)` outputs (newest first) with the
+    coefficients `A` and treat overflows of the partial products. Requantize
+    their sum to the accumulator format, subtract it from the transversal part
+    and requantize the difference to the output format, treating overflows
+    each time.
+
+    `Y` contains the initial output registers (newest first).
+
+    Return the output values, the final output registers, the number of
+    overflows of the partial products, the overflow flags of the accumulator
+    with shape `(N, 2)` (transversal and recursive part of each sample, i.e.
+    in the order of the sample loop) and the overflow flags of the output.
+    """
+    N = len(acc_b)
+    M = len(A)
+    # ring buffer with two copies of the output registers: the window
+    # `buf[p:p + M]` always contains the last M outputs, newest first
+    buf = np.zeros(2 * M, dtype=np.int64)
+    buf[:M] = Y
+    buf[M:] = Y
+    p = 0
+    y = np.zeros(N, dtype=np.int64)
+    ovr_acc = np.zeros((N, 2), dtype=np.int8)
+    ovr_O = np.zeros(N, dtype=np.int8)
+    N_ma = 0
+    for k in range(N):
+        acc_b_k, o = ovfl(acc_b[k], W_acc, o_acc)
+        ovr_acc[k, 0] = o
+        s = 0
+        for i in range(M):
+            v, o = ovfl(A[i] * buf[p + i], W_ma, o_ma)
+            N_ma += abs(o)
+            s += v
+        acc_a, o = ovfl(requant(s, dWF_acc, q_acc), W_acc, o_acc)
+        ovr_acc[k, 1] = o
+        v, o = ovfl(requant(acc_b_k - acc_a, dWF_O, q_O), W_O, o_O)
+        ovr_O[k] = o
+        y[k] = v
+        # insert output into recursive (output) state register
+        p = p - 1 if p > 0 else M - 1
+        buf[p] = v
+        buf[p + M] = v
+    return y, buf[p:p + M].copy(), N_ma, ovr_acc, ovr_O
+
+
+if HAS_NUMBA:
+    requant = numba.njit(cache=True)(requant)
+    ovfl = numba.njit(cache=True)(ovfl)
+    fir_df_kernel = numba.njit(cache=True)(fir_df_kernel)
+    iir_df1_kernel = numba.njit(cache=True)(iir_df1_kernel)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Wordlength sweep: Simulate a fixpoint filter with a list of quantizer
+configurations (`fxq` dicts) against the same stimulus and rate the results
+by SNR, number of overflows and maximum error w.r.t. the floating point
+response of the filter.
+"""
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.function_base import iterable
+import scipy.signal as sig
+
+import pyfda.filterbroker as fb
+import pyfda.libs.pyfda_fix_lib as fx
+
+import logging
+logger = logging.getLogger(__name__)
+
+#: keys of the filter dict used by the simulation, see `fil_snapshot()`
+FIL_KEYS = ('ba', 'qfrmt', 'fx_sim', 'fx_base')
+
+
+# ------------------------------------------------------------------------------
+def sweep_stimulus(q_i: dict, N: int = 4096, amp: float = 0.5, seed: int = 0
+                   ) -> np.ndarray:
+    """
+    Return `N` samples of uniformly distributed white noise in fractional format
+    with an amplitude of `amp` times the full scale range of the input quantizer
+    dict `q_i`.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-amp, amp, N) * (1 << q_i['WI'])
+
+
+# ------------------------------------------------------------------------------
+def fil_snapshot() -> dict:
+    """
+    Return a deep copy of the entries `FIL_KEYS` of the filter dict `fb.fil[0]`
+    that are needed for the sweep. Take it on the GUI thread when the sweep runs
+    in a worker thread, the filter dict may be changed in the meantime.
+    """
+    return {k: copy.deepcopy(fb.fil[0][k]) for k in FIL_KEYS}
+
+
+# ------------------------------------------------------------------------------
+def sweep_configs(fxq: dict, dWF: iterable = range(-3, 4),
+                  keys: iterable = None) -> list:
+    """
+    Create a list of quantizer configurations from the `fxq` dict by changing the
+    fractional word lengths of the quantizers `keys` by the values in `dWF`,
+    negative word lengths are clipped to zero. By default, the word lengths
+    of all quantizers except for the input and output quantizer are changed.
+
+    Returns a list of deep copies of `fxq`.
+    """
+    if keys is None:
+        keys = [k for k in fxq if k not in {'QI', 'QO'}]
+    fxq_list = []
+    for d in dWF:
+        fxq_d = copy.deepcopy(fxq)
+        for k in keys:
+            fxq_d[k]['WF'] = max(fxq[k]['WF'] + d, 0)
+        fxq_list.append(fxq_d)
+    return fxq_list
+
+
+# ------------------------------------------------------------------------------
+def simulate(fx_class: type, fxq: dict, x_q: np.ndarray):
+    """
+    Instantiate fixpoint filter `fx_class` with quantizer configuration `fxq`,
+    calculate the response to the quantized stimulus `x_q` and return it together
+    with the dict of data path overflows returned by `fx_filt.n_overflows()`.
+    """
+    fx_filt = fx_class(fxq)
+    y_q = np.asarray(fx_filt.fxfilter(x_q)[0], dtype=np.float64)
+    return y_q, fx_filt.n_overflows()
+
+
+# ------------------------------------------------------------------------------
+def _simulate_worker(fx_class: type, fxq: dict, x_q: np.ndarray, fil: dict):
+    """
+    Process pool wrapper for `simulate()`, copy the filter settings `fil` that
+    are needed by the fixpoint filters to the filter dict of the worker process.
+    """
+    fb.fil[0].update(fil)
+    return simulate(fx_class, fxq, x_q)
+
+
+# ------------------------------------------------------------------------------
+def fx_sweep(fx_class: type, fxq_list: list, x: np.ndarray, n_workers: int = 1,
+             fil: dict = None) -> list:
+    """
+    Simulate the fixpoint filter class `fx_class` (e.g. `FIR_DF_pyfixp`) with the
+    coefficients `fil['ba']` for all quantizer configurations in `fxq_list`
+    against the same stimulus `x`.
+
+    The stimulus is quantized only once per input quantizer setting, the floating
+    point reference (response of the unquantized filter to the quantized stimulus)
+    is calculated only once per input quantizer setting as well. The metrics for all
+    configurations are calculated in one pass along the configuration axis.
+
+    Parameters
+    ----------
+    fx_class : type
+        Fixpoint filter class, instantiated with a quantizer dict `fxq` and providing
+        a method `fxfilter(x)` that returns the response as the first item and
+        a method `n_overflows()` that returns the overflows of the data path
+
+    fxq_list : list of dict
+        Quantizer configurations, each in the format of `fb.fil[0]['fxq']`. The
+        dicts are deep-copied before the simulation.
+
+    x : ndarray of float
+        Stimulus in fractional format
+
+    n_workers : int
+        Number of worker processes, started with the 'spawn' method. With the
+        default `n_workers = 1`, the configurations are simulated sequentially
+        in the current process.
+
+    fil : dict or None
+        Filter settings `FIL_KEYS`, by default `fil_snapshot()` of the current
+        filter dict. The worker processes only use these settings, the fixpoint
+        filters of the sequential simulation read `fb.fil[0]`.
+
+    Returns
+    -------
+    results : list of dict
+        For each configuration a dict with the keys
+
+        - 'SNR': signal-to-noise ratio of the response in dB w.r.t. the floating
+          point response (`np.inf` for identical responses)
+        - 'err_max': maximum absolute error of the response in fractional format
+        - 'N_over': total number of overflows
+        - 'N_over_q': dict with the number of overflows for each quantizer
+    """
+    if fil is None:
+        fil = fil_snapshot()
+    if not fil['fx_sim']:
+        logger.warning("Fixpoint mode is not active, cannot run wordlength sweep.")
+        return []
+    fxq_list = [copy.deepcopy(fxq) for fxq in fxq_list]
+    qfrmt = fil['qfrmt']
+    b, a = (np.asarray(c, dtype=np.float64) for c in fil['ba'])
+    x = np.asarray(x, dtype=np.float64).real
+
+    # quantize stimulus and calculate float reference once per input quantizer
+    stim = {}  # key: input quantizer settings, value: (x_q, y_ref, N_over_I)
+    keys = []
+    for fxq in fxq_list:
+        key = tuple(fxq['QI'][k] for k in ('WI', 'WF', 'quant', 'ovfl'))
+        keys.append(key)
+        if key not in stim:
+            Q_I = fx.Fixed(copy.deepcopy(fxq['QI']))
+            Q_I.resetN()
+            x_q = Q_I.fixp(x, out_frmt=qfrmt)
+            x_f = x_q / (1 << fxq['QI']['WF']) if qfrmt == 'qint' else x_q
+            stim[key] = (x_q, sig.lfilter(b, a, x_f), Q_I.N_over)
+
+    # simulate all configurations
+    if n_workers > 1 and len(fxq_list) > 1:
+        # don't fork, the sweep may run in a thread of the (multithreaded) GUI
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=multiprocessing.get_context('spawn')
+                                 ) as executor:
+            futures = [executor.submit(_simulate_worker, fx_class, fxq, stim[key][0], fil)
+                       for fxq, key in zip(fxq_list, keys)]
+            sims = [f.result() for f in futures]
+    else:
+        sims = [simulate(fx_class, fxq, stim[key][0])
+                for fxq, key in zip(fxq_list, keys)]
+
+    # calculate metrics for all configurations at once
+    y_ref = np.array([stim[key][1] for key in keys])
+    y = np.array([s[0] for s in sims])
+    if qfrmt == 'qint':
+        y /= np.array([1 << fxq['QO']['WF'] for fxq in fxq_list])[:, None]
+    err = y - y_ref
+    P_sig = np.sum(y_ref ** 2, axis=1)
+    P_err = np.sum(err ** 2, axis=1)
+    with np.errstate(divide='ignore'):
+        SNR = 10 * np.log10(P_sig / P_err)
+    err_max = np.max(np.abs(err), axis=1)
+
+    results = []
+    for i, key in enumerate(keys):
+        N_over_q = {'Q_I': stim[key][2], **sims[i][1]}
+        results.append({'SNR': SNR[i], 'err_max': err_max[i],
+                        'N_over': sum(N_over_q.values()), 'N_over_q': N_over_q})
+    return results
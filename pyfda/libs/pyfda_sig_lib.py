@@ -13,9 +13,11 @@ import logging
 logger = logging.getLogger(__name__)
 
 import time
+import hashlib
 import numpy as np
 from numpy import pi
 import scipy.signal as sig
+import scipy.fft as sfft
 
 import pyfda.libs.pyfda_lib as pyfda_lib
 import pyfda.filterbroker as fb
@@ -973,3 +975,980 @@ def zorp_group_delayz(zorp, w, fs=1):
     r2 = r**2
     cos = np.cos(W - phi)
     return w, 2 * pi * (r2 - r*cos) / (r2 + 1 - 2*r*cos)
+
+
+# ------------------------------------------------------------------------------
+#: Min. number of taps of an FIR filter for calculating transient responses with
+#: `OLS_Filter` instead of `scipy.signal.lfilter()` / `sosfilt()`, measured with
+#: `python -m pyfda.tests.test_ols_time` (crossover w.r.t. `lfilter()`, `sosfilt()`
+#: is slower than both for FIR filters with more than approx. 16 taps)
+N_TAPS_OLS = 128
+
+
+class OLS_Filter(object):
+    """
+    FIR filter using fast convolution with the overlap-save method: The signal is
+    split into overlapping blocks of `N_fft` samples, each block is multiplied
+    with the transfer function in the frequency domain and the first `len(b) - 1`
+    samples of each result (the circular part) are discarded.
+
+    The last `len(b) - 1` input samples are kept as the filter state so that a
+    signal can be filtered frame by frame with `filter()`, yielding the same
+    result as `scipy.signal.lfilter(b, 1, x, zi=zi)` within floating point
+    tolerance. The cost per output sample grows with log(len(b)) instead of len(b).
+
+    Parameters
+    ----------
+    b : array_like
+        Coefficients of the FIR filter (real or complex)
+
+    N_fft : int or None
+        FFT block length (`N_fft >= len(b)`), by default the length with the least
+        operations per output sample is chosen from the fast FFT lengths returned
+        by `scipy.fft.next_fast_len()`, see `fft_len()`.
+    """
+    #: max. number of samples that are transformed at once
+    N_BATCH = 1 << 20
+
+    def __init__(self, b, N_fft: int = None) -> None:
+        self.b = np.atleast_1d(np.asarray(b))
+        self.N_taps = len(self.b)
+        if N_fft is None:
+            N_fft = self.fft_len(self.N_taps)
+        elif N_fft < self.N_taps:
+            raise ValueError(f"FFT length N_fft = {N_fft} needs to be >= len(b) = "
+                             f"{self.N_taps}!")
+        self.N_fft = N_fft
+        self.N_hop = N_fft - self.N_taps + 1  # number of output samples per block
+        self.H_r = sfft.rfft(self.b.real, N_fft) if not np.iscomplexobj(self.b) else None
+        self.H_c = sfft.fft(self.b, N_fft)
+        self.reset()
+
+    @staticmethod
+    def fft_len(N_taps: int) -> int:
+        """
+        Return the fast FFT length `L >= max(2 N_taps, 64)` that minimizes the
+        number of operations per output sample, approximately `L log2(L) /
+        (L - N_taps + 1)`
+        """
+        L = sfft.next_fast_len(max(2 * N_taps, 64), real=True)
+        L_best = L
+        cost_best = np.inf
+        while L <= 64 * N_taps or L == L_best:
+            cost = L * np.log2(L) / (L - N_taps + 1)
+            if cost < cost_best:
+                L_best, cost_best = L, cost
+            L = sfft.next_fast_len(L + 1, real=True)
+        return L_best
+
+    def reset(self) -> None:
+        """
+        Reset the filter state (last `len(b) - 1` input samples) to zero
+        """
+        self.zi = np.zeros(self.N_taps - 1)
+
+    def filter(self, x) -> np.ndarray:
+        """
+        Filter the frame `x` and update the filter state
+
+        Parameters
+        ----------
+        x : array_like
+            Input signal frame (real or complex)
+
+        Returns
+        -------
+        y : ndarray
+            Filtered frame with the same length as `x`, it is real when both `x`
+            and `b` are real
+        """
+        x = np.asarray(x)
+        N = len(x)
+        cmplx = self.H_r is None or np.iscomplexobj(x) or np.iscomplexobj(self.zi)
+        dtype = complex if cmplx else float
+        if N == 0:
+            return np.zeros(0, dtype=dtype)
+        # prepend the state to the input frame and zero-pad it to full blocks
+        n_blk = -(-N // self.N_hop)
+        buf = np.zeros((n_blk - 1) * self.N_hop + self.N_fft, dtype=dtype)
+        buf[:self.N_taps - 1] = self.zi
+        buf[self.N_taps - 1:self.N_taps - 1 + N] = x
+        self.zi = buf[N:N + self.N_taps - 1].copy()
+
+        # view of the overlapping blocks, transformed in batches to limit memory
+        blocks = np.lib.stride_tricks.sliding_window_view(buf, self.N_fft)[::self.N_hop]
+        y = np.empty((n_blk, self.N_hop), dtype=dtype)
+        n_batch = max(self.N_BATCH // self.N_fft, 1)
+        for k in range(0, n_blk, n_batch):
+            blk = blocks[k:k + n_batch]
+            if cmplx:
+                Y = sfft.ifft(sfft.fft(blk, axis=1) * self.H_c, axis=1)
+            else:
+                Y = sfft.irfft(sfft.rfft(blk, axis=1) * self.H_r, self.N_fft, axis=1)
+            y[k:k + n_batch] = Y[:, self.N_taps - 1:]
+        return y.reshape(-1)[:N]
+
+
+# ------------------------------------------------------------------------------
+def minmax_decim(y, N_bins: int):
+    """
+    Split the real signal `y` into `N_bins` buckets of equal length (except for
+    the last one) and return the indices of the minimum and the maximum of each
+    bucket. Plotting the samples at these indices instead of all samples yields
+    the same envelope for signals that are much longer than the number of pixels,
+    peaks are not lost like with simple downsampling.
+
+    Parameters
+    ----------
+    y : array_like
+        Real signal with `len(y) >= 1`
+
+    N_bins : int
+        Number of buckets (`N_bins >= 1`), when `len(y) < N_bins` each bucket
+        contains one sample
+
+    Returns
+    -------
+    idx_min, idx_max : ndarray of int
+        Indices of the minimum and the maximum of each bucket, both are sorted
+        in ascending order
+    """
+    y = np.asarray(y)
+    L = -(-len(y) // max(N_bins, 1))  # bucket length
+    N_full = len(y) // L  # number of full buckets
+    # full buckets as a 2D view, the remaining samples form the last bucket
+    y_b = y[:N_full * L].reshape(N_full, L)
+    offset = np.arange(N_full) * L
+    idx_min = offset + np.argmin(y_b, axis=1)
+    idx_max = offset + np.argmax(y_b, axis=1)
+    if N_full * L < len(y):
+        idx_min = np.append(idx_min, N_full * L + np.argmin(y[N_full * L:]))
+        idx_max = np.append(idx_max, N_full * L + np.argmax(y[N_full * L:]))
+    return idx_min, idx_max
+
+
+# ------------------------------------------------------------------------------
+class STFT_Stream(object):
+    """
+    Short-time Fourier transform of a signal that is passed frame by frame: Each
+    segment of `len(win)` samples, overlapping by `N_ovlp` samples with the
+    previous one, is detrended (mean removed), windowed and transformed as soon
+    as it is complete. The samples that are needed for the next segment (the
+    overlap tail) are kept between the frames.
+
+    The transformed segments (columns) are stored in a preallocated array,
+    `spectrogram()` derives the same results from them as
+    `scipy.signal.spectrogram(x, fs, window=win, noverlap=N_ovlp, detrend='constant')`
+    for all modes and scalings without recalculating the transform.
+
+    Parameters
+    ----------
+    win : array_like
+        Window, its length is the segment and FFT length `N_fft`
+
+    N_ovlp : int
+        Number of overlapping samples between segments (`0 <= N_ovlp < N_fft`)
+
+    N : int
+        Total number of samples of the signal, used for preallocating the
+        columns. Samples exceeding `N` are ignored.
+
+    buf : ndarray or None
+        Preallocated, zero-initialized complex array with the shape
+        `(n_cols(N, N_fft, N_ovlp), N_fft)` for the columns, e.g. memory-mapped
+        to a file. By default, a new array is created.
+    """
+    #: max. number of samples that are transformed at once
+    N_BATCH = 1 << 20
+
+    def __init__(self, win, N_ovlp: int, N: int, buf: np.ndarray = None) -> None:
+        self.win = np.asarray(win)
+        self.N_fft = len(self.win)
+        if not 0 <= N_ovlp < self.N_fft:
+            raise ValueError(f"Overlap N_ovlp = {N_ovlp} needs to be in the range "
+                             f"0 ... {self.N_fft - 1}!")
+        self.N_ovlp = N_ovlp
+        self.N_hop = self.N_fft - N_ovlp
+        shape = (self.n_cols(N, self.N_fft, N_ovlp), self.N_fft)
+        if buf is None:
+            buf = np.zeros(shape, dtype=complex)
+        elif buf.shape != shape:
+            raise ValueError(f"Buffer shape {buf.shape} needs to be {shape}!")
+        self.S = buf
+        self.reset()
+
+    @staticmethod
+    def n_cols(N: int, N_fft: int, N_ovlp: int) -> int:
+        """
+        Return the number of complete segments in a signal with `N` samples
+        """
+        return max((N - N_fft) // (N_fft - N_ovlp) + 1, 0)
+
+    def reset(self) -> None:
+        """
+        Reset the number of input samples and calculated columns to zero
+        """
+        self.N_in = 0  # number of input samples
+        self.N_cols = 0  # number of calculated columns
+        self.cmplx = False  # True when a complex frame has been added
+        self.tail = np.zeros(0)
+
+    def add(self, x) -> None:
+        """
+        Append the frame `x` to the signal and transform all segments that have
+        become complete
+        """
+        x = np.asarray(x)
+        self.N_in += len(x)
+        self.cmplx = self.cmplx or np.iscomplexobj(x)
+        buf = np.concatenate((self.tail, x))
+        n = min(max((len(buf) - self.N_fft) // self.N_hop + 1, 0),
+                len(self.S) - self.N_cols)
+        if n > 0:
+            segs = np.lib.stride_tricks.sliding_window_view(
+                buf, self.N_fft)[::self.N_hop][:n]
+            n_batch = max(self.N_BATCH // self.N_fft, 1)
+            for k in range(0, n, n_batch):
+                seg = segs[k:k + n_batch]
+                self.S[self.N_cols + k:self.N_cols + k + len(seg)] = sfft.fft(
+                    (seg - np.mean(seg, axis=1, keepdims=True)) * self.win, axis=1)
+            self.N_cols += n
+        self.tail = buf[n * self.N_hop:].copy()
+
+    def spectrogram(self, fs: float = 1., scaling: str = 'density', mode: str = 'psd',
+                    onesided: bool = True, k_start: int = 0, k_end: int = None):
+        """
+        Return the spectrogram of the columns `k_start ... k_end - 1` (by default
+        all calculated columns) like `scipy.signal.spectrogram()`. For complex
+        signals, a two-sided spectrogram is returned always.
+
+        Parameters
+        ----------
+        fs : float
+            Sampling frequency
+
+        scaling : str
+            'density' (power spectral density in V**2 / Hz) or 'spectrum' (power
+            spectrum in V**2)
+
+        mode : str
+            'psd', 'complex', 'magnitude', 'angle' or 'phase' (unwrapped along
+            the frequency axis)
+
+        onesided : bool
+            Return a one-sided spectrogram for real signals
+
+        k_start, k_end : int
+            Range of columns
+
+        Returns
+        -------
+        f : ndarray
+            Frequencies
+
+        t : ndarray
+            Times of the segment centers
+
+        Sxx : ndarray
+            Spectrogram with the shape `(len(f), len(t))`
+        """
+        if k_end is None or k_end > self.N_cols:
+            k_end = self.N_cols
+        k_start = min(max(k_start, 0), k_end)
+        onesided = onesided and not self.cmplx
+        if onesided:
+            f = sfft.rfftfreq(self.N_fft, 1 / fs)
+        else:
+            f = sfft.fftfreq(self.N_fft, 1 / fs)
+        t = (np.arange(k_start, k_end) * self.N_hop + self.N_fft / 2) / fs
+
+        if scaling == 'density':
+            scale = 1.0 / (fs * np.sum(np.abs(self.win)**2))
+        elif scaling == 'spectrum':
+            scale = 1.0 / np.abs(np.sum(self.win))**2
+        else:
+            raise ValueError(f'Unknown scaling "{scaling}"')
+
+        S = self.S[k_start:k_end, :len(f)].T
+        if mode == 'psd':
+            Sxx = (S.real**2 + S.imag**2) * scale
+            if onesided:
+                # double the power of the negative frequencies except DC and f_S/2
+                Sxx[1:self.N_fft - len(f) + 1] *= 2
+        else:
+            Sxx = S * np.sqrt(scale)
+            if onesided:
+                # DC and f_S/2 are real for real signals, remove the sign of the
+                # imaginary zero that would yield an angle of -pi
+                Sxx[0].imag = 0
+                if self.N_fft % 2 == 0:
+                    Sxx[-1].imag = 0
+            if mode == 'magnitude':
+                Sxx = np.abs(Sxx)
+            elif mode in {'angle', 'phase'}:
+                Sxx = np.angle(Sxx)
+                if mode == 'phase':
+                    Sxx = np.unwrap(Sxx, axis=0)
+            elif mode != 'complex':
+                raise ValueError(f'Unknown mode "{mode}"')
+        return f, t, Sxx
+
+
+# ------------------------------------------------------------------------------
+def _fft_poly(c, N_fft: int, N: int) -> np.ndarray:
+    """
+    Return the first `N` points of the `N_fft` point DFT of the polynomial `c`
+    (of each row for a 2D array). Longer polynomials are folded modulo `N_fft`
+    (time domain aliasing), which yields the exact values on the grid of the DFT.
+    """
+    c = np.atleast_1d(np.asarray(c))
+    L = c.shape[-1]
+    if L > N_fft:
+        c = np.pad(c, [(0, 0)] * (c.ndim - 1) + [(0, -L % N_fft)])
+        c = c.reshape(c.shape[:-1] + (-1, N_fft)).sum(axis=-2)
+    if np.iscomplexobj(c):
+        return sfft.fft(c, N_fft)[..., :N]
+    C = sfft.rfft(c, N_fft)
+    N_r = C.shape[-1]
+    if N > N_r:  # complete the spectrum with the conjugate symmetric half
+        C = np.concatenate((C, np.conj(C[..., 1:N_fft - N_r + 1][..., ::-1])), axis=-1)
+    return C[..., :N]
+
+
+def freqz_fft(b, a=1, worN: int = 512, whole: bool = False) -> tuple:
+    r"""
+    Calculate the frequency response `(w, H)` of the transfer function with the
+    coefficients `b` and `a` at `worN` uniformly spaced frequencies
+    `w = 0 ... 2 pi` (`whole = True`) or `w = 0 ... pi` (excluding the upper
+    limit) like `scipy.signal.freqz(b, a, worN, whole)`.
+
+    Numerator and denominator are evaluated with (real) FFTs of the zero-padded
+    or folded coefficients, i.e. with :math:`O(L + N \log N)` operations for
+    filters with `L` coefficients and `N` frequency points instead of
+    :math:`O(L N)` for the evaluation of the polynomials at each frequency. This
+    matters for long FIR filters and for the denominator of IIR filters.
+
+    Zeros of the denominator on the grid yield `inf` or `nan` without a warning.
+    """
+    N = int(worN)
+    N_fft = N if whole else 2 * N
+    w = np.linspace(0, 2 * pi if whole else pi, N, endpoint=False)
+    B = _fft_poly(b, N_fft, N)
+    a = np.atleast_1d(np.asarray(a))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if len(a) == 1:
+            H = B / a[0]
+        else:
+            H = B / _fft_poly(a, N_fft, N)
+    return w, H
+
+
+def sosfreqz_fft(sos, worN: int = 512, whole: bool = False) -> tuple:
+    """
+    Calculate the frequency response `(w, H)` of the second-order sections `sos`
+    at `worN` uniformly spaced frequencies like
+    `scipy.signal.sosfreqz(sos, worN, whole)`. Numerators and denominators of
+    all sections are evaluated with one batch of FFTs, see `freqz_fft()`.
+    """
+    sos = np.atleast_2d(np.asarray(sos))
+    N = int(worN)
+    N_fft = N if whole else 2 * N
+    w = np.linspace(0, 2 * pi if whole else pi, N, endpoint=False)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H = np.prod(_fft_poly(sos[:, :3], N_fft, N) / _fft_poly(sos[:, 3:], N_fft, N),
+                    axis=0)
+    return w, H
+
+
+# ------------------------------------------------------------------------------
+def _czt_poly(c, w_lim, N: int) -> np.ndarray:
+    """
+    Return the values of the polynomial `c` (of each row for a 2D array) at `N`
+    equidistant frequencies `w_lim[0] ... w_lim[1]` (including both limits) on
+    the unit circle, calculated with the chirp-Z transform.
+    """
+    dw = (w_lim[1] - w_lim[0]) / max(N - 1, 1)
+    return sig.czt(np.atleast_1d(np.asarray(c)), N, w=np.exp(-1j * dw),
+                   a=np.exp(1j * w_lim[0]), axis=-1)
+
+
+def freqz_czt(b, a=1, w_lim=(0, pi), N: int = 512) -> tuple:
+    """
+    Calculate the frequency response `(w, H)` of the transfer function with the
+    coefficients `b` and `a` at `N` equidistant frequencies
+    `w = w_lim[0] ... w_lim[1]` (including both limits, in rad / sample) with
+    the chirp-Z transform.
+
+    In contrast to `freqz_fft()`, the frequency resolution only depends on
+    `N` and the width of the range, not on the number of points on the whole
+    unit circle. This allows zooming into narrow bands (e.g. passband ripple or
+    notches) with high resolution at the cost of a few FFTs with a length of
+    `len(b) + N`.
+    """
+    w = np.linspace(w_lim[0], w_lim[1], N)
+    B = _czt_poly(b, w_lim, N)
+    a = np.atleast_1d(np.asarray(a))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if len(a) == 1:
+            H = B / a[0]
+        else:
+            H = B / _czt_poly(a, w_lim, N)
+    return w, H
+
+
+def sosfreqz_czt(sos, w_lim=(0, pi), N: int = 512) -> tuple:
+    """
+    Calculate the frequency response `(w, H)` of the second-order sections `sos`
+    at `N` equidistant frequencies `w = w_lim[0] ... w_lim[1]` with the chirp-Z
+    transform, see `freqz_czt()`.
+    """
+    sos = np.atleast_2d(np.asarray(sos))
+    w = np.linspace(w_lim[0], w_lim[1], N)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H = np.prod(_czt_poly(sos[:, :3], w_lim, N) / _czt_poly(sos[:, 3:], w_lim, N),
+                    axis=0)
+    return w, H
+
+
+# ------------------------------------------------------------------------------
+#: spec keys of the filter dict for band edges, refined by `freqz_adaptive()`
+F_EDGES = ('F_PB', 'F_PB2', 'F_SB', 'F_SB2', 'F_C', 'F_C2')
+
+
+def fil_resp(fil_dict: dict, w) -> np.ndarray:
+    """
+    Return the frequency response of the filter dict `fil_dict` at the
+    frequencies `w` (in rad / sample) with the method selected by `freqz_method()`
+    """
+    method = freqz_method(fil_dict, w)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'sos':
+            return sig.sosfreqz(fil_dict['sos'], worN=w)[1]
+        elif method == 'zpk':
+            z, p, k = fil_dict['zpk']
+            return sig.freqz_zpk(z, p, np.ravel(k)[0], worN=w)[1]
+        else:
+            b, a = fil_dict['ba']
+            return sig.freqz(b, a, worN=w)[1]
+
+
+def freqz_adaptive(fil_dict: dict, w_lim=(0, 2 * pi), N_start: int = 128,
+                   N_max: int = 8192, tol_dB: float = 0.05, tol_phi: float = 0.01,
+                   dB_min: float = -100., r_tol: float = 0.05, N_res: int = 1 << 16,
+                   N_fft: int = 2048) -> tuple:
+    """
+    Calculate the frequency response `(w, H)` of the filter dict `fil_dict` on an
+    adaptive, non-uniform frequency grid `w_lim[0] ... w_lim[1]` (in rad / sample).
+    For the whole unit circle (`w_lim[1] - w_lim[0] >= 2 pi`), the upper limit is
+    excluded like for `freqz(..., whole=True)`.
+
+    The grid starts with `N_start` uniformly spaced points, the band edges
+    `F_EDGES` of the specifications and the angles of poles and zeros with a
+    distance of less than `r_tol` from the unit circle, surrounded by points at
+    the distance from the unit circle. The grid is refined by bisection
+    until the response at the center of each interval deviates by less than
+    `tol_dB` in magnitude (in dB, clipped at `dB_min`) and by less than `tol_phi`
+    in phase (in rad, only above `dB_min`) from the linear interpolation between
+    its end points, until the intervals are shorter than `(w_lim[1] - w_lim[0])
+    / N_res` or when `N_max` points have been reached (intervals with the
+    largest errors are split first). Only intervals that have been split are
+    tested again.
+
+    Most of the points are placed at band edges, passband ripple and notches,
+    flat bands are represented by the few points of the initial grid.
+
+    FIR filters (method 'fft' of `freqz_method()`) are evaluated on a uniform grid
+    instead with `N_fft` points or with four points per coefficient (rounded up to
+    a power of two) for longer filters, calculated with `freqz_fft()` or with
+    `freqz_czt()` for a part of the unit circle. Refining doesn't pay off for
+    them, the zeros on the unit circle in the stopband would need more evaluations
+    than the FFT grid.
+
+    Returns
+    -------
+    w : ndarray
+        Frequency points in ascending order
+
+    H : ndarray
+        Complex frequency response at `w`
+    """
+    w_0, w_1 = float(w_lim[0]), float(w_lim[1])
+    whole = w_1 - w_0 >= 2 * pi
+    b, a = fil_dict['ba']
+    if freqz_method(fil_dict) == 'fft' and not np.any(np.atleast_1d(a)[1:]):  # FIR
+        N = max(N_fft, 1 << int(np.ceil(np.log2(4 * len(np.atleast_1d(b))))))
+        if whole and w_0 == 0:
+            return freqz_fft(b, a, worN=N, whole=True)
+        elif whole:
+            w, H = freqz_czt(b, a, (w_0, w_1), N + 1)
+            return w[:-1], H[:-1]
+        else:
+            return freqz_czt(b, a, (w_0, w_1), N)
+    dw_min = (w_1 - w_0) / N_res  # min. distance of grid points
+    # --- initial grid: uniform grid, band edges and singularities ---
+    w = [np.linspace(w_0, w_1, N_start + 1)]
+    edges = [2 * pi * fil_dict[k] for k in F_EDGES if k in fil_dict]
+    try:
+        z, p, _ = fil_dict['zpk']
+        for r in np.concatenate((np.ravel(z), np.ravel(p))):
+            d = abs(1 - abs(r))
+            if r != 0 and d < r_tol:
+                d = max(d, dw_min)
+                edges += list(np.angle(r) + np.array([-3, -1, 0, 1, 3]) * d)
+    except (KeyError, TypeError, ValueError):
+        pass
+    for e in edges:  # edges and their mirrored images in the range
+        w.append(np.array([e, -e]) + 2 * pi * np.arange(-1, 2)[:, None])
+    w = np.unique(np.concatenate([np.ravel(x) for x in w]))
+    w = w[(w >= w_0) & (w <= w_1)]
+    H = fil_resp(fil_dict, w)
+
+    def dB(H):
+        return 20 * np.log10(np.maximum(np.abs(H), 10**(dB_min / 20)))
+
+    # --- refinement by bisection ---
+    active = np.ones(len(w) - 1, dtype=bool)  # intervals to be tested
+    while True:
+        idx = np.nonzero(active & (np.diff(w) > dw_min))[0]
+        if len(idx) == 0 or len(w) >= N_max:
+            break
+        w_m = (w[idx] + w[idx + 1]) / 2
+        H_m = fil_resp(fil_dict, w_m)
+        H_l, H_r = H[idx], H[idx + 1]
+        err_dB = np.abs(dB(H_m) - (dB(H_l) + dB(H_r)) / 2)
+        valid = np.minimum(np.minimum(dB(H_l), dB(H_r)), dB(H_m)) > dB_min
+        with np.errstate(divide='ignore', invalid='ignore'):
+            err_phi = np.abs(np.angle(H_m / H_l * np.exp(-0.5j * np.angle(H_r / H_l))))
+        # error relative to the tolerance, refine the worst intervals first
+        score = np.nan_to_num(np.maximum(err_dB / tol_dB,
+                                         np.where(valid, err_phi / tol_phi, 0)))
+        refine = score > 1
+        N_free = N_max - len(w)
+        if np.sum(refine) > N_free:
+            refine &= score >= np.sort(score[refine])[-N_free]
+            refine[np.cumsum(refine) > N_free] = False
+        # insert the centers of the intervals to be refined
+        w_new = np.concatenate((w, w_m[refine]))
+        new = np.concatenate((np.zeros(len(w), dtype=bool), np.ones(np.sum(refine), dtype=bool)))
+        order = np.argsort(w_new, kind='stable')
+        w = w_new[order]
+        H = np.concatenate((H, H_m[refine]))[order]
+        new = new[order]
+        active = new[:-1] | new[1:]  # both halves of split intervals are tested
+    if whole:
+        H = H[w < w_1]
+        w = w[w < w_1]
+    return w, H
+
+
+# ------------------------------------------------------------------------------
+def freq_range(W, range_type: str = 'whole') -> tuple:
+    """
+    Select the frequency points `W` (sorted, in the range `0 ... 2 pi`) for the
+    display range `range_type` (`fb.fil[0]['freqSpecsRangeType']`):
+
+    - 'whole': all points `0 ... 2 pi`
+    - 'sym': points `-pi ... pi`, points `>= pi` are shifted by `-2 pi` and moved
+      to the front (same as `np.fft.fftshift()` for uniform grids)
+    - 'half': points `0 ... pi` (excluding `pi`)
+
+    Returns
+    -------
+    W : ndarray
+        Selected (and shifted) frequency points
+
+    idx : ndarray of int
+        Indices of the selected points in the original array, use e.g.
+        `H[idx]` for selecting the corresponding values of the frequency response
+    """
+    W = np.asarray(W)
+    if range_type == 'sym':
+        idx = np.concatenate((np.nonzero(W >= pi)[0], np.nonzero(W < pi)[0]))
+        return np.where(W >= pi, W - 2 * pi, W)[idx], idx
+    elif range_type == 'half':
+        idx = np.nonzero(W < pi)[0]
+    else:
+        idx = np.arange(len(W))
+    return W[idx], idx
+
+
+# ------------------------------------------------------------------------------
+#: max. number of elements of the temporary distance matrix in `zpk_mag_dB()`
+N_CHUNK_SURF = 1 << 16
+
+
+def zpk_mag_dB(z, p, k, zz, N_chunk: int = N_CHUNK_SURF) -> np.ndarray:
+    """
+    Return the magnitude `20 log10 |H(zz)|` in dB of the transfer function with
+    the zeros `z`, poles `p` and gain `k` at the complex points `zz` (any shape).
+
+    The magnitude is calculated as the sum of the log. distances of `zz` to the
+    zeros minus the sum of the log. distances to the poles. In contrast to the
+    evaluation of the numerator and denominator polynomials, this neither
+    overflows nor loses precision for high filter orders. Multiple roots (e.g. the
+    poles of FIR filters at the origin) are evaluated once and weighted with
+    their multiplicity, cancelling zeros and poles are removed. The points are
+    processed in chunks, limiting the temporary distance matrix to `N_chunk`
+    elements.
+
+    Returns `-inf` at the zeros and `inf` at the poles.
+    """
+    zz = np.asarray(zz, dtype=complex)
+    z = np.ravel(np.asarray(z, dtype=complex))
+    p = np.ravel(np.asarray(p, dtype=complex))
+    # unique roots with multiplicity, counted positive for zeros, negative for poles
+    r, idx = np.unique(np.concatenate((z, p)), return_inverse=True)
+    m = np.bincount(np.ravel(idx), weights=np.r_[np.ones(len(z)), -np.ones(len(p))],
+                    minlength=len(r))
+    r, m = r[m != 0], m[m != 0]
+
+    zz_f = zz.ravel()
+    H_dB = np.empty(len(zz_f))
+    N_chunk = max(N_chunk // max(len(r), 1), 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for n in range(0, len(zz_f), N_chunk):
+            d = zz_f[n:n + N_chunk, None] - r
+            H_dB[n:n + N_chunk] = np.log10(d.real**2 + d.imag**2) @ m
+        H_dB = 10 * H_dB + 20 * np.log10(np.abs(np.ravel(k)[0]))
+    return H_dB.reshape(zz.shape)
+
+
+def mag_clip(H_dB, H_max: float, H_min: float = None, log: bool = False) -> np.ndarray:
+    """
+    Return the magnitude `H_dB` (in dB, e.g. from `zpk_mag_dB()`) in dB
+    (`log = True`) or linear, clipped at `H_min` and `H_max` (in dB or linear) like
+    `pyfda_lib.H_mag()`. Undefined values (coinciding zeros and poles) are
+    replaced by `H_min`.
+    """
+    if log:
+        H = H_dB
+    else:
+        with np.errstate(over='ignore'):
+            H = 10**(np.asarray(H_dB) / 20)
+    H = np.clip(H, H_min, H_max)
+    if H_min is not None:
+        H = np.where(np.isnan(H), H_min, H)
+    return H
+
+
+def surface_grid(u, v, polar: bool = False) -> np.ndarray:
+    """
+    Return the complex grid `u + j v` for the real and imaginary axis `u` and `v`
+    or the polar grid `u exp(j v)` for the radius `u` and the angle `v` (`polar=True`),
+    the rows correspond to `v`, the columns to `u` (like `np.meshgrid(u, v)`).
+    """
+    uu, vv = np.meshgrid(u, v)
+    if polar:
+        return uu * np.exp(1j * vv)
+    else:
+        return uu + 1j * vv
+
+
+# ------------------------------------------------------------------------------
+def decimate_axis(a, N: int) -> np.ndarray:
+    """
+    Return every `N`-th element of the grid axis `a`, including the last one, e.g.
+    for a coarse preview of a surface on the same range as on the full grid
+    """
+    a = np.asarray(a)
+    return a[np.unique(np.r_[0:len(a):N, len(a) - 1])]
+
+
+# ------------------------------------------------------------------------------
+class Freqz_Cache(object):
+    """
+    Cache for frequency responses, shared by all widgets via the module instance
+    `freqz_cache`: The response of a design is calculated only once, no matter
+    how many widgets request it after a `data_changed` signal.
+
+    `fil_freqz()` calculates the response of a filter dict with the method that
+    fits the design best (see `freqz_method()`), `freqz()`, `sosfreqz()` and
+    `zpkfreqz()` calculate it from the coefficients `ba`, `sos` or `zpk`.
+    `fil_czt()` calculates the response in a frequency range, e.g. for zoomed plots,
+    `fil_adaptive()` on an adaptive grid. `fil_surface()` calculates the magnitude
+    `|H(z)|` on a grid in the z-plane for 3D and contour plots.
+
+    Responses are keyed by a hash of the content of the coefficients (`b`, `a`,
+    `sos` or `z`, `p`, `k`), the frequency points `worN` and the `whole` flag. For an integer
+    `worN`, the frequency vector is scaled to the sampling frequency `fs` of
+    each request, i.e. requests with different `fs` share the same entry. A
+    changed design yields a new key, the least recently used responses are
+    dropped when more than `N_MAX` responses are stored.
+
+    Returned arrays are read-only as they are shared between all callers,
+    copy them before modifying them in place.
+
+    Attributes
+    ----------
+    hits : int
+        Number of requests served from the cache
+
+    misses : int
+        Number of requests that needed a new calculation
+
+    method : str or None
+        Method used by the last request of `fil_freqz()`: 'fft', 'ba', 'sos' or
+        'zpk', see `freqz_method()`
+    """
+    #: max. number of cached responses
+    N_MAX = 8
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Remove all responses and reset the hit and miss counters
+        """
+        self.cache = {}  # dicts keep the insertion order, used for LRU eviction
+        self.hits = 0
+        self.misses = 0
+        self.method = None
+
+    @staticmethod
+    def _key(*args) -> str:
+        """
+        Return a hash of the content of the arrays and parameters in `args`
+        """
+        h = hashlib.sha1()
+        for arg in args:
+            arr = np.asarray(arg)
+            # same key for coefficients given as e.g. int list or float array
+            if arr.dtype.kind in 'biu':
+                arr = arr.astype(float)
+            elif arr.dtype == object:
+                arr = arr.astype(complex)
+            h.update(f"{arr.dtype.str}{arr.shape}".encode())
+            h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
+
+    def _lookup(self, key: str, calc, worN, fs: float) -> tuple:
+        """
+        Return the response with `key`, calculate it with `calc()` for `fs = 2 pi`
+        when it is not in the cache yet. Scale the frequency vector for an
+        integer `worN`.
+        """
+        if key in self.cache:
+            self.hits += 1
+            w, H = self.cache.pop(key)  # re-insert as most recently used entry
+        else:
+            self.misses += 1
+            w, H = calc()
+            w.flags.writeable = False
+            H.flags.writeable = False
+            if len(self.cache) >= self.N_MAX:
+                del self.cache[next(iter(self.cache))]
+        self.cache[key] = (w, H)
+        if np.ndim(worN) == 0 and fs != 2 * pi:
+            w = w * (fs / (2 * pi))
+            w.flags.writeable = False
+        return w, H
+
+    def freqz(self, b, a=1, worN=512, whole: bool = False, fs: float = 2 * pi
+              ) -> tuple:
+        """
+        Return the frequency response `(w, H)` of the transfer function with the
+        coefficients `b` and `a` like `scipy.signal.freqz(b, a, worN, whole, fs=fs)`.
+        For an integer `worN`, the response is calculated with `freqz_fft()`.
+        """
+        if np.ndim(worN) == 0:  # number of frequency points
+            key = self._key('ba', b, a, int(worN), whole)
+            return self._lookup(
+                key, lambda: freqz_fft(b, a, worN=int(worN), whole=whole), worN, fs)
+        else:  # frequency points, their unit depends on fs
+            key = self._key('ba', b, a, worN, fs)
+            return self._lookup(
+                key, lambda: sig.freqz(b, a, worN=worN, fs=fs), worN, fs)
+
+    def sosfreqz(self, sos, worN=512, whole: bool = False, fs: float = 2 * pi
+                 ) -> tuple:
+        """
+        Return the frequency response `(w, H)` of the second-order sections `sos`
+        like `scipy.signal.sosfreqz(sos, worN, whole, fs=fs)`. For an integer
+        `worN`, the response is calculated with `sosfreqz_fft()`.
+        """
+        if np.ndim(worN) == 0:
+            key = self._key('sos', sos, int(worN), whole)
+            return self._lookup(
+                key, lambda: sosfreqz_fft(sos, worN=int(worN), whole=whole), worN, fs)
+        else:
+            key = self._key('sos', sos, worN, fs)
+            return self._lookup(
+                key, lambda: sig.sosfreqz(sos, worN=worN, fs=fs), worN, fs)
+
+    def zpkfreqz(self, z, p, k, worN=512, whole: bool = False, fs: float = 2 * pi
+                 ) -> tuple:
+        """
+        Return the frequency response `(w, H)` of the zeros `z`, poles `p` and
+        gain `k` like `scipy.signal.freqz_zpk(z, p, k, worN, whole, fs=fs)`
+        """
+        if np.ndim(worN) == 0:
+            key = self._key('zpk', z, p, k, int(worN), whole)
+            return self._lookup(
+                key, lambda: sig.freqz_zpk(z, p, k, worN=int(worN), whole=whole),
+                worN, fs)
+        else:
+            key = self._key('zpk', z, p, k, worN, fs)
+            return self._lookup(
+                key, lambda: sig.freqz_zpk(z, p, k, worN=worN, fs=fs), worN, fs)
+
+    def fil_freqz(self, fil_dict: dict = None, worN=512, whole: bool = False,
+                  fs: float = 2 * pi) -> tuple:
+        """
+        Return the frequency response `(w, H)` of the filter dict `fil_dict`
+        (default: `fb.fil[0]`) with the method selected by `freqz_method()`,
+        the method is stored in the attribute `method`.
+
+        Parameters and return values are the same as for `scipy.signal.freqz()`.
+        """
+        if fil_dict is None:
+            fil_dict = fb.fil[0]
+        method = freqz_method(fil_dict, worN)
+        if method != self.method:
+            logger.debug(f"Calculating frequency response with method '{method}'.")
+        self.method = method
+        if method == 'sos':
+            return self.sosfreqz(fil_dict['sos'], worN, whole, fs)
+        elif method == 'zpk':
+            z, p, k = fil_dict['zpk']
+            return self.zpkfreqz(z, p, np.ravel(k)[0], worN, whole, fs)
+        else:  # 'fft' or 'ba', selected by freqz() via worN
+            b, a = fil_dict['ba']
+            return self.freqz(b, a, worN, whole, fs)
+
+    def fil_adaptive(self, fil_dict: dict = None, w_lim=(0, 2 * pi),
+                     fs: float = 2 * pi, **kwargs) -> tuple:
+        """
+        Return the frequency response `(w, H)` of the filter dict `fil_dict`
+        (default: `fb.fil[0]`) on the adaptive frequency grid `w_lim[0] ...
+        w_lim[1]` (in rad / sample) calculated by `freqz_adaptive(fil_dict, w_lim,
+        **kwargs)`. The frequency vector is scaled to the sampling frequency `fs`.
+
+        Unless given in `kwargs`, the number of points is limited to
+        `N_max = 4 * params['N_FFT']` and FIR filters are evaluated on a uniform grid
+        with at least `N_fft = params['N_FFT']` points.
+        """
+        from pyfda.pyfda_rc import params  # circular import at module level
+        if fil_dict is None:
+            fil_dict = fb.fil[0]
+        kwargs.setdefault('N_max', 4 * params['N_FFT'])
+        kwargs.setdefault('N_fft', params['N_FFT'])
+        self.method = method = freqz_method(fil_dict, w_lim)
+        if method == 'sos':
+            coeffs = [fil_dict['sos']]
+        elif method == 'zpk':
+            coeffs = list(fil_dict['zpk'])
+        else:
+            coeffs = list(fil_dict['ba'])
+        edges = [fil_dict[k] for k in F_EDGES if k in fil_dict]
+        key = self._key('adaptive', method, *coeffs, edges, w_lim, sorted(kwargs.items()))
+        w, H = self._lookup(key, lambda: freqz_adaptive(fil_dict, w_lim, **kwargs),
+                            w_lim, fs)
+        if fs != 2 * pi:
+            w = w * (fs / (2 * pi))
+        return w, H
+
+    def fil_czt(self, fil_dict: dict = None, f_lim=(0, 0.5), N: int = 512,
+                fs: float = 1.) -> tuple:
+        """
+        Return the frequency response `(f, H)` of the filter dict `fil_dict`
+        (default: `fb.fil[0]`) at `N` equidistant frequencies
+        `f = f_lim[0] ... f_lim[1]` (including both limits) for the sampling
+        frequency `fs`, e.g. for the visible range of a zoomed plot.
+
+        The method is selected by `freqz_method()` for a frequency vector
+        ('sos', 'zpk' or 'ba') and stored in the attribute `method`. Polynomials
+        and second-order sections are evaluated with the chirp-Z transform
+        (`freqz_czt()`, `sosfreqz_czt()`), zeros and poles with
+        `scipy.signal.freqz_zpk()`.
+        """
+        if fil_dict is None:
+            fil_dict = fb.fil[0]
+        w_lim = 2 * pi * np.asarray(f_lim, dtype=float) / fs
+        self.method = method = freqz_method(fil_dict, w_lim)
+        if method == 'sos':
+            sos = fil_dict['sos']
+            key = self._key('czt', sos, w_lim, N)
+            w, H = self._lookup(key, lambda: sosfreqz_czt(sos, w_lim, N), w_lim, fs)
+        elif method == 'zpk':
+            z, p, k = fil_dict['zpk']
+            k = np.ravel(k)[0]
+            key = self._key('czt', z, p, k, w_lim, N)
+            w, H = self._lookup(
+                key, lambda: sig.freqz_zpk(z, p, k, worN=np.linspace(*w_lim, N)),
+                w_lim, fs)
+        else:
+            b, a = fil_dict['ba']
+            key = self._key('czt', b, a, w_lim, N)
+            w, H = self._lookup(key, lambda: freqz_czt(b, a, w_lim, N), w_lim, fs)
+        return w * (fs / (2 * pi)), H
+
+    def _surface_key(self, fil_dict: dict, u, v, polar: bool) -> str:
+        """
+        Return the key of the surface of `fil_dict` on the grid `(u, v, polar)`
+        """
+        z, p, k = fil_dict['zpk']
+        return self._key('surface', z, p, np.ravel(k)[0], u, v, polar)
+
+    def fil_surface(self, u, v, polar: bool = False, fil_dict: dict = None) -> tuple:
+        """
+        Return the complex grid `zz = surface_grid(u, v, polar)` and the magnitude
+        `20 log10 |H(zz)|` in dB of the zeros and poles of the filter dict `fil_dict`
+        (default: `fb.fil[0]`) on it, calculated by `zpk_mag_dB()`, e.g. for 3D
+        or contour plots of `|H(z)|`. Convert the result to the display scale
+        with `mag_clip()`.
+
+        Surfaces are keyed by the zeros, poles and gain and by the grid
+        parameters, redraws with e.g. changed colormap or clipping limits reuse
+        them.
+        """
+        if fil_dict is None:
+            fil_dict = fb.fil[0]
+        z, p, k = fil_dict['zpk']
+
+        def calc():
+            zz = surface_grid(u, v, polar)
+            return zz, zpk_mag_dB(z, p, k, zz)
+
+        return self._lookup(self._surface_key(fil_dict, u, v, polar), calc, None, 2 * pi)
+
+    def surface_cached(self, u, v, polar: bool = False, fil_dict: dict = None) -> bool:
+        """
+        Return True when the surface of `fil_dict` (default: `fb.fil[0]`) on the
+        grid `(u, v, polar)` is in the cache, see `fil_surface()`
+        """
+        if fil_dict is None:
+            fil_dict = fb.fil[0]
+        return self._surface_key(fil_dict, u, v, polar) in self.cache
+
+
+# ------------------------------------------------------------------------------
+def freqz_method(fil_dict: dict, worN=512) -> str:
+    """
+    Return the method for calculating the frequency response of the filter dict
+    `fil_dict` at the frequencies `worN` (number of points or frequency vector):
+
+    - 'fft': FIR filters and IIR filters without second-order sections that
+      have not been designed in zpk format, evaluated on a uniform grid (integer
+      `worN`) with `freqz_fft()`
+    - 'sos': IIR filters with second-order sections `fil_dict['sos']`, the
+      cascade is evaluated with `sosfreqz_fft()` or `scipy.signal.sosfreqz()`,
+      avoiding the numerical problems of the transfer function of high order
+      filters
+    - 'zpk': IIR filters without second-order sections (e.g. with complex
+      coefficients) designed in zpk format (`fil_dict['creator']`), the products
+      of zeros and poles are evaluated with `scipy.signal.freqz_zpk()`
+    - 'ba': same as 'fft' for non-uniform frequency vectors, the polynomials
+      are evaluated with `scipy.signal.freqz()`
+    """
+    a = np.atleast_1d(np.asarray(fil_dict['ba'][1]))
+    if np.any(a[1:]):  # IIR filter
+        if len(fil_dict.get('sos', [])) > 0:
+            return 'sos'
+        if fil_dict.get('creator', ('ba',))[0] == 'zpk':
+            return 'zpk'
+    return 'fft' if np.ndim(worN) == 0 else 'ba'
+
+
+#: frequency response cache shared by all widgets
+freqz_cache = Freqz_Cache()
@@ -10,15 +10,17 @@ r"""
 Widget for plotting \|H(z)\| in 3D
 """
 from pyfda.libs.compat import (
-    QWidget, QComboBox, QLabel, QLineEdit, QDial, QGridLayout, QFrame, pyqtSignal)
+    QWidget, QComboBox, QLabel, QLineEdit, QDial, QGridLayout, QFrame, pyqtSignal,
+    QtCore)
 
 import numpy as np
-from numpy import pi, ones, sin, cos, log10
-import scipy.signal as sig
+from numpy import pi, ones, log10
 
 import pyfda.filterbroker as fb
 from pyfda.pyfda_rc import params
-from pyfda.libs.pyfda_lib import H_mag, mod_version, safe_eval, to_html
+from pyfda.libs.pyfda_lib import mod_version, safe_eval, to_html
+from pyfda.libs.pyfda_sig_lib import (
+    freqz_cache, zpk_mag_dB, mag_clip, surface_grid, decimate_axis)
 from pyfda.libs.pyfda_qt_lib import qget_cmb_box, PushButton
 from pyfda.plot_widgets.mpl_widget import MplWidget
 
@@ -58,6 +60,11 @@ class Plot_3D(QWidget):
     sig_rx = pyqtSignal(object)
 #    sig_tx = pyqtSignal(object) # outgoing from process_signals
 
+    #: decimation factor of the grid for the coarse preview of |H(z)|
+    N_COARSE = 4
+    #: delay in ms before the coarse preview is refined
+    T_REFINE = 50
+
     def __init__(self):
         super().__init__()
         self.zmin = 0
@@ -213,6 +220,11 @@ class Plot_3D(QWidget):
         self.mplwidget.mplToolbar.a_ui_num_levels = 2
         self.setLayout(self.mplwidget.layVMainMpl)
 
+        # one-shot timer for drawing |H(z)| on the fine grid after the coarse preview
+        self.timer_refine = QtCore.QTimer()
+        self.timer_refine.setSingleShot(True)
+        self.timer_refine.timeout.connect(self._refine)
+
         self._init_grid()  # initialize grid and do initial plot
 
         # ----------------------------------------------------------------------
@@ -258,7 +270,10 @@ class Plot_3D(QWidget):
 
 # ------------------------------------------------------------------------------
     def _init_grid(self):
-        """ Initialize (x,y,z) coordinate grid + (re)draw plot."""
+        """
+        Initialize the parameters `(u, v, polar)` of the coordinate grid (see
+        `pyfda_sig_lib.surface_grid()`) + (re)draw plot.
+        """
         phi_UC = np.linspace(0, 2*pi, 400, endpoint=True)  # angles for unit circle
         self.xy_UC = np.exp(1j * phi_UC)  # x,y coordinates of unity circle
 
@@ -279,18 +294,30 @@ class Plot_3D(QWidget):
         dy = (self.ymax - self.ymin) / steps  # grid size cartesian range
 
         if self.but_plot_in_UC.isChecked():  # Plot circular range in 3D-Plot
-            [r, phi] = np.meshgrid(np.arange(rmin, rmax, dr),
-                                   np.linspace(0, 2 * pi, steps, endpoint=True))
-            self.x = r * cos(phi)
-            self.y = r * sin(phi)
+            self.grid = (np.arange(rmin, rmax, dr),
+                         np.linspace(0, 2 * pi, steps, endpoint=True), True)
         else:  # cartesian grid
-            [self.x, self.y] = np.meshgrid(np.arange(self.xmin, self.xmax, dx),
-                                           np.arange(self.ymin, self.ymax, dy))
-
-        self.z = self.x + 1j*self.y  # create coordinate grid for complex plane
+            self.grid = (np.arange(self.xmin, self.xmax, dx),
+                         np.arange(self.ymin, self.ymax, dy), False)
 
         self.draw()  # initial plot
 
+# ------------------------------------------------------------------------------
+    @staticmethod
+    def _stems(c, z_0, z_1):
+        """
+        Return the x, y and z coordinates of vertical lines from `z_0` to `z_1`
+        (scalars or arrays) at the complex positions `c`, separated by nans. This
+        plots all lines with one call, which is much faster for high order filters.
+        """
+        c = np.asarray(c, dtype=complex)
+        n = len(c)
+        x = np.column_stack((c.real, c.real, np.full(n, np.nan))).ravel()
+        y = np.column_stack((c.imag, c.imag, np.full(n, np.nan))).ravel()
+        z = np.column_stack((np.broadcast_to(z_0, n), np.broadcast_to(z_1, n),
+                             np.full(n, np.nan))).ravel()
+        return x, y, z
+
 # ------------------------------------------------------------------------------
     def init_axes(self):
         """
@@ -387,18 +414,32 @@ class Plot_3D(QWidget):
         """
         Main drawing entry point: perform the actual plot
         """
+        self.timer_refine.stop()
         self.draw_3d()
 
 # ------------------------------------------------------------------------------
-    def draw_3d(self):
+    def _refine(self):
+        """
+        Draw |H(z)| on the fine grid after the coarse preview
+        """
+        if self.isVisible():
+            self.draw_3d(coarse=False)
+        else:
+            self.data_changed = True
+
+# ------------------------------------------------------------------------------
+    def draw_3d(self, coarse: bool = True):
         """
         Draw various 3D plots
+
+        |H(z)| is only calculated when it is displayed (mesh, surf or contour plots).
+        When it is not in the cache yet and `coarse == True`, it is calculated
+        on a grid decimated by `N_COARSE` first (without storing it in the cache)
+        and refined after `T_REFINE` ms, keeping the UI responsive for high order
+        filters.
         """
         self.init_axes()
 
-        bb = fb.fil[0]['ba'][0]
-        aa = fb.fil[0]['ba'][1]
-
         zz = np.array(fb.fil[0]['zpk'][0])
         pp = np.array(fb.fil[0]['zpk'][1])
 
@@ -432,7 +473,7 @@ class Plot_3D(QWidget):
         # -----------------------------------------------------------------------------
 
 
-        [w, H] = sig.freqz(bb, aa, worN=N_FFT, whole=True)
+        [w, H] = freqz_cache.fil_freqz(fb.fil[0], worN=N_FFT, whole=True)
         H = np.nan_to_num(H)  # replace nans and inf by finite numbers
 
         H_abs = abs(H)
@@ -481,10 +522,24 @@ class Plot_3D(QWidget):
                 plevel_top = plevel_rel * top
                 plevel_btm = top
 
-        # calculate H(jw)| along the unity circle and |H(z)|, each clipped
-        # between bottom and top
-        H_UC = H_mag(bb, aa, self.xy_UC, top, H_min=bottom, log=self.but_log.isChecked())
-        Hmag = H_mag(bb, aa, self.z, top, H_min=bottom, log=self.but_log.isChecked())
+        # calculate H(jw)| along the unity circle and |H(z)| from zeros and poles,
+        # each clipped between bottom and top
+        z, p, k = fb.fil[0]['zpk']
+        log = self.but_log.isChecked()
+        H_UC = mag_clip(zpk_mag_dB(z, p, k, self.xy_UC), top, H_min=bottom, log=log)
+
+        if self.cmbMode3D.currentText() != 'None' or self.but_contour_2d.isChecked():
+            if coarse and not freqz_cache.surface_cached(*self.grid):
+                # preview on the coarse grid, not stored in the cache
+                u, v, polar = self.grid
+                z_grid = surface_grid(decimate_axis(u, self.N_COARSE),
+                                      decimate_axis(v, self.N_COARSE), polar)
+                H_dB = zpk_mag_dB(z, p, k, z_grid)
+                self.timer_refine.start(self.T_REFINE)
+            else:
+                z_grid, H_dB = freqz_cache.fil_surface(*self.grid)
+            x, y = z_grid.real, z_grid.imag
+            Hmag = mag_clip(H_dB, top, H_min=bottom, log=log)
 
         # ===============================================================
         # Plot Unit Circle (UC)
@@ -504,12 +559,8 @@ class Plot_3D(QWidget):
             self.ax3d.plot(self.xy_UC.real, self.xy_UC.imag, H_UC, 'w--', lw=4)
 
             if stride < 10:  # plot thin vertical line every stride points on the UC
-                for k in range(len(self.xy_UC[::stride])):
-                    self.ax3d.plot(
-                        [self.xy_UC.real[::stride][k], self.xy_UC.real[::stride][k]],
-                        [self.xy_UC.imag[::stride][k], self.xy_UC.imag[::stride][k]],
-                        [np.ones(len(self.xy_UC[::stride]))[k]*bottom, H_UC[::stride][k]],
-                        linewidth=1, color=(0.5, 0.5, 0.5))
+                self.ax3d.plot(*self._stems(self.xy_UC[::stride], bottom, H_UC[::stride]),
+                               linewidth=1, color=(0.5, 0.5, 0.5))
 
         # ===============================================================
         # Plot Poles and Zeros
@@ -522,24 +573,20 @@ class Plot_3D(QWidget):
             self.ax3d.plot(zz.real, zz.imag, ones(len(zz)) * zlevel, 'o',
                markersize=PN_SIZE, markeredgecolor='blue', markeredgewidth=2.0,
                 markerfacecolor='none')
-            for k in range(len(zz)):  # plot zero "stems"
-                self.ax3d.plot([zz[k].real, zz[k].real], [zz[k].imag, zz[k].imag],
-                            [bottom, zlevel], linewidth=1, color='b')
+            # plot zero "stems"
+            self.ax3d.plot(*self._stems(zz, bottom, zlevel), linewidth=1, color='b')
 
             # Plot the poles at |H(z_p)| = plevel with "stems":
             self.ax3d.plot(np.real(pp), np.imag(pp), plevel_top,
               'x', markersize=PN_SIZE, markeredgewidth=2.0, markeredgecolor='red')
-            for k in range(len(pp)):  # plot pole "stems"
-                self.ax3d.plot([pp[k].real, pp[k].real], [pp[k].imag, pp[k].imag],
-                            [plevel_btm, plevel_top], linewidth=1, color='r')
+            # plot pole "stems"
+            self.ax3d.plot(*self._stems(pp, plevel_btm, plevel_top), linewidth=1,
+                           color='r')
 
         # ===============================================================
         # 3D-Plots of |H(z)| clipped between |H(z)| = top
         # ===============================================================
 
-        m_cb = ScalarMappable(cmap=cmap)  # normalized proxy object that is mappable
-        m_cb.set_array(Hmag)              # for colorbar
-
         # ---------------------------------------------------------------
         # 3D-mesh plot
         # ---------------------------------------------------------------
@@ -547,7 +594,7 @@ class Plot_3D(QWidget):
             # fig_mlab = mlab.figure(fgcolor=(0., 0., 0.), bgcolor=(1, 1, 1))
             # self.ax3d.set_zlim(0,2)
             self.ax3d.plot_wireframe(
-                self.x, self.y, Hmag, rstride=5, cstride=stride,
+                x, y, Hmag, rstride=5, cstride=stride,
                 linewidth=1, color='gray')
 
         # ---------------------------------------------------------------
@@ -558,7 +605,7 @@ class Plot_3D(QWidget):
             if MLAB:
                 # Mayavi
                 surf = mlab.surf(
-                    self.x, self.y, H_mag, colormap='RdYlBu', warp_scale='auto')
+                    x, y, Hmag, colormap='RdYlBu', warp_scale='auto')
                 # Change the visualization parameters.
                 surf.actor.property.interpolation = 'phong'
                 surf.actor.property.specular = 0.1
@@ -580,14 +627,14 @@ class Plot_3D(QWidget):
     #                    linewidth=0, antialiased=False, shade=True, facecolors = rgb)
     #            s.set_edgecolor('gray')
                 s = self.ax3d.plot_surface(
-                    self.x, self.y, Hmag, alpha=alpha, rstride=1, cstride=1, linewidth=0,
+                    x, y, Hmag, alpha=alpha, rstride=1, cstride=1, linewidth=0,
                     antialiased=False, facecolors=rgb, cmap=cmap_surf, shade=True)
                 s.set_edgecolor(None)
         # ---------------------------------------------------------------
         # 3D-Contour plot
         # ---------------------------------------------------------------
         elif self.cmbMode3D.currentText() == 'Contour':
-            s = self.ax3d.contourf3D(self.x, self.y, Hmag, NL, alpha=alpha, cmap=cmap)
+            s = self.ax3d.contourf3D(x, y, Hmag, NL, alpha=alpha, cmap=cmap)
 
         # ---------------------------------------------------------------
         # 2D-Contour plot
@@ -603,13 +650,15 @@ class Plot_3D(QWidget):
 #            self.ax3d.contourf(x, y, Hmag, 20, zdir='y', offset=ymax,
 #                         cmap=cmap, alpha = alpha)#, vmin = bottom)#, vmax = top, vmin = bottom)
             s = self.ax3d.contourf(
-                self.x, self.y, Hmag, NL, zdir='z', offset=bottom - (top - bottom) * 0.05,
+                x, y, Hmag, NL, zdir='z', offset=bottom - (top - bottom) * 0.05,
                 cmap=cmap, alpha=alpha)
 
         # plot colorbar for suitable plot modes
         if self.but_colbar.isChecked() and (self.but_contour_2d.isChecked() or
                                             str(self.cmbMode3D.currentText())
                                             in {'Contour', 'Surf'}):
+            m_cb = ScalarMappable(cmap=cmap)  # normalized proxy object that is mappable
+            m_cb.set_array(Hmag)              # for colorbar
             self.colb = self.mplwidget.fig.colorbar(m_cb, ax=self.ax3d, shrink=0.8, 
                                                     aspect=20, pad=0.02, fraction=0.08)
 
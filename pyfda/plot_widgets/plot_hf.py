@@ -15,7 +15,6 @@ can be overlayed.
 from pyfda.libs.compat import (QCheckBox, QWidget, QComboBox, QLabel, QLineEdit,
                                QFrame, QHBoxLayout, QGridLayout, pyqtSlot, pyqtSignal)
 import numpy as np
-import scipy.signal as sig
 from matplotlib.patches import Rectangle
 from matplotlib import rcParams
 import matplotlib.ticker as ticker
@@ -26,6 +25,7 @@ from pyfda.filterbroker import get_fil_dict
 from pyfda.pyfda_rc import params
 from pyfda.plot_widgets.mpl_widget import MplWidget
 from pyfda.libs.pyfda_lib import pprint_log, safe_eval, to_html
+from pyfda.libs.pyfda_sig_lib import freqz_cache, freq_range
 from pyfda.libs.pyfda_qt_lib import PushButton, qtext_width, qcmb_box_populate
 
 import logging
@@ -40,6 +40,9 @@ class Plot_Hf(QWidget):
     # incoming, connected in sender widget (locally connected to self.process_sig_rx() )
     sig_rx = pyqtSignal(object)
 
+    #: number of frequency points of the zoomed response over the visible range
+    N_ZOOM = 1024
+
     def __init__(self):
         super().__init__()
         self.needs_calc = True  # flag whether plot needs to be updated
@@ -49,6 +52,9 @@ class Plot_Hf(QWidget):
 
         self.log_bottom = -80
         self.lin_neg_bottom = -10
+        # plotted lines for each axis as tuples (line, part) with
+        # part = 'abs', 're', 'im' or 'phi', updated when zooming in
+        self.zoom_lines = {}
 
         self.cmb_units_a_items = [
             "<span>Set unit for y-axis</span>",
@@ -143,6 +149,12 @@ class Plot_Hf(QWidget):
         self.cmbInset.setCurrentIndex(0)
         self.inset_idx = 0  # store previous index for comparison
 
+        self.but_zoom = PushButton(" Zoom ", checked=False)
+        self.but_zoom.setToolTip(
+            "<span>Recalculate the frequency response with high resolution over the "
+            "visible frequency range (chirp-Z transform) after zooming or panning."
+            "</span>")
+
         self.but_specs = PushButton("Specs ", checked=False)
         self.but_specs.setToolTip("Display filter specs as hatched regions")
 
@@ -171,6 +183,8 @@ class Plot_Hf(QWidget):
         layHControls.addStretch(1)
         layHControls.addWidget(self.but_zerophase)
         layHControls.addStretch(1)
+        layHControls.addWidget(self.but_zoom)
+        layHControls.addStretch(1)
         layHControls.addWidget(self.lblInset)
         layHControls.addWidget(self.cmbInset)
         layHControls.addStretch(1)
@@ -215,6 +229,7 @@ class Plot_Hf(QWidget):
         self.chk_show_H_im.clicked.connect(self.draw)
 
         self.but_zerophase.clicked.connect(self.draw)
+        self.but_zoom.clicked.connect(self.zoom_all)
         self.cmbInset.currentIndexChanged.connect(self.draw_inset)
 
         self.but_specs.clicked.connect(self.draw)
@@ -512,12 +527,17 @@ class Plot_Hf(QWidget):
                 self.ax_i.add_patch(rect)
 
                 self.ax_i.set_xlim(get_fil_dict(['freqSpecsRange']))
+                self.zoom_lines[self.ax_i] = []
                 if self.chk_show_H_abs.isChecked():
-                    self.ax_i.plot(self.F, self.H_plt_abs,  label=r'$|H(F)|$')
+                    self.zoom_lines[self.ax_i] += [(self.ax_i.plot(
+                        self.F, self.H_plt_abs, label=r'$|H(F)|$')[0], 'abs')]
                 if self.chk_show_H_re.isChecked():
-                    self.ax_i.plot(self.F, self.H_plt_re, label=r'$\Re\{H(F)\}$')
+                    self.zoom_lines[self.ax_i] += [(self.ax_i.plot(
+                        self.F, self.H_plt_re, label=r'$\Re\{H(F)\}$')[0], 're')]
                 if self.chk_show_H_im.isChecked():
-                    self.ax_i.plot(self.F, self.H_plt_im, label=r'$\Im\{H(F)\}$')
+                    self.zoom_lines[self.ax_i] += [(self.ax_i.plot(
+                        self.F, self.H_plt_im, label=r'$\Im\{H(F)\}$')[0], 'im')]
+                self.ax_i.callbacks.connect('xlim_changed', self.zoom_hf)
 
             if self.cmbInset.currentIndex() == 1: # edit / navigate inset
                 self.ax_i.set_navigate(True)
@@ -532,6 +552,7 @@ class Plot_Hf(QWidget):
             try:
                 #remove ax_i from the figure
                 self.mplwidget.fig.delaxes(self.ax_i)
+                self.zoom_lines.pop(self.ax_i, None)
             except AttributeError:
                 pass
 
@@ -566,24 +587,28 @@ class Plot_Hf(QWidget):
                 phi_str += ' in deg ' + r'$\rightarrow $'
                 scale = 180./np.pi
 
+            self.phi_scale = scale
             # replace nan and inf by finite values, otherwise np.unwrap yields
             # an array full of nans
-            phi = np.angle(np.nan_to_num(self.H_c))
+            self.phi = np.unwrap(np.angle(np.nan_to_num(self.H_c)))
         # -----------------------------------------------------------
-            self.ax_p.plot(self.F, np.unwrap(phi)*scale,
-                           'g-.', label=r"$\angle\,H(F)$")
+            line, = self.ax_p.plot(self.F, self.phi*scale,
+                                   'g-.', label=r"$\angle\,H(F)$")
         # -----------------------------------------------------------
             self.ax_p.set_ylabel(phi_str)
+            self.zoom_lines.setdefault(ax, []).append((line, 'phi'))
 
 #------------------------------------------------------------------------------
     def calc_hf(self):
         """
         (Re-)Calculate the complex frequency response H_cmplx(W) (complex)
-        for W = 0 ... 2 pi:
+        for W = 0 ... 2 pi on a uniform or an adaptive grid:
         """
-        self.W, self.H_cmplx = sig.freqz(
-            get_fil_dict(['ba', 0]), get_fil_dict(['ba', 1]), worN=params['N_FFT'],
-            whole=True, fs=2*np.pi)
+        if params['FREQ_GRID'] == 'adaptive':
+            self.W, self.H_cmplx = freqz_cache.fil_adaptive(fb.fil[0])
+        else:
+            self.W, self.H_cmplx = freqz_cache.fil_freqz(
+                fb.fil[0], worN=params['N_FFT'], whole=True, fs=2*np.pi)
 
 #------------------------------------------------------------------------------
     def draw(self):
@@ -658,23 +683,13 @@ class Plot_Hf(QWidget):
 
         # ========= select frequency range to be displayed =====================
         # === shift, scale and select: W -> F, H_cplx -> H_c
-        self.F = self.W / (2 * np.pi) * self.f_max
-
-        if get_fil_dict(['freqSpecsRangeType']) == 'sym':
-            # shift H and F by f_S/2
-            self.H_c = np.fft.fftshift(self.H_cmplx)
-            self.F -= self.f_max/2.
-        elif get_fil_dict(['freqSpecsRangeType']) == 'half':
-            # only use the first half of H and F
-            self.H_c = self.H_cmplx[0:params['N_FFT']//2]
-            self.F = self.F[0:params['N_FFT']//2]
-        else:  # get_fil_dict(['freqSpecsRangeType']) == 'whole'
-            # use H and F as calculated
-            self.H_c = self.H_cmplx
+        W, idx = freq_range(self.W, get_fil_dict(['freqSpecsRangeType']))
+        self.F = W / (2 * np.pi) * self.f_max
+        self.H_c = self.H_cmplx[idx]
 
         # remove linear phase if button is checked
         if self.but_zerophase.isChecked():
-            self.H_c = self.H_c * np.exp(1j * self.W[0:len(self.F)] * get_fil_dict(["N"])/2.)
+            self.H_c = self.H_c * np.exp(1j * W * get_fil_dict(["N"])/2.)
 
         H_str = r'$H(\mathrm{e}^{\mathrm{j} \Omega})$'
 
@@ -683,31 +698,20 @@ class Plot_Hf(QWidget):
         if self.ax.get_navigate():
             #-----------------------------------------------------------
             self.ax.clear()
+            self.zoom_lines[self.ax] = []
             # Select abs / real / imaginary part and scale according to selected unit
             if self.chk_show_H_abs.isChecked():
-                if self.unitA == 'dB':
-                    self.H_plt_abs = np.maximum(20*np.log10(np.abs(self.H_c)), self.log_bottom)
-                elif self.unitA == 'V':
-                    self.H_plt_abs = np.abs(self.H_c)
-                elif self.unitA == 'W':
-                    self.H_plt_abs =  np.abs(self.H_c) * np.abs(self.H_c)
-                self.ax.plot(self.F, self.H_plt_abs, label = '$|H(F)|$')
+                self.H_plt_abs = self.scale_H(self.H_c, 'abs')
+                self.zoom_lines[self.ax] += [(self.ax.plot(
+                    self.F, self.H_plt_abs, label = '$|H(F)|$')[0], 'abs')]
             if self.chk_show_H_re.isChecked():
-                if self.unitA == 'dB':
-                    self.H_plt_re = np.maximum(20*np.log10(np.abs(self.H_c.real)), self.log_bottom)
-                elif self.unitA == 'V':
-                    self.H_plt_re = self.H_c.real
-                elif self.unitA == 'W':
-                    self.H_plt_re =  self.H_c.real * self.H_c.real
-                self.ax.plot(self.F, self.H_plt_re, label = r'$\Re\{H(F)\}$')
+                self.H_plt_re = self.scale_H(self.H_c, 're')
+                self.zoom_lines[self.ax] += [(self.ax.plot(
+                    self.F, self.H_plt_re, label = r'$\Re\{H(F)\}$')[0], 're')]
             if self.chk_show_H_im.isChecked():
-                if self.unitA == 'dB':
-                    self.H_plt_im = np.maximum(20*np.log10(np.abs(self.H_c.imag)), self.log_bottom)
-                elif self.unitA == 'V':
-                    self.H_plt_im = self.H_c.imag
-                elif self.unitA == 'W':
-                    self.H_plt_im =  self.H_c.imag * self.H_c.imag
-                self.ax.plot(self.F, self.H_plt_im, label = r'$\Im\{H(F)\}$')
+                self.H_plt_im = self.scale_H(self.H_c, 'im')
+                self.zoom_lines[self.ax] += [(self.ax.plot(
+                    self.F, self.H_plt_im, label = r'$\Im\{H(F)\}$')[0], 'im')]
 
             # calculate limits for selected curves depending on selected unit
             if self.unitA == 'dB':
@@ -745,6 +749,8 @@ class Plot_Hf(QWidget):
             #     self.ax_bounds = [self.ax.get_ybound()[0], self.ax.get_ybound()[1]]#, self.ax.get]
             self.ax.set_xlim(f_lim)
             self.ax.set_ylim(A_lim)
+            # axes callbacks are removed by `clear()`, connect zoom after setting limits
+            self.ax.callbacks.connect('xlim_changed', self.zoom_hf)
             # logger.warning("set limits")
 
             self.ax.set_xlabel(get_fil_dict(['plt_fLabel']))
@@ -780,6 +786,67 @@ class Plot_Hf(QWidget):
 
         self.redraw()
 
+#------------------------------------------------------------------------------
+    def scale_H(self, H_c, part: str):
+        """
+        Return the magnitude (`part = 'abs'`), the real (`'re'`) or the imaginary
+        part (`'im'`) of the complex frequency response `H_c`, scaled according
+        to the selected unit
+        """
+        if part == 'abs':
+            H = np.abs(H_c)
+        else:
+            H = H_c.real if part == 're' else H_c.imag
+        if self.unitA == 'dB':
+            with np.errstate(divide='ignore'):
+                return np.maximum(20*np.log10(np.abs(H)), self.log_bottom)
+        elif self.unitA == 'W':
+            return H * H
+        else:  # 'V'
+            return H
+
+#------------------------------------------------------------------------------
+    def zoom_hf(self, ax):
+        """
+        Callback for changed x-limits of `ax` (main plot or inset): When the
+        "Zoom" button is checked and less than `N_ZOOM` points of the frequency
+        response are visible, recalculate it with `N_ZOOM` points over the visible
+        range with the chirp-Z transform. Otherwise, show the response calculated
+        for the whole frequency range.
+        """
+        lines = self.zoom_lines.get(ax)
+        if not lines or not hasattr(self, 'F'):
+            return
+        f_lo, f_hi = ax.get_xlim()
+        N_vis = np.count_nonzero((self.F >= f_lo) & (self.F <= f_hi))
+        if self.but_zoom.isChecked() and N_vis < self.N_ZOOM and f_hi > f_lo:
+            F, H_c = freqz_cache.fil_czt(fb.fil[0], (f_lo, f_hi), self.N_ZOOM,
+                                         fs=self.f_max)
+            if self.but_zerophase.isChecked():
+                H_c = H_c * np.exp(1j * 2 * np.pi * F / self.f_max
+                                   * get_fil_dict(["N"])/2.)
+        else:
+            F, H_c = self.F, self.H_c
+        for line, part in lines:
+            if part == 'phi':
+                phi = np.unwrap(np.angle(np.nan_to_num(H_c)))
+                if F is not self.F:
+                    # continue the unwrapped phase of the whole frequency range
+                    phi += 2 * np.pi * np.round(
+                        (np.interp(F[0], self.F, self.phi) - phi[0]) / (2 * np.pi))
+                line.set_data(F, phi * self.phi_scale)
+            else:
+                line.set_data(F, self.scale_H(H_c, part))
+
+#------------------------------------------------------------------------------
+    def zoom_all(self):
+        """
+        "Zoom" button has been toggled, update the response of main plot and inset
+        """
+        for ax in list(self.zoom_lines):
+            self.zoom_hf(ax)
+        self.redraw()
+
 #------------------------------------------------------------------------------
     def redraw(self):
         """
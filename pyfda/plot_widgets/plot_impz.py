@@ -9,9 +9,12 @@
 """
 Widget for plotting impulse and general transient responses
 """
+import os
 import time
+import tempfile
 from pyfda.libs.compat import (
-    QWidget, pyqtSignal, QTabWidget, QVBoxLayout, QIcon, QSize, QSizePolicy, QFont, QFontMetrics)
+    QWidget, QThread, QApplication, pyqtSignal, QTabWidget, QVBoxLayout, QIcon, QSize,
+    QSizePolicy, QFont, QFontMetrics)
 
 import numpy as np
 import scipy.signal as sig
@@ -21,8 +24,11 @@ from matplotlib.ticker import AutoMinorLocator
 
 import pyfda.filterbroker as fb
 from pyfda.filterbroker import get_fil_dict, set_fil_dict
+import pyfda.libs.pyfda_dirs as dirs
 import pyfda.libs.pyfda_fix_lib as fx
-from pyfda.libs.pyfda_sig_lib import angle_zero
+from pyfda.libs.pyfda_ensemble import NOISE_RANDOM, EnsembleStats, ensemble, spectra
+from pyfda.libs.pyfda_sig_lib import (
+    angle_zero, freqz_cache, minmax_decim, OLS_Filter, N_TAPS_OLS, STFT_Stream)
 from pyfda.libs.pyfda_lib import (
     safe_eval, pprint_log, calc_ssb_spectrum, first_item)
 from pyfda.libs.pyfda_qt_lib import (
@@ -44,6 +50,58 @@ logger = logging.getLogger(__name__)
 classes = {'Plot_Impz': 'y[n] / Y(f)'}  #: Dict containing class name : display name
 
 
+class Impz_Worker(QThread):
+    """
+    Worker thread for the frame loop of the transient simulation: Calculate
+    stimulus and float or fixpoint response frame by frame with
+    `Plot_Impz.impz_frame()`, writing into the preallocated buffers of the
+    widget. Drawing is left to the GUI thread.
+
+    After each frame, `sig_frame` is emitted with the number of samples calculated
+    so far, `sig_finish` is emitted when the loop has been left. Both signals pass
+    the worker instance as the first argument. The loop is stopped after the current
+    frame with `requestInterruption()`.
+
+    When an ensemble of noisy simulations has been requested, the further
+    realizations are simulated with `Plot_Impz.impz_ensemble()` after the frame
+    loop has finished.
+    """
+    sig_frame = pyqtSignal(object, int)
+    sig_finish = pyqtSignal(object)
+
+    def __init__(self, impz_wdg: QWidget, N_end: int, N_frame: int) -> None:
+        super().__init__()
+        self.impz_wdg = impz_wdg
+        self.N_end = N_end
+        self.N_frame = N_frame
+        # fixpoint mode may be changed in the GUI during the simulation
+        self.fx_sim = get_fil_dict(['fx_sim'])
+
+    def run(self) -> None:
+        wdg = self.impz_wdg
+        while wdg.N_first < self.N_end and not self.isInterruptionRequested():
+            # The last frame could be shorter than N_frame:
+            L_frame = min(self.N_frame, self.N_end - wdg.N_first)
+            try:
+                wdg.impz_frame(slice(wdg.N_first, wdg.N_first + L_frame), self.fx_sim)
+            except Exception as e:
+                logger.error(f"Error in transient simulation: {e}")
+                wdg.error = True
+            if wdg.error:
+                break  # exit while loop
+            wdg.N_first += L_frame
+            if wdg.out_of_core:
+                wdg.flush_buffers()
+            self.sig_frame.emit(self, wdg.N_first)
+        if wdg.ens_K > 1 and not wdg.error and not self.isInterruptionRequested():
+            try:
+                wdg.impz_ensemble(self.N_frame, stop=self.isInterruptionRequested)
+            except Exception as e:
+                logger.error(f"Error in ensemble simulation: {e}")
+                wdg.error = True
+        self.sig_finish.emit(self)
+
+
 class Plot_Impz(QWidget):
     """
     Construct a widget for plotting impulse and general transient responses
@@ -51,6 +109,17 @@ class Plot_Impz(QWidget):
     sig_rx = pyqtSignal(object)  # incoming
     sig_tx = pyqtSignal(object)  # outgoing, e.g. when stimulus has been calculated
     from pyfda.libs.pyfda_qt_lib import emit
+    # min. time in s between incremental redraws of the time domain during simulation
+    T_DRAW_INC = 1.
+    # buffers of the transient simulation are memory-mapped to temporary files when
+    # their total size in bytes exceeds MEMMAP_BYTES (out-of-core simulation) ...
+    MEMMAP_BYTES = 1 << 28
+    # ... and the frame length is limited to N_FRAME_MEMMAP samples
+    N_FRAME_MEMMAP = 1 << 20
+    # time domain plots with more than N_DECIM_PX samples per pixel of the axis
+    # width are decimated to the min. and max. of each pixel, stems are replaced
+    # by their envelope
+    N_DECIM_PX = 2
 
     def __init__(self, objectName='plot_impz_inst'):
         super().__init__()
@@ -58,6 +127,12 @@ class Plot_Impz(QWidget):
         # arrays that need to be passed to subwidgets
         self.setObjectName(objectName)
         self.x = self.y = self.x_q = None
+        self.out_of_core = False  # buffers are memory-mapped to temporary files
+        self.ols = None  # FFT convolution engine for long FIR filters
+        self.fft_range = None  # range and window of the last FFTs, see `calc_fft()`
+        self.fft_win = None
+        self.stft = None  # STFT columns of the spectrogram, see `spgr_update()`
+        self.stft_key = None
 
         # create the UI part with buttons etc.
         self.ui = PlotImpz_UI()
@@ -68,8 +143,25 @@ class Plot_Impz(QWidget):
         self.needs_calc = True
         # same when fixpoint specs have been changed, only needed in Fixpoint mode
         self.needs_calc_fx = True
+        # flag whether the stimulus needs to be recalculated, only the stimulus with
+        # the settings `self.x_key` (see `Plot_Tran_Stim.stim_key()`) is cached
+        self.needs_calc_stim = True
+        self.x_key = None
+        # flag whether the FFTs need to be recalculated due to changed data, changes
+        # of the window or the range are detected in `calc_fft()`
+        self.needs_calc_fft = True
         self.needs_redraw = [True] * 2  # flag which plot needs to be redrawn
         self.error = False
+        # overflow densities of fixpoint quantizers, see `_get_ovfl_hotspots()`
+        self.ovfl_hotspots = []
+        # fixpoint filter object passed by the fixpoint widget, `None` when the
+        # fixpoint widget doesn't provide one
+        self.fx_filt = None
+        # worker thread for the transient simulation, `None` when no simulation is active
+        self.worker = None
+        self.N_valid = 0  # number of samples calculated so far
+        self.ens_K = 1  # number of realizations of the ensemble simulation
+        self.ens_stats = None  # statistics of the ensemble simulation
 
         set_fil_dict(['fx_sim'], False, backup=False)  # disable fixpoint mode initially
         self.fx_mode_old = False
@@ -93,6 +185,8 @@ class Plot_Impz(QWidget):
                              'ms': self.fmt_mkr_size}
 
         self._construct_UI()
+        if QApplication.instance() is not None:
+            QApplication.instance().aboutToQuit.connect(self.impz_stop)
 
         # --------------------------------------------
         # initialize UI and `get_fil_dict(['fx_sim'])` for fixpoint or float simulation
@@ -386,6 +480,7 @@ class Plot_Impz(QWidget):
                     initialize fixpoint widget and
                     start simulation via `calc_auto` -> `self.impz_init()`
                 """
+                self.impz_stop()  # fixpoint filter is reconfigured
                 self.needs_calc = True  # force recalculation
                 self.error = False      # reset error flag
                 # set cmb box for fixpoint / float simulation and update ui:
@@ -403,15 +498,19 @@ class Plot_Impz(QWidget):
                 """
                 The fixpoint widget has been initialized and starts the fx simulation
                 when the widget is visible via `self.impz()` and the handle to the
-                fixpoint simulation method handle passed in `dict_sig['fxfilter_func']`
+                fixpoint simulation method handle passed in `dict_sig['fxfilter_func']`.
+                The fixpoint filter object in `dict_sig['fx_filt']` provides access
+                to the quantizers for the overflow statistics.
                 """
                 self.fxfilter = dict_sig['fxfilter_func']
+                self.fx_filt = dict_sig.get('fx_filt')
                 if self.isVisible():
                     self.impz()
                 return
 
             # --------------- ERROR -------------------
             elif dict_sig['fx_sim'] == 'error':
+                self.impz_stop()
                 self.needs_calc = True
                 self.error = True
                 self.ui.but_run.setIcon(QIcon(":/play.svg"))
@@ -431,8 +530,10 @@ class Plot_Impz(QWidget):
 
         # --- widget is visible, handle all signals except 'fx_sim' -----------
         elif self.isVisible():
-            if 'data_changed' in dict_sig or self.needs_calc\
-                    or (get_fil_dict(['fx_sim']) and self.needs_calc_fx):
+            # `needs_calc` is also set while a simulation is running, only restart it
+            # when data has been changed
+            if 'data_changed' in dict_sig or self.worker is None and (self.needs_calc
+                    or (get_fil_dict(['fx_sim']) and self.needs_calc_fx)):
                 # a file has been loaded or unloaded:
                 if 'data_changed' in dict_sig and dict_sig['data_changed'] == 'file_io':
                     # make file data available to stimulus widget and modify number of
@@ -460,6 +561,7 @@ class Plot_Impz(QWidget):
                     self.emit({'ui_global_changed': 'csv'})
                 else:
                     # treat all other local UI events here
+                    self.impz_stop()
                     self.needs_calc = True
                     # make file data available to stimulus widget:
                     self.file_io()
@@ -470,12 +572,14 @@ class Plot_Impz(QWidget):
 
         else:  # invisible
             if 'data_changed' in dict_sig:
+                self.impz_stop()
                 self.needs_calc = True
             elif 'view_changed' in dict_sig and dict_sig['view_changed'] == 'f_S':
                 self.needs_redraw = [True] * 2
                 # update frequency related widgets (visible or not)
             elif 'ui_local_changed' in dict_sig:
                 # self.needs_redraw = [True] * 2
+                self.impz_stop()
                 self.needs_calc = True
 
     # ------------------------------------------------------------------------------
@@ -553,7 +657,9 @@ class Plot_Impz(QWidget):
         Triggered by:
 
             - `_construct_UI()` during initialization
-            - Pressing "Run" button, passing button state as a bool
+            - Pressing "Run" button, passing button state as a bool. When a
+              simulation is running, it is stopped and the results calculated so far
+              are drawn.
             - `self.ui.cmb_sim_select` when changing between fixpoint and float mode
             - `self.calc_auto()` when activating "Autorun"
             - Autorun (when something relevant in the UI has been updated)
@@ -571,6 +677,11 @@ class Plot_Impz(QWidget):
         """
 
         # logger.info("impz_init")
+        # stop running simulation, "Run" button only stops it
+        if self.impz_stop() and type(arg) == bool:
+            self.draw()
+            return
+
         self.resize_stim_tab_widget()
         # allow scaling the frequency response from pure impulse (no DC, noise or file)
         # button is only visible for impulse-shaped stimuli
@@ -591,6 +702,7 @@ class Plot_Impz(QWidget):
 
         if type(arg) == bool:
             self.needs_calc = True  # but_run has been pressed -> force run
+            self.stim_wdg.new_seed()  # ... with a new realization of random noise
         elif not self.ui.but_auto_run.isChecked():  # "Auto" is not active, return
             return
 
@@ -623,15 +735,23 @@ class Plot_Impz(QWidget):
             self.stim_wdg.init_labels_stim()
             self.title_str = self.stim_wdg.title_str
 
-            self.n = np.arange(self.ui.N_end, dtype=float)
-
-            # initialize arrays for stimulus and response
-            if self.cmplx:
-                self.x = np.zeros(self.ui.N_end, dtype=complex)
-                self.y = np.zeros(self.ui.N_end, dtype=complex)
-            else:
-                self.x = np.zeros(self.ui.N_end, dtype=float)
-                self.y = np.zeros(self.ui.N_end, dtype=float)
+            # initialize arrays for stimulus and response, release old buffers first.
+            # The stimulus is only recalculated when its settings have been changed.
+            dtype = np.dtype(complex) if self.cmplx else np.dtype(float)
+            self.x_key_calc = self.stim_wdg.stim_key(self.ui.N_end)
+            self.needs_calc_stim = self.x_key is None or self.x_key != self.x_key_calc\
+                or self.x.dtype != dtype
+            if self.needs_calc_stim:
+                self.x = self.x_key = None
+            self.y = self.x_q = None
+            N_bytes = self.ui.N_end * (2 * dtype.itemsize + 8 * get_fil_dict(['fx_sim']))
+            self.out_of_core = N_bytes > self.MEMMAP_BYTES
+            if self.out_of_core:
+                logger.info(f"Out-of-core simulation, {N_bytes / (1 << 20):.0f} MB of "
+                            f"buffers are memory-mapped to '{dirs.TEMP_DIR}'.")
+            if self.needs_calc_stim:
+                self.x = self._alloc_buffer(self.ui.N_end, dtype)
+            self.y = self._alloc_buffer(self.ui.N_end, dtype)
 
             # initialize progress bar
             self.ui.prg_wdg.setMaximum(self.ui.N_end)
@@ -647,12 +767,13 @@ class Plot_Impz(QWidget):
                 # - emit {'fx_sim': 'init'} to listening widgets (input_fixpoint_specs)
                 self.title_str = r'$Fixpoint$ ' + self.title_str
                  # initialize array for quantized stimulus
-                self.x_q = np.empty_like(self.x, dtype=np.float64)
+                self.x_q = self._alloc_buffer(self.ui.N_end, np.float64)
                 if np.any(np.iscomplex(x_test)):
                     logger.warning(
                         "Complex stimulus: Only its real part is used for the "
                         "fixpoint filter!")
-                # setup and initialize input quantizer
+                # setup and initialize input quantizer, it is used for all frames
+                # so that the state of a delta-sigma modulator is kept between them
                 self.q_i = fx.Fixed(get_fil_dict(['fxq', 'QI']))
                 # always use integer decimal format for input quantizer
                 # self.q_i.set_qdict({'fx_base': 'dec'})
@@ -664,7 +785,13 @@ class Plot_Impz(QWidget):
                 # Initialize filter memory with zeros, for either cascaded structure (sos)
                 # or direct form
                 self.sos = np.asarray(get_fil_dict(['sos']))
-                if len(self.sos) > 0:  # has second order sections
+                self.ols = None
+                b, a = (np.atleast_1d(np.asarray(c)) for c in get_fil_dict(['ba']))
+                if len(b) >= N_TAPS_OLS and not np.any(a[1:]):
+                    # long FIR filter, use FFT convolution (overlap-save)
+                    self.ols = OLS_Filter(b / a[0])
+                    self.bb, self.aa = b, a  # needed for step error calculation
+                elif len(self.sos) > 0:  # has second order sections
                     self.zi = np.zeros((self.sos.shape[0], 2))
                 else:
                     self.bb = np.asarray(get_fil_dict(['ba', 0]))
@@ -680,7 +807,8 @@ class Plot_Impz(QWidget):
     # --------------------------------------------------------------------------
     def impz(self):
         """
-        Calculate floating point / fixpoint response and redraw it
+        Start calculation of floating point / fixpoint response in a worker thread,
+        it is drawn in `self.impz_finish()` when the worker has finished.
 
         Triggered by:
 
@@ -688,73 +816,232 @@ class Plot_Impz(QWidget):
         -  Fixpoint widget, requesting "start_fx_response_calculation"
             via `process_rx_signal()` (fixpoint filter)
         """
-        while self.N_first < self.ui.N_end:
-            # logger.info("impz(): Calculating frame "
-            #             f"{int(np.ceil(self.N_first / self.ui.N_frame)) + 1} of "
-            #             f"{int(np.ceil(self.ui.N_end / self.ui.N_frame))}")
-            # The last frame could be shorter than self.ui.N_frame:
-            L_frame = min(self.ui.N_frame, self.ui.N_end - self.N_first)
-            # Define slicing expression for the current frame
-            frame = slice(self.N_first, self.N_first + L_frame)
-
-            # ------------------------------------------------------------------
-            # ---- calculate stimuli for current frame inplace -----------------
-            # ------------------------------------------------------------------
-            # self.x[frame] = self.stim_wdg.calc_stimulus_frame(
+        self.impz_stop()
+        self.N_valid = 0
+        self.needs_calc_fft = True
+        self.stft = None
+        self.ovfl_hotspots = []
+        self.t_draw_inc = time.perf_counter()  # time of last incremental redraw
+        self.T_draw_inc = self.T_DRAW_INC
+        self.impz_ensemble_init()
+
+        N_frame = self.ui.N_frame
+        if self.out_of_core:
+            N_frame = min(N_frame, self.N_FRAME_MEMMAP)
+        self.worker = Impz_Worker(self, N_end=len(self.x), N_frame=N_frame)
+        self.worker.sig_frame.connect(self._impz_frame_done)
+        self.worker.sig_finish.connect(self._impz_worker_finished)
+        self.worker.start()
+
+    # --------------------------------------------------------------------------
+    def _alloc_buffer(self, N: int, dtype) -> np.ndarray:
+        """
+        Return a zero-initialized buffer with `N` samples of type `dtype` for the
+        transient simulation. For out-of-core simulations (`self.out_of_core == True`),
+        the buffer is memory-mapped to an anonymous temporary file in
+        `dirs.TEMP_DIR`, the file is deleted when the buffer is released.
+        """
+        if not self.out_of_core:
+            return np.zeros(N, dtype=dtype)
+        with tempfile.TemporaryFile(dir=dirs.TEMP_DIR) as f:
+            # the mapping keeps the file alive after it has been closed
+            return np.memmap(f, dtype=dtype, mode='w+', shape=(N,))
+
+    # --------------------------------------------------------------------------
+    def flush_buffers(self) -> None:
+        """
+        Write the memory-mapped buffers to their files so that the OS can drop the
+        pages of the frames that have been calculated. This is called from the
+        worker thread after each frame of an out-of-core simulation.
+        """
+        for buf in (self.x, self.y, self.x_q):
+            if isinstance(buf, np.memmap):
+                buf.flush()
+
+    # --------------------------------------------------------------------------
+    def impz_ensemble_init(self) -> None:
+        """
+        Set up an ensemble simulation of `self.ens_K` realizations when a random
+        noise stimulus with more than one realization has been selected. Window,
+        spectral range and fixpoint filter class are read here as they cannot be
+        accessed from the worker thread.
+        """
+        stim_ui = self.stim_wdg.ui
+        self.ens_stats = None
+        self.ens_K = stim_ui.N_ens if stim_ui.noise in NOISE_RANDOM else 1
+        if self.ens_K < 2:
+            return
+        if stim_ui.cmb_file_io.isEnabled() and qget_cmb_box(stim_ui.cmb_file_io) == "use":
+            logger.warning("No ensemble simulation with stimulus from file data.")
+            self.ens_K = 1
+            return
+        self.ens_fx_class = None
+        if get_fil_dict(['fx_sim']):
+            if self.fx_filt is None:
+                logger.warning("Fixpoint filter does not support ensemble simulations.")
+                self.ens_K = 1
+                return
+            self.ens_fx_class = type(self.fx_filt)
+        self.ens_win = self.ui.qfft_win_select.calc_window(self.ui.N)\
+            / self.ui.all_wins_dict['cgain']
+        self.ens_N_start = self.ui.N_start
+
+    # --------------------------------------------------------------------------
+    def impz_ensemble(self, N_frame: int, stop=None) -> None:
+        """
+        Store the statistics (spectra, overflows and the mean and variance of the
+        response) of `self.ens_K` realizations of the stimulus with independent
+        noise in `self.ens_stats`. The response calculated by the frame
+        loop is the first realization, the remaining ones are simulated up to the end
+        of the range of the spectra in a process pool for large ensembles. The
+        deterministic part of the stimulus is calculated once for this range in
+        frames of `N_frame` samples. This is called from the worker thread
+        `Impz_Worker`, `stop()` is polled for stopping the simulation.
+        """
+        seg = slice(self.ens_N_start, self.ens_N_start + len(self.ens_win))
+        q_i = N_over = None
+        if self.ens_fx_class is not None:
+            q_i = self.q_i.q_dict
+            N_over = {'Q_I': self.q_i.N_over, **self.fx_filt.n_overflows()}
+        stats = EnsembleStats(seg.stop, len(self.ens_win))
+        stats.add(self.y[:seg.stop], *spectra(self.x[seg], self.y[seg], self.ens_win, q_i),
+                  N_over)
+
+        x_det = self._alloc_buffer(seg.stop, self.x.dtype)
+        for N_first in range(0, seg.stop, N_frame):
             self.stim_wdg.calc_stimulus_frame(
-                self.x, N_first=self.N_first, N_frame=L_frame, N_end=self.ui.N_end)
-
-            # ------------------------------------------------------------------
-            # ---- calculate fixpoint or floating point response for current frame
-            # ------------------------------------------------------------------
-            if get_fil_dict(['fx_sim']):  # fixpoint filter
-                # Quantize stimulus:
-                self.x_q[frame] = self.q_i.fixp(self.x[frame].real,
-                                                out_frmt=get_fil_dict(['qfrmt']))
-                # --------------------------------------------------------------
-                # ---- Get fixpoint response for current frame -----------------
-                # --------------------------------------------------------------
-                try:
-                    self.y[frame] = np.asarray(self.fxfilter(self.x_q[frame]))
-                    # logger.warning(f"y_frame = {pprint_log(self.y[frame])}")
-
-                except ValueError as e:
-                    if self.fxfilter(self.x_q[frame]) is None:
-                        logger.error("Fixpoint simulation returned empty results!")
-                    else:
-                        logger.error("Simulator error {0}".format(e))
-                        fb.fx_results = None
-                    self.error = True
+                x_det, N_first=N_first, N_frame=min(N_frame, seg.stop - N_first),
+                N_end=len(self.x), noise=False)
+        # starting worker processes takes a few seconds, only use them for large
+        # ensembles
+        if self.ens_K * len(x_det) < 1 << 22:
+            n_workers = 1
+        else:
+            n_workers = min(os.cpu_count() or 1, self.ens_K - 1)
+        stim_ui = self.stim_wdg.ui
+        stats.merge(ensemble(
+            x_det, stim_ui.noise, stim_ui.noi, self.ens_K - 1, self.ens_win,
+            N_start=self.ens_N_start, fx_class=self.ens_fx_class, n_workers=n_workers,
+            stop=stop))
+        self.ens_stats = stats
 
-                if self.error:
-                    self.ui.but_run.setIcon(QIcon(":/play.svg"))
-                    qstyle_widget(self.ui.but_run, "error")
-                    self.needs_calc = True
-                    break  # exit while loop
+    # --------------------------------------------------------------------------
+    def impz_frame(self, frame: slice, fx_sim: bool) -> None:
+        """
+        Calculate stimulus and floating point / fixpoint response for the samples
+        `frame` in place. This is called from the worker thread `Impz_Worker`,
+        errors are signalled by setting `self.error = True`.
+        """
+        N_first = frame.start
+        L_frame = frame.stop - frame.start
+
+        # ------------------------------------------------------------------
+        # ---- calculate stimuli for current frame inplace -----------------
+        # ------------------------------------------------------------------
+        # self.x[frame] = self.stim_wdg.calc_stimulus_frame(
+        if self.needs_calc_stim:
+            self.stim_wdg.calc_stimulus_frame(
+                self.x, N_first=N_first, N_frame=L_frame, N_end=len(self.x))
+
+        # ------------------------------------------------------------------
+        # ---- calculate fixpoint or floating point response for current frame
+        # ------------------------------------------------------------------
+        if fx_sim:  # fixpoint filter
+            # Quantize stimulus:
+            self.x_q[frame] = self.q_i.fixp(self.x[frame].real,
+                                            out_frmt=get_fil_dict(['qfrmt']))
+            # --------------------------------------------------------------
+            # ---- Get fixpoint response for current frame -----------------
+            # --------------------------------------------------------------
+            try:
+                self.y[frame] = np.asarray(self.fxfilter(self.x_q[frame]))
+                # logger.warning(f"y_frame = {pprint_log(self.y[frame])}")
 
-            else:
-                # --------------------------------------------------------------
-                # ---- Get floating point response for current frame -----------
-                # --------------------------------------------------------------
-                if len(self.sos) > 0:  # has second order sections
-                    self.y[frame], self.zi = sig.sosfilt(self.sos, self.x[frame],
-                                                         zi=self.zi)
-                else:  # no second order sections
-                    self.y[frame], self.zi = sig.lfilter(
-                        self.bb, self.aa, self.x[frame], zi=self.zi)
-                # remove complex values produced by numerical inaccuracies,
-                # `tol` is specified in multiples of machine eps
-                self.y[frame] = np.real_if_close(self.y[frame], tol=1e3)
-
-            # TODO: Test for user interrupt here
-            # --- Increase frame counter ---------------------------------------
-            self.N_first += self.ui.N_frame
-            self.ui.prg_wdg.setValue(self.N_first)
-
-        # -------------------------------------------------------------
-        # ----------------------- finish ------------------------------
-        # -------------------------------------------------------------
-        self.impz_finish()
+            except ValueError as e:
+                if self.fxfilter(self.x_q[frame]) is None:
+                    logger.error("Fixpoint simulation returned empty results!")
+                else:
+                    logger.error("Simulator error {0}".format(e))
+                    fb.fx_results = None
+                self.error = True
+
+        else:
+            # --------------------------------------------------------------
+            # ---- Get floating point response for current frame -----------
+            # --------------------------------------------------------------
+            if self.ols is not None:  # long FIR filter
+                self.y[frame] = self.ols.filter(self.x[frame])
+            elif len(self.sos) > 0:  # has second order sections
+                self.y[frame], self.zi = sig.sosfilt(self.sos, self.x[frame],
+                                                     zi=self.zi)
+            else:  # no second order sections
+                self.y[frame], self.zi = sig.lfilter(
+                    self.bb, self.aa, self.x[frame], zi=self.zi)
+            # remove complex values produced by numerical inaccuracies,
+            # `tol` is specified in multiples of machine eps
+            self.y[frame] = np.real_if_close(self.y[frame], tol=1e3)
+
+    # --------------------------------------------------------------------------
+    def _impz_frame_done(self, worker: Impz_Worker, N_first: int) -> None:
+        """
+        Update the progress bar when the worker has finished a frame and redraw
+        the time domain plot at most every `T_DRAW_INC` seconds. For large data
+        sets, the interval is increased so that drawing takes max. 20% of the time.
+        """
+        if worker is not self.worker:  # signal from a stopped worker
+            return
+        self.ui.prg_wdg.setValue(N_first)
+        self.N_valid = N_first
+        self.needs_calc_fft = True
+        if qget_cmb_box(self.ui.cmb_plt_time_spgr) != "none":
+            self.spgr_update()
+        if time.perf_counter() - self.t_draw_inc > self.T_draw_inc\
+                and self.tab_mpl_w.currentIndex() == 0:
+            t_draw = time.perf_counter()
+            self.needs_redraw[0] = True
+            self.draw()
+            self.t_draw_inc = time.perf_counter()
+            self.T_draw_inc = max(self.T_DRAW_INC, 4 * (self.t_draw_inc - t_draw))
+
+    # --------------------------------------------------------------------------
+    def _impz_worker_finished(self, worker: Impz_Worker) -> None:
+        """
+        Finish the simulation when the worker has calculated all frames or
+        indicate an error
+        """
+        if worker is not self.worker:  # worker has been stopped
+            return
+        worker.wait()  # run() is about to return, don't destroy a running thread
+        self.worker = None
+        if self.error:
+            self.ui.but_run.setIcon(QIcon(":/play.svg"))
+            qstyle_widget(self.ui.but_run, "error")
+            self.needs_calc = True
+        else:
+            self.impz_finish()
+
+    # --------------------------------------------------------------------------
+    def impz_stop(self) -> bool:
+        """
+        Stop a running simulation after the current frame and wait for the worker
+        thread. Signals of the stopped worker are ignored from now on.
+
+        Returns `True` when a simulation was active, otherwise `False`
+        """
+        if self.worker is None:
+            return False
+        worker = self.worker
+        self.worker = None
+        worker.requestInterruption()
+        worker.wait()
+        self.N_valid = self.N_first
+        self.ens_stats = None  # statistics of an incomplete ensemble are discarded
+        self.needs_calc = True
+        logger.info(f"Stopped transient simulation after {self.N_first} of "
+                    f"{worker.N_end} samples.")
+        self.ui.but_run.setIcon(QIcon(":/play.svg"))
+        qstyle_widget(self.ui.but_run, 'changed')
+        return True
 
     # --------------------------------------------------------------------------
     def impz_finish(self):
@@ -777,11 +1064,26 @@ class Plot_Impz(QWidget):
                 dc = sig.sosfreqz(self.sos, [0])  # yields (w(0), H(0))
             else:
                 dc = sig.freqz(self.bb, self.aa, [0])
-            self.y[max(self.ui.N_start, self.stim_wdg.T1_idx):] = \
-                self.y[max(self.ui.N_start, self.stim_wdg.T1_idx):] - abs(dc[1])
+            self.y[max(self.ui.N_start, self.stim_wdg.T1_idx):] -= abs(dc[1])
+            self.stft = None
 
         self.ui.prg_wdg.setValue(self.ui.N_end)  # 100% reached
+        self.N_valid = len(self.y)
+        self.needs_calc_fft = True
+        if self.needs_calc_stim:  # stimulus is complete, cache it
+            self.x_key = self.x_key_calc
+            self.x_key_file = self.stim_wdg.x_file  # keep file data alive for its id
+            self.needs_calc_stim = False
         self.t_resp = time.process_time()
+        # store overflow statistics before the quantizers are used for other purposes
+        self.ovfl_hotspots = self._get_ovfl_hotspots() if fb.fil[0]['fx_sim'] else []
+        if self.ens_stats is not None:
+            N_over = {k: v / self.ens_stats.K for k, v in self.ens_stats.N_over.items()
+                      if v > 0}
+            logger.info(f"Spectra averaged over an ensemble of {self.ens_stats.K} "
+                        "realizations, max. std. deviation of the response: "
+                        f"{np.sqrt(np.max(self.ens_stats.y_var)):.4g}"
+                        + (f", mean overflows: {N_over}" if N_over else ""))
 
         self.draw()
         # self.needs_redraw[self.tab_mpl_w.currentIndex()] = False
@@ -801,6 +1103,23 @@ class Plot_Impz(QWidget):
         if fb.fil[0]['fx_sim']:
             self.emit({'fx_sim': 'finish'})
 
+    # --------------------------------------------------------------------------
+    def _get_ovfl_hotspots(self) -> list:
+        """
+        Return the overflow densities of the input quantizer and - when the fixpoint
+        filter object `self.fx_filt` has been passed by the fixpoint widget - of
+        the output quantizer of the fixpoint filter from their streaming overflow
+        statistics as a list of tuples `(label, n, density, bin_size)` for all
+        quantizers with overflows.
+        """
+        quantizers = [('x_Q', getattr(self, 'q_i', None)),
+                      ('y_Q', getattr(self.fx_filt, 'Q_O', None))]
+        hotspots = []
+        for label, q in quantizers:
+            if isinstance(q, fx.Fixed) and q.ovfl_stats.N_over > 0:
+                hotspots.append((label, *q.ovfl_stats.density(), q.ovfl_stats.bin_size))
+        return hotspots
+
     # --------------------------------------------------------------------------
     def update_fx_settings(self, arg=None):
         """
@@ -834,6 +1153,7 @@ class Plot_Impz(QWidget):
                 qset_cmb_box(self.ui.cmb_sim_select, "float", data=True)
         # Combobox modified, set fb.fil[0]['fx_sim'] according to combobox and start sim
         elif type(arg) == int:
+            self.impz_stop()
             fb.fil[0]['fx_sim'] = (qget_cmb_box(self.ui.cmb_sim_select) == 'fixpoint')
             self.emit({'fx_sim': 'specs_changed'})
             self.needs_calc = True
@@ -879,6 +1199,14 @@ class Plot_Impz(QWidget):
         # calculate FFT of stimulus / response
         N = self.ui.N
         win = self.ui.qfft_win_select.calc_window(N) / self.ui.all_wins_dict['cgain']
+        # only recalculate FFTs when data, window or range have been changed
+        fft_range = (self.ui.N_start, self.ui.N_end)
+        if not self.needs_calc_fft and fft_range == self.fft_range\
+                and np.array_equal(win, self.fft_win):
+            return
+        self.fft_range = fft_range
+        self.fft_win = win
+        self.needs_calc_fft = False
         if self.x is None:
             self.X = np.zeros(N)  # dummy result
             logger.warning("Stimulus is 'None', FFT cannot be calculated.")
@@ -914,6 +1242,17 @@ class Plot_Impz(QWidget):
             self.Y = np.fft.fft(y_win) / self.ui.N
             # self.Y[0] = self.Y[0] * np.sqrt(2) # correct value at DC
 
+        # replace spectra by the root of the mean power spectra of the ensemble
+        # (magnitude only) when the ensemble has been calculated with the same
+        # window and range
+        ens = self.ens_stats
+        if ens is not None and self.ens_N_start == self.ui.N_start\
+                and len(self.ens_win) == N and np.array_equal(self.ens_win, win):
+            self.X = np.sqrt(ens.P_X)
+            self.Y = np.sqrt(ens.P_Y)
+            if self.ens_fx_class is not None:
+                self.X_q = np.sqrt(ens.P_Xq)
+
 #        if self.ui.chk_win_freq.isChecked():
 #            self.Win = np.abs(np.fft.fft(win)) / self.ui.N
 
@@ -980,11 +1319,43 @@ class Plot_Impz(QWidget):
 
         if idx == 0 and self.needs_redraw[0]\
                 and self.mplwidget_t.mplToolbar.plot_enabled:
-            self.draw_time(N_start=self.ui.N_start, N_end=self.ui.N_end)
+            # during the simulation, only the samples calculated so far are drawn
+            self.draw_time(N_start=self.ui.N_start,
+                           N_end=min(self.ui.N_end, max(self.N_valid, 1)))
         elif idx == 1 and self.needs_redraw[1]\
                 and self.mplwidget_f.mplToolbar.plot_enabled:
             self.draw_freq()
 
+    # ------------------------------------------------------------------------
+    def spgr_update(self) -> None:
+        """
+        Transform the segments of the signal selected for the spectrogram that
+        have been calculated since the last call, the STFT columns are stored
+        in `self.stft`. They are recalculated from the beginning when the signal,
+        the segment length, the overlap or the window have been changed.
+
+        This is called after each frame of the simulation and before drawing the
+        spectrogram, redraws with changed display settings (mode, scaling, log.
+        scale) reuse the stored columns.
+        """
+        sel = qget_cmb_box(self.ui.cmb_plt_time_spgr)
+        s = {'xn': self.x, 'xqn': self.x_q, 'yn': self.y}.get(sel)
+        N_fft = self.ui.time_nfft_spgr
+        N_ovlp = self.ui.time_ovlp_spgr
+        if s is None or N_ovlp >= N_fft:
+            self.stft = None
+            return
+        win = self.ui.qfft_win_select.calc_window(N_fft)
+        key = (sel, N_fft, N_ovlp, len(s))
+        if self.stft is None or self.stft_key != key\
+                or not np.array_equal(win, self.stft.win):
+            N_cols = STFT_Stream.n_cols(len(s), N_fft, N_ovlp)
+            buf = self._alloc_buffer(N_cols * N_fft, complex).reshape(N_cols, N_fft)
+            self.stft = STFT_Stream(win, N_ovlp, len(s), buf)
+            self.stft_key = key
+        if self.stft.N_in < self.N_valid:
+            self.stft.add(s[self.stft.N_in:self.N_valid])
+
     # ------------------------------------------------------------------------
     def _spgr_ui2params(self):
         """
@@ -1118,14 +1489,93 @@ class Plot_Impz(QWidget):
             handle = (handle, handle_mkr)
         return handle
 
+    # ------------------------------------------------------------------------
+    def draw_data_decim(self, plt_style: str, ax: object, x: np.ndarray, y: np.ndarray,
+                        bottom: float = 0, label: str = '',
+                        plt_fmt: dict = {}, mkr_fmt: dict = {}):
+        """
+        Plot x, y data like `draw_data()`, but decimate the data when there are
+        more than `N_DECIM_PX` samples per pixel of the axis width: Only the min.
+        and the max. of the samples per pixel are plotted, stems are replaced by
+        their envelope.
+
+        The data is stored in `self.decim` and redrawn for the visible range
+        when the x-limits are changed by zooming or panning (`_update_decim()`),
+        showing the data with full resolution when zoomed in sufficiently.
+
+        Parameters and return value are the same as for `draw_data()`, `x` needs
+        to be sorted in ascending order.
+        """
+        entry = {'ax': ax, 'plt_style': plt_style, 'x': x, 'y': y, 'bottom': bottom,
+                 'label': label, 'plt_fmt': plt_fmt, 'mkr_fmt': mkr_fmt, 'artists': []}
+        self.decim.append(entry)
+        return self._draw_decim(entry, 0, len(x))
+
+    # ------------------------------------------------------------------------
+    def _draw_decim(self, entry: dict, i_start: int, i_end: int):
+        """
+        (Re-)draw the range `i_start:i_end` of the data in `entry`, decimated to
+        the axis width when needed (see `draw_data_decim()`) and return the handle
+        for the legend.
+        """
+        ax = entry['ax']
+        for artist in entry['artists']:
+            artist.remove()
+        # drawing may change the x-limits (autoscaling), update the entry before
+        # to prevent recursive redraws from `_update_decim()`
+        entry['artists'] = []
+        entry['range'] = (i_start, i_end)
+        children = set(ax.get_children())
+
+        x = entry['x'][i_start:i_end]
+        y = entry['y'][i_start:i_end]
+        plt_fmt = entry['plt_fmt']
+        N_px = max(int(ax.bbox.width), 100)
+
+        if len(x) > self.N_DECIM_PX * N_px:
+            idx_min, idx_max = minmax_decim(y, N_px)
+            if entry['plt_style'] == "stem":
+                # envelope of the stems between the bottom line and min. / max.
+                ax.axhline(entry['bottom'], **plt_fmt)
+                handle = ax.fill_between(
+                    x[np.minimum(idx_min, idx_max)],
+                    np.minimum(y[idx_min], entry['bottom']),
+                    np.maximum(y[idx_max], entry['bottom']), step='mid', linewidth=0,
+                    color=plt_fmt.get('color'), alpha=plt_fmt.get('alpha'))
+            else:
+                # min. and max. of each bucket in the order of occurrence
+                idx = np.sort(np.concatenate((idx_min, idx_max)))
+                handle = self.draw_data(
+                    entry['plt_style'], ax, x[idx], y[idx], bottom=entry['bottom'],
+                    label=entry['label'], plt_fmt=plt_fmt, mkr_fmt=entry['mkr_fmt'])
+        else:
+            handle = self.draw_data(
+                entry['plt_style'], ax, x, y, bottom=entry['bottom'],
+                label=entry['label'], plt_fmt=plt_fmt, mkr_fmt=entry['mkr_fmt'])
+
+        entry['artists'] = [a for a in ax.get_children() if a not in children]
+        return handle
+
+    # ------------------------------------------------------------------------
+    def _update_decim(self, ax: object) -> None:
+        """
+        Callback for changed x-limits of the time domain axes `ax` (zoom / pan):
+        Redraw all decimated data for the visible range.
+        """
+        x_min, x_max = ax.get_xlim()
+        for entry in self.decim:
+            # visible range plus one sample on each side
+            i_start = max(np.searchsorted(entry['x'], x_min) - 1, 0)
+            i_end = min(np.searchsorted(entry['x'], x_max, side='right') + 1,
+                        len(entry['x']))
+            if (i_start, i_end) != entry['range']:
+                self._draw_decim(entry, i_start, i_end)
+
     # ================ Plotting routine time domain =========================
     def _init_axes_time(self):
         """
         Clear and initialize the axes of the time domain matplotlib widgets
         """
-        # calculate time vector from index n and T_S
-        self.t = self.n * fb.fil[0]['T_S']
-
         # Read out combo boxes with plotting styles and remove the '*' for markers
         self.plt_time_resp = qget_cmb_box(self.ui.cmb_plt_time_resp).replace("*", "")
         self.plt_time_stim = qget_cmb_box(self.ui.cmb_plt_time_stim).replace("*", "")
@@ -1137,6 +1587,9 @@ class Plot_Impz(QWidget):
             or self.plt_time_stim != "none"\
             or (self.plt_time_stmq != "none" and fb.fil[0]['fx_sim'])
 
+        # decimated plot data, see `draw_data_decim()`. Reset it before clearing
+        # the figure as this changes the x-limits of the axes
+        self.decim = []
         self.mplwidget_t.fig.clf()  # clear figure with axes
 
         num_subplots = max(int(self.plt_time_enabled) + self.cmplx + self.spgr, 1)
@@ -1156,9 +1609,6 @@ class Plot_Impz(QWidget):
         if self.spgr:
             self.ax_s = self.axes_time[-1]  # assign last axis
 
-        if False:  # not implemented / tested yet: complex data as 3D plot
-            self.ax3d = self.mplwidget_t.fig.add_subplot(111, projection='3d')
-
         for ax in self.axes_time:
             ax.xaxis.tick_bottom()  # remove axis ticks on top
             ax.yaxis.tick_left()  # remove axis ticks right
@@ -1222,15 +1672,16 @@ class Plot_Impz(QWidget):
             # self.t_interp = np.linspace(self.t[0], self.t[-1], (len(self.t) - 1) * I + 1)
             # self.x_interp = np.interp(self.t_interp, self.t, self.x, left=None, right=None,
             #                      period=None)
+            # only interpolate the displayed range with some margin for the filter
+            N_lo = max(N_start - 32, 0)
+            N_hi = min(N_end + 32, len(self.x))
             self.x_interp = sig.resample_poly(
-                self.x, I, 1, axis=0, window=('kaiser', 5.0),
-                padtype='line', cval=None)[N_start * I: N_end * I]
-            self.t_interp = np.linspace(
-                self.n[0], self.n[-1] + 1, len(self.n) * I,
-                endpoint=False)[N_start * I: N_end * I] * fb.fil[0]['T_S']
+                self.x[N_lo:N_hi], I, 1, axis=0, window=('kaiser', 5.0),
+                padtype='line', cval=None)[(N_start - N_lo) * I: (N_end - N_lo) * I]
+            self.t_interp = np.arange(N_start * I, N_end * I) / I * fb.fil[0]['T_S']
 
-
-        t = self.t[N_start:N_end]
+        # calculate time vector for the displayed range from index n and T_S
+        t = np.arange(N_start, N_end) * fb.fil[0]['T_S']
         x = self.x[N_start:N_end] * self.scale_i  # obtain same scaling for x as for quantized signals
         y = self.y[N_start:N_end]
 
@@ -1295,7 +1746,7 @@ class Plot_Impz(QWidget):
 
         # --------------- Stimulus plot --------------------------------------
         if self.plt_time_stim != "none":
-            h_r.append(self.draw_data(
+            h_r.append(self.draw_data_decim(
                 self.plt_time_stim, self.ax_r, t,
                 x_r, label=lbl_x_r, bottom=bottom_t,
                 plt_fmt=self.fmt_plot_stim, mkr_fmt=fmt_mkr_stim))
@@ -1303,7 +1754,7 @@ class Plot_Impz(QWidget):
 
             if self.ui.chk_plt_time_stim_interp.isChecked():
                 # add interpolated waveform
-                h_r.append(self.draw_data(
+                h_r.append(self.draw_data_decim(
                     "line", self.ax_r, self.t_interp,
                     self.x_interp, label=lbl_x_r_interp, bottom=bottom_t,
                     plt_fmt=self.fmt_plot_stim_interp, mkr_fmt={'marker': ''}))
@@ -1311,18 +1762,28 @@ class Plot_Impz(QWidget):
 
         # -------------- Stimulus <q> plot ------------------------------------
         if x_q is not None and self.plt_time_stmq != "none":
-            h_r.append(self.draw_data(
+            h_r.append(self.draw_data_decim(
                 self.plt_time_stmq, self.ax_r, t,
                 x_q, label='$x_q[n]$', bottom=bottom_t,
                 plt_fmt=self.fmt_plot_stmq, mkr_fmt=fmt_mkr_stmq))
             l_r += ['$x_q[n]$']
         # --------------- Response plot ----------------------------------
         if self.plt_time_resp != "none":
-            h_r.append(self.draw_data(
+            h_r.append(self.draw_data_decim(
                 self.plt_time_resp, self.ax_r, t,
                 y_r, label=lbl_y_r, bottom=bottom_t,
                 plt_fmt=self.fmt_plot_resp, mkr_fmt=fmt_mkr_resp))
             l_r += [lbl_y_r]
+        # --------------- Ensemble mean +/- std. deviation of the response ----------
+        N_ens = 0 if self.ens_stats is None else min(N_end, len(self.ens_stats.y_mean))
+        if self.plt_time_resp != "none" and N_ens > N_start\
+                and not (self.cmplx or self.ui.but_log_time.isChecked()):
+            y_mean = self.ens_stats.y_mean[N_start:N_ens].real
+            y_std = np.sqrt(self.ens_stats.y_var[N_start:N_ens])
+            h_r.append(self.ax_r.fill_between(
+                t[:N_ens - N_start], y_mean - y_std, y_mean + y_std,
+                color=self.fmt_plot_resp['color'], alpha=0.2, linewidth=0))
+            l_r += [r'$\bar{y}[n] \pm \sigma_y$']
         # --------------- Window plot ----------------------------------
         if self.ui.chk_win_time.isChecked():
             if self.ui.but_log_time.isChecked():
@@ -1331,10 +1792,27 @@ class Plot_Impz(QWidget):
                     self.ui.bottom_t)
             else:
                 win = self.ui.qfft_win_select.calc_window(self.ui.N)
-            h_r.append(self.ax_r.plot(
-                t, win, c="gray",
-                label=fb.fil[0]['tran_freq_win']['disp_name'])[0])
+            h_r.append(self.draw_data_decim(
+                "line", self.ax_r, t, win, label=fb.fil[0]['tran_freq_win']['disp_name'],
+                plt_fmt={'color': 'gray'}))
             l_r += [fb.fil[0]['tran_freq_win']['disp_name']]
+        # --------------- Overflow hotspots ----------------------------------
+        if fb.fil[0]['fx_sim'] and self.plt_time_enabled:
+            for (label, n, density, bin_size), color in\
+                    zip(self.ovfl_hotspots, (self.fmt_plot_stmq['color'],
+                                             self.fmt_plot_resp['color'])):
+                # shade bins with overflows, opacity corresponds to overflow density
+                h = None
+                for n_0, rho in zip(n, density / np.max(density)):
+                    if rho > 0 and n_0 < N_end and n_0 + bin_size > N_start:
+                        h = self.ax_r.axvspan(
+                            max(n_0, N_start) * fb.fil[0]['T_S'],
+                            min(n_0 + bin_size, N_end) * fb.fil[0]['T_S'],
+                            color=color, alpha=0.05 + 0.25 * rho, linewidth=0)
+                if h is not None:
+                    h_r.append(h)
+                    l_r += [f'Overflows ${label}$']
+
         # --------------- LEGEND (real part) ----------------------------------
         if self.plt_time_enabled:
             self.ax_r.legend(h_r, l_r, loc='best', fontsize='small', fancybox=True,
@@ -1344,7 +1822,7 @@ class Plot_Impz(QWidget):
         if self.cmplx:
             if self.plt_time_stim != "none":
                 # --- imag. part of stimulus -----
-                h_i.append(self.draw_data(
+                h_i.append(self.draw_data_decim(
                     self.plt_time_stim, self.ax_i, t,
                     x_i, label=lbl_x_i, bottom=bottom_t,
                     plt_fmt=self.fmt_plot_stim, mkr_fmt=fmt_mkr_stim))
@@ -1352,7 +1830,7 @@ class Plot_Impz(QWidget):
 
             if self.plt_time_resp != "none":
                 # --- imag. part of response -----
-                h_i.append(self.draw_data(
+                h_i.append(self.draw_data_decim(
                     self.plt_time_resp, self.ax_i, t,
                     y_i, label=lbl_y_i, bottom=bottom_t,
                     plt_fmt=self.fmt_plot_resp, mkr_fmt=fmt_mkr_resp))
@@ -1463,11 +1941,12 @@ class Plot_Impz(QWidget):
                 scale = 'linear'
                 bottom_spgr = 0
 
-            t_range = (self.t[self.ui.N_start], self.t[-1])
+            t_range = (self.ui.N_start * fb.fil[0]['T_S'],
+                       (len(self.x) - 1) * fb.fil[0]['T_S'])
             # hidden images: https://scipython.com/blog/hidden-images-in-spectrograms/
 
 # =============================================================================
-            win = self.ui.qfft_win_select.calc_window(self.ui.time_nfft_spgr)
+            self.spgr_update()
             if False:
                 Sxx, f, t, im = self.ax_s.specgram(
                     s, Fs=fb.fil[0]['f_S'], NFFT=self.ui.time_nfft_spgr,
@@ -1486,22 +1965,25 @@ class Plot_Impz(QWidget):
                 cbar.ax.set_ylabel(spgr_pre + spgr_symb + spgr_args + spgr_unit)
 
                 self.ax_s.set_ylabel(fb.fil[0]['plt_fLabel'])
-            else:
-                f, t, Sxx = sig.spectrogram(
-                    s, fb.fil[0]['f_S'], window=win,  # ('tukey', 0.25),
-                    nperseg=self.ui.time_nfft_spgr, noverlap=self.ui.time_ovlp_spgr,
-                    nfft=None, return_onesided=fb.fil[0]['freqSpecsRangeType'] == 'half',
-                    scaling=scaling, mode=mode, detrend='constant')
-                # Fs : sampling frequency for scaling
-                # window: callable or ndarray, default window_hanning
-                # nperseg : data points for each segment
-                # noverlap : number of overlapping points between segments
-                # nfft: = nperseg by default, can be larger to create zero-padding
+            elif self.stft is not None:
+                # segments within the displayed range from the stored STFT columns,
+                # same result as `sig.spectrogram(s, f_S, window=win, nperseg=NFFT,
+                # noverlap=N_OVLP, detrend='constant', ...)`
+                f, t, Sxx = self.stft.spectrogram(
+                    fb.fil[0]['f_S'], scaling=scaling, mode=mode,
+                    onesided=fb.fil[0]['freqSpecsRangeType'] == 'half',
+                    k_start=-(-N_start // self.stft.N_hop),
+                    k_end=STFT_Stream.n_cols(N_end, self.stft.N_fft, self.stft.N_ovlp))
                 # return_onesided : For complex data, a two-sided spectrum is
                 #                   returned always
                 # scaling: 'density' scales power spectral density by f_S,
                 #          'spectrum' returns power spectrum in V**2
-                # mode: 'psd', 'complex','magnitude','angle', 'phase' (no unwrapping)
+                # mode: 'psd', 'complex','magnitude','angle', 'phase'
+                if self.plt_time_spgr == "xn":  # same scaling as for quantized signals
+                    if mode == "psd":
+                        Sxx *= self.scale_i**2
+                    elif mode in {"magnitude", "complex"}:
+                        Sxx *= self.scale_i
 
     #            col_mesh = self.ax_s.pcolormesh(t, np.fft.fftshift(f),
     #                           np.fft.fftshift(Sxx, axes=0), shading='gouraud')
@@ -1509,34 +1991,23 @@ class Plot_Impz(QWidget):
 
                 if self.ui.but_log_spgr_time.isChecked():
                     Sxx = np.maximum(dB_scale * np.log10(np.abs(Sxx)), self.ui.bottom_t)
-                # shading: 'auto', 'gouraud', 'nearest'
-                col_mesh = self.ax_s.pcolormesh(t, f, Sxx, shading='auto')
-                cbar = self.mplwidget_t.fig.colorbar(col_mesh, ax=self.ax_s, aspect=30,
-                                                     pad=0.005)
-                cbar.ax.set_ylabel(spgr_pre + spgr_symb + spgr_args + spgr_unit)
+                if len(t) > 0:  # no complete segment at the start of the simulation
+                    # shading: 'auto', 'gouraud', 'nearest'
+                    col_mesh = self.ax_s.pcolormesh(t, f, Sxx, shading='auto')
+                    cbar = self.mplwidget_t.fig.colorbar(
+                        col_mesh, ax=self.ax_s, aspect=30, pad=0.005)
+                    cbar.ax.set_ylabel(spgr_pre + spgr_symb + spgr_args + spgr_unit)
 
                 self.ax_s.set_ylabel(fb.fil[0]['plt_fLabel'])
 
-        # --------------- 3D Complex  -----------------------------------------
-        if False:  # not implemented / tested yet: complex data as 3D plot
-            # plotting the stems
-            for i in range(self.ui.N_start, self.ui.N_end):
-                self.ax3d.plot([self.t[i], self.t[i]], [y_r[i], y_r[i]], [0, y_i[i]],
-                               '-', linewidth=2, alpha=.5)
-
-            # plotting a circle on the top of each stem
-            self.ax3d.plot(
-                self.t[self.ui.N_start:], y_r[self.ui.N_start:], y_i[self.ui.N_start:],
-                'o', markersize=8, markerfacecolor='none', label='$y[n]$')
-
-            self.ax3d.set_xlabel('x')
-            self.ax3d.set_ylabel('y')
-            self.ax3d.set_zlabel('z')
-
         # --------------- Title and common labels ---------------------------
         self.axes_time[-1].set_xlabel(fb.fil[0]['plt_tLabel'])
         self.axes_time[0].set_title(self.title_str)
-        self.ax_r.set_xlim([self.t[self.ui.N_start], self.t[self.ui.N_end-1]])
+        self.ax_r.set_xlim([self.ui.N_start * fb.fil[0]['T_S'],
+                            (self.ui.N_end - 1) * fb.fil[0]['T_S']])
+        # redraw decimated data for the visible range when zooming / panning
+        for ax in self.axes_time:
+            ax.callbacks.connect('xlim_changed', self._update_decim)
         # expand_lim(self.ax_r, 0.02)
 
         self.redraw()  # redraw currently active mplwidget
@@ -1661,8 +2132,8 @@ class Plot_Impz(QWidget):
                 f_max = fb.fil[0]['f_max']
 
             # freqz-based ideal frequency response:
-            F_id, H_id = sig.freqz(get_fil_dict(['ba', 0]), get_fil_dict(['ba', 1]),
-                                   worN=params['N_FFT'], whole=True, fs=f_max)
+            F_id, H_id = freqz_cache.fil_freqz(fb.fil[0], worN=params['N_FFT'],
+                                               whole=True, fs=f_max)
 
             # frequency vector for FFT-based frequency plots:
             F = np.fft.fftfreq(self.ui.N, d=1. / f_max)
@@ -1738,11 +2209,11 @@ class Plot_Impz(QWidget):
 
                 F = np.fft.fftshift(F)
 
-                # shift H_id and F_id by f_S/2
-                F_id -= f_max/2
+                # shift H_id and F_id by f_S/2 (F_id and H_id are read-only)
+                F_id = F_id - f_max/2
                 H_id = np.fft.fftshift(H_id)
                 if not freq_resp:
-                    H_id /= 2
+                    H_id = H_id / 2
 
             elif fb.fil[0]['freqSpecsRangeType'] == 'half':
                 # display 0 ... f_S/2 -> only use the first half of X, Y and F
@@ -1761,7 +2232,7 @@ class Plot_Impz(QWidget):
                 # display 0 ... f_S -> shift frequency axis
                 F = np.fft.fftshift(F) + f_max/2.
                 if not freq_resp:
-                    H_id /= 2
+                    H_id = H_id / 2
 
             # -----------------------------------------------------------------
             # Calculate log FFT and power if selected, set units
@@ -13,12 +13,13 @@ from pyfda.libs.compat import (
     QCheckBox, QWidget, QComboBox, QHBoxLayout, QFrame, pyqtSignal)
 
 import numpy as np
-import scipy.signal as sig
+import pyfda.filterbroker as fb
 from pyfda.filterbroker import get_fil_dict, set_fil_dict
 from pyfda.pyfda_rc import params
 from pyfda.plot_widgets.mpl_widget import MplWidget
 from matplotlib.ticker import AutoMinorLocator
 from pyfda.libs.pyfda_lib import pprint_log
+from pyfda.libs.pyfda_sig_lib import freqz_cache, freq_range
 from pyfda.libs.pyfda_qt_lib import qget_cmb_box, PushButton
 
 import logging
@@ -159,9 +160,11 @@ class Plot_Phi(QWidget):
         (Re-)Calculate the complex frequency response H(f)
         """
         # calculate H_cplx(W) (complex) for W = 0 ... 2 pi:
-        self.W, self.H_cmplx = sig.freqz(
-            get_fil_dict(['ba', 0]), get_fil_dict(['ba', 1]), worN=params['N_FFT'],
-            whole=True, fs=2*np.pi)
+        if params['FREQ_GRID'] == 'adaptive':
+            self.W, self.H_cmplx = freqz_cache.fil_adaptive(fb.fil[0])
+        else:
+            self.W, self.H_cmplx = freqz_cache.fil_freqz(
+                fb.fil[0], worN=params['N_FFT'], whole=True, fs=2*np.pi)
         # replace nan and inf by finite values, otherwise np.unwrap yields
         # an array full of nans
         self.H_cmplx = np.nan_to_num(self.H_cmplx)
@@ -187,19 +190,9 @@ class Plot_Phi(QWidget):
 
         # ========= select frequency range to be displayed =====================
         # === shift, scale and select: W -> F, H_cplx -> H_c
-        F = self.W * f_max_2 / np.pi
-
-        if get_fil_dict(['freqSpecsRangeType']) == 'sym':
-            # shift H and F by f_S/2
-            H = np.fft.fftshift(self.H_cmplx)
-            F -= f_max_2
-        elif get_fil_dict(['freqSpecsRangeType']) == 'half':
-            # only use the first half of H and F
-            H = self.H_cmplx[0:params['N_FFT']//2]
-            F = F[0:params['N_FFT']//2]
-        else:  # get_fil_dict(['freqSpecsRangeType']) == 'whole'
-            # use H and F as calculated
-            H = self.H_cmplx
+        W, idx = freq_range(self.W, get_fil_dict(['freqSpecsRangeType']))
+        F = W * f_max_2 / np.pi
+        H = self.H_cmplx[idx]
 
         y_str = r'$\angle H(\mathrm{e}^{\mathrm{j} \Omega})$ in '
         if self.unitPhi == 'rad':
@@ -13,13 +13,16 @@
 Widget for plotting poles and zeros
 """
 from pyfda.libs.compat import (
-    QWidget, QLabel, QFrame, QDial, QHBoxLayout, pyqtSignal, QComboBox, QLineEdit)
+    QWidget, QLabel, QFrame, QDial, QHBoxLayout, pyqtSignal, QComboBox, QLineEdit,
+    QtCore)
 import numpy as np
 import scipy.signal as sig
 
 import pyfda.filterbroker as fb
 from pyfda.pyfda_rc import params
-from pyfda.libs.pyfda_lib import unique_roots, H_mag, to_html, safe_eval
+from pyfda.libs.pyfda_lib import unique_roots, to_html, safe_eval
+from pyfda.libs.pyfda_sig_lib import (
+    freqz_cache, mag_clip, surface_grid, zpk_mag_dB, decimate_axis)
 from pyfda.libs.pyfda_qt_lib import (
     PushButton, qcmb_box_populate, qget_cmb_box, qtext_width)
 
@@ -38,6 +41,11 @@ class Plot_PZ(QWidget):
     # incoming, connected in sender widget (locally connected to self.process_sig_rx() )
     sig_rx = pyqtSignal(object)
 
+    #: decimation factor of the grid for the coarse preview of the contours
+    N_COARSE = 4
+    #: delay in ms before the coarse preview is refined
+    T_REFINE = 50
+
     def __init__(self):
         super().__init__()
         self.needs_calc = True   # flag whether filter data has been changed
@@ -178,6 +186,11 @@ class Plot_PZ(QWidget):
 
         self.init_axes()
 
+        # one-shot timer for drawing the contours on the fine grid after the preview
+        self.timer_refine = QtCore.QTimer()
+        self.timer_refine.setSingleShot(True)
+        self.timer_refine.timeout.connect(self._refine)
+
         self._log_clicked()  # calculate and draw poles and zeros
 
         # ----------------------------------------------------------------------
@@ -259,14 +272,26 @@ class Plot_PZ(QWidget):
         self.lblTop.setVisible(contour)
         self.lblTopdB.setVisible(contour and self.but_log.isChecked())
 
+        self.timer_refine.stop()
         if True:
             self.init_axes()
         self.draw_pz()
 
     # --------------------------------------------------------------------------
-    def draw_pz(self):
+    def _refine(self):
+        """
+        Draw the contours on the fine grid after the coarse preview
+        """
+        if self.isVisible():
+            self.init_axes()
+            self.draw_pz(coarse=False)
+        else:
+            self.needs_calc = True
+
+    # --------------------------------------------------------------------------
+    def draw_pz(self, coarse: bool = True):
         """
-        (re)draw P/Z plot
+        (re)draw P/Z plot, see `draw_contours()` for `coarse`
         """
         p_marker = params['P_Marker']
         z_marker = params['Z_Marker']
@@ -291,7 +316,7 @@ class Plot_PZ(QWidget):
 
         self.draw_Hf(r=self.diaRad_Hf.value(), Hf_visible=(overlay == "h(f)"))
 
-        self.draw_contours(overlay)
+        self.draw_contours(overlay, coarse)
 
         self.redraw()
 
@@ -496,7 +521,13 @@ class Plot_PZ(QWidget):
         return z, p, k
 
     # --------------------------------------------------------------------------
-    def draw_contours(self, overlay):
+    def draw_contours(self, overlay, coarse: bool = True):
+        """
+        Draw contours of |H(z)|, calculated from zeros and poles with
+        `freqz_cache.fil_surface()`. When |H(z)| is not in the cache yet and
+        `coarse == True`, it is calculated on a grid decimated by `N_COARSE`
+        first (without storing it in the cache) and refined after `T_REFINE` ms.
+        """
         if overlay not in {"contour", "contourf"}:
             return
         self.ax.apply_aspect()  # normally, the correct aspect is only set when plotting
@@ -505,10 +536,18 @@ class Plot_PZ(QWidget):
         # logger.warning(xl)
         # logger.warning(yl)
 
-        [x, y] = np.meshgrid(
-            np.arange(xl[0], xl[1], 0.01),
-            np.arange(yl[0], yl[1], 0.01))
-        z = x + 1j*y  # create coordinate grid for complex plane
+        u = np.arange(xl[0], xl[1], 0.01)
+        v = np.arange(yl[0], yl[1], 0.01)
+        if coarse and not freqz_cache.surface_cached(u, v):
+            # preview on the coarse grid, not stored in the cache
+            z = surface_grid(decimate_axis(u, self.N_COARSE),
+                             decimate_axis(v, self.N_COARSE))
+            zeros, poles, k = fb.fil[0]['zpk']
+            H_dB = zpk_mag_dB(zeros, poles, np.ravel(k)[0], z)
+            self.timer_refine.start(self.T_REFINE)
+        else:
+            z, H_dB = freqz_cache.fil_surface(u, v)  # coordinate grid and |H(z)| in dB
+        x, y = z.real, z.imag
 
         if self.but_log.isChecked():
             H_max = self.zmax_dB
@@ -516,8 +555,7 @@ class Plot_PZ(QWidget):
         else:
             H_max = self.zmax
             H_min = self.zmin
-        Hmag = H_mag(fb.fil[0]['ba'][0], fb.fil[0]['ba'][1], z, H_max, H_min=H_min,
-                     log=self.but_log.isChecked())
+        Hmag = mag_clip(H_dB, H_max, H_min=H_min, log=self.but_log.isChecked())
 
         if overlay == "contour":
             self.ax.contour(x, y, Hmag, 20, alpha=0.5, cmap=self.cmap)
@@ -547,8 +585,7 @@ class Plot_PZ(QWidget):
         # suppress "divide by zero in log10" warnings
         old_settings_seterr = np.seterr()
         np.seterr(divide='ignore')
-        ba = fb.fil[0]['ba']
-        w, H = sig.freqz(ba[0], ba[1], worN=params['N_FFT'], whole=True)
+        w, H = freqz_cache.fil_freqz(fb.fil[0], worN=params['N_FFT'], whole=True)
         H = np.abs(H)
         if self.but_log.isChecked():
             H = np.clip(np.log10(H), -6, None)  # clip to -120 dB
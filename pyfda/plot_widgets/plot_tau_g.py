@@ -15,7 +15,8 @@ from pyfda.pyfda_rc import params
 from pyfda.filterbroker import get_fil_dict
 import numpy as np
 from pyfda.libs.pyfda_qt_lib import qcmb_box_populate
-from pyfda.libs.pyfda_sig_lib import group_delay
+from pyfda.libs.pyfda_sig_lib import (
+    group_delay, group_delayz, sos_group_delayz, freqz_cache, freq_range)
 from pyfda.libs.compat import (QCheckBox, QWidget, QFrame, QComboBox,
                                QHBoxLayout, pyqtSignal)
 import logging
@@ -145,7 +146,14 @@ class Plot_tau_g(QWidget):
         # scipy: self.W, self.tau_g = group_delay((bb, aa), w=params['N_FFT'],
         #                                           whole = True)
 
-        if get_fil_dict(['creator', 0]) == 'sos':  # one of 'sos', 'zpk', 'ba'
+        if params['FREQ_GRID'] == 'adaptive':
+            # evaluate group delay on the adaptive grid of the frequency response
+            W, _ = freqz_cache.fil_adaptive()
+            if len(get_fil_dict(['sos'])) > 0:
+                self.W, self.tau_g = sos_group_delayz(get_fil_dict(['sos']), W)
+            else:
+                self.W, self.tau_g = group_delayz(bb, aa, W)
+        elif get_fil_dict(['creator', 0]) == 'sos':  # one of 'sos', 'zpk', 'ba'
             self.W, self.tau_g = group_delay(get_fil_dict(['sos']), nfft=params['N_FFT'],
                                              sos=True, whole=True,
                                              verbose=self.chkWarnings.isChecked(),
@@ -169,19 +177,9 @@ class Plot_tau_g(QWidget):
         # ========= select frequency range to be displayed =====================
         # === shift, scale and select: W -> F, H_cplx -> H_c
         f_max_2 = get_fil_dict(['f_max']) / 2.
-        F = self.W * f_max_2 / np.pi
-
-        if get_fil_dict(['freqSpecsRangeType']) == 'sym':
-            # shift tau_g and F by f_S/2
-            tau_g = np.fft.fftshift(self.tau_g)
-            F -= f_max_2
-        elif get_fil_dict(['freqSpecsRangeType']) == 'half':
-            # only use the first half of H and F
-            tau_g = self.tau_g[0:params['N_FFT']//2]
-            F = F[0:params['N_FFT']//2]
-        else:  # get_fil_dict(['freqSpecsRangeType']) == 'whole'
-            # use H and F as calculated
-            tau_g = self.tau_g
+        W, idx = freq_range(self.W, get_fil_dict(['freqSpecsRangeType']))
+        F = W * f_max_2 / np.pi
+        tau_g = self.tau_g[idx]
 
         # ================ Main Plotting Routine =========================
         # ===  clear the axes and (re)draw the plot
@@ -18,6 +18,7 @@ from scipy.special import sinc, diric
 
 import pyfda.filterbroker as fb
 from pyfda.libs.pyfda_sig_lib import angle_zero
+from pyfda.libs.pyfda_ensemble import NOISE_RANDOM, noise_frame
 from pyfda.libs.pyfda_lib import (
     pprint_log, rect_bl, sawtooth_bl, triang_bl, comb_bl, safe_numexpr_eval)
 
@@ -34,6 +35,8 @@ class Plot_Tran_Stim(QWidget):
     """
     sig_rx = pyqtSignal(object)  # incoming
     sig_tx = pyqtSignal(object)  # outgoing, e.g. when stimulus has been calculated
+    # style of formula field, emitted from the simulation thread
+    sig_formula_style = pyqtSignal(str)
     from pyfda.libs.pyfda_qt_lib import emit
 
     def __init__(self):
@@ -46,6 +49,9 @@ class Plot_Tran_Stim(QWidget):
         self.needs_redraw = [True] * 2  # flag which plot needs to be redrawn
         self.error = False
         self.x_file = None  # data mapped from file io in Plot_Impz.file_io()
+        # seed for the random number generator for noise, restarted with every stimulus
+        self.seed = np.random.SeedSequence().entropy
+        self.rng = np.random.default_rng(self.seed)
 
         self._construct_UI()
 
@@ -72,9 +78,40 @@ class Plot_Tran_Stim(QWidget):
 
         self.ui.sig_tx.connect(self.sig_tx)  # relay UI events further up
         self.sig_rx.connect(self.ui.sig_rx)  # ... and the other way round
+        # widgets may only be styled in the GUI thread, use a queued connection
+        self.sig_formula_style.connect(self._style_formula)
 
         self.setLayout(layVMain)
 
+    def _style_formula(self, state: str) -> None:
+        """
+        Set the style of the formula field to `state` ('normal' or 'failed')
+        """
+        qstyle_widget(self.ui.ledStimFormula, state)
+
+    def new_seed(self) -> None:
+        """
+        Create a new seed for the noise generator, yielding a new realization of
+        the noise with the next stimulus
+        """
+        self.seed = np.random.SeedSequence().entropy
+
+    def stim_key(self, N_end: int) -> tuple:
+        """
+        Return a hashable key of all settings that the stimulus with `N_end`
+        samples depends on: the scalar parameters of the UI, the states of the
+        widgets that are read in `calc_stimulus_frame()`, the sampling time, the
+        identity of the file data and - for random noise - the seed of the
+        noise generator. Stimuli with the same key are identical.
+        """
+        ui_pars = tuple((k, v) for k, v in sorted(vars(self.ui).items())
+                        if type(v) in {bool, int, float, complex, str} and k != 'N_ens')
+        file_io = self.ui.cmb_file_io.isEnabled() and qget_cmb_box(self.ui.cmb_file_io)
+        seed = self.seed if self.ui.noise in NOISE_RANDOM else None
+        return (ui_pars, self.ui.but_stim_bl.isChecked(),
+                qget_cmb_box(self.ui.cmb_stim_noise), file_io, id(self.x_file),
+                fb.fil[0]['T_S'], fb.fil[0]['f_S'], N_end, seed)
+
     def init_labels_stim(self):
             '''intialize title string, y-axis label and some variables'''
             # use radians for angle internally
@@ -173,7 +210,8 @@ class Plot_Tran_Stim(QWidget):
 
 # ------------------------------------------------------------------------------
     def calc_stimulus_frame(self, x: np.ndarray = np.random.randn(10), N_first: int = 0,
-                            N_frame: int = 10, N_end: int = 10) -> np.ndarray:
+                            N_frame: int = 10, N_end: int = 10, noise: bool = True
+                            ) -> np.ndarray:
         """
         Calculate a data frame of stimulus `x` with a length of `N_frame` samples,
         starting with index `N_first`
@@ -192,6 +230,10 @@ class Plot_Tran_Stim(QWidget):
         N_end: int
             last sample of total stimulus to be generated (needed for scaling for some stimuli)
 
+        noise: bool
+            when False, no noise is added to the stimulus (e.g. to calculate the
+            deterministic part of the stimulus for ensemble simulations)
+
         Returns
         -------
         None
@@ -430,42 +472,26 @@ class Plot_Tran_Stim(QWidget):
 
             x[frm_slc] = safe_numexpr_eval(self.ui.stim_formula, (N_frame,), param_dict)
             if safe_numexpr_eval.err > 0:
-                qstyle_widget(self.ui.ledStimFormula, 'failed')
+                self.sig_formula_style.emit('failed')
             else:
-                qstyle_widget(self.ui.ledStimFormula, 'normal')
+                self.sig_formula_style.emit('normal')
         else:
             logger.error('Unknown stimulus format "{0}"'.format(self.ui.stim))
             return None
         # ----------------------------------------------------------------------
         # Calculate noise
         # ----------------------------------------------------------------------
-        if self.ui.noise == "none":
+        if self.ui.noise == "none" or not noise:
             pass
-        elif self.ui.noise == "gauss":
-            # Gaussian noise is uncorrelated, no information from last frame needed
-            if np.iscomplexobj(self.ui.noi):
-                noi = self.ui.noi.real * np.random.randn(N_frame)\
-                    + 1j * self.ui.noi.imag * np.random.randn(N_frame)
-            else:
-                noi = self.ui.noi * np.random.randn(N_frame)
-        # ---
-        elif self.ui.noise == "uniform":
-            # Uniform noise is uncorrelated, no information from last frame needed
-            if np.iscomplexobj(self.ui.noi):
-                noi = self.ui.noi.real * (np.random.rand(N_frame) - 0.5)\
-                    + 1j * self.ui.noi.imag * (np.random.rand(N_frame) - 0.5)
-            else:
-                noi = self.ui.noi * (np.random.rand(N_frame) - 0.5)
-        # ---
-        elif self.ui.noise == "randint":
-            # Random integers are uncorrelated, no information from last frame needed
-            if np.iscomplexobj(self.ui.noi):
-                noi = np.random.randint(
-                    int(np.abs(self.ui.noi.real)) + 1, size=N_frame) +\
-                        1j * np.random.randint(
-                            int(np.abs(self.ui.noi.imag)) + 1, size=N_frame)
-            else:
-                noi = np.random.randint(int(np.abs(self.ui.noi)) + 1, size=N_frame)
+        elif self.ui.noise in NOISE_RANDOM:
+            # Brownian noise is cumulative, add last value of last frame to current
+            # frame. The other kinds of noise are uncorrelated, no information from
+            # the last frame is needed.
+            if N_first == 0:
+                self.noi_last = 0  # initialize for first frame
+                self.rng = np.random.default_rng(self.seed)
+            noi = noise_frame(self.ui.noise, self.ui.noi, N_frame, self.rng, self.noi_last)
+            self.noi_last = noi[-1]
         # ---
         elif self.ui.noise == "mls":
             # Maximum Length Sequences have a fixed length of 2 ** self.ui.mls_b,
@@ -485,19 +511,6 @@ class Plot_Tran_Stim(QWidget):
                 noi = self.ui.noi.real * noi_r + 1j * self.ui.noi.imag * noi_i
             else:
                 noi = noi_r * self.ui.noi
-        # ---
-        elif self.ui.noise == "brownian":  # brownian noise
-            # Brownian noise in cumulative, add last value of last frame to
-            # current frame
-            if N_first == 0:
-                self.noi_last = 0  # initialize for first frame
-            if np.iscomplexobj(self.ui.noi):
-                noi = np.cumsum(self.ui.noi.real * np.random.randn(N_frame))\
-                    + 1j * np.cumsum(self.ui.noi.imag * np.random.randn(N_frame))
-            else:
-                noi = np.cumsum(self.ui.noi * np.random.randn(N_frame))
-            noi += self.noi_last
-            self.noi_last = noi[-1]
         else:
             logger.error('Unknown kind of noise "{}"'.format(self.ui.noise))
 
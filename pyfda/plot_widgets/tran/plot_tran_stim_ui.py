@@ -17,6 +17,7 @@ from pyfda.libs.compat import (
 
 from pyfda.libs.pyfda_lib import to_html, safe_eval, pprint_log
 import pyfda.filterbroker as fb
+from pyfda.libs.pyfda_ensemble import NOISE_RANDOM
 from pyfda.libs.pyfda_qt_lib import (
     qcmb_box_populate, qget_cmb_box, qtext_width, qstyle_widget, QVLine, PushButton)
 # FMT string for QLineEdit fields, e.g. '{:.3g}'
@@ -95,6 +96,7 @@ class Plot_Tran_Stim_UI(QWidget):
         self.noi = 0.1
         self.noise = "none"
         self.mls_b = 8
+        self.N_ens = 1  # number of realizations for ensemble averaging
         self.DC = 0.0
         self.stim_formula = "A1 * abs(sin(2 * pi * f1 * n))"
         self.stim_par1 = 0.5
@@ -434,10 +436,21 @@ class Plot_Tran_Stim_UI(QWidget):
         self.lblNoi_par = QLabel("not initialized", self)
         self.ledNoi_par = QLineEdit(self)
         self.ledNoi_par.setMaximumWidth(qtext_width(N_x=4))
+        self.lbl_N_ens = QLabel(to_html("&nbsp;K =", frmt='bi'), self)
+        self.led_N_ens = QLineEdit(self, objectName="stimNEns")
+        self.led_N_ens.setMaximumWidth(qtext_width(N_x=6))
+        self.led_N_ens.setText(str(self.N_ens))
+        self.led_N_ens.setToolTip(
+            "<span>Number of realizations <i>K</i> of the noise process. For "
+            "<i>K</i> &gt; 1, the spectra are averaged over an ensemble of <i>K</i> "
+            "simulations with independent noise, the time plot shows the first "
+            "realization.</span>")
         layH_noi_params = QHBoxLayout()
         layH_noi_params.addWidget(self.ledNoi)
         layH_noi_params.addWidget(self.lblNoi_par)
         layH_noi_params.addWidget(self.ledNoi_par)
+        layH_noi_params.addWidget(self.lbl_N_ens)
+        layH_noi_params.addWidget(self.led_N_ens)
 
         # ----------------------------------------------
         # Widget and Layout containing formula editor
@@ -575,6 +588,7 @@ class Plot_Tran_Stim_UI(QWidget):
         self.cmb_stim_noise.currentIndexChanged.connect(self._update_noi)
         self.ledNoi.editingFinished.connect(self._update_noi)
         self.ledNoi_par.editingFinished.connect(self._update_noi)
+        self.led_N_ens.editingFinished.connect(self._update_noi)
         self.ledAmp1.editingFinished.connect(self._update_amp1)
         self.ledAmp2.editingFinished.connect(self._update_amp2)
         self.ledPhi1.editingFinished.connect(self._update_phi1)
@@ -978,9 +992,14 @@ class Plot_Tran_Stim_UI(QWidget):
         self.ledNoi.setVisible(self.noise != 'none')
         self.lblNoi_par.setVisible(self.noise == 'mls')
         self.ledNoi_par.setVisible(self.noise == 'mls')
+        self.lbl_N_ens.setVisible(self.noise in NOISE_RANDOM)
+        self.led_N_ens.setVisible(self.noise in NOISE_RANDOM)
         if self.noise != 'none':
             self.noi = safe_eval(self.ledNoi.text(), 0, return_type='cmplx')
             self.ledNoi.setText(str(self.noi))
+            self.N_ens = max(safe_eval(self.led_N_ens.text(), self.N_ens,
+                                       return_type='int', sign='pos'), 1)
+            self.led_N_ens.setText(str(self.N_ens))
             if self.noise == 'gauss':
                 self.lblNoi.setText(to_html("&nbsp;&sigma; =", frmt='bi'))
                 self.ledNoi.setToolTip(
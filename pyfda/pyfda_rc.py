@@ -44,6 +44,7 @@ mpl_ms = 8  # base size for matplotlib markers
 # Various parameters for calculation and plotting
 params = {
     'N_FFT':  2048,   # number of FFT points for plot commands (freqz etc.)
+    'FREQ_GRID': 'uniform',  # 'uniform' (N_FFT points) or 'adaptive' frequency grid
     'FMT': '{:.3g}',  # format string for QLineEdit fields
     'CSV': {  # format options and parameters for CSV-files and clipboard
             'delimiter': 'auto',  # default delimiter
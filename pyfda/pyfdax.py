@@ -37,6 +37,7 @@ from pyfda.libs.compat import Qt, QtCore, QApplication, QIcon
 # from pyfda.libs.pyfda_lib import ANSIcolors as ACol
 import numpy as np
 from pyfda.pyfda_class import pyFDA
+from pyfda.libs.pyfda_fix_lib_numba import fx_backend
 
 def main():
     """
@@ -149,6 +150,7 @@ def main():
                 f"avail: {avail_geometry.width()}x{avail_geometry.height()}")
     logger.info(f"with {style} and matplotlib fontsize {fontsize}.")
     logger.info(f"lDPI = {ldpi:.2f}, pDPI = {pdpi:.2f} ({pdpix:.2f} x {pdpiy:.2f}), pix.ratio = {pixel_ratio}")
+    logger.info(f"Using '{fx_backend()}' backend for fixpoint kernels.")
 
     # Available signals:
     # - logicalDotsPerInchChanged(qreal dpi)
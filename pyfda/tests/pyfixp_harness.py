@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Shared test harness for the pyfixp filter implementations: Filter the same
+stimulus in block mode and in the sample loop and compare the results.
+
+Usage: derive a test class from `PyfixpHarness` and `unittest.TestCase` and set
+the class attributes describing the filter under test.
+"""
+
+from contextlib import ExitStack
+from unittest.mock import patch
+import numpy as np
+import pyfda.filterbroker as fb
+from pyfda.libs import pyfda_fix_lib_numba as fxn
+
+
+class PyfixpHarness:
+    """
+    Mixin with fixtures and the block-vs-loop tests common to all pyfixp filters
+    """
+    DUT = None  # filter class under test
+    BA = None  # coefficients [b, a] written to `fb.fil[0]['ba']`
+    Q_COEFFS = {'QCB': {'WI': 0, 'WF': 7, 'ovfl': 'wrap', 'quant': 'round'}}
+    WI_ACC = 2  # integer bits of the accumulator
+    OVFL_O = None  # fixed overflow mode of the output quantizer, None: same as QACC
+    STATE = ('zi',)  # names of the register attributes that must match after filtering
+    # quantization modes for `test_block_bit_exact()`
+    QUANT_BLOCK = ['floor', 'round', 'fix', 'ceil', 'rint']
+    # methods of `DUT` that must not be called when the integer kernel is active
+    NO_KERNEL = ()
+
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+        fb.fil[0]['ba'] = self.BA
+        rng = np.random.default_rng(42)
+        self.x = np.round(rng.uniform(-4, 4, 300) * 8) / 8  # quantized to Q2.3
+
+    def get_p(self, ovfl='wrap', quant='floor', ovfl_o=None):
+        """
+        Return the quantizer dict of the filter with accumulator and output
+        quantizer set to `ovfl` resp. `ovfl_o` and `quant`
+        """
+        ovfl_o = ovfl_o or self.OVFL_O or ovfl
+        p = {k: dict(v) for k, v in self.Q_COEFFS.items()}
+        p.update({'QACC': {'WI': self.WI_ACC, 'WF': 6, 'ovfl': ovfl, 'quant': quant},
+                  'QI': {'WI': 2, 'WF': 3, 'ovfl': 'sat', 'quant': 'round'},
+                  'QO': {'WI': 2, 'WF': 4, 'ovfl': ovfl_o, 'quant': quant}})
+        return p
+
+    def ovfl_counts(self, dut):
+        """
+        Return a tuple with overflow counts of `dut` after filtering a frame,
+        the first entry is the overflow count of the accumulator
+        """
+        return (dut.Q_acc.q_dict['N_over'],)
+
+    def patch_kernel(self):
+        """
+        Return a context manager that selects the integer kernel (compiled with
+        numba or not)
+        """
+        stack = ExitStack()
+        stack.enter_context(patch.object(fxn, 'fx_backend', return_value='numba'))
+        for name in self.NO_KERNEL:
+            stack.enter_context(patch.object(self.DUT, name, side_effect=AssertionError))
+        return stack
+
+    # --------------------------------------------------------------------------
+    def drive(self, p, x, N_frame=128):
+        """
+        Filter `x` frame by frame in block mode and loop mode, return both
+        filter instances and lists with outputs and overflow counts per frame
+        """
+        dut_b = self.DUT(p, block_mode=True)
+        dut_l = self.DUT(p, block_mode=False)
+        y_b, y_l, N_b, N_l = [], [], [], []
+        for k in range(0, len(x), N_frame):
+            y_b.append(dut_b.fxfilter(x[k:k + N_frame])[0])
+            y_l.append(dut_l.fxfilter(x[k:k + N_frame])[0])
+            N_b.append(self.ovfl_counts(dut_b))
+            N_l.append(self.ovfl_counts(dut_l))
+        return dut_b, dut_l, y_b, y_l, N_b, N_l
+
+    def run_filters(self, p, x, N_frame=128):
+        """
+        Filter `x` frame by frame in block mode and loop mode, check that the
+        register states match and return outputs and overflow counts of both
+        """
+        dut_b, dut_l, y_b, y_l, N_b, N_l = self.drive(p, x, N_frame)
+        for name in self.STATE:
+            self.assertTrue(np.array_equal(getattr(dut_b, name), getattr(dut_l, name)),
+                            msg=name)
+        return np.concatenate(y_b), np.concatenate(y_l), N_b, N_l
+
+    def assert_ovfl_stats_equal(self, Q_b, Q_l, msg=None):
+        """
+        Overflow statistics of quantizers `Q_b` and `Q_l` must be identical
+        """
+        S_b, S_l = Q_b.ovfl_stats, Q_l.ovfl_stats
+        self.assertEqual((S_b.N, S_b.N_pos, S_b.N_neg, S_b.idx_first, S_b.idx_last),
+                         (S_l.N, S_l.N_pos, S_l.N_neg, S_l.idx_first, S_l.idx_last),
+                         msg=msg)
+        self.assertTrue(np.array_equal(S_b.bins, S_l.bins), msg=msg)
+
+    def check_bit_exact(self, quant_modes, ovfl_expected=False):
+        """
+        Compare block mode and sample loop for all number formats, overflow and
+        quantization modes in `quant_modes`
+        """
+        for qfrmt in ['qfrac', 'qint']:
+            fb.fil[0]['qfrmt'] = qfrmt
+            for ovfl in ['wrap', 'sat', 'none']:
+                for quant in quant_modes:
+                    p = self.get_p(ovfl=ovfl, quant=quant)
+                    x = self.x * (1 << p['QI']['WF']) if qfrmt == 'qint' else self.x
+                    y_b, y_l, N_b, N_l = self.run_filters(p, x)
+                    msg = f"{qfrmt}, {ovfl}, {quant}"
+                    self.assertTrue(np.array_equal(y_b, y_l), msg=msg)
+                    self.assertEqual(N_b, N_l, msg=msg)
+                    if ovfl_expected and ovfl != 'none':
+                        self.assertGreater(max(n[0] for n in N_b), 0, msg=msg)
+
+    # --------------------------------------------------------------------------
+    def test_block_bit_exact(self):
+        """
+        Block mode and sample loop must yield identical results and overflow
+        counts for all quantization / overflow modes and number formats
+        """
+        self.check_bit_exact(self.QUANT_BLOCK, ovfl_expected=True)
+
+    def test_kernel_bit_exact(self):
+        """
+        The integer kernel (compiled with numba or not) must yield the same results
+        and overflow counts as the sample loop
+        """
+        with self.patch_kernel():
+            self.check_bit_exact(['floor', 'round', 'fix', 'ceil', 'rint'])
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Speed comparison of the vectorized CSD engine (`dec2csd_arr()`, `csd2dec_arr()`,
+`csd_nonzero()`) and the element-wise converters `dec2csd_vec()` and `csd2dec_vec()`
+for coefficient tables, run with `python -m pyfda.tests.test_csd_time`
+"""
+import time
+import numpy as np
+
+import pyfda.libs.pyfda_fix_lib as fx
+
+if __name__ == "__main__":
+    N = 10000  # number of table entries
+    WF = 15
+    y_int = np.random.default_rng(0).integers(-(1 << WF), 1 << WF, N)
+    y = y_int / 2 ** WF
+
+    t1 = time.perf_counter()
+    s_e = fx.dec2csd_vec(y, WF)
+    t2 = time.perf_counter()
+    s_v = fx.dec2csd_arr(y, WF)
+    t3 = time.perf_counter()
+    print(f"dec -> csd:     T_elem = {t2 - t1:.4f} s, T_vec = {t3 - t2:.4f} s, "
+          f"speedup = {(t2 - t1) / (t3 - t2):.1f}")
+
+    raw = np.char.replace(s_v, '.', '')  # integer CSD strings
+    t1 = time.perf_counter()
+    y_e = fx.csd2dec_vec(raw)
+    t2 = time.perf_counter()
+    y_v = fx.csd2dec_arr(raw)
+    t3 = time.perf_counter()
+    assert np.array_equal(y_e, y_v) and np.array_equal(y_v, y_int), "Results differ!"
+    print(f"csd -> dec:     T_elem = {t2 - t1:.4f} s, T_vec = {t3 - t2:.4f} s, "
+          f"speedup = {(t2 - t1) / (t3 - t2):.1f}")
+
+    t1 = time.perf_counter()
+    n_e = sum(s.count('+') + s.count('-') for s in fx.dec2csd_vec(y, WF))
+    t2 = time.perf_counter()
+    n_v = fx.csd_nonzero(y_int)[1]
+    t3 = time.perf_counter()
+    # `dec2csd()` returns non-canonical strings for some values, so n_e >= n_v
+    print(f"nonzero digits: T_elem = {t2 - t1:.4f} s, T_vec = {t3 - t2:.4f} s, "
+          f"speedup = {(t2 - t1) / (t3 - t2):.1f}, N = {n_v} (element-wise: {n_e})")
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the Monte-Carlo ensemble of transient simulations
+"""
+import unittest
+import numpy as np
+import scipy.signal as sig
+
+import pyfda.filterbroker as fb
+from pyfda.libs.pyfda_ensemble import EnsembleStats, ensemble, noise_frame
+from pyfda.fixpoint_widgets.fir_df.fir_df_pyfixp import FIR_DF_pyfixp
+
+
+class TestEnsemble(unittest.TestCase):
+
+    def setUp(self):
+        fb.fil[0].update({'ba': [[0.25, 0.5, 0.25], [1, 0, 0]], 'sos': [],
+                          'fx_sim': False, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+        self.N = 256
+        self.win = np.ones(self.N)
+        self.x_det = 0.5 * np.sin(2 * np.pi * 0.125 * np.arange(self.N))
+
+    def test_noise_frame(self):
+        """
+        Noise has the specified statistics, real and imaginary part of complex
+        noise are independent and brownian noise continues the last frame
+        """
+        rng = np.random.default_rng(1)
+        self.assertAlmostEqual(np.std(noise_frame('gauss', 2, 100000, rng)), 2, places=1)
+        self.assertAlmostEqual(np.var(noise_frame('uniform', 1, 100000, rng)), 1 / 12,
+                               places=2)
+        n = noise_frame('randint', 3, 1000, rng)
+        self.assertEqual(set(n), {0, 1, 2, 3})
+        n = noise_frame('gauss', 1 + 2j, 100000, rng)
+        self.assertAlmostEqual(np.std(n.real), 1, places=1)
+        self.assertAlmostEqual(np.std(n.imag), 2, places=1)
+        self.assertLess(abs(np.corrcoef(n.real, n.imag)[0, 1]), 0.02)
+        n = noise_frame('brownian', 1, 10, np.random.default_rng(2), noi_last=5)
+        self.assertTrue(np.allclose(
+            n - 5, np.cumsum(np.random.default_rng(2).standard_normal(10))))
+        with self.assertRaises(ValueError):
+            noise_frame('mls', 1, 10, rng)
+
+    def test_statistics(self):
+        """
+        Power spectra of the ensemble match the theoretical values for white
+        Gaussian noise, realizations are only simulated up to the end of the
+        range of the spectra
+        """
+        K = 400
+        stats = ensemble(self.x_det, 'gauss', 0.1, K, self.win, seed=0)
+        self.assertEqual(stats.K, K)
+        b, a = fb.fil[0]['ba']
+        Y_det = np.fft.fft(sig.lfilter(b, a, self.x_det)) / self.N
+        # white noise floor of the stimulus spectrum: sigma^2 / N, the mean noise
+        # floor of the response is 0.01 * sum(b**2) / N, it adds to the spectrum
+        # of the deterministic part
+        P_noise_x = np.mean(np.delete(stats.P_X, [32, 224]))
+        self.assertAlmostEqual(P_noise_x * self.N / 0.01, 1, places=1)
+        P_noise_y = 0.01 * np.sum(np.square(b)) / self.N
+        self.assertAlmostEqual(np.mean(stats.P_Y - np.abs(Y_det) ** 2) / P_noise_y, 1,
+                               places=1)
+        self.assertAlmostEqual(stats.P_Y[32] / np.abs(Y_det[32]) ** 2, 1, places=2)
+        # mean of the response is the response to the deterministic part, its
+        # variance is sigma^2 * sum(b**2) after the transient
+        self.assertEqual(len(stats.y_mean), self.N)
+        self.assertLess(np.max(np.abs(stats.y_mean - sig.lfilter(b, a, self.x_det))),
+                        5 * 0.1 * np.linalg.norm(b) / np.sqrt(K))
+        self.assertAlmostEqual(np.mean(stats.y_var[2:]) / (0.01 * np.sum(np.square(b))),
+                               1, places=1)
+
+        # samples after the range of the spectra don't change the results
+        x_det = np.concatenate((self.x_det, np.ones(1000)))
+        s_1 = ensemble(x_det, 'gauss', 0.1, 10, self.win, seed=1)
+        s_2 = ensemble(self.x_det, 'gauss', 0.1, 10, self.win, seed=1)
+        self.assertTrue(np.array_equal(s_1.P_Y, s_2.P_Y))
+        self.assertTrue(np.array_equal(s_1.y_var, s_2.y_var))
+
+    def test_merge(self):
+        """
+        Merging partial statistics yields the same result as adding all
+        realizations to one instance
+        """
+        rng = np.random.default_rng(3)
+        ys = rng.standard_normal((10, 32)) + 1j * rng.standard_normal((10, 32))
+        s_all = EnsembleStats(32, 32)
+        s_1 = EnsembleStats(32, 32)
+        s_2 = EnsembleStats(32, 32)
+        for k, y in enumerate(ys):
+            s_all.add(y, y, y, N_over={'Q': k})
+            (s_1 if k < 3 else s_2).add(y, y, y, N_over={'Q': k})
+        s_1.merge(s_2)
+        self.assertEqual(s_1.K, 10)
+        self.assertTrue(np.allclose(s_1.y_mean, np.mean(ys, axis=0)))
+        self.assertTrue(np.allclose(s_1.y_var, np.var(ys, axis=0, ddof=1)))
+        self.assertTrue(np.allclose(s_1.y_var, s_all.y_var))
+        self.assertTrue(np.allclose(s_1.P_Y, s_all.P_Y))
+        self.assertTrue(np.allclose(s_1.P_Y, np.mean(np.abs(ys) ** 2, axis=0)))
+        self.assertFalse(np.any(s_1.P_Xq))
+        self.assertEqual(s_1.N_over, {'Q': 45})
+
+    def test_reproducible(self):
+        """
+        Results only depend on the seed, not on the number of workers or on the
+        filter structure; stopping returns the realizations of the first chunk
+        """
+        s_1 = ensemble(self.x_det, 'uniform', 0.5, 20, self.win, seed=42)
+        s_2 = ensemble(self.x_det, 'uniform', 0.5, 20, self.win, seed=42, n_workers=2)
+        self.assertTrue(np.array_equal(s_1.P_X, s_2.P_X))
+        self.assertTrue(np.array_equal(s_1.P_Y, s_2.P_Y))
+        self.assertTrue(np.allclose(s_1.y_var, s_2.y_var))
+        fb.fil[0]['sos'] = sig.tf2sos(*fb.fil[0]['ba'])
+        s_3 = ensemble(self.x_det, 'uniform', 0.5, 20, self.win, seed=42)
+        self.assertTrue(np.allclose(s_1.P_Y, s_3.P_Y))
+        s_4 = ensemble(self.x_det, 'uniform', 0.5, 20, self.win, seed=42,
+                       stop=lambda: True)
+        self.assertEqual(s_4.K, 2)
+
+    def test_fixpoint(self):
+        """
+        Fixpoint ensembles count the overflows of all quantizers
+        """
+        fb.fil[0].update({'fx_sim': True, 'fxq': {
+            'QCB': {'WI': 0, 'WF': 7, 'ovfl': 'wrap', 'quant': 'round'},
+            'QACC': {'WI': 1, 'WF': 6, 'ovfl': 'sat', 'quant': 'floor'},
+            'QI': {'WI': 0, 'WF': 7, 'ovfl': 'sat', 'quant': 'round'},
+            'QO': {'WI': 0, 'WF': 7, 'ovfl': 'sat', 'quant': 'floor'}}})
+        stats = ensemble(self.x_det, 'gauss', 0.5, 8, self.win, seed=0,
+                         fx_class=FIR_DF_pyfixp)
+        self.assertEqual(stats.K, 8)
+        self.assertGreater(stats.N_over['Q_I'], 0)
+        self.assertTrue(np.all(stats.P_Xq > 0))
+        # saturation of the input quantizer reduces the power of the stimulus
+        self.assertLess(np.sum(stats.P_Xq), np.sum(stats.P_X))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_ensemble
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the persistent simulation session of the Amaranth FIR filter
+"""
+
+import copy
+import unittest
+import numpy as np
+import pyfda.filterbroker as fb
+from pyfda.fixpoint_widgets.fir_df.fir_df_pyfixp import FIR_DF_pyfixp
+try:
+    from pyfda.fixpoint_widgets.fir_df.fir_df_amaranth import FIR_DF_amaranth
+    HAS_AMARANTH = True
+except ImportError:
+    HAS_AMARANTH = False
+
+
+@unittest.skipUnless(HAS_AMARANTH, "amaranth is not installed")
+class TestFIR_DF_amaranth(unittest.TestCase):
+
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+        fb.fil[0]['ba'] = [[0.1, 0.3, 0.5, 0.3, 0.1], [1]]
+        self.p = {'QCB': {'WI': 0, 'WF': 5, 'ovfl': 'wrap', 'quant': 'floor'},
+                  'QACC': {'WI': 2, 'WF': 4, 'ovfl': 'wrap', 'quant': 'round'},
+                  'QI': {'WI': 1, 'WF': 3, 'ovfl': 'sat', 'quant': 'round'},
+                  'QO': {'WI': 2, 'WF': 3, 'ovfl': 'wrap', 'quant': 'round'}}
+        rng = np.random.default_rng(42)
+        self.x = np.round(rng.uniform(-2, 2, 200) * 8) / 8  # quantized to Q1.3
+
+    def test_frames(self):
+        """
+        Response must not depend on the frame length
+        """
+        dut = FIR_DF_amaranth(self.p)
+        y = dut.fxfilter(self.x)[0]
+        self.assertEqual(len(y), len(self.x))
+        self.assertTrue(np.any(y != 0))
+        dut = FIR_DF_amaranth(self.p)
+        y_f = np.concatenate([dut.fxfilter(self.x[k:k + 37])[0]
+                              for k in range(0, len(self.x), 37)])
+        self.assertTrue(np.array_equal(y, y_f))
+
+    def test_pyfixp(self):
+        """
+        Response must be bit-exact to `FIR_DF_pyfixp` with one sample latency of
+        the output register. With lossless products, the wrap-around accumulator
+        and the output quantizer (truncation, wrap-around or saturation) yield the
+        same results as the single requantization of the sum in the Amaranth filter.
+        """
+        self.p['QACC'] = {'WI': 0, 'WF': 8, 'ovfl': 'wrap', 'quant': 'floor'}
+        x = np.minimum(self.x, 1.875)  # range of the input quantizer
+        for qfrmt in ('qfrac', 'qint'):
+            fb.fil[0]['qfrmt'] = qfrmt
+            x_q = x * 8 if qfrmt == 'qint' else x
+            for ovfl in ('wrap', 'sat'):
+                self.p['QO'] = {'WI': 0, 'WF': 3, 'ovfl': ovfl, 'quant': 'floor'}
+                y = FIR_DF_amaranth(copy.deepcopy(self.p)).fxfilter(x_q)[0]
+                y_ref = FIR_DF_pyfixp(copy.deepcopy(self.p)).fxfilter(x_q)[0]
+                self.assertEqual(y[0], 0)
+                self.assertTrue(np.array_equal(y[1:], y_ref[:-1]))
+                self.assertGreater(len(np.unique(y)), 10)
+
+    def test_session_reuse(self):
+        """
+        `init()` with unchanged settings must reuse the simulator and clear the registers,
+        changed settings must rebuild the simulator
+        """
+        dut = FIR_DF_amaranth(self.p)
+        y = dut.fxfilter(self.x)[0]
+        sim = dut.sim
+        dut.init(self.p)
+        self.assertIs(dut.sim, sim)
+        self.assertTrue(np.array_equal(dut.fxfilter(self.x)[0], y))
+
+        fb.fil[0]['ba'] = [[0.1, 0.3, 0.5, 0.3, 0.2], [1]]
+        dut.init(self.p)
+        self.assertIsNot(dut.sim, sim)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_fir_df_amaranth
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the pyfixp implementation of the direct-form FIR filter
+"""
+
+import unittest
+import numpy as np
+import pyfda.filterbroker as fb
+from pyfda.fixpoint_widgets.fir_df.fir_df_pyfixp import FIR_DF_pyfixp
+from pyfda.tests.pyfixp_harness import PyfixpHarness
+
+
+class TestFIR_DF_pyfixp(PyfixpHarness, unittest.TestCase):
+
+    DUT = FIR_DF_pyfixp
+    BA = [[0.9, -0.7, 0.55, 0.3, -0.2, 0.1, 0.05], [1]]
+    QUANT_BLOCK = ['floor', 'round', 'fix', 'ceil', 'rint', 'none']
+    NO_KERNEL = ('fxfilter_block',)
+
+    def test_block_chunks(self):
+        """
+        Results must not depend on the chunk size of the block processing
+        """
+        p = self.get_p(ovfl='sat', quant='round')
+        y_b, y_l, N_b, N_l = self.run_filters(p, self.x, N_frame=300)
+        FIR_DF_pyfixp.N_BLOCK_MAX, N_block_max = 50, FIR_DF_pyfixp.N_BLOCK_MAX
+        try:
+            y_c, _, N_c, _ = self.run_filters(p, self.x, N_frame=300)
+        finally:
+            FIR_DF_pyfixp.N_BLOCK_MAX = N_block_max
+        self.assertTrue(np.array_equal(y_b, y_c))
+        self.assertEqual(N_b, N_c)
+
+    def test_kernel_ovfl_stats(self):
+        """
+        The integer kernel must yield the same accumulator overflow statistics as
+        the sample loop
+        """
+        with self.patch_kernel():
+            dut_b, dut_l, *_ = self.drive(self.get_p(ovfl='sat', quant='round'), self.x)
+        self.assertGreater(dut_b.Q_acc.ovfl_stats.N_over, 0)
+        self.assert_ovfl_stats_equal(dut_b.Q_acc, dut_l.Q_acc)
+
+    def test_single_tap(self):
+        """
+        Register state must not grow for a filter with a single tap
+        """
+        fb.fil[0]['ba'] = [[0.5], [1]]
+        y_b, y_l, _, _ = self.run_filters(self.get_p(), self.x, N_frame=50)
+        self.assertTrue(np.array_equal(y_b, y_l))
+        self.assertTrue(np.array_equal(y_b, self.x * 0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_fir_df_pyfixp
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the wordlength sweep of fixpoint filters
+"""
+
+import unittest
+import numpy as np
+import scipy.signal as sig
+import pyfda.filterbroker as fb
+from pyfda.libs import pyfda_fix_sweep as sw
+from pyfda.fixpoint_widgets.fir_df.fir_df_pyfixp import FIR_DF_pyfixp
+
+
+class TestFixSweep(unittest.TestCase):
+
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+        fb.fil[0]['ba'] = [list(sig.firwin(21, 0.3)), [1]]
+        self.fxq = {'QCB': {'WI': 0, 'WF': 8, 'ovfl': 'wrap', 'quant': 'round'},
+                    'QACC': {'WI': 2, 'WF': 10, 'ovfl': 'wrap', 'quant': 'floor'},
+                    'QI': {'WI': 0, 'WF': 12, 'ovfl': 'sat', 'quant': 'round'},
+                    'QO': {'WI': 0, 'WF': 12, 'ovfl': 'sat', 'quant': 'round'}}
+        self.x = sw.sweep_stimulus(self.fxq['QI'], N=1000)
+
+    def test_configs(self):
+        """
+        Only the fractional word lengths of the internal quantizers are changed
+        """
+        fxq_list = sw.sweep_configs(self.fxq, dWF=[-9, 0, 2])
+        self.assertEqual([f['QCB']['WF'] for f in fxq_list], [0, 8, 10])
+        self.assertEqual([f['QACC']['WF'] for f in fxq_list], [1, 10, 12])
+        self.assertTrue(all(f['QI'] == self.fxq['QI'] for f in fxq_list))
+        self.assertEqual(self.fxq['QCB']['WF'], 8)  # original dict is unchanged
+
+    def test_sweep(self):
+        """
+        SNR must grow and the maximum error must shrink with the word length,
+        the results must match a single simulation of each configuration
+        """
+        fxq_list = sw.sweep_configs(self.fxq, dWF=[-4, 0, 4])
+        results = sw.fx_sweep(FIR_DF_pyfixp, fxq_list, self.x)
+        SNR = [r['SNR'] for r in results]
+        err_max = [r['err_max'] for r in results]
+        self.assertTrue(SNR[0] < SNR[1] < SNR[2])
+        self.assertTrue(err_max[0] > err_max[1] > err_max[2])
+
+        for fxq, r in zip(fxq_list, results):
+            x_q = np.round(self.x * (1 << 12)) / (1 << 12)
+            y = FIR_DF_pyfixp(fxq).fxfilter(x_q)[0]
+            err = y - sig.lfilter(fb.fil[0]['ba'][0], 1, x_q)
+            self.assertAlmostEqual(r['err_max'], np.max(np.abs(err)))
+
+    def test_overflows(self):
+        """
+        Overflows of the accumulator are counted, the process pool must yield the
+        same results as the sequential simulation
+        """
+        self.fxq['QACC']['WI'] = 0
+        fxq_list = sw.sweep_configs(self.fxq, dWF=[0, 1])
+        fxq_list[1]['QACC']['WI'] = 2
+        # the response to a square wave overshoots near the edges
+        x = 0.95 * np.sign(np.sin(2 * np.pi * 0.02 * np.arange(1000) + 0.1))
+        results = sw.fx_sweep(FIR_DF_pyfixp, fxq_list, x)
+        self.assertGreater(results[0]['N_over'], 0)
+        self.assertEqual(results[0]['N_over'], results[0]['N_over_q']['Q_acc'])
+        self.assertEqual(results[1]['N_over_q']['Q_acc'], 0)
+        # only the data path quantizers are counted
+        self.assertEqual(set(results[0]['N_over_q']), {'Q_I', 'Q_acc', 'Q_O'})
+
+        results_pool = sw.fx_sweep(FIR_DF_pyfixp, fxq_list, x, n_workers=2)
+        for r, r_p in zip(results, results_pool):
+            self.assertEqual(r['SNR'], r_p['SNR'])
+            self.assertEqual(r['N_over_q'], r_p['N_over_q'])
+
+    def test_snapshot(self):
+        """
+        Worker processes only use the snapshot of the filter settings, later
+        changes of the filter dict don't affect the sweep
+        """
+        fxq_list = sw.sweep_configs(self.fxq, dWF=[-2, 0])
+        results = sw.fx_sweep(FIR_DF_pyfixp, fxq_list, self.x)
+        fil = sw.fil_snapshot()
+        self.assertEqual(set(fil), set(sw.FIL_KEYS))
+        fb.fil[0]['ba'] = [list(sig.firwin(11, 0.1)), [1]]
+        results_pool = sw.fx_sweep(FIR_DF_pyfixp, fxq_list, self.x, n_workers=2,
+                                   fil=fil)
+        for r, r_p in zip(results, results_pool):
+            self.assertEqual(r['SNR'], r_p['SNR'])
+            self.assertEqual(r['err_max'], r_p['err_max'])
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_fix_sweep
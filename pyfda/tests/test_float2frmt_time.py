@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Speed comparison of the vectorized formatter `int2frmt()` used by `Fixed.float2frmt()`,
+the element-wise legacy string converters and the cached results of `float2frmt()`
+for coefficient tables, run with `python -m pyfda.tests.test_float2frmt_time`
+"""
+import time
+import logging
+import numpy as np
+
+import pyfda.filterbroker as fb
+import pyfda.libs.pyfda_fix_lib as fx
+
+
+def legacy_frmt(y_int, W, WI, fx_base):
+    """ format integers with the element-wise string converters """
+    y_bin = fx.binary_repr(y_int, W)
+    if fx_base == 'hex':
+        return fx.bin2hex_vec(y_bin, WI)
+    elif fx_base == 'oct':
+        return fx.bin2oct_vec(y_bin, WI)
+    elif WI == W:
+        return y_bin
+    return fx.insert_binary_point(y_bin, WI)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)  # don't report overflows
+    N = 10000  # number of table entries
+    x = np.random.default_rng(0).uniform(-1, 1, N)
+
+    print(f"{'format':>10}{'T_legacy / s':>14}{'T_vec / s':>12}{'T_cache / s':>13}"
+          f"{'speedup':>10}")
+    for qfrmt, fx_base in [('qfrac', 'bin'), ('qint', 'bin'), ('qfrac', 'hex'),
+                           ('qint', 'hex'), ('qfrac', 'oct')]:
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': qfrmt, 'fx_base': fx_base})
+        Q = fx.Fixed({'WI': 0, 'WF': 23, 'ovfl': 'wrap', 'quant': 'round'})
+        W = Q.q_dict['WI'] + Q.q_dict['WF'] + 1
+        WI = W if qfrmt == 'qint' else Q.q_dict['WI']
+        x_q = x * 2 ** Q.q_dict['WF'] if qfrmt == 'qint' else x
+        y_int = np.int64(np.round(Q.fixp(x_q, out_frmt=qfrmt) / Q.LSB))
+        t1 = time.perf_counter()
+        y_l = legacy_frmt(y_int, W, WI, fx_base)
+        t2 = time.perf_counter()
+        y_v = Q.float2frmt(x_q)
+        t3 = time.perf_counter()
+        y_c = Q.float2frmt(x_q)  # served from the cache
+        t4 = time.perf_counter()
+        assert np.array_equal(y_l, y_v) and np.array_equal(y_v, y_c), "Results differ!"
+        print(f"{qfrmt + '/' + fx_base:>10}{t2 - t1:>14.4f}{t3 - t2:>12.4f}"
+              f"{t4 - t3:>13.5f}{(t2 - t1) / (t3 - t2):>10.1f}")
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Speed and accuracy comparison of the frequency response calculated with
+`scipy.signal.freqz()` from the transfer function and with the response engine
+`Freqz_Cache.fil_freqz()` (FFT, sos or zpk method, see `freqz_method()`) for
+long FIR and high order IIR filters on the grid with `N_FFT` points.
+
+The second table compares the specification checks (min. / max. passband gain,
+max. stopband gain) on the uniform grid with `N_FFT` points and on the adaptive
+grid of `freqz_adaptive()` with a dense reference grid.
+Run with `python -m pyfda.tests.test_freqz_time`
+"""
+import time
+import warnings
+import numpy as np
+import scipy.signal as sig
+
+import pyfda.libs.pyfda_sig_lib as pyfda_sig_lib
+from pyfda.libs.pyfda_sig_lib import Freqz_Cache, fil_resp, freqz_adaptive
+
+N_FFT = 2048  # default of params['N_FFT']
+N_RUNS = 5
+
+
+def t_min(fnc):
+    """ Return the result of `fnc()` and the min. execution time of `N_RUNS` runs """
+    T = np.inf
+    for _ in range(N_RUNS):
+        t1 = time.perf_counter()
+        res = fnc()
+        T = min(T, time.perf_counter() - t1)
+    return res, T
+
+
+def spec_check(w, H, F_PB, F_SB):
+    """ Return min. and max. passband gain and max. stopband gain in dB """
+    A = 20 * np.log10(np.abs(H[w <= np.pi]))
+    w = w[w <= np.pi]
+    return (np.min(A[w <= 2 * np.pi * F_PB]), np.max(A[w <= 2 * np.pi * F_PB]),
+            np.max(A[w >= 2 * np.pi * F_SB]))
+
+
+if __name__ == "__main__":
+    warnings.simplefilter('ignore', sig.BadCoefficients)
+    designs = {}
+    for N_taps in [101, 2001, 10001, 100001]:
+        b = sig.firwin(N_taps, 0.1)
+        designs[f"FIR, {N_taps} taps"] = {
+            'ba': [b, np.r_[1, np.zeros(N_taps - 1)]], 'sos': [],
+            'creator': ('ba', 'firwin')}
+    for N in [8, 20, 40]:
+        sos = sig.ellip(N, 0.1, 80, 0.05, output='sos')
+        designs[f"ellip. IIR, order {N}"] = {
+            'ba': sig.sos2tf(sos), 'sos': sos, 'creator': ('sos', 'ellip')}
+        z, p, k = sig.sos2zpk(sos)
+        designs[f"ellip. IIR, order {N}, zpk"] = {
+            'ba': sig.sos2tf(sos), 'sos': [], 'zpk': [z, p, k],
+            'creator': ('zpk', 'ellip')}
+
+    print(f"N_FFT = {N_FFT}\n")
+    print(f"{'design':<28}{'method':>7}{'T_freqz / ms':>14}{'T_engine / ms':>15}"
+          f"{'speedup':>9}{'err_freqz / dB':>16}")
+    for name, fil in designs.items():
+        b, a = fil['ba']
+        (_, H_ba), T_ba = t_min(lambda: sig.freqz(b, a, worN=N_FFT, whole=True))
+        cache = Freqz_Cache()
+        # clear the cache before each run to measure the calculation
+        (_, H), T = t_min(lambda: (cache.clear(), cache.fil_freqz(
+            fil, worN=N_FFT, whole=True))[1])
+        # deviation of the response calculated from the transfer function in the
+        # passband (|H| > -1 dB) from the engine, large for high order IIR filters
+        pb = np.abs(H) > 10**(-1/20)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            err = np.max(np.abs(20 * np.log10(np.abs(H_ba[pb]) / np.abs(H[pb]))))
+        print(f"{name:<28}{cache.method:>7}{T_ba * 1e3:>14.2f}{T * 1e3:>15.2f}"
+              f"{T_ba / T:>9.1f}{err:>16.1e}")
+
+    # ------------------------------------------------------------------------
+    designs = {}
+    for N, F_PB, F_SB in [(8, 0.1, 0.12), (16, 0.01, 0.011)]:
+        sos = sig.ellip(N, 0.1, 80, 2 * F_PB, output='sos')
+        designs[f"ellip. IIR, order {N}"] = {
+            'ba': sig.sos2tf(sos), 'sos': sos, 'zpk': sig.sos2zpk(sos),
+            'F_PB': F_PB, 'F_SB': F_SB}
+    for N_taps, F_PB, F_SB in [(101, 0.1, 0.15), (1001, 0.1, 0.102)]:
+        b = sig.remez(N_taps, [0, F_PB, F_SB, 0.5], [1, 0])
+        designs[f"FIR, {N_taps} taps"] = {
+            'ba': [b, np.r_[1, np.zeros(N_taps - 1)]], 'sos': [],
+            'zpk': sig.tf2zpk(b, 1), 'F_PB': F_PB, 'F_SB': F_SB}
+
+    print(f"\n{'design':<28}{'N_eval':>8}{'T / ms':>8}{'err_PB_min / dB':>17}"
+          f"{'err_PB_max / dB':>17}{'err_SB_max / dB':>17}")
+    for name, fil in designs.items():
+        w_ref = np.linspace(0, np.pi, 1 << 20)
+        spec_ref = spec_check(w_ref, fil_resp(fil, w_ref), fil['F_PB'], fil['F_SB'])
+        w = np.linspace(0, 2 * np.pi, N_FFT, endpoint=False)
+        err = np.subtract(spec_check(w, fil_resp(fil, w), fil['F_PB'], fil['F_SB']),
+                          spec_ref)
+        print(f"{name + ', uniform':<28}{N_FFT:>8}{'':>8}"
+              + "".join(f"{e:>17.2e}" for e in err))
+        # count the evaluations of the adaptive grid
+        N_eval = [0]
+
+        def fil_resp_cnt(fil_dict, w):
+            N_eval[0] += len(w)
+            return fil_resp(fil_dict, w)
+        pyfda_sig_lib.fil_resp = fil_resp_cnt
+        t1 = time.perf_counter()
+        w, H = freqz_adaptive(fil)
+        T = time.perf_counter() - t1
+        pyfda_sig_lib.fil_resp = fil_resp
+        if N_eval[0] == 0:  # FIR filters are evaluated on a uniform FFT grid
+            N_eval[0] = len(w)
+        err = np.subtract(spec_check(w, H, fil['F_PB'], fil['F_SB']), spec_ref)
+        print(f"{name + ', adaptive':<28}{N_eval[0]:>8}{T * 1e3:>8.1f}"
+              + "".join(f"{e:>17.2e}" for e in err))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Speed comparison of the vectorized string parser `Fixed.frmt2float()` and the
+element-wise conversion with `frmt2float_scalar()` for coefficient tables,
+run with `python -m pyfda.tests.test_frmt2float_time`
+"""
+import time
+import logging
+import numpy as np
+
+import pyfda.filterbroker as fb
+from pyfda.libs.pyfda_fix_lib import Fixed
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)  # don't report overflows
+    N = 10000  # number of table entries
+    x = np.random.default_rng(0).uniform(-1, 1, N)
+
+    print(f"{'format':>8}{'T_scalar / s':>14}{'T_vec / s':>12}{'speedup':>10}")
+    for qfrmt, fx_base in [('qfrac', 'dec'), ('qint', 'dec'), ('qfrac', 'bin'),
+                           ('qfrac', 'hex'), ('qint', 'hex'), ('qint', 'oct')]:
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': qfrmt, 'fx_base': fx_base})
+        Q = Fixed({'WI': 0, 'WF': 23, 'ovfl': 'wrap', 'quant': 'round'})
+        table = np.asarray(Q.float2frmt(x)).astype(str)  # formatted strings
+        t1 = time.perf_counter()
+        y_s = Q.frmt2float_vec(table)
+        t2 = time.perf_counter()
+        y_v = Q.frmt2float(table)
+        t3 = time.perf_counter()
+        assert np.array_equal(y_s, y_v), "Results differ!"
+        print(f"{qfrmt + '/' + fx_base:>8}{t2 - t1:>14.4f}{t3 - t2:>12.4f}"
+              f"{(t2 - t1) / (t3 - t2):>10.1f}")
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the pyfixp implementation of the direct-form DF1 IIR filter
+"""
+
+import unittest
+from unittest.mock import patch
+import numpy as np
+from pyfda.libs import pyfda_fix_lib_numba as fxn
+from pyfda.fixpoint_widgets.iir_df1.iir_df1_pyfixp import IIR_DF1_pyfixp
+from pyfda.tests.pyfixp_harness import PyfixpHarness
+
+
+class TestIIR_DF1_pyfixp(PyfixpHarness, unittest.TestCase):
+
+    DUT = IIR_DF1_pyfixp
+    BA = [[0.2, 0.35, 0.4, 0.35, 0.2], [1, -1.3, 1.05, -0.45, 0.1]]
+    Q_COEFFS = {'QCB': {'WI': 0, 'WF': 7, 'ovfl': 'wrap', 'quant': 'round'},
+                'QCA': {'WI': 1, 'WF': 6, 'ovfl': 'wrap', 'quant': 'round'}}
+    WI_ACC = 3
+    OVFL_O = 'wrap'
+    STATE = ('zi_a', 'zi_b')
+
+    def ovfl_counts(self, dut):
+        return tuple(n for Q in (dut.Q_acc, dut.Q_O)
+                     for n in (Q.N_over, Q.q_dict['N_over'], Q.N))
+
+    def test_ovfl_stats(self):
+        """
+        Overflow statistics of the accumulator and the output quantizer must be
+        identical for block engine, integer kernel and sample loop when the filter
+        is driven into output overflow
+        """
+        p = self.get_p(ovfl='sat', ovfl_o='wrap')
+        p['QO']['WI'] = 0
+        for backend in ['numpy', 'numba']:
+            with patch.object(fxn, 'fx_backend', return_value=backend):
+                dut_b, dut_l, *_ = self.drive(p, self.x)
+            self.assert_ovfl_stats_equal(dut_b.Q_acc, dut_l.Q_acc, msg=backend)
+            self.assert_ovfl_stats_equal(dut_b.Q_O, dut_l.Q_O, msg=backend)
+            self.assertGreater(dut_b.Q_O.ovfl_stats.N_pos, 0)
+            self.assertGreater(dut_b.Q_O.ovfl_stats.N_neg, 0)
+            self.assertEqual(dut_b.Q_O.ovfl_stats.N_over, dut_b.Q_O.N_over)
+
+    def test_block_fallback(self):
+        """
+        Settings not supported by the block engine must fall back to the sample loop
+        """
+        dut = IIR_DF1_pyfixp(self.get_p(quant='none'))
+        self.assertIsNone(dut.fxfilter_block(self.x))
+        dut = IIR_DF1_pyfixp(self.get_p(ovfl_o='none'))
+        self.assertIsNone(dut.fxfilter_block(self.x))
+        dut = IIR_DF1_pyfixp(self.get_p())
+        self.assertIsNone(dut.fxfilter_block(self.x + 0.01))  # off-grid input
+        self.assertIsNotNone(dut.fxfilter_block(self.x))
+
+        y_b, y_l, N_b, N_l = self.run_filters(self.get_p(ovfl_o='none'), self.x)
+        self.assertTrue(np.array_equal(y_b, y_l))
+        self.assertEqual(N_b, N_l)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_iir_df1_pyfixp
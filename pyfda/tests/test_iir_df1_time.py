@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Speed comparison of the block engine and the sample loop of `IIR_DF1_pyfixp`,
+run with `python -m pyfda.tests.test_iir_df1_time`
+"""
+import time
+import logging
+import numpy as np
+import scipy.signal as sig
+
+import pyfda.filterbroker as fb
+from pyfda.fixpoint_widgets.iir_df1.iir_df1_pyfixp import IIR_DF1_pyfixp
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)  # don't report overflows
+    N = 20000  # number of samples
+    N_frame = 5000  # frame length
+    fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+    p = fb.fil[0]['fxq']  # default quantizer settings
+    x = np.round(np.random.default_rng(0).uniform(-1, 1, N) * (1 << 15)) / (1 << 15)
+
+    print(f"{'order':>6}{'T_loop / s':>12}{'T_block / s':>12}{'speedup':>10}")
+    for order in [2, 4, 8, 16]:
+        b, a = sig.ellip(order, 0.1, 40, 0.2)
+        fb.fil[0]['ba'] = [b / 2 ** np.ceil(np.log2(np.max(np.abs(b)) + 1e-9)), a]
+        T = {}
+        for block_mode in [False, True]:
+            dut = IIR_DF1_pyfixp(p, block_mode=block_mode)
+            t1 = time.perf_counter()
+            y = [dut.fxfilter(x[k:k + N_frame])[0] for k in range(0, N, N_frame)]
+            T[block_mode] = time.perf_counter() - t1
+            if block_mode:
+                assert np.array_equal(np.concatenate(y), y_loop), "Results differ!"
+            else:
+                y_loop = np.concatenate(y)
+        print(f"{order:>6}{T[False]:>12.4f}{T[True]:>12.4f}{T[False] / T[True]:>10.1f}")
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Speed comparison of FIR filtering with `lfilter()`, `sosfilt()` and overlap-save
+FFT convolution (`OLS_Filter`) for the frame-wise transient simulation, used to
+set the crossover threshold `pyfda_sig_lib.N_TAPS_OLS`.
+Run with `python -m pyfda.tests.test_ols_time`
+"""
+import time
+import numpy as np
+import scipy.signal as sig
+
+from pyfda.libs.pyfda_sig_lib import OLS_Filter, N_TAPS_OLS
+
+if __name__ == "__main__":
+    N = 1 << 18  # number of samples
+    N_frame = 1 << 14  # frame length
+    x = np.random.default_rng(0).standard_normal(N)
+    frames = [slice(k, k + N_frame) for k in range(0, N, N_frame)]
+
+    print(f"N_TAPS_OLS = {N_TAPS_OLS}\n")
+    print(f"{'N_taps':>7}{'N_fft':>8}{'T_lfilt / ms':>14}{'T_sos / ms':>12}"
+          f"{'T_ols / ms':>12}{'speedup':>9}{'err_max':>10}")
+    for N_taps in [8, 16, 32, 48, 64, 96, 128, 256, 1024, 4000]:
+        b = sig.firwin(N_taps, 0.2)
+        T = {}
+        # lfilter
+        t1 = time.perf_counter()
+        zi = np.zeros(N_taps - 1)
+        y_lf = np.empty(N)
+        for frm in frames:
+            y_lf[frm], zi = sig.lfilter(b, 1, x[frm], zi=zi)
+        T['lfilt'] = time.perf_counter() - t1
+        # sosfilt, the conversion of long FIR filters to sos takes too long
+        if N_taps <= 256:
+            sos = sig.tf2sos(b, np.r_[1, np.zeros(N_taps - 1)])
+            t1 = time.perf_counter()
+            zi = np.zeros((sos.shape[0], 2))
+            for frm in frames:
+                _, zi = sig.sosfilt(sos, x[frm], zi=zi)
+            T['sos'] = time.perf_counter() - t1
+        else:
+            T['sos'] = np.nan
+        # overlap-save
+        t1 = time.perf_counter()
+        ols = OLS_Filter(b)
+        y_ols = np.concatenate([ols.filter(x[frm]) for frm in frames])
+        T['ols'] = time.perf_counter() - t1
+        err = np.max(np.abs(y_ols - y_lf))
+        print(f"{N_taps:>7}{ols.N_fft:>8}{T['lfilt'] * 1e3:>14.2f}{T['sos'] * 1e3:>12.2f}"
+              f"{T['ols'] * 1e3:>12.2f}{T['lfilt'] / T['ols']:>9.1f}{err:>10.1e}")
@@ -11,6 +11,7 @@ Test suite for the pyfda_fix_lib classes and methods
 """
 
 import unittest
+from unittest.mock import patch, Mock
 import numpy as np
 import pyfda.filterbroker as fb
 from pyfda.libs import pyfda_fix_lib as fix_lib
@@ -529,6 +530,460 @@ class TestSequenceFunctions(unittest.TestCase):
 #==============================================================================
 
 
+class TestQuantPlan(unittest.TestCase):
+    """
+    Test the quantization plan compiled by `Fixed.set_qdict()`
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+        self.myQ = fix_lib.Fixed({'WI': 0, 'WF': 3, 'ovfl': 'sat', 'quant': 'round'})
+
+    def test_fast_path(self):
+        """
+        Float arrays and scalars take the fast path, everything else the slow path
+        """
+        N_fast, N_slow = self.myQ.N_fast, self.myQ.N_slow
+        self.myQ.fixp(np.array([0.1, 0.7]))
+        self.myQ.fixp(0.3)
+        self.myQ.fixp(np.float64(0.3))
+        self.assertEqual(self.myQ.N_fast - N_fast, 3)
+        self.myQ.fixp([0.1, 0.7])
+        self.myQ.fixp(np.array(['0.1', '0.7']))
+        self.myQ.fixp(1)
+        self.assertEqual(self.myQ.N_slow - N_slow, 3)
+        self.assertEqual(self.myQ.N_fast - N_fast, 3)
+
+    def test_fast_slow_equal(self):
+        """
+        Fast and slow path yield identical results and overflow counts
+        """
+        y_list = [-1.1, -1.0, -0.5, -0.0625, 0, 0.0625, 0.5, 0.9, 0.99, 1.0, 1.1, 3.3]
+        for quant in ['floor', 'round', 'fix', 'ceil', 'rint', 'none']:
+            for ovfl in ['wrap', 'sat', 'none']:
+                self.myQ.set_qdict({'quant': quant, 'ovfl': ovfl})
+                self.myQ.resetN()
+                yq_fast = self.myQ.fixp(np.array(y_list))
+                N_over_fast = self.myQ.q_dict['N_over']
+                yq_scalar = [self.myQ.fixp(y) for y in y_list]
+                self.myQ.resetN()
+                yq_slow = self.myQ.fixp(y_list)  # list, takes the slow path
+                self.assertListEqual(list(yq_fast), list(yq_slow))
+                self.assertListEqual(list(yq_fast), yq_scalar)
+                self.assertEqual(N_over_fast, self.myQ.q_dict['N_over'])
+
+    def test_recompile(self):
+        """
+        The plan is updated by `set_qdict()`
+        """
+        self.assertEqual(self.myQ.fixp(1.5), 0.875)
+        self.myQ.set_qdict({'ovfl': 'wrap'})
+        self.assertEqual(self.myQ.fixp(1.5), -0.5)
+        self.myQ.set_qdict({'WI': 1})
+        self.assertEqual(self.myQ.fixp(1.5), 1.5)
+
+
+class TestIntBackend(unittest.TestCase):
+    """
+    Test the int64 backend of `Fixed()` against the float64 backend
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qint', 'fx_base': 'dec'})
+        rng = np.random.default_rng(1)
+        self.y = rng.uniform(-300, 300, 500)
+        # add some values at the borders of the wrap-around range and some ties
+        self.y[:10] = [-8, -24, -40, 7.5, 8, -8.5, 2.5, 3.5, -2.5, 0]
+        self.x_i = rng.integers(-2**13, 2**13, 500)
+
+    def test_auto_select(self):
+        Q = fix_lib.Fixed({'WI': 3, 'WF': 0})
+        self.assertTrue(Q.int_backend_active())
+        fb.fil[0]['qfrmt'] = 'qfrac'
+        self.assertFalse(Q.int_backend_active())
+        Q.int_backend = True
+        self.assertTrue(Q.int_backend_active())
+        Q.set_qdict({'quant': 'none'})
+        self.assertFalse(Q.int_backend_active())
+
+    def test_fixp_int_float(self):
+        """
+        Both backends must yield identical results and overflow counts
+        """
+        for quant in ['floor', 'round', 'fix', 'ceil', 'rint']:
+            for ovfl in ['wrap', 'sat', 'none']:
+                q_dict = {'WI': 2, 'WF': 1, 'quant': quant, 'ovfl': ovfl}
+                Q_f = fix_lib.Fixed(q_dict.copy(), int_backend=False)
+                Q_i = fix_lib.Fixed(q_dict.copy(), int_backend=True)
+                for in_frmt in ['qint', 'qfrac']:
+                    for out_frmt in ['qint', 'qfrac']:
+                        yq_f = Q_f.fixp(self.y, in_frmt=in_frmt, out_frmt=out_frmt)
+                        yq_i = Q_i.fixp(self.y, in_frmt=in_frmt, out_frmt=out_frmt)
+                        self.assertTrue(np.array_equal(yq_f, yq_i))
+                        self.assertEqual(Q_f.N_over, Q_i.N_over)
+
+                QI = fix_lib.Fixed({'WI': 4, 'WF': 9})
+                yq_f = Q_f.requant(self.x_i.astype(float), QI)
+                yq_i = Q_i.requant(self.x_i, QI)
+                self.assertEqual(yq_i.dtype, np.int64)
+                self.assertTrue(np.array_equal(yq_f, yq_i))
+                self.assertEqual(Q_f.N_over, Q_i.N_over)
+
+    def test_wrap(self):
+        """
+        Two's complement wrap-around for W = 4 bits
+        """
+        Q = fix_lib.Fixed({'WI': 3, 'WF': 0, 'quant': 'floor', 'ovfl': 'wrap'})
+        y = [-40, -24, -9, -8, 7, 8, 24]
+        yq_goal = [-8, -8, 7, -8, 7, -8, -8]
+        self.assertListEqual(list(Q.fixp(np.array(y), in_frmt='qint', out_frmt='qint')),
+                             yq_goal)
+        Q.int_backend = False
+        self.assertListEqual(list(Q.fixp(y, in_frmt='qint', out_frmt='qint')), yq_goal)
+
+    def test_int_62_bits(self):
+        """
+        Integer arrays are quantized exactly up to 62 bits
+        """
+        Q = fix_lib.Fixed({'WI': 40, 'WF': 21, 'quant': 'floor', 'ovfl': 'wrap'})
+        x = np.array([2**61 - 1, 2**61, -2**61, -2**61 - 1, 12345678901234567])
+        yq = Q.fixp(x, in_frmt='qint', out_frmt='qint')
+        self.assertListEqual(list(yq), [2**61 - 1, -2**61, -2**61, 2**61 - 1,
+                                        12345678901234567])
+        self.assertEqual(Q.N_over, 2)
+
+
+class TestFrmt2FloatArr(unittest.TestCase):
+    """
+    Test the vectorized string parser of `Fixed.frmt2float()`
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+
+    def compare(self, y_list, q_dict):
+        """
+        The vectorized parser must yield the same values and overflow counts as
+        the scalar parser
+        """
+        Q = fix_lib.Fixed(q_dict)
+        y_s = [Q.frmt2float_scalar(y) for y in y_list]
+        N_over = Q.N_over
+        Q.resetN()
+        y_v = Q.frmt2float(np.array(y_list).reshape(2, -1))
+        self.assertEqual(y_v.shape, (2, len(y_list) // 2))
+        self.assertListEqual(list(y_v.ravel()), y_s, msg=fb.fil[0]['fx_base'])
+        self.assertEqual(Q.N_over, N_over, msg=fb.fil[0]['fx_base'])
+
+    def test_formats(self):
+        """
+        Well-formed, malformed and complex strings in all number formats
+        """
+        y_dict = {
+            'dec': ['0.5', '-0.25', ' 1,5 ', '1e-3', '-2.5E1', '', '7', '1.2.3',
+                    '-', '0.1j', '3+x', '.75'],
+            'bin': ['0.1', '1.01', '-0.11', '110.1', '1', '11111111111', '',
+                    '1.1.1', '-', '0.1j', '01,1', '2.1'],
+            'oct': ['0.4', '7.7', '-0.2', '17.1', '0', '777777777', '', '-.4',
+                    '8', '12 3', '0.1j', '1-2'],
+            'hex': ['0.8', 'F.F', '-0.4', 'a.B', '0', 'FFFFFFFFFFFFFFFFFFFF', '',
+                    '-.c', 'g', '1 2', '0.1j', '.1-2']}
+        for fx_base, y_list in y_dict.items():
+            fb.fil[0]['fx_base'] = fx_base
+            for qfrmt in ['qfrac', 'qint']:
+                fb.fil[0]['qfrmt'] = qfrmt
+                for ovfl in ['sat', 'wrap']:
+                    self.compare(y_list, {'WI': 2, 'WF': 3, 'ovfl': ovfl,
+                                          'quant': 'round'})
+
+    def test_round_trip(self):
+        """
+        Formatted tables are converted back to the quantized values
+        """
+        x = np.random.default_rng(0).uniform(-1, 1, 1000)
+        for fx_base in ['dec', 'bin', 'oct', 'hex']:
+            fb.fil[0]['fx_base'] = fx_base
+            Q = fix_lib.Fixed({'WI': 0, 'WF': 15, 'ovfl': 'wrap', 'quant': 'floor'})
+            table = np.asarray(Q.float2frmt(x)).astype(str)
+            self.assertTrue(np.array_equal(Q.frmt2float(table), Q.fixp(x)))
+
+
+class TestFloat2FrmtArr(unittest.TestCase):
+    """
+    Test the vectorized formatter `int2frmt()` and the cache of `Fixed.float2frmt()`
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'bin'})
+
+    def test_int2frmt(self):
+        """
+        Results must be identical to the legacy string converters
+        """
+        rng = np.random.default_rng(0)
+        for W in [1, 2, 5, 8, 13, 24, 33]:
+            y = rng.integers(-(1 << (W - 1)), 1 << (W - 1), 100)
+            y_bin = fix_lib.binary_repr(y, W)
+            for WI in [0, 1, W // 2, W - 1, W]:
+                self.assertTrue(np.array_equal(fix_lib.int2frmt(y, W, WI, 'hex'),
+                                               fix_lib.bin2hex_vec(y_bin, WI)))
+                self.assertTrue(np.array_equal(fix_lib.int2frmt(y, W, WI, 'oct'),
+                                               fix_lib.bin2oct_vec(y_bin, WI)))
+                y_bin_pt = y_bin if WI == W else fix_lib.insert_binary_point(y_bin, WI)
+                self.assertTrue(np.array_equal(fix_lib.int2frmt(y, W, WI, 'bin'),
+                                               y_bin_pt))
+        self.assertListEqual(list(fix_lib.int2frmt([-3, 5], 5, 2, 'hex')), ['7.4', '1.4'])
+        # values outside the range of W bits cannot be formatted
+        self.assertIsNone(fix_lib.int2frmt([8], 4, 0, 'bin'))
+
+    def test_cache(self):
+        """
+        Cached results must be returned with the same overflow flags and counters,
+        the cache is cleared when the quantizer settings change
+        """
+        Q = fix_lib.Fixed({'WI': 0, 'WF': 3, 'ovfl': 'sat', 'quant': 'round'},
+                          track_flags=True)
+        x = np.array([-1.5, -0.3, 0.2, 0.9, 1.2])
+        y = Q.float2frmt(x)
+        ovr_flag = Q.ovr_flag.copy()
+        Q.resetN()
+        y[0] = '0.000'  # modifying the result must not affect the cache
+        y_c = Q.float2frmt(x)
+        self.assertEqual(Q.N_cache_hits, 1)
+        self.assertListEqual(list(y_c), ['1.000', '1.110', '0.010', '0.111', '0.111'])
+        self.assertTrue(np.array_equal(Q.ovr_flag, ovr_flag))
+        self.assertEqual(Q.N_over, 2)
+        self.assertEqual(Q.q_dict['N_over'], 2)
+        Q.set_qdict({'WF': 4})
+        self.assertEqual(len(Q.frmt_cache), 0)
+        self.assertEqual(Q.float2frmt(x)[1], '1.1011')
+        self.assertEqual(Q.N_cache_hits, 1)
+
+
+class TestOvflStats(unittest.TestCase):
+    """
+    Test the streaming overflow statistics of `Fixed()`
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+
+    def test_stream(self):
+        """
+        Statistics over several frames must match the statistics of the whole signal
+        """
+        x = np.random.default_rng(1).uniform(-1.2, 1.2, 5000)
+        x[:700] *= 0.5  # no overflows at the beginning
+        for int_backend in [False, True]:
+            Q = fix_lib.Fixed({'WI': 0, 'WF': 7, 'ovfl': 'sat', 'quant': 'floor'},
+                              int_backend=int_backend)
+            for k in range(0, len(x), 333):
+                Q.fixp(x[k:k + 333])
+            Q.fixp(float(x[0]))  # scalar without overflow
+            Q.fixp(1.5)  # scalar with overflow
+            over = np.concatenate((x, [x[0], 1.5]))
+            over_pos, over_neg = over >= 1, over < -1
+            stats = Q.ovfl_stats
+            self.assertEqual(stats.N, len(over))
+            self.assertEqual(stats.N_pos, np.count_nonzero(over_pos))
+            self.assertEqual(stats.N_neg, np.count_nonzero(over_neg))
+            self.assertEqual(stats.N_over, Q.N_over)
+            idx = np.flatnonzero(over_pos | over_neg)
+            self.assertEqual((stats.idx_first, stats.idx_last), (idx[0], idx[-1]))
+            n, density = stats.density()
+            self.assertEqual(stats.bin_size, 32)  # smallest power of 2 for 5002 samples
+            self.assertTrue(np.array_equal(n, np.arange(0, len(over), 32)))
+            counts = np.add.reduceat((over_pos | over_neg).astype(int), n)
+            self.assertTrue(np.allclose(density * np.diff(np.append(n, len(over))),
+                                        counts))
+            self.assertEqual(Q.ovr_flag, 1)  # flag of last scalar
+            Q.resetN()
+            self.assertEqual((stats.N, stats.N_over, stats.idx_first), (0, 0, -1))
+
+    def test_flags(self):
+        """
+        Arrays of overflow flags are only calculated on request
+        """
+        x = np.array([-1.5, 0.5, 1.5])
+        Q = fix_lib.Fixed({'WI': 0, 'WF': 3, 'ovfl': 'wrap', 'quant': 'round'})
+        Q.fixp(x)
+        self.assertEqual(Q.ovr_flag, 0)
+        Q.track_flags = True
+        Q.fixp(x)
+        self.assertListEqual(list(Q.ovr_flag), [-1, 0, 1])
+
+
+class TestCSD(unittest.TestCase):
+    """
+    Test the vectorized CSD encoder and decoder
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'csd'})
+
+    def test_naf(self):
+        """
+        CSD digits must represent the integers without adjacent nonzero digits
+        """
+        y = np.arange(-1000, 1001)
+        D = fix_lib.csd_digits(y)
+        self.assertTrue(np.array_equal(D @ (1 << np.arange(D.shape[1] - 1, -1, -1)), y))
+        self.assertFalse(np.any((D[:, 1:] != 0) & (D[:, :-1] != 0)))
+        n, n_total = fix_lib.csd_nonzero(y)
+        self.assertTrue(np.array_equal(n, np.count_nonzero(D, axis=1)))
+        self.assertEqual(n_total, np.count_nonzero(D))
+        self.assertListEqual(list(fix_lib.csd_nonzero([7, -6, 0, 1023])[0]), [2, 2, 0, 2])
+
+    def test_dec2csd_arr(self):
+        """
+        Strings must be identical to `dec2csd()` except for fractional values in
+        the range 1/3 < |x| < 2/3 which are converted incorrectly by `dec2csd()`
+        """
+        for WF in [0, 1, 4, 9]:
+            y = np.arange(-700, 700) / 2 ** WF
+            y_str = fix_lib.dec2csd_arr(y, WF)
+            self.assertTrue(np.array_equal(fix_lib.csd2dec_arr(y_str), y))
+            legacy = (np.abs(y) <= 1/3) | (np.abs(y) >= 2/3)
+            self.assertTrue(np.array_equal(
+                y_str[legacy], fix_lib.dec2csd_vec(y[legacy], WF).astype(str)))
+        self.assertEqual(fix_lib.dec2csd_arr(0.5, 1), '0.+')
+        self.assertListEqual(list(fix_lib.dec2csd_arr([0, -6, 3.5], 1)),
+                             ['0', '-0+0.0', '+00.-'])
+
+    def test_frmt2float(self):
+        """
+        The vectorized parser must yield the same results as the scalar parser
+        """
+        Q = fix_lib.Fixed({'WI': 2, 'WF': 5, 'ovfl': 'wrap', 'quant': 'round'})
+        x = np.random.default_rng(0).uniform(-5, 5, 200)
+        y_list = list(Q.float2frmt(x)) + ['+0-.0+', ' +0- ', '', '.', '+|0',
+                                           '+.0.1', '-0+0+0+0+0+0']
+        y_s = [Q.frmt2float_scalar(y) for y in y_list]
+        self.assertListEqual(list(Q.frmt2float(np.array(y_list))), y_s)
+
+
+def _simulate_dsm_1st(u, ntf, x0=0.):
+    """
+    First-order delta-sigma modulator with the interface of
+    `deltasigma.simulateDSM()`, used instead of the optional module
+    """
+    x = float(np.atleast_1d(x0)[0])
+    v = np.zeros(len(u))
+    xn = np.zeros((1, len(u)))
+    for k, u_k in enumerate(u):
+        v[k] = 1. if x >= 0 else -1.
+        x += u_k - v[k]
+        xn[0, k] = x
+    return v, xn, None, None
+
+
+@patch.object(fix_lib, 'DS', True)
+@patch.object(fix_lib, 'simulateDSM', _simulate_dsm_1st, create=True)
+class TestDSM(unittest.TestCase):
+    """
+    Test delta-sigma modulation with the DSM quantizer object
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'dec'})
+        fix_lib._NTF_CACHE.clear()
+        self.x = 0.5 * np.sin(2 * np.pi * 0.01 * np.arange(200))
+
+    def test_ntf_cache(self):
+        """
+        The NTF is synthesized only once per parameter set
+        """
+        ntf = Mock(side_effect=lambda order, osr, opt: (order, osr, opt))
+        with patch.object(fix_lib, 'synthesizeNTF', ntf, create=True):
+            Q = fix_lib.Fixed({'WI': 0, 'WF': 0, 'quant': 'dsm', 'ovfl': 'none'})
+            for k in range(5):
+                Q.fixp(self.x)
+            fix_lib.Fixed(Q.q_dict.copy()).fixp(self.x)
+            self.assertEqual(ntf.call_count, 1)
+            self.assertEqual(Q.dsm.ntf, (3, 64, 1))
+            Q.set_qdict({'dsm_order': 5, 'dsm_osr': 32})
+            Q.fixp(self.x)
+            self.assertEqual(ntf.call_count, 2)
+            self.assertEqual(Q.dsm.ntf, (5, 32, 1))
+
+    def test_frames(self):
+        """
+        Frame-wise modulation yields the same results as modulation in one pass
+        """
+        with patch.object(fix_lib, 'synthesizeNTF', Mock(), create=True):
+            q_dict = {'WI': 0, 'WF': 0, 'quant': 'dsm', 'ovfl': 'none'}
+            yq = fix_lib.Fixed(q_dict.copy()).fixp(self.x)
+            Q = fix_lib.Fixed(q_dict.copy())
+            yq_frames = np.concatenate([Q.fixp(self.x[k:k + 32])
+                                        for k in range(0, len(self.x), 32)])
+            self.assertTrue(np.array_equal(yq, yq_frames))
+            self.assertTrue(set(yq) == {0, 1})
+            Q.dsm.reset()
+            self.assertTrue(np.array_equal(yq[:32], Q.fixp(self.x[:32])))
+
+    def test_reset(self):
+        """
+        `resetN()` and changed modulator parameters reset the modulator state,
+        repeated runs and coefficient quantization yield identical results
+        """
+        with patch.object(fix_lib, 'synthesizeNTF', Mock(), create=True):
+            Q = fix_lib.Fixed({'WI': 0, 'WF': 0, 'quant': 'dsm', 'ovfl': 'none'})
+            y1 = Q.fixp(self.x[:37])
+            Q.resetN()
+            self.assertTrue(np.array_equal(y1, Q.fixp(self.x[:37])))
+            # state is kept with `dsm=False`
+            y2 = Q.fixp(self.x[37:74])
+            Q.resetN()
+            Q.fixp(self.x[:37])
+            Q.resetN(dsm=False)
+            self.assertTrue(np.array_equal(y2, Q.fixp(self.x[37:74])))
+            Q.set_qdict({'dsm_order': 5})
+            self.assertIsNone(Q.dsm)
+            Q.set_qdict({'dsm_order': 3})
+            self.assertTrue(np.array_equal(y1, Q.fixp(self.x[:37])))
+            b = self.x[3:20]
+            self.assertTrue(np.array_equal(fix_lib.quant_coeffs(b, Q),
+                                           fix_lib.quant_coeffs(b, Q)))
+
+
+class TestQuantCoeffsCache(unittest.TestCase):
+    """
+    Test the LRU cache of `quant_coeffs()`
+    """
+    def setUp(self):
+        fb.fil[0].update({'fx_sim': True, 'qfrmt': 'qfrac', 'fx_base': 'hex'})
+        fix_lib.quant_coeffs_cache_clear()
+
+    def test_cache(self):
+        """
+        Cached results must be read-only, identical to the uncached results and
+        restore the overflow counters
+        """
+        b = np.array([0.9, -1.3, 0.55, 1.2, -0.2])
+        Q = fix_lib.Fixed({'WI': 0, 'WF': 7, 'ovfl': 'sat', 'quant': 'round'})
+        bq = fix_lib.quant_coeffs(b, Q)
+        self.assertEqual(fix_lib.quant_coeffs_cache_info()['misses'], 1)
+        self.assertFalse(bq.flags.writeable)
+        self.assertEqual(fb.fil[0]['fx_base'], 'hex')
+        N_over = Q.N_over
+        self.assertEqual(N_over, 2)
+        Q.fixp(0)  # change counters
+        bq_c = fix_lib.quant_coeffs(b.copy(), Q)
+        self.assertIs(bq_c, bq)
+        self.assertEqual((Q.N, Q.N_over, Q.q_dict['N_over']), (len(b), N_over, N_over))
+        self.assertEqual(Q.ovfl_stats.N_over, N_over)
+        self.assertEqual(fix_lib.quant_coeffs_cache_info()['hits'], 1)
+        # different settings, format or coefficients must not hit the cache
+        Q.set_qdict({'WF': 5})
+        self.assertFalse(np.array_equal(fix_lib.quant_coeffs(b, Q), bq))
+        self.assertTrue(np.array_equal(fix_lib.quant_coeffs(b, Q, out_frmt='qint'),
+                                       np.round(fix_lib.quant_coeffs(b, Q) * 32)))
+        b[0] = 0.8
+        fix_lib.quant_coeffs(b, Q, recursive=True)
+        self.assertEqual(fix_lib.quant_coeffs_cache_info()['hits'], 2)
+        self.assertEqual(fix_lib.quant_coeffs_cache_info()['misses'], 4)
+        # least recently used entries are evicted
+        with patch.object(fix_lib, 'QUANT_COEFFS_CACHE_SIZE', 2):
+            for k in range(4):
+                fix_lib.quant_coeffs(b + k, Q)
+        self.assertEqual(fix_lib.quant_coeffs_cache_info()['size'], 2)
+        fix_lib.quant_coeffs_cache_clear()
+        self.assertEqual(fix_lib.quant_coeffs_cache_info()['misses'], 0)
+
+
 if __name__=='__main__':
     unittest.main()
 
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test suite for the signal processing library pyfda_sig_lib
+"""
+import unittest
+import numpy as np
+import scipy.signal as sig
+
+from pyfda.libs.pyfda_sig_lib import (
+    Freqz_Cache, OLS_Filter, STFT_Stream, decimate_axis, freq_range, freqz_adaptive,
+    freqz_fft, mag_clip, minmax_decim, sosfreqz_fft, surface_grid, zpk_mag_dB)
+
+
+class TestOLS_Filter(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.x = self.rng.standard_normal(10007)
+
+    def filter_frames(self, ols, x, N_frame):
+        return np.concatenate(
+            [ols.filter(x[k:k + N_frame]) for k in range(0, len(x), N_frame)])
+
+    def test_lfilter(self):
+        """
+        Frame-wise filtering yields the same result as `lfilter()` for various
+        filter lengths, block lengths and frame lengths
+        """
+        for N_taps in [1, 2, 7, 128, 1000]:
+            b = self.rng.standard_normal(N_taps)
+            y_ref = sig.lfilter(b, 1, self.x)
+            for N_fft in [None, N_taps, 2 * N_taps + 3]:
+                for N_frame in [7, 100, 1024, 20000]:
+                    ols = OLS_Filter(b, N_fft)
+                    y = self.filter_frames(ols, self.x, N_frame)
+                    self.assertEqual(y.dtype, float)
+                    self.assertTrue(np.allclose(y, y_ref, rtol=0, atol=1e-10),
+                                    msg=f"N_taps={N_taps}, N_fft={N_fft}, N_frame={N_frame}")
+
+    def test_complex(self):
+        """
+        Complex coefficients and signals, also switching from real to complex
+        frames
+        """
+        b = self.rng.standard_normal(200) + 1j * self.rng.standard_normal(200)
+        self.assertTrue(np.allclose(self.filter_frames(OLS_Filter(b), self.x, 999),
+                                    sig.lfilter(b, 1, self.x)))
+        b = b.real
+        x = self.x + 1j * np.r_[np.zeros(5000), self.rng.standard_normal(5007)]
+        ols = OLS_Filter(b)
+        y = np.concatenate([ols.filter(x[:5000].real), ols.filter(x[5000:])])
+        self.assertTrue(np.allclose(y, sig.lfilter(b, 1, x)))
+
+    def test_fft_len(self):
+        """
+        Block length is a fast FFT length much larger than the filter, state is
+        reset and invalid block lengths are rejected
+        """
+        for N_taps in [1, 100, 4000]:
+            L = OLS_Filter.fft_len(N_taps)
+            self.assertGreaterEqual(L, 2 * N_taps)
+            self.assertFalse(L & 1 and L % 3 and L % 5)
+        ols = OLS_Filter(np.ones(10))
+        ols.filter(np.ones(100))
+        ols.reset()
+        self.assertTrue(np.allclose(ols.filter(np.ones(10)), np.arange(1, 11)))
+        self.assertEqual(len(ols.filter([])), 0)
+        with self.assertRaises(ValueError):
+            OLS_Filter(np.ones(10), N_fft=9)
+
+
+class TestMinmaxDecim(unittest.TestCase):
+
+    def test_minmax_decim(self):
+        """
+        Min. and max. of each bucket are returned in ascending order, also for a
+        shorter last bucket and for signals shorter than the number of buckets
+        """
+        y = np.random.default_rng(0).standard_normal(1003)
+        idx_min, idx_max = minmax_decim(y, 100)
+        L = 11  # ceil(1003 / 100)
+        self.assertEqual(len(idx_min), 92)  # 91 full buckets + 2 remaining samples
+        for k, (i_min, i_max) in enumerate(zip(idx_min, idx_max)):
+            self.assertEqual(y[i_min], np.min(y[k * L:(k + 1) * L]))
+            self.assertEqual(y[i_max], np.max(y[k * L:(k + 1) * L]))
+        self.assertTrue(np.all(np.diff(idx_min) > 0) and np.all(np.diff(idx_max) > 0))
+        self.assertEqual(y[idx_max].max(), y.max())
+        idx_min, idx_max = minmax_decim(y[:10], 100)
+        self.assertTrue(np.array_equal(idx_min, np.arange(10)))
+        self.assertTrue(np.array_equal(idx_max, np.arange(10)))
+
+
+class TestSTFT_Stream(unittest.TestCase):
+
+    def test_spectrogram(self):
+        """
+        Frame-wise STFT yields the same results as `scipy.signal.spectrogram()`
+        for real and complex signals, all modes and scalings
+        """
+        rng = np.random.default_rng(0)
+        x_r = rng.standard_normal(2003)
+        for x in (x_r, x_r + 1j * rng.standard_normal(2003)):
+            for N_fft, N_ovlp in [(64, 32), (63, 0), (16, 15)]:
+                win = sig.get_window('hann', N_fft)
+                stft = STFT_Stream(win, N_ovlp, len(x))
+                for k in range(0, len(x), 300):
+                    stft.add(x[k:k + 300])
+                self.assertEqual(stft.N_cols, len(stft.S))
+                for mode in ['psd', 'magnitude', 'angle', 'phase', 'complex']:
+                    for scaling in ['density', 'spectrum']:
+                        f, t, Sxx = sig.spectrogram(
+                            x, 2., window=win, noverlap=N_ovlp, detrend='constant',
+                            return_onesided=not np.iscomplexobj(x),
+                            scaling=scaling, mode=mode)
+                        f_s, t_s, Sxx_s = stft.spectrogram(2., scaling, mode)
+                        self.assertTrue(np.allclose(f_s, f) and np.allclose(t_s, t))
+                        self.assertTrue(np.allclose(Sxx_s, Sxx),
+                                        msg=f"N_fft={N_fft}, mode={mode}, {x.dtype}")
+        # range of columns
+        _, t, Sxx = stft.spectrogram(k_start=3, k_end=5)
+        self.assertEqual(Sxx.shape, (16, 2))
+        self.assertTrue(np.allclose(t, [3 + 8, 4 + 8]))
+        with self.assertRaises(ValueError):
+            STFT_Stream(win, 16, 100)
+
+
+class TestFreqz_Cache(unittest.TestCase):
+
+    def test_freqz(self):
+        """
+        Cached responses are identical to `scipy.signal.freqz()` and `sosfreqz()`,
+        they are shared between requests with the same content and different
+        sampling frequencies and are read-only
+        """
+        cache = Freqz_Cache()
+        b, a = [1, 2, 1], [1, -0.5, 0.25]
+        w, H = cache.freqz(b, a, worN=256, whole=True, fs=10.)
+        w_ref, H_ref = sig.freqz(b, a, worN=256, whole=True, fs=10.)
+        self.assertTrue(np.allclose(w, w_ref) and np.allclose(H, H_ref))
+        self.assertFalse(H.flags.writeable or w.flags.writeable)
+        w, H_2 = cache.freqz(np.array(b, dtype=float), np.array(a, dtype=float),
+                             worN=256, whole=True)
+        self.assertIs(H_2, H)
+        self.assertAlmostEqual(w[1], 2 * np.pi / 256)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # other coefficients, grid or frequency points need a new calculation
+        cache.freqz(b, a, worN=256)
+        cache.freqz([1, 2, 2], a, worN=256, whole=True)
+        f = np.array([0.1, 0.2])
+        w, H = cache.freqz(b, a, worN=f, fs=1.)
+        self.assertTrue(np.allclose(H, sig.freqz(b, a, worN=f, fs=1.)[1]))
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        sos = sig.tf2sos(b, a)
+        self.assertTrue(np.allclose(cache.sosfreqz(sos, 100)[1],
+                                    sig.sosfreqz(sos, 100)[1]))
+
+    def test_freqz_fft(self):
+        """
+        FFT-based response is identical to `scipy.signal.freqz()` for short and
+        long (folded) real and complex filters and to `scipy.signal.sosfreqz()`
+        """
+        rng = np.random.default_rng(0)
+        for N_taps in [1, 3, 100, 1001]:
+            b = rng.standard_normal(N_taps)
+            for b in (b, b + 1j * rng.standard_normal(N_taps)):
+                for a in (1, [1, -0.5, 0.3]):
+                    for N, whole in [(7, True), (7, False), (512, True), (512, False)]:
+                        w, H = freqz_fft(b, a, N, whole)
+                        w_ref, H_ref = sig.freqz(b, a, N, whole=whole)
+                        self.assertTrue(np.allclose(w, w_ref) and np.allclose(H, H_ref),
+                                        msg=f"N_taps={N_taps}, N={N}, whole={whole}")
+        sos = sig.ellip(9, 0.1, 60, 0.1, output='sos')
+        for N, whole in [(2, True), (7, False), (512, True)]:
+            self.assertTrue(np.allclose(sosfreqz_fft(sos, N, whole)[1],
+                                        sig.sosfreqz(sos, N, whole=whole)[1]))
+
+    def test_fil_freqz(self):
+        """
+        Method is selected from the filter dict: FFT for FIR filters, sos for
+        IIR filters with second-order sections, zpk for designs in zpk format
+        without them and polynomials for frequency vectors
+        """
+        cache = Freqz_Cache()
+        b, a = sig.ellip(8, 0.1, 60, 0.1)
+        z, p, k = sig.tf2zpk(b, a)
+        sos = sig.zpk2sos(z, p, k)
+        _, H_ref = sig.sosfreqz(sos, 256, whole=True)
+        fil = {'ba': [b, a], 'sos': sos, 'zpk': [z, p, k], 'creator': ('sos', 'ellip')}
+        _, H = cache.fil_freqz(fil, 256, whole=True)
+        self.assertEqual(cache.method, 'sos')
+        self.assertTrue(np.allclose(H, H_ref))
+        fil.update({'sos': [], 'creator': ('zpk', 'ellip')})
+        _, H = cache.fil_freqz(fil, 256, whole=True)
+        self.assertEqual(cache.method, 'zpk')
+        self.assertTrue(np.allclose(H, H_ref))
+        fil['creator'] = ('ba', 'ellip')
+        cache.fil_freqz(fil, 256, whole=True)
+        self.assertEqual(cache.method, 'fft')
+        h = sig.firwin(2001, 0.1)
+        fil = {'ba': [h, np.r_[1, np.zeros(2000)]], 'sos': sig.tf2sos(h[:5], 1),
+               'creator': ('ba', 'firwin')}
+        w, H = cache.fil_freqz(fil, 512, fs=2.)
+        self.assertEqual(cache.method, 'fft')
+        self.assertTrue(np.allclose(H, sig.freqz(h, 1, 512)[1]))
+        self.assertAlmostEqual(w[-1], 511 / 512)
+        cache.fil_freqz(fil, w, fs=2.)
+        self.assertEqual(cache.method, 'ba')
+
+    def test_lru(self):
+        """
+        The least recently used response is dropped when the cache is full
+        """
+        cache = Freqz_Cache()
+        for k in range(cache.N_MAX):
+            cache.freqz([1, k], worN=16)
+        cache.freqz([1, 0], worN=16)  # hit, most recently used entry now
+        cache.freqz([1, -1], worN=16)  # drops [1, 1]
+        self.assertEqual(len(cache.cache), cache.N_MAX)
+        cache.freqz([1, 0], worN=16)
+        self.assertEqual(cache.hits, 2)
+        cache.freqz([1, 1], worN=16)
+        self.assertEqual(cache.misses, cache.N_MAX + 2)
+        cache.clear()
+        self.assertEqual((len(cache.cache), cache.hits, cache.misses), (0, 0, 0))
+
+
+class TestFreqzAdaptive(unittest.TestCase):
+
+    def setUp(self):
+        sos = sig.ellip(8, 0.1, 60, 0.1, output='sos')
+        z, p, k = sig.sos2zpk(sos)
+        self.fil = {'ba': sig.sos2tf(sos), 'sos': sos, 'zpk': [z, p, k],
+                    'F_PB': 0.05, 'F_SB': 0.06}
+
+    def test_grid(self):
+        """
+        Adaptive grid contains the band edges, is refined in the passband and
+        finds passband ripple and stopband maximum with less points than a
+        uniform grid with 2048 points
+        """
+        w, H = freqz_adaptive(self.fil)
+        self.assertTrue(np.all(np.diff(w) > 0))
+        self.assertEqual(w[0], 0)
+        self.assertLess(w[-1], 2 * np.pi)
+        self.assertLess(len(w), 2048)
+        self.assertTrue(np.allclose(H, sig.sosfreqz(self.fil['sos'], w)[1]))
+        for F in (0.05, 0.06, 0.94):
+            self.assertTrue(np.any(np.isclose(w, 2 * np.pi * F, rtol=0, atol=1e-12)))
+        # transition band is refined: more than 10 x the average density of points
+        N_tb = np.sum((w >= 0.1 * np.pi) & (w <= 0.12 * np.pi))
+        self.assertGreater(N_tb / 0.02, 10 * len(w) / 2)
+        w_d = np.linspace(0, np.pi, 1 << 18)
+        H_d = np.abs(sig.sosfreqz(self.fil['sos'], w_d)[1])
+        pb, sb = w <= 0.1 * np.pi, (w >= 0.12 * np.pi) & (w <= np.pi)
+        self.assertAlmostEqual(np.min(np.abs(H[pb])), np.min(H_d[w_d <= 0.1 * np.pi]), 4)
+        self.assertAlmostEqual(np.max(np.abs(H[sb])), np.max(H_d[w_d >= 0.12 * np.pi]), 5)
+        # range and max. number of points
+        w, H = freqz_adaptive(self.fil, w_lim=(0.1, 0.2), N_start=16, N_max=100)
+        self.assertEqual((w[0], w[-1]), (0.1, 0.2))
+        self.assertLessEqual(len(w), 100)
+
+    def test_grid_fir(self):
+        """
+        FIR filters are evaluated on a uniform grid with at least `N_fft` and four
+        points per coefficient
+        """
+        b = sig.remez(101, [0, 0.1, 0.15, 0.5], [1, 0])
+        fil = {'ba': [b, np.r_[1, np.zeros(100)]], 'F_PB': 0.1, 'F_SB': 0.15}
+        w, H = freqz_adaptive(fil, N_fft=256)
+        self.assertTrue(np.allclose(w, np.linspace(0, 2 * np.pi, 512, endpoint=False)))
+        self.assertTrue(np.allclose(H, sig.freqz(b, 1, w)[1]))
+        w, H = freqz_adaptive(fil, w_lim=(0.1, 0.2))
+        self.assertEqual(len(w), 2048)
+        self.assertTrue(np.allclose((w[0], w[-1]), (0.1, 0.2)))
+        self.assertTrue(np.allclose(H, sig.freqz(b, 1, w)[1]))
+        cache = Freqz_Cache()
+        self.assertEqual(len(cache.fil_adaptive(fil)[0]), 2048)
+        self.assertEqual(cache.method, 'ba')
+
+    def test_freq_range(self):
+        """
+        Selected range is identical to `fftshift()` / first half for uniform grids
+        """
+        for N in (8, 9):
+            W = np.linspace(0, 2 * np.pi, N, endpoint=False)
+            W_s, idx = freq_range(W, 'sym')
+            W_f = np.fft.fftshift(W)
+            self.assertTrue(np.allclose(W_s, np.where(W_f >= np.pi, W_f - 2 * np.pi, W_f)))
+            self.assertTrue(np.array_equal(idx, np.fft.fftshift(np.arange(N))))
+            self.assertTrue(np.array_equal(freq_range(W, 'half')[1], np.arange((N + 1) // 2)))
+            self.assertTrue(np.array_equal(freq_range(W, 'whole')[0], W))
+        cache = Freqz_Cache()
+        w, H = cache.fil_adaptive(self.fil, fs=2.)
+        self.assertIs(cache.fil_adaptive(self.fil)[1], H)
+        self.assertEqual(cache.method, 'sos')
+        self.assertAlmostEqual(w[-1], 2 - 2 / 128)
+
+
+class TestSurface(unittest.TestCase):
+
+    def setUp(self):
+        self.zz = surface_grid(np.arange(-1.5, 1.5, 0.03), np.arange(-1.5, 1.5, 0.03))
+
+    def test_zpk_mag_dB(self):
+        """
+        Magnitude from log. distances is identical to the polynomials for low
+        orders, also when evaluated in chunks and for multiple roots, and to the
+        cascade of second-order sections for high orders
+        """
+        b, a = sig.ellip(6, 0.1, 60, 0.3)
+        z, p, k = sig.tf2zpk(b, a)
+        H_dB = 20 * np.log10(np.abs(np.polyval(b, self.zz) / np.polyval(a, self.zz)))
+        self.assertTrue(np.allclose(zpk_mag_dB(z, p, k, self.zz), H_dB))
+        self.assertTrue(np.allclose(zpk_mag_dB(z, p, k, self.zz, N_chunk=7), H_dB))
+        # FIR filter with 100 poles at the origin
+        b = sig.firwin(101, 0.2)
+        z, p, k = sig.tf2zpk(b, np.r_[1, np.zeros(100)])
+        ok = np.abs(self.zz) > 0.1
+        H_dB = 20 * np.log10(np.abs(np.polyval(b, self.zz[ok]) / self.zz[ok]**100))
+        self.assertTrue(np.allclose(zpk_mag_dB(z, p, k, self.zz[ok]), H_dB))
+        # 100th order, the polynomials overflow
+        sos = sig.ellip(100, 0.1, 60, 0.3, output='sos')
+        z, p, k = sig.sos2zpk(sos)
+        H_dB = np.sum([20 * np.log10(np.abs(np.polyval(s[:3], self.zz)
+                                            / np.polyval(s[3:], self.zz))) for s in sos],
+                      axis=0)
+        self.assertTrue(np.allclose(zpk_mag_dB(z, p, k, self.zz), H_dB, atol=1e-6))
+        # zeros, poles and cancelling zeros and poles
+        self.assertTrue(np.allclose(
+            zpk_mag_dB([0.5, 0.2], [0.2, 0.8], 2, [0.5, 0.8, 0.2]), [-np.inf, np.inf, 0]))
+
+    def test_mag_clip(self):
+        """
+        Magnitude in dB is converted and clipped, undefined values are set to `H_min`
+        """
+        H_dB = np.array([-np.inf, np.nan, 0, 20, np.inf])
+        self.assertTrue(np.allclose(mag_clip(H_dB, 2, 0), [0, 0, 1, 2, 2]))
+        self.assertTrue(np.allclose(mag_clip(H_dB, 10, -80, log=True),
+                                    [-80, -80, 0, 10, 10]))
+
+    def test_fil_surface(self):
+        """
+        Surfaces are cached by zeros, poles, gain and grid parameters
+        """
+        fil = {'zpk': [[1j, -1j], [0.5], np.array([2.])]}
+        u = np.linspace(-1, 1, 11)
+        cache = Freqz_Cache()
+        self.assertFalse(cache.surface_cached(u, u, fil_dict=fil))
+        zz, H_dB = cache.fil_surface(u, u, fil_dict=fil)
+        self.assertTrue(cache.surface_cached(u, u, fil_dict=fil))
+        self.assertTrue(np.array_equal(zz, surface_grid(u, u)))
+        # coarse grid keeps the limits
+        self.assertTrue(np.array_equal(decimate_axis(u, 4), u[[0, 4, 8, 10]]))
+        self.assertTrue(np.array_equal(decimate_axis(u, 5), u[[0, 5, 10]]))
+        self.assertTrue(np.allclose(H_dB, zpk_mag_dB([1j, -1j], [0.5], 2, zz)))
+        self.assertIs(cache.fil_surface(u, u, fil_dict=fil)[1], H_dB)
+        self.assertFalse(H_dB.flags.writeable)
+        # polar grid
+        zz, _ = cache.fil_surface(u, u, polar=True, fil_dict=fil)
+        self.assertTrue(np.allclose(zz, np.outer(np.exp(1j * u), u)))
+        fil['zpk'][2] = 3
+        self.assertFalse(cache.surface_cached(u, u, fil_dict=fil))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# run tests with python -m pyfda.tests.test_pyfda_sig_lib
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Speed and accuracy comparison of the magnitude |H(z)| on the 3D plot grid
+calculated from the polynomials (`pyfda_lib.H_mag()`) and from zeros and poles
+as log. distances (`pyfda_sig_lib.zpk_mag_dB()`) for elliptic filters. The
+reference is the cascade of second-order sections.
+Run with `python -m pyfda.tests.test_surface_time`
+"""
+import time
+import warnings
+import numpy as np
+import scipy.signal as sig
+
+from pyfda.libs.pyfda_lib import H_mag
+from pyfda.libs.pyfda_sig_lib import surface_grid, zpk_mag_dB
+
+N_RUNS = 5
+
+if __name__ == "__main__":
+    warnings.simplefilter('ignore', sig.BadCoefficients)
+    # grid of Plot_3D with 100 x 100 points
+    zz = surface_grid(np.arange(-1.5, 1.5, 0.03), np.arange(-1.5, 1.5, 0.03))
+
+    print(f"{'order':>6}{'T_poly / ms':>13}{'T_zpk / ms':>12}{'err_poly / dB':>15}"
+          f"{'err_zpk / dB':>14}")
+    for N in [8, 20, 50, 100]:
+        sos = sig.ellip(N, 0.1, 60, 0.3, output='sos')
+        b, a = sig.sos2tf(sos)
+        z, p, k = sig.sos2zpk(sos)
+        with np.errstate(all='ignore'):
+            H_ref = np.sum([20 * np.log10(np.abs(np.polyval(s[:3], zz)
+                                                 / np.polyval(s[3:], zz)))
+                            for s in sos], axis=0)
+            T = {'poly': np.inf, 'zpk': np.inf}
+            for _ in range(N_RUNS):
+                t1 = time.perf_counter()
+                H_poly = H_mag(b, a, zz, np.inf, log=True)
+                T['poly'] = min(T['poly'], time.perf_counter() - t1)
+                t1 = time.perf_counter()
+                H_zpk = zpk_mag_dB(z, p, k, zz)
+                T['zpk'] = min(T['zpk'], time.perf_counter() - t1)
+            # deviation in the range -100 ... 100 dB of the reference
+            rng = np.abs(H_ref) < 100
+            err_poly = np.max(np.abs(np.nan_to_num(H_poly[rng] - H_ref[rng], nan=np.inf)))
+            err_zpk = np.max(np.abs(H_zpk[rng] - H_ref[rng]))
+        print(f"{N:>6}{T['poly'] * 1e3:>13.2f}{T['zpk'] * 1e3:>12.2f}{err_poly:>15.1e}"
+              f"{err_zpk:>14.1e}")
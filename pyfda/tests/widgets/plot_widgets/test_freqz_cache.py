@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test that the frequency response is shared between the widgets
+"""
+import sys
+import time
+import unittest
+
+import numpy as np
+import scipy.signal as sig
+
+from pyfda.libs.compat import QApplication, QTest
+import pyfda.filterbroker as fb
+from pyfda.libs.pyfda_qt_lib import qset_cmb_box
+from pyfda.libs.pyfda_sig_lib import freqz_cache
+from pyfda.plot_widgets.plot_hf import Plot_Hf
+from pyfda.plot_widgets.plot_phi import Plot_Phi
+from pyfda.plot_widgets.plot_3d import Plot_3D
+from pyfda.plot_widgets.plot_pz import Plot_PZ
+from pyfda.plot_widgets.plot_tau_g import Plot_tau_g
+from pyfda.pyfda_rc import params
+from pyfda.input_widgets.input_info import Input_Info
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+class FreqzCacheTest(unittest.TestCase):
+    """Test the shared frequency response cache"""
+
+    def setUp(self):
+        self.wdgs = [Plot_Hf(), Plot_Phi(), Plot_3D()]
+        for wdg in self.wdgs:
+            wdg.show()
+
+    def tearDown(self):
+        for wdg in self.wdgs:
+            wdg.close()
+            wdg.deleteLater()
+        self.wdgs = []
+
+    def test_shared_response(self):
+        """
+        A design change triggers only one calculation of the response on the
+        full unit circle for all widgets
+        """
+        fb.fil[0].update({'ba': [[0.3, 0.3], [1, -0.4]], 'zpk': [[-1], [0.4], 0.3],
+                          'sos': []})
+        freqz_cache.clear()
+        for wdg in self.wdgs:
+            wdg.process_sig_rx({'data_changed': 'filter_designed', 'id': 0})
+        self.assertEqual(freqz_cache.misses, 1)
+        self.assertEqual(freqz_cache.hits, len(self.wdgs) - 1)
+        # Input_Info only calculates the response at the test frequencies
+        info = Input_Info()
+        info.process_sig_rx({'data_changed': 'filter_designed', 'id': 0})
+        self.assertLessEqual(freqz_cache.misses, 2)
+
+    def test_adaptive_grid(self):
+        """
+        With the adaptive grid, magnitude, phase and group delay are calculated
+        on the same grid with one calculation
+        """
+        sos = sig.ellip(8, 0.1, 60, 0.1, output='sos')
+        fb.fil[0].update({'ba': sig.sos2tf(sos), 'sos': sos, 'zpk': sig.sos2zpk(sos),
+                          'freqSpecsRangeType': 'half'})
+        self.wdgs += [Plot_tau_g()]
+        self.wdgs[-1].show()
+        freqz_cache.clear()
+        params['FREQ_GRID'] = 'adaptive'
+        try:
+            for wdg in self.wdgs[:2] + self.wdgs[3:]:  # without Plot_3D
+                wdg.process_sig_rx({'data_changed': 'n_fft', 'id': 0})
+        finally:
+            params['FREQ_GRID'] = 'uniform'
+        self.assertEqual(freqz_cache.misses, 1)
+        W = self.wdgs[0].W
+        self.assertLess(len(W), params['N_FFT'])
+        self.assertTrue(np.array_equal(self.wdgs[1].W, W))
+        self.assertTrue(np.array_equal(self.wdgs[3].W, W))
+        # only the first half is displayed
+        F = self.wdgs[0].F
+        self.assertEqual(len(F), np.sum(W < np.pi))
+        self.assertTrue(np.allclose(np.abs(self.wdgs[0].H_c),
+                                    np.abs(sig.sosfreqz(sos, W[W < np.pi])[1])))
+        # passband, the response of ba is inaccurate near singularities and edges
+        pb = W < 0.08 * np.pi
+        self.assertTrue(np.allclose(self.wdgs[3].tau_g[pb],
+                                    sig.group_delay(fb.fil[0]['ba'], W[pb])[1], rtol=1e-3))
+
+    def test_surface(self):
+        """
+        |H(z)| is drawn on a coarse grid first and refined by a timer, redraws
+        with changed display settings reuse the cached surface
+        """
+        z, p, k = sig.ellip(100, 0.1, 60, 0.3, output='zpk')
+        fb.fil[0].update({'ba': sig.zpk2tf(z, p, k), 'sos': [], 'zpk': [z, p, k]})
+        wdg = self.wdgs[2]  # Plot_3D
+        freqz_cache.clear()
+        qset_cmb_box(wdg.cmbMode3D, 'Surf', fireSignals=True)
+        self.assertTrue(wdg.timer_refine.isActive())
+        self.assertFalse(freqz_cache.surface_cached(*wdg.grid))
+        t_start = time.time()
+        while wdg.timer_refine.isActive():
+            self.assertLess(time.time() - t_start, 20, "Timeout")
+            QTest.qWait(10)
+        self.assertTrue(freqz_cache.surface_cached(*wdg.grid))
+        misses = freqz_cache.misses
+        wdg.cmbColormap.setCurrentIndex(wdg.cmbColormap.currentIndex() + 1)
+        wdg.but_log.click()
+        self.assertFalse(wdg.timer_refine.isActive())
+        self.assertEqual(freqz_cache.misses, misses)
+        # contours of Plot_PZ
+        pz = Plot_PZ()
+        self.wdgs.append(pz)
+        pz.show()
+        qset_cmb_box(pz.cmb_overlay, 'contour', fireSignals=True)
+        self.assertTrue(pz.timer_refine.isActive())
+        pz._refine()
+        misses = freqz_cache.misses
+        pz.draw()
+        self.assertFalse(pz.timer_refine.isActive())
+        self.assertEqual(freqz_cache.misses, misses)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# run tests with python -m pyfda.tests.widgets.plot_widgets.test_freqz_cache
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test the zoomed frequency response of the Plot_Hf widget
+"""
+import sys
+import unittest
+
+import numpy as np
+import scipy.signal as sig
+
+from pyfda.libs.compat import QApplication
+import pyfda.filterbroker as fb
+from pyfda.libs.pyfda_qt_lib import qset_cmb_box
+from pyfda.plot_widgets.plot_hf import Plot_Hf
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+class PlotHfTest(unittest.TestCase):
+    """Test the zoomed frequency response of Plot_Hf"""
+
+    def setUp(self):
+        self.b = sig.firwin(501, 0.2)
+        fb.fil[0].update({'ba': [self.b, np.r_[1, np.zeros(500)]], 'sos': [],
+                          'creator': ('ba', 'firwin')})
+        self.form = Plot_Hf()
+        self.form.show()
+        qset_cmb_box(self.form.cmb_units_a, 'V', fireSignals=True)  # redraws plot
+        self.f_S = fb.fil[0]['f_max']
+
+    def tearDown(self):
+        self.form.close()
+        self.form.deleteLater()
+
+    def test_zoom(self):
+        """
+        With "Zoom" checked, the response is recalculated with N_ZOOM points over
+        the visible range, zooming out restores the response of the whole range
+        """
+        ax = self.form.ax
+        line = self.form.zoom_lines[ax][0][0]
+        F = line.get_xdata()
+        # zoom into the passband, less than N_ZOOM points are visible
+        f_lim = (0.01 * self.f_S, 0.02 * self.f_S)
+        ax.set_xlim(f_lim)
+        self.assertTrue(np.array_equal(line.get_xdata(), F))  # "Zoom" is not checked
+        self.form.but_zoom.click()
+        F_z = line.get_xdata()
+        self.assertEqual(len(F_z), self.form.N_ZOOM)
+        self.assertTrue(np.allclose([F_z[0], F_z[-1]], f_lim))
+        _, H = sig.freqz(self.b, worN=F_z, fs=self.f_S)
+        self.assertTrue(np.allclose(line.get_ydata(), np.abs(H)))
+        # recalculated after panning
+        ax.set_xlim(0.02 * self.f_S, 0.03 * self.f_S)
+        self.assertAlmostEqual(line.get_xdata()[0], 0.02 * self.f_S)
+        # zoom out
+        ax.set_xlim(0, self.f_S / 2)
+        self.assertTrue(np.array_equal(line.get_xdata(), F))
+        # inset
+        self.form.cmbInset.setCurrentIndex(1)
+        line_i = self.form.zoom_lines[self.form.ax_i][0][0]
+        self.form.ax_i.set_xlim(f_lim)
+        self.assertEqual(len(line_i.get_xdata()), self.form.N_ZOOM)
+        self.form.cmbInset.setCurrentIndex(0)
+        self.assertEqual(len(self.form.zoom_lines), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# run tests with python -m pyfda.tests.widgets.plot_widgets.test_plot_hf
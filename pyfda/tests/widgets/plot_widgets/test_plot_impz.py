@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the pyFDA project hosted at https://github.com/chipmuenk/pyfda
+#
+# Copyright © pyFDA Project Contributors
+# Licensed under the terms of the MIT License
+# (see file LICENSE in root directory for details)
+
+"""
+Test the transient simulation of the Plot_Impz widget in a worker thread
+"""
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import scipy.signal as sig
+from matplotlib.collections import LineCollection, PolyCollection
+
+import pyfda.filterbroker as fb
+from pyfda.libs.compat import QApplication, QTest
+from pyfda.libs.pyfda_qt_lib import qset_cmb_box
+from pyfda.libs.pyfda_sig_lib import STFT_Stream
+from pyfda.plot_widgets.plot_impz import Plot_Impz
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+
+class PlotImpzTest(unittest.TestCase):
+    """Test the transient simulation of Plot_Impz"""
+
+    def setUp(self):
+        fb.fil[0].update({'ba': [[0.2, 0.3, 0.2], [1, -0.5, 0.2]], 'sos': []})
+        self.form = Plot_Impz()
+        self.form.T_DRAW_INC = 1000  # no incremental redraws
+        self.form.show()
+        self.wait()
+
+    def wait(self, cond=lambda form: form.worker is None, timeout=20):
+        """
+        Process events until `cond` becomes true
+        """
+        t_start = time.time()
+        while not cond(self.form):
+            self.assertLess(time.time() - t_start, timeout, "Timeout")
+            QTest.qWait(5)
+
+    def test_response(self):
+        """
+        Response calculated frame-wise in the worker is identical to the response
+        calculated in one pass
+        """
+        self.form.ui.N_end = 1000
+        self.form.ui.N_frame = 64
+        self.form.ui.but_run.click()
+        self.assertIsNotNone(self.form.worker)
+        self.wait()
+        self.assertFalse(self.form.needs_calc)
+        self.assertEqual(self.form.ui.prg_wdg.value(), 1000)
+        self.assertEqual(self.form.N_valid, 1000)
+        b, a = fb.fil[0]['ba']
+        self.assertTrue(np.allclose(self.form.y, sig.lfilter(b, a, self.form.x)))
+
+    def test_stim_cache(self):
+        """
+        The stimulus is only recalculated when its settings have been changed,
+        the FFTs only when data, window or range have been changed
+        """
+        self.form.ui.but_run.click()
+        self.wait()
+        x = self.form.x
+        self.assertIsNotNone(self.form.x_key)
+        with patch.object(self.form.stim_wdg, 'calc_stimulus_frame',
+                          wraps=self.form.stim_wdg.calc_stimulus_frame) as calc_stim:
+            # filter has been changed: only the response is recalculated
+            fb.fil[0].update({'ba': [[0.3, 0.3], [1, -0.4]], 'sos': []})
+            self.form.process_sig_rx({'data_changed': 'filter_designed', 'id': 0})
+            self.wait()
+            self.assertIs(self.form.x, x)
+            self.assertEqual(calc_stim.call_count, 1)  # only the 10 test samples
+            self.assertTrue(np.allclose(self.form.y, sig.lfilter([0.3, 0.3], [1, -0.4], x)))
+            # stimulus has been changed
+            self.form.stim_wdg.ui.A1 = 2.
+            self.form.process_sig_rx({'data_changed': 'filter_designed', 'id': 0})
+            self.wait()
+            self.assertIsNot(self.form.x, x)
+            self.assertGreater(calc_stim.call_count, 2)
+            self.assertEqual(np.max(np.abs(self.form.x)), 2.)
+        self.form.calc_fft()
+        self.form.X = None
+        self.form.calc_fft()  # nothing has changed
+        self.assertIsNone(self.form.X)
+        self.form.ui.qfft_win_select.set_window_name('hann')
+        self.form.calc_fft()  # window has changed
+        self.assertIsNotNone(self.form.X)
+
+    def test_decimation(self):
+        """
+        Long time domain plots are decimated to the axis width, stems are drawn
+        as envelopes. Zooming in shows the data with full resolution.
+        """
+        self.form.ui.N_end = 100000
+        self.form.ui.N_frame = 100000
+        self.form.ui.but_run.click()
+        self.wait()
+        qset_cmb_box(self.form.ui.cmb_plt_time_stim, 'stem', data=True)
+        qset_cmb_box(self.form.ui.cmb_plt_time_resp, 'stem', data=True)
+        self.form.draw_time()
+        N_px = int(self.form.ax_r.bbox.width)
+        self.assertEqual(len(self.form.decim), 2)  # stimulus and response
+        for entry in self.form.decim:
+            self.assertEqual(entry['plt_style'], 'stem')
+            # envelope with one point per pixel
+            env = [a for a in entry['artists'] if isinstance(a, PolyCollection)]
+            self.assertEqual(len(env), 1)
+            self.assertLessEqual(len(entry['artists']), 3)
+        y = self.form.decim[1]['y']
+        self.assertEqual(np.max(y), np.max(self.form.y.real))
+        # zoom in to 50 samples
+        T_S = fb.fil[0]['T_S']
+        self.form.ax_r.set_xlim(1000 * T_S, 1050 * T_S)
+        for entry in self.form.decim:
+            self.assertEqual(entry['range'], (999, 1052))
+            self.assertFalse(any(isinstance(a, PolyCollection) for a in entry['artists']))
+        stem_lines = self.form.decim[1]['artists']
+        self.assertTrue(any(isinstance(a, LineCollection) and len(a.get_segments()) == 53
+                            for a in stem_lines))
+        # zoom out to 20 samples per pixel: line plots are decimated to min. / max.
+        qset_cmb_box(self.form.ui.cmb_plt_time_resp, 'line', data=True,
+                     fireSignals=True)  # redraws plot
+        self.form.ax_r.set_xlim(0, 20 * N_px * T_S)
+        entry = self.form.decim[1]
+        self.assertEqual(entry['plt_style'], 'line')
+        line = entry['artists'][0]
+        self.assertLessEqual(len(line.get_xdata()), 2 * N_px)
+        self.assertEqual(np.max(line.get_ydata()), np.max(y[:20 * N_px + 2]))
+
+    def test_spectrogram(self):
+        """
+        STFT columns of the spectrogram are calculated frame by frame, redraws
+        with changed display settings reuse them
+        """
+        ui = self.form.ui
+        qset_cmb_box(ui.cmb_plt_time_spgr, 'yn', data=True)
+        ui.N = ui.N_end = 1000
+        ui.N_frame = 64
+        ui.time_nfft_spgr = 64
+        ui.time_ovlp_spgr = 32
+        with patch.object(STFT_Stream, 'add', autospec=True,
+                          side_effect=STFT_Stream.add) as add:
+            ui.but_run.click()
+            self.wait()
+            self.assertGreater(add.call_count, 10)  # called for each frame
+            stft = self.form.stft
+            self.assertEqual(stft.N_in, 1000)
+            self.assertEqual(stft.N_cols, 30)
+            win = ui.qfft_win_select.calc_window(64)
+            _, _, Sxx = sig.spectrogram(self.form.y, window=win, noverlap=32,
+                                        detrend='constant')
+            self.assertTrue(np.allclose(stft.spectrogram()[2], Sxx))
+            # toggling log. scale only redraws the spectrogram
+            add.reset_mock()
+            ui.but_log_spgr_time.click()
+            self.assertIs(self.form.stft, stft)
+            add.assert_not_called()
+            # changing the overlap recalculates it
+            ui.led_time_ovlp_spgr.setText('16')
+            self.form._spgr_ui2params()
+            self.assertEqual(self.form.stft.N_ovlp, 16)
+            self.assertEqual(self.form.stft.N_cols, 20)
+
+    def test_long_fir(self):
+        """
+        Long FIR filters are calculated with FFT convolution
+        """
+        b = sig.firwin(301, 0.1)
+        fb.fil[0].update({'ba': [b, np.r_[1, np.zeros(300)]], 'sos': []})
+        self.form.ui.N_end = 5000
+        self.form.ui.N_frame = 700
+        self.form.ui.but_run.click()
+        self.wait()
+        self.assertIsNotNone(self.form.ols)
+        self.assertTrue(np.allclose(self.form.y, sig.lfilter(b, 1, self.form.x)))
+
+    def test_out_of_core(self):
+        """
+        Large buffers are memory-mapped, the response is calculated frame-wise
+        with a limited frame length
+        """
+        self.form.MEMMAP_BYTES = 1000
+        self.form.N_FRAME_MEMMAP = 100
+        self.form.ui.N_end = 1000
+        self.form.ui.N_frame = 1000
+        self.form.ui.but_run.click()
+        self.assertEqual(self.form.worker.N_frame, 100)
+        self.wait()
+        self.assertTrue(self.form.out_of_core)
+        self.assertIsInstance(self.form.x, np.memmap)
+        self.assertIsInstance(self.form.y, np.memmap)
+        b, a = fb.fil[0]['ba']
+        self.assertTrue(np.allclose(self.form.y, sig.lfilter(b, a, self.form.x)))
+
+    def test_stop(self):
+        """
+        Pressing "Run" during a simulation stops it after the current frame
+        """
+        self.form.ui.N_end = 1000000
+        self.form.ui.N_frame = 100
+        self.form.ui.but_run.click()
+        self.wait(lambda form: form.ui.prg_wdg.value() > 0)
+        x = self.form.x
+        self.form.ui.but_run.click()
+        self.assertIsNone(self.form.worker)
+        self.assertTrue(self.form.needs_calc)
+        N_valid = self.form.N_valid
+        self.assertTrue(0 < N_valid < 1000000)
+        self.assertEqual(N_valid, self.form.N_first)
+        QTest.qWait(50)  # signals of stopped worker are ignored
+        self.assertEqual(self.form.N_valid, N_valid)
+        self.assertTrue(self.form.needs_calc)
+        self.assertIs(self.form.x, x)  # buffers are not reallocated
+        self.assertFalse(np.any(self.form.y[N_valid:]))
+
+    def test_ensemble(self):
+        """
+        With random noise and K > 1 realizations, the spectra are averaged over
+        the ensemble
+        """
+        stim_ui = self.form.stim_wdg.ui
+        qset_cmb_box(stim_ui.cmb_stim_noise, 'gauss')
+        stim_ui.led_N_ens.setText('8')
+        stim_ui._update_noi()  # triggers simulation
+        self.wait()
+        self.assertFalse(self.form.needs_calc)
+        self.assertEqual(self.form.ens_stats.K, 8)
+        self.form.calc_fft()
+        self.assertTrue(np.allclose(self.form.Y, np.sqrt(self.form.ens_stats.P_Y)))
+        # mean and variance of the response up to the end of the range of the spectra,
+        # drawn as a band around the mean
+        ens = self.form.ens_stats
+        self.assertEqual(len(ens.y_mean), self.form.ui.N_end)
+        self.assertTrue(np.all(ens.y_var[1:] > 0))
+        self.form.draw_time(N_start=0, N_end=self.form.ui.N_end)
+        self.assertEqual(len([c for c in self.form.ax_r.collections
+                              if isinstance(c, PolyCollection)]), 1)
+        # ensemble is not used when noise is switched off
+        qset_cmb_box(stim_ui.cmb_stim_noise, 'none')
+        stim_ui._update_noi()
+        self.wait()
+        self.assertIsNone(self.form.ens_stats)
+        self.form.draw_time(N_start=0, N_end=self.form.ui.N_end)
+        self.assertFalse(any(isinstance(c, PolyCollection)
+                             for c in self.form.ax_r.collections))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# run tests with python -m pyfda.tests.widgets.plot_widgets.test_plot_impz